@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+"""
+Measures, for every node class, the memory held by an object and the cost of
+constructing it, of loading it from an OSDF document and of generating its
+document again. The documents come from fields_docs.json, next to this
+script, and load on both the Field based classes and older revisions. Run it
+from the root of a checkout:
+
+    $ PYTHONPATH=. python bench/bench_fields.py --count 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+from cutlass.dependency import node_classes, loader_methods
+
+def to_str(value):
+    """ Converts the unicode strings parsed from JSON to str. """
+    if isinstance(value, dict):
+        return dict((to_str(k), to_str(v)) for (k, v) in value.items())
+
+    if isinstance(value, list):
+        return [to_str(v) for v in value]
+
+    if isinstance(value, unicode):
+        return value.encode("utf-8")
+
+    return value
+
+def size_of(obj):
+    """ The size of an object in bytes, including its __dict__ if any. """
+    size = sys.getsizeof(obj)
+
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+
+    return size
+
+def best(func, count):
+    """ The best time per call of func over 3 runs, in microseconds. """
+    return min(timeit.repeat(func, number=count, repeat=3)) / count * 1e6
+
+def main():
+    """ The main body of execution. """
+    parser = argparse.ArgumentParser(
+        description='Time the construction, loading and documents of nodes.')
+
+    parser.add_argument('--count', metavar='n', type=int, default=2000,
+                        help='Number of objects per run.')
+    args = parser.parse_args()
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "fields_docs.json")
+
+    with open(path) as docs_file:
+        docs = to_str(json.load(docs_file))
+
+    print("%-32s %6s %9s %9s %9s" % ("class", "bytes", "new", "load", "raw"))
+
+    for (_node_type, cls) in sorted(node_classes.items()):
+        name = cls.__name__
+        loader = getattr(cls, loader_methods[name])
+
+        doc = dict(docs[name], id="bench_" + name, ver=1)
+        loaded = loader(doc)
+
+        print("%-32s %6d %7.1fus %7.1fus %7.1fus" % (
+            name, size_of(cls()), best(cls, args.count),
+            best(lambda: loader(doc), args.count),
+            best(loaded._get_raw_doc, args.count)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+
+"""
+Measures the cost of constructing model objects and the number of logging
+handlers attached to their class logger afterwards. Run it from the root of
+a checkout to compare the class logger setup against older revisions:
+
+    $ PYTHONPATH=. python bench/bench_loggers.py --count 100000
+"""
+
+import argparse
+import logging
+import time
+
+from cutlass import Sample
+
+def main():
+    """ The main body of execution. """
+    parser = argparse.ArgumentParser(
+        description='Time the construction of Sample objects.')
+
+    parser.add_argument('--count', metavar='n', type=int, default=10000,
+                        help='Number of objects to construct.')
+    args = parser.parse_args()
+
+    start = time.time()
+
+    for _ in range(args.count):
+        sample = Sample()
+
+    elapsed = time.time() - start
+
+    handlers = len(logging.getLogger(sample.logger.name).handlers)
+
+    print("objects:  %d" % args.count)
+    print("total:    %.2fs" % elapsed)
+    print("per obj:  %.1fus" % (elapsed / args.count * 1e6))
+    print("handlers: %d" % handlers)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+"""
+Measures the cost of constructing VisitAttribute objects and of loading them
+from an OSDF document. Run it from the root of a checkout to compare the
+property setup against older revisions:
+
+    $ PYTHONPATH=. python bench/bench_visit_attr.py --count 5000
+"""
+
+import argparse
+import timeit
+
+from cutlass import VisitAttribute
+
+def sample_doc():
+    """ Builds the document to load, with fields from several sections. """
+    attr = VisitAttribute()
+
+    attr.comment = "comment"
+    attr.study = "prediabetes"
+    attr.survey_id = "survey"
+    attr.age = 30
+    attr.thirtym_gluc = 90
+    attr.breakfast_food = "eggs"
+
+    doc = attr._get_raw_doc()
+    doc['id'] = "visit_attr_bench"
+    doc['ver'] = 1
+
+    return doc
+
+def best(func, count):
+    """ The best time per call of func over 3 runs, in microseconds. """
+    return min(timeit.repeat(func, number=count, repeat=3)) / count * 1e6
+
+def main():
+    """ The main body of execution. """
+    parser = argparse.ArgumentParser(
+        description='Time the construction and loading of VisitAttribute.')
+
+    parser.add_argument('--count', metavar='n', type=int, default=5000,
+                        help='Number of objects per run.')
+    args = parser.parse_args()
+
+    doc = sample_doc()
+
+    print("construct: %.1fus" % best(VisitAttribute, args.count))
+    print("load:      %.1fus" %
+          best(lambda: VisitAttribute.load_visit_attr(doc), args.count))
+
+if __name__ == '__main__':
+    main()
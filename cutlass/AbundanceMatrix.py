@@ -10,7 +10,9 @@ import os
 import string
 from cutlass.aspera import aspera
 from cutlass.iHMPSession import iHMPSession
+from cutlass.identity import identity_mapped
 from cutlass.Base import Base
+from cutlass.fields import Field
 from cutlass.Util import *
 
 # Create a module logger named after the module
@@ -18,6 +20,19 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+def _check_size(size):
+    """
+    Checks a new size of the file in bytes.
+
+    Args:
+        size (int): The size of the file in bytes.
+
+    Returns:
+        None
+    """
+    if size < 0:
+        raise ValueError("The size must be non-negative.")
+
 class AbundanceMatrix(Base):
     """
     The class encapsulates iHMP abundance matrix data. It contains all
@@ -31,6 +46,29 @@ class AbundanceMatrix(Base):
 
     aspera_server = "aspera.microbiome-bioactives.org"
 
+    __slots__ = ("_urls",)
+
+    checksums = Field(dict, "The checksum data.", required=True, default=dict)
+    comment = Field(str, "A descriptive comment for the abundance matrix.",
+                    required=True)
+    format = Field(str, "The file format of the matrix file. eg.g. tbl, csv, "
+                   "biom.", required=True)
+    format_doc = Field(str, "URL for documentation of file format.",
+                       required=True)
+    local_file = Field(str, "The path to the local file to upload to the iHMP "
+                       "DCC.", meta=False)
+    matrix_type = Field(str, "The type of matrix, e.g. community, functional, "
+                        "proteomic, lipidomic, transcriptomic.", required=True)
+    private_files = Field(
+        bool, "Whether this object describes private data that should not be "
+        "uploaded to the DCC. Defaults to false.")
+    size = Field(int, "The size of the file in bytes.", required=True,
+                 check=_check_size)
+    sop = Field(str, "URL pointing to a description of the process used to "
+                "generate the matrix.")
+    study = Field(str, "One of the 3 studies that are part of the iHMP.",
+                  required=True)
+
     def __init__(self, *args, **kwargs):
         """
         Constructor for the AbundanceMatrix class. This initializes the
@@ -39,287 +77,10 @@ class AbundanceMatrix(Base):
         Args:
             None
         """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        # These are common to all objects
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        # Required properties
-        self._checksums = {}
-        self._comment = None
-        self._format = None
-        self._format_doc = None
-        self._matrix_type = None
-        self._size = None
-        self._study = None
         self._urls = ['']
 
-        # Optional properties
-        self._local_file = None
-        self._private_files = None
-        self._sop = None
-
         super(AbundanceMatrix, self).__init__(*args, **kwargs)
 
-    @property
-    def checksums(self):
-        """
-        dict: The checksum data.
-        """
-        self.logger.debug("In 'checksums' getter.")
-        return self._checksums
-
-    @checksums.setter
-    @enforce_dict
-    def checksums(self, checksums):
-        """
-        The setter for the checksums.
-
-        Args:
-            checksums (dict): The checksums used for data integrity checking.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'checksums' setter.")
-
-        self._checksums = checksums
-
-    @property
-    def comment(self):
-        """
-        str: A descriptive comment for the abundance matrix.
-        """
-        self.logger.debug("In 'comment' getter.")
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for a descriptive comment for the abundance matrix.
-
-        Args:
-            comment (str): The comment text.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'comment' setter.")
-
-        self._comment = comment
-
-    @property
-    def format(self):
-        """
-        str: The file format of the matrix file. eg.g. tbl, csv, biom.
-        """
-        self.logger.debug("In 'format' getter.")
-        return self._format
-
-    @format.setter
-    @enforce_string
-    def format(self, format_):
-        """
-        The setter for the file format of the matrix file. eg.g. tbl, csv, biom.
-
-        Args:
-            format (str): The file format of the matrix file.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format' setter.")
-        self._format = format_
-
-    @property
-    def format_doc(self):
-        """
-        str: URL for documentation of file format.
-        """
-        self.logger.debug("In 'format_doc' getter.")
-        return self._format_doc
-
-    @format_doc.setter
-    @enforce_string
-    def format_doc(self, format_doc):
-        """
-        The setter for the URL for the documentation of the file format.
-
-        Args:
-            format_doc (str): URL for file format documentation.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format_doc' setter.")
-
-        self._format_doc = format_doc
-
-    @property
-    def local_file(self):
-        """
-        str: The path to the local file to upload to the iHMP DCC.
-        """
-        self.logger.debug("In 'local_file' getter.")
-
-        return self._local_file
-
-    @local_file.setter
-    @enforce_string
-    def local_file(self, local_file):
-        """
-        The setter for the AbundanceMatrix local file.
-
-        Args:
-            local_file (str): The URL to the local file that should be uploaded
-                              to the DCC.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_file' setter.")
-
-        self._local_file = local_file
-
-    @property
-    def matrix_type(self):
-        """
-        str: The type of matrix, e.g. community, functional, proteomic,
-        lipidomic, transcriptomic.
-        """
-        self.logger.debug("In 'matrix_type' getter.")
-
-        return self._matrix_type
-
-    @matrix_type.setter
-    @enforce_string
-    def matrix_type(self, matrix_type):
-        """
-        The setter for the type of matrix, e.g. community, functional,
-        proteomic, lipidomic, transcriptomic.
-        Args:
-            matrix_type (str):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'matrix_type' setter.")
-
-        self._matrix_type = matrix_type
-
-    @property
-    def private_files(self):
-        """
-        bool: Whether this object describes private data that should not
-        be uploaded to the DCC. Defaults to false.
-        """
-        self.logger.debug("In 'private_files' getter.")
-
-        return self._private_files
-
-    @private_files.setter
-    @enforce_bool
-    def private_files(self, private_files):
-        """
-        The setter for the private files flag to denote this object
-        describes data that should not be uploaded to the DCC.
-
-        Args:
-            private_files (bool):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'private_files' setter.")
-
-        self._private_files = private_files
-
-    @property
-    def size(self):
-        """
-        int: The size of the file in bytes.
-        """
-        self.logger.debug("In 'size' getter.")
-
-        return self._size
-
-    @size.setter
-    @enforce_int
-    def size(self, size):
-        """
-        The setter for the size of the file in bytes.
-
-        Args:
-            size (int):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'size' setter.")
-
-        if size < 0:
-            raise ValueError("The size must be non-negative.")
-
-        self._size = size
-
-    @property
-    def sop(self):
-        """
-        str: URL pointing to a description of the process used to generate
-        the matrix.
-        """
-        self.logger.debug("In 'sop' getter.")
-
-        return self._sop
-
-    @sop.setter
-    @enforce_string
-    def sop(self, sop):
-        """
-        Set the URL pointing to a description of the process used to generate
-        the matrix.
-
-        Args:
-            sop (str): The documentation URL.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sop' setter.")
-
-        self._sop = sop
-
-    @property
-    def study(self):
-        """
-        str: One of the 3 studies that are part of the iHMP.
-        """
-        self.logger.debug("In 'study' getter.")
-
-        return self._study
-
-    @study.setter
-    @enforce_string
-    def study(self, study):
-        """
-        One of the 3 studies that are part of the iHMP.
-
-        Args:
-            study (str): One of the 3 studies that are part of the iHMP.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'study' setter.")
-
-        self._study = study
-
     @property
     def urls(self):
         """
@@ -330,14 +91,15 @@ class AbundanceMatrix(Base):
 
         return self._urls
 
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -347,7 +109,8 @@ class AbundanceMatrix(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -374,7 +137,7 @@ class AbundanceMatrix(Base):
 
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -382,7 +145,8 @@ class AbundanceMatrix(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -390,7 +154,7 @@ class AbundanceMatrix(Base):
         """
         self.logger.debug("In is_valid.")
 
-        problems = self.validate()
+        problems = self.validate(session=session)
 
         valid = True
 
@@ -416,44 +180,9 @@ class AbundanceMatrix(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [AbundanceMatrix.namespace]
-            },
-            'linkage': self._links,
-            'ns': AbundanceMatrix.namespace,
-            'node_type': 'abundance_matrix',
-            'meta': {
-                'checksums': self._checksums,
-                'comment': self._comment,
-                'format': self._format,
-                'format_doc': self._format_doc,
-                'matrix_type': self._matrix_type,
-                'size': self._size,
-                'study': self._study,
-                'subtype': self._matrix_type,
-                'tags': self._tags,
-                'urls': self._urls
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("Object has the OSDF id set.")
-            doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("Object has the OSDF version set.")
-            doc['ver'] = self._version
-
-        # Handle optional properties
-        if self._sop is not None:
-            self.logger.debug("Object has the 'sop' property set.")
-            doc['meta']['sop'] = self._sop
-
-        if self._private_files is not None:
-            self.logger.debug("Object has the 'private_files' property set.")
-            doc['meta']['private_files'] = self._private_files
+        doc = super(AbundanceMatrix, self)._get_raw_doc()
+        doc['meta']['subtype'] = self._matrix_type
+        doc['meta']['urls'] = self._urls
 
         return doc
 
@@ -471,7 +200,7 @@ class AbundanceMatrix(Base):
         return ("checksums", "comment", "format", "format_doc",
                 "matrix_type", "size", "study")
 
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object (self) from OSDF. If the object has not been
         previously saved (node ID is not set), then an error message will be
@@ -480,7 +209,8 @@ class AbundanceMatrix(Base):
         instance, and this object must be re-saved in order to use it again.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True upon successful deletion, False otherwise.
@@ -493,7 +223,8 @@ class AbundanceMatrix(Base):
 
         matrix_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -510,7 +241,7 @@ class AbundanceMatrix(Base):
         return success
 
     @staticmethod
-    def search(query="\"abundance_matrix\"[node_type]"):
+    def search(query="\"abundance_matrix\"[node_type]", session=None):
         """
         Searches OSDF for AbundanceMatrix nodes. Any criteria the user wishes to
         add is provided by the user in the query language specifications
@@ -525,6 +256,8 @@ class AbundanceMatrix(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          Annotation node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of AbundanceMatrix objects. It returns an empty list
@@ -532,7 +265,8 @@ class AbundanceMatrix(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"abundance_matrix"[node_type]':
@@ -554,6 +288,7 @@ class AbundanceMatrix(Base):
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_abundance_matrix(matrix_data):
         """
         Takes the provided JSON string and converts it to an
@@ -570,36 +305,16 @@ class AbundanceMatrix(Base):
 
         module_logger.debug("Filling in %s details.", __name__)
 
-        # The attributes commmon to all iHMP nodes
-        matrix._set_id(matrix_data['id'])
-        matrix.links = matrix_data['linkage']
-        matrix.version = matrix_data['ver']
-
-        # Required fields
-        matrix.checksums = matrix_data['meta']['checksums']
-        matrix.comment = matrix_data['meta']['comment']
-        matrix.format = matrix_data['meta']['format']
-        matrix.format_doc = matrix_data['meta']['format_doc']
-        matrix.matrix_type = matrix_data['meta']['matrix_type']
-        matrix.size = matrix_data['meta']['size']
-        matrix.study = matrix_data['meta']['study']
-        matrix.tags = matrix_data['meta']['tags']
+        matrix._load_doc(matrix_data)
         # We need to use the private attribute here because there is no
         # public setter.
         matrix._urls = matrix_data['meta']['urls']
 
-        # Optional fields
-        if 'sop' in matrix_data['meta']:
-            matrix.sop = matrix_data['meta']['sop']
-
-        if 'private_files' in matrix_data['meta']:
-            matrix.private_files = matrix_data['meta']['private_files']
-
         module_logger.debug("Returning loaded %s.", __name__)
         return matrix
 
     @staticmethod
-    def load(matrix_id):
+    def load(matrix_id, session=None):
         """
         Loads the data for the specified input ID from the OSDF instance to
         this object. If the provided ID does not exist, then an error message
@@ -607,6 +322,8 @@ class AbundanceMatrix(Base):
 
         Args:
             matrix_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             An AbundanceMatrix object with all the available OSDF data loaded
@@ -614,19 +331,21 @@ class AbundanceMatrix(Base):
         """
         module_logger.debug("In load. Specified ID: %s", matrix_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         matrix_data = session.get_osdf().get_node(matrix_id)
-        matrix = AbundanceMatrix.load_abundance_matrix(matrix_data)
+        matrix = AbundanceMatrix.load_abundance_matrix(matrix_data, session=session)
 
         module_logger.debug("Returning loaded %s.", __name__)
 
         return matrix
 
-    def _upload_data(self):
+    def _upload_data(self, session=None):
         self.logger.debug("In _upload_data.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         study = self._study
 
         study2dir = {
@@ -691,7 +410,7 @@ class AbundanceMatrix(Base):
         else:
             self._urls = ["fasp://" + AbundanceMatrix.aspera_server + remote_path]
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in OSDF. The JSON form of the current data for the
         instance is first validated. If the data is not valid, then the data
@@ -701,7 +420,8 @@ class AbundanceMatrix(Base):
         save, will be assigned to the alphanumeric ID found in OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -712,11 +432,12 @@ class AbundanceMatrix(Base):
         # If node previously saved, use edit_node instead since ID
         # is given (an update in a way)
         # can also use get_node to check if the node already exists
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid.")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         success = False
@@ -725,7 +446,7 @@ class AbundanceMatrix(Base):
             self._urls = ["<private>"]
         else:
             try:
-                self._upload_data()
+                self._upload_data(session=session)
             except Exception as upload_exception:
                 self.logger.exception(upload_exception)
                 # Don't bother continuing...
@@ -6,9 +6,11 @@ import json
 import logging
 import os
 import string
-from itertools import count
 from cutlass.iHMPSession import iHMPSession
-from cutlass.Base import Base
+from cutlass.identity import identity_mapped
+from cutlass.paging import oql_docs
+from cutlass.Base import Base, node_ref
+from cutlass.fields import Field
 from cutlass.aspera import aspera
 from cutlass.Util import *
 
@@ -19,6 +21,19 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+def _check_size(size):
+    """
+    Checks a new file size.
+
+    Args:
+        size (int): The size of the file in bytes.
+
+    Returns:
+        None
+    """
+    if size < 0:
+        raise ValueError("The size must be non-negative.")
+
 class Annotation(Base):
     """
     The class encapsulates iHMP annotation data. It contains all
@@ -35,6 +50,35 @@ class Annotation(Base):
 
     date_format = '%Y-%m-%d'
 
+    __slots__ = ("_urls",)
+
+    annotation_pipeline = Field(str, "Get the software and version used to "
+                                "generate the annotation.", required=True)
+    annotation_source = Field(
+        str, "Get the databases used for providing curation.")
+    checksums = Field(dict, "The annotation's checksum data.", required=True,
+                      default=dict)
+    comment = Field(str, "A descriptive comment for the annotation.")
+    date = Field(str, "The date on which the annotations were generated.",
+                 check=check_past_date)
+    format = Field(str, "The file format of the annotation file.",
+                   required=True)
+    format_doc = Field(str, "URL for documentation of file format.",
+                       required=True)
+    orf_process = Field(str, "The software and version used to generate gene "
+                        "predictions.", required=True, strict=False)
+    private_files = Field(
+        bool, "Whether this object describes private data that should not be "
+        "uploaded to the DCC. Defaults to false.")
+    sop = Field(
+        str, "The URL for documentation of procedures used in annotation.")
+    size = Field(int, "The size of the file in bytes.", required=True,
+                 check=_check_size, strict=False)
+    study = Field(str, "One of the 3 studies that are part of the iHMP.",
+                  required=True)
+    local_file = Field(str, "Path to the local file to upload to the server.",
+                       meta=False)
+
     def __init__(self, *args, **kwargs):
         """
         Constructor for the Annotation class. This initializes the
@@ -43,368 +87,10 @@ class Annotation(Base):
         Args:
             None
         """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        # Required properties
-        self._annotation_pipeline = None
-        self._checksums = {}
-        self._format = None
-        self._format_doc = None
-        self._local_file = None
-        self._orf_process = None
-        self._size = None
-        self._study = None
         self._urls = ['']
 
-        # Optional properties
-        self._comment = None
-        self._date = None
-        self._sop = None
-        self._annotation_source = None
-        self._private_files = None
-
         super(Annotation, self).__init__(*args, **kwargs)
 
-    @property
-    def annotation_pipeline(self):
-        """
-        str: Get the software and version used to generate the annotation.
-        """
-        self.logger.debug("In 'annotation_pipeline' getter.")
-
-        return self._annotation_pipeline
-
-    @annotation_pipeline.setter
-    @enforce_string
-    def annotation_pipeline(self, annotation_pipeline):
-        """
-        Set The software and version used to generate annotation.
-
-        Args:
-            annotation_pipeline (str): The software and version used to
-            generate annotation.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'annotation_pipeline' setter.")
-
-        self._annotation_pipeline = annotation_pipeline
-
-    @property
-    def annotation_source(self):
-        """
-        str: Get the databases used for providing curation.
-        """
-        self.logger.debug("In 'annotation_source' getter.")
-
-        return self._annotation_source
-
-    @annotation_source.setter
-    @enforce_string
-    def annotation_source(self, annotation_source):
-        """
-        Set the databases used for providing curation; or for cases where
-        annotation was provided by a community jamboree or model organism
-        database.
-
-        Args:
-            annotation_source (str): The databases used for providing
-            curation.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'annotation_source' setter.")
-
-        self._annotation_source = annotation_source
-
-    @property
-    def checksums(self):
-        """
-        dict: The annotation's checksum data.
-        """
-        self.logger.debug("In checksums getter.")
-        return self._checksums
-
-    @checksums.setter
-    @enforce_dict
-    def checksums(self, checksums):
-        """
-        The setter for the Annotation's checksums.
-
-        Args:
-            checksums (dict): The checksums.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'checksums' setter.")
-
-        self._checksums = checksums
-
-    @property
-    def comment(self):
-        """
-        str: A descriptive comment for the annotation.
-        """
-        self.logger.debug("In 'comment' getter.")
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for a descriptive comment for the annotation.
-
-        Args:
-            comment (str): The comment text.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In comment setter.")
-
-        self._comment = comment
-
-    @property
-    def date(self):
-        """
-        str: The date on which the annotations were generated.
-        """
-        self.logger.debug("In 'date' getter.")
-
-        return self._date
-
-    @date.setter
-    @enforce_string
-    @enforce_past_date
-    def date(self, date):
-        """
-        The setter the date of the annotation.
-
-        Args:
-            date (str): The date in YYYY-MM-DD format.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'date' setter.")
-
-        self._date = date
-
-    @property
-    def format(self):
-        """
-        str: The file format of the annotation file.
-        """
-        self.logger.debug("In 'format' getter.")
-
-        return self._format
-
-    @format.setter
-    @enforce_string
-    def format(self, format):
-        """
-        The setter for the file format of the annotation file.
-
-        Args:
-            format (str): The file format of the annotation file.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format' setter.")
-
-        self._format = format
-
-    @property
-    def format_doc(self):
-        """
-        str: URL for documentation of file format.
-        """
-        self.logger.debug("In format_doc getter.")
-        return self._format_doc
-
-    @format_doc.setter
-    @enforce_string
-    def format_doc(self, format_doc):
-        """
-        The setter for the URL for the documentation of the file format.
-
-        Args:
-            format_doc (str): URL for file format documentation.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format_doc' setter.")
-
-        self._format_doc = format_doc
-
-    @property
-    def orf_process(self):
-        """
-        str: The software and version used to generate gene predictions.
-        """
-        self.logger.debug("In 'orf_process' getter.")
-
-        return self._orf_process
-
-    @orf_process.setter
-    @enforce_string
-    def orf_process(self, orf_process):
-        """
-        Set the software and version used to generate gene predictions.
-
-        Args:
-            orf_process (str): The software and version used.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'orf_process' setter.")
-
-        self._orf_process = orf_process
-
-    @property
-    def private_files(self):
-        """
-        bool: Whether this object describes private data that should not
-        be uploaded to the DCC. Defaults to false.
-        """
-        self.logger.debug("In 'private_files' getter.")
-
-        return self._private_files
-
-    @private_files.setter
-    @enforce_bool
-    def private_files(self, private_files):
-        """
-        The setter for the private files flag to denote this object
-        describes data that should not be uploaded to the DCC.
-
-        Args:
-            private_files (bool):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'private_files' setter.")
-
-        self._private_files = private_files
-
-    @property
-    def sop(self):
-        """
-        str: The URL for documentation of procedures used in annotation.
-        """
-        self.logger.debug("In 'sop' getter.")
-
-        return self._sop
-
-    @sop.setter
-    @enforce_string
-    def sop(self, sop):
-        """
-        Set the URL for documentation of procedures used in annotation.
-
-        Args:
-            sop (str): The documentation URL.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sop' setter.")
-
-        self._sop = sop
-
-    @property
-    def size(self):
-        """
-        int: The size of the file in bytes.
-        """
-        self.logger.debug("In 'size' getter.")
-
-        return self._size
-
-    @size.setter
-    @enforce_int
-    def size(self, size):
-        """
-        The setter for the file size.
-
-        Args:
-            size (int): The size of the file in bytes.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'size' setter.")
-
-        if size < 0:
-            raise ValueError("The size must be non-negative.")
-
-        self._size = size
-
-    @property
-    def study(self):
-        """
-        str: One of the 3 studies that are part of the iHMP.
-        """
-        self.logger.debug("In 'study' getter.")
-
-        return self._study
-
-    @study.setter
-    @enforce_string
-    def study(self, study):
-        """
-        One of the 3 studies that are part of the iHMP.
-
-        Args:
-            study (str): One of the 3 studies that are part of the iHMP.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'study' setter.")
-
-        self._study = study
-
-    @property
-    def local_file(self):
-        """
-        str: Path to the local file to upload to the server.
-        """
-        self.logger.debug("In 'local_file' getter.")
-
-        return self._local_file
-
-    @local_file.setter
-    @enforce_string
-    def local_file(self, local_file):
-        """
-        The setter for the Annotation local file.
-
-        Args:
-            local_file (str): The path to the local file that should be uploaded
-            to the server.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_file' setter.")
-
-        self._local_file = local_file
-
     @property
     def urls(self):
         """
@@ -415,14 +101,15 @@ class Annotation(Base):
 
         return self._urls
 
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -432,7 +119,8 @@ class Annotation(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -458,7 +146,7 @@ class Annotation(Base):
 
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -466,7 +154,8 @@ class Annotation(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -474,8 +163,7 @@ class Annotation(Base):
         """
         self.logger.debug("In is_valid.")
 
-
-        problems = self.validate()
+        problems = self.validate(session=session)
 
         valid = True
 
@@ -501,56 +189,9 @@ class Annotation(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [Annotation.namespace]
-            },
-            'linkage': self._links,
-            'ns': Annotation.namespace,
-            'node_type': 'annotation',
-            'meta': {
-                'annotation_pipeline': self._annotation_pipeline,
-                'checksums': self._checksums,
-                'format': self._format,
-                'format_doc': self._format_doc,
-                'orf_process': self._orf_process,
-                'size': self._size,
-                'study': self._study,
-                'subtype': self._study,
-                'tags': self._tags,
-                'urls': self._urls
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("Object has the OSDF id set.")
-            doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("Object has the OSDF version set.")
-            doc['ver'] = self._version
-
-        # Handle optional properties
-        if self._comment is not None:
-            self.logger.debug("Object has the 'comment' property set.")
-            doc['meta']['comment'] = self._comment
-
-        if self._date is not None:
-            self.logger.debug("Object has the 'date' property set.")
-            doc['meta']['date'] = self._date
-
-        if self._sop is not None:
-            self.logger.debug("Object has the 'sop' property set.")
-            doc['meta']['sop'] = self._sop
-
-        if self._annotation_source is not None:
-            self.logger.debug("Object has the 'annotation_source' property set.")
-            doc['meta']['annotation_source'] = self._annotation_source
-
-        if self._private_files is not None:
-            self.logger.debug("Object has the 'private_files' property set.")
-            doc['meta']['private_files'] = self._private_files
+        doc = super(Annotation, self)._get_raw_doc()
+        doc['meta']['subtype'] = self._study
+        doc['meta']['urls'] = self._urls
 
         return doc
 
@@ -568,7 +209,7 @@ class Annotation(Base):
         return ("annotation_pipeline", "checksums", "format", "format_doc",
                 "orf_process", "size", "study", "tags")
 
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object (self) from OSDF. If the object has not been
         previously saved (node ID is not set), then an error message will be
@@ -577,7 +218,8 @@ class Annotation(Base):
         instance, and this object must be re-saved in order to use it again.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True upon successful deletion, False otherwise.
@@ -590,7 +232,8 @@ class Annotation(Base):
 
         annotation_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -607,7 +250,7 @@ class Annotation(Base):
         return success
 
     @staticmethod
-    def search(query="\"annotation\"[node_type]"):
+    def search(query="\"annotation\"[node_type]", session=None):
         """
         Searches OSDF for Annotation nodes. Any criteria the user wishes to
         add is provided by the user in the query language specifications
@@ -622,6 +265,8 @@ class Annotation(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          Annotation node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of Annotation objects. It returns an empty list
@@ -629,7 +274,8 @@ class Annotation(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"annotation"[node_type]':
@@ -645,12 +291,13 @@ class Annotation(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                annot_result = Annotation.load_annotation(result)
+                annot_result = Annotation.load_annotation(result, session=session)
                 result_list.append(annot_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_annotation(annot_data):
         """
         Takes the provided JSON string and converts it to a
@@ -667,43 +314,16 @@ class Annotation(Base):
 
         module_logger.debug("Filling in Annotation details.")
 
-        # The attributes commmon to all iHMP nodes
-        annot._set_id(annot_data['id'])
-        annot.links = annot_data['linkage']
-        annot.version = annot_data['ver']
-
-        # Required fields
-        annot.annotation_pipeline = annot_data['meta']['annotation_pipeline']
-        annot.checksums = annot_data['meta']['checksums']
-        annot.format = annot_data['meta']['format']
-        annot.format_doc = annot_data['meta']['format_doc']
-        annot.study = annot_data['meta']['study']
-        annot.tags = annot_data['meta']['tags']
+        annot._load_doc(annot_data)
         # We need to use the private attribute here because there is no
         # public setter.
         annot._urls = annot_data['meta']['urls']
 
-        # Optional fields
-        if 'comment' in annot_data['meta']:
-            annot.comment = annot_data['meta']['comment']
-
-        if 'date' in annot_data['meta']:
-            annot.date = annot_data['meta']['date']
-
-        if 'sop' in annot_data['meta']:
-            annot.sop = annot_data['meta']['sop']
-
-        if 'annotation_source' in annot_data['meta']:
-            annot.annotation_source = annot_data['meta']['annotation_source']
-
-        if 'private_files' in annot_data['meta']:
-            annot.private_files = annot_data['meta']['private_files']
-
         module_logger.debug("Returning loaded %s.", __name__)
         return annot
 
     @staticmethod
-    def load(annot_id):
+    def load(annot_id, session=None):
         """
         Loads the data for the specified input ID from the OSDF instance to
         this object.  If the provided ID does not exist, then an error message
@@ -711,6 +331,8 @@ class Annotation(Base):
 
         Args:
             annot_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A Annotation object with all the available OSDF data loaded
@@ -718,19 +340,21 @@ class Annotation(Base):
         """
         module_logger.debug("In load. Specified ID: %s", annot_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         annot_data = session.get_osdf().get_node(annot_id)
-        annot = Annotation.load_annotation(annot_data)
+        annot = Annotation.load_annotation(annot_data, session=session)
 
         module_logger.debug("Returning loaded Annotation.")
 
         return annot
 
-    def _upload_data(self):
+    def _upload_data(self, session=None):
         self.logger.debug("In _upload_data.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         study = self._study
 
         study2dir = {
@@ -768,7 +392,7 @@ class Annotation(Base):
         else:
             self._urls = ["fasp://" + Annotation.aspera_server + remote_path]
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in OSDF. The JSON form of the current data for the
         instance is validated in the save function. If the data is not valid,
@@ -779,7 +403,8 @@ class Annotation(Base):
         Also, the version is updated as the data is saved in OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -790,11 +415,12 @@ class Annotation(Base):
         # If node previously saved, use edit_node instead since ID
         # is given (an update in a way)
         # can also use get_node to check if the node already exists
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid.")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         success = False
@@ -803,7 +429,7 @@ class Annotation(Base):
             self._urls = ["<private>"]
         else:
             try:
-                self._upload_data()
+                self._upload_data(session=session)
             except Exception as e:
                 self.logger.exception(e)
                 # Don't bother continuing...
@@ -861,26 +487,21 @@ class Annotation(Base):
         self.logger.debug("Returning " + str(success))
         return success
 
-    def clustered_seq_sets(self):
+    def clustered_seq_sets(self, ids_only=False, fan_out=None):
         """
         Returns an iterator of all ClusteredSeqSets connected to this Annotation.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         self.logger.debug("In clustered_seq_sets.")
 
         linkage_query = '"{}"[linkage.computed_from]'.format(self.id)
 
-        query = iHMPSession.get_session().get_osdf().oql_query
-
         from cutlass.ClusteredSeqSet import ClusteredSeqSet
 
-        for page_no in count(1):
-            res = query(Annotation.namespace, linkage_query, page=page_no)
-            res_count = res['result_count']
-
-            for doc in res['results']:
-                yield ClusteredSeqSet.load_clustered_seq_set(doc)
-
-            res_count -= len(res['results'])
-
-            if res_count < 1:
-                break
+        for doc in oql_docs(Annotation.namespace, linkage_query, fan_out=fan_out):
+            yield node_ref(doc) if ids_only else ClusteredSeqSet.load_clustered_seq_set(doc)
@@ -1,7 +1,10 @@
+import gzip
 import json
 import logging
+import time
+from collections import namedtuple
 from osdf import OSDF
-from itertools import islice
+from cutlass.fields import FieldsMeta
 from cutlass.iHMPSession import iHMPSession
 from cutlass.Util import *
 
@@ -12,16 +15,40 @@ module_logger.addHandler(logging.NullHandler())
 
 # pylint: disable=C0302, W0703, C1801
 
+# The ID, node type and version of a node, handed back instead of the node's
+# object by walks, searches and accessors called with ids_only=True.
+NodeRef = namedtuple("NodeRef", ["id", "node_type", "ver"])
+
+def node_ref(doc):
+    """
+    Returns the NodeRef of a raw OSDF document.
+
+    Args:
+        doc (dict): The OSDF document.
+
+    Returns:
+        A NodeRef tuple.
+    """
+    return NodeRef(doc['id'], doc['node_type'], doc.get('ver'))
+
 class Base(object):
     """
     The parent class from which all objects inherit specific features from. This class
     contains all the fields required to all sub-classes (ID, version, links, and tags).
+    Sub-classes declare the rest of their fields as Field objects.
 
     Attributes:
         namespace (str): The namespace this class will use in the OSDF instance
+        logger (Logger): The logger of the class.
     """
+    __metaclass__ = FieldsMeta
+
+    __slots__ = ("_id", "_version", "_links", "_tags", "_linked")
+
     namespace = "hmbr"
 
+    logger = ClassLogger()
+
     def __init__(self):
         """
         Constructor for the Base class. This should not be called from the user, so the
@@ -31,14 +58,18 @@ class Base(object):
         Args:
             None
         """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
         self._id = None
         self._version = None
         self._links = {}
         self._tags = []
+        self._linked = {}
+
+        for (attr, default) in self._defaults:
+            # Mutable defaults, such as dict, are made anew for each object
+            if callable(default):
+                default = default()
+
+            setattr(self, attr, default)
 
     @property
     def id(self):
@@ -143,14 +174,15 @@ class Base(object):
         else:
             raise ValueError("Tag already present for this subject")
 
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -160,7 +192,8 @@ class Base(object):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -173,7 +206,7 @@ class Base(object):
         self.logger.debug("Number of validation problems: %s.", str(len(problems)))
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -181,7 +214,8 @@ class Base(object):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -191,7 +225,8 @@ class Base(object):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, _error_message) = session.get_osdf().validate_node(document)
@@ -200,6 +235,85 @@ class Base(object):
 
         return valid
 
+    def _get_raw_doc(self):
+        """
+        Generates the raw JSON document for the current object from the fields
+        of its class. Required fields are included whether they are set or
+        not, the other fields only if they are set. Sub-classes add the parts
+        of their documents that are not fields.
+
+        Args:
+            None
+
+        Returns:
+            A dictionary representation of the JSON document.
+        """
+        self.logger.debug("In _get_raw_doc.")
+
+        # local import to avoid cyclic imports
+        from cutlass.dependency import node_types
+
+        meta = {'tags': self._tags}
+
+        for (name, attr, required, _strict) in self._doc_fields:
+            value = getattr(self, attr)
+
+            if required or value is not None:
+                meta[name] = value
+
+        doc = {
+            'acl': {
+                'read': ['all'],
+                'write': [self.namespace]
+            },
+            'linkage': self._links,
+            'ns': self.namespace,
+            'node_type': node_types[self.__class__.__name__],
+            'meta': meta
+        }
+
+        if self._id is not None:
+            self.logger.debug("Object has the OSDF id set.")
+            doc['id'] = self._id
+
+        if self._version is not None:
+            self.logger.debug("Object has the OSDF version set.")
+            doc['ver'] = self._version
+
+        return doc
+
+    def _load_doc(self, doc, require_tags=True):
+        """
+        Fills in the current object from a raw OSDF document: the ID, version,
+        links and tags, and each field of the class found in the document.
+        The values are checked the same way as when they are set by hand.
+
+        Args:
+            doc (dict): The OSDF document.
+            require_tags (bool): Whether the document must have tags.
+
+        Returns:
+            None
+
+        Exceptions:
+            KeyError: If the document lacks the tags or one of the strict
+                      fields of the class.
+        """
+        self.logger.debug("In _load_doc.")
+
+        self._set_id(doc['id'])
+        self.version = doc['ver']
+        self.links = doc['linkage']
+
+        meta = doc['meta']
+
+        if require_tags or 'tags' in meta:
+            self.tags = meta['tags']
+
+        for (name, _attr, _required, strict) in self._doc_fields:
+            if strict or name in meta:
+                setattr(self, name, meta[name])
+
     def to_json(self, indent=4):
         """
         Converts the current object from a raw dictionary to a pretty-printed
@@ -223,28 +337,32 @@ class Base(object):
 
         return json_str
 
-    def search(self, query):
+    def search(self, query, session=None):
         """
         Searches the OSDF instance using the specified input parameters
 
         Args:
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
 
         """
         self.logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
 
         self.logger.info("Got iHMP session.")
 
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object. The object must already have been saved/present
         in the OSDF instance, so an ID for the object must have been already set.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the object was successfully deleted, False otherwise
@@ -260,7 +378,8 @@ class Base(object):
 
         visit_node_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -276,26 +395,375 @@ class Base(object):
 
         return success
 
-    def children(self, flatten=False):
-        """ Returns the children of this node. """
+    @classmethod
+    def aload(cls, node_id, session=None):
+        """
+        The non-blocking counterpart of load(). The document is fetched on the
+        session's worker pool.
+
+        Args:
+            node_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
+
+        Returns:
+            A Future whose result() is the loaded object.
+        """
+        if session is None:
+            session = iHMPSession.get_session()
+
+        return session.submit(cls.load, node_id, session=session)
+
+    @classmethod
+    def load_many(cls, node_ids, session=None, window=None):
+        """
+        Loads many nodes of this class at once. The documents are fetched
+        concurrently on the session's worker pool instead of one load() at a
+        time.
+
+        Args:
+            node_ids (list): The OSDF IDs of the documents to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
+            window (int): How many requests may be in flight at once.
+                          Defaults to the number of session workers.
+
+        Returns:
+            A tuple of the list of loaded objects, in input order, and the
+            list of IDs that could not be loaded.
+        """
+        from .dependency import loader_methods
+
+        if session is None:
+            session = iHMPSession.get_session()
+
+        loader = getattr(cls, loader_methods[cls.__name__])
+
+        node_ids = list(node_ids)
+        docs = session.get_nodes(node_ids, window=window)
+
+        nodes = []
+        missing = []
+
+        for (node_id, doc) in zip(node_ids, docs):
+            if doc is None:
+                missing.append(node_id)
+            else:
+                nodes.append(loader(doc, session=session))
+
+        return (nodes, missing)
+
+    @classmethod
+    def asearch(cls, query=None, session=None):
+        """
+        The non-blocking counterpart of search().
+
+        Args:
+            query (str): The query for the OSDF framework. Defaults to the
+                         node type of the class.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
+
+        Returns:
+            A Future whose result() is the list of matching objects.
+        """
+        if session is None:
+            session = iHMPSession.get_session()
+
+        if query is None:
+            return session.submit(cls.search, session=session)
+
+        return session.submit(cls.search, query, session=session)
+
+    @classmethod
+    def search_iter(cls, query=None, session=None, prefetch=True, fan_out=2,
+                    ids_only=False):
+        """
+        Searches the OSDF database like search(), but walks through every
+        page of results instead of only the first one. Pages are requested
+        lazily, with the next page fetched in the background, and the
+        matching objects are yielded as they arrive, so memory use stays
+        bounded regardless of the number of results.
+
+        Args:
+            query (str): The query for the OSDF framework. Defaults to the
+                         node type of the class.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
+            prefetch (bool): Whether to fetch the following pages of
+                             results in the background.
+            fan_out (int): How many pages may be requested at once. Higher
+                           values are faster but hold more pages in memory.
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+
+        Returns:
+            A generator of the matching objects.
+        """
+        from .dependency import loader_methods, node_types
+        from .paging import oql_docs
+
+        node_type = node_types[cls.__name__]
+        type_query = '"{}"[node_type]'.format(node_type)
+
+        if query is None:
+            query = type_query
+        elif query != type_query:
+            query = '({}) && {}'.format(query, type_query)
+
+        loader = getattr(cls, loader_methods[cls.__name__])
+
+        # The results may be many, so their pages are not cached.
+        for doc in oql_docs(cls.namespace, query, session=session,
+                            prefetch=prefetch, fan_out=fan_out, cache=False):
+            yield node_ref(doc) if ids_only else loader(doc, session=session)
+
+    def _linked_docs(self, linkage, node_types, session=None, fan_out=None):
+        """
+        Returns the documents of the nodes linked to this one through a
+        linkage, keeping the ones of the given node types. When only one
+        node type is wanted, the query itself filters on it. Otherwise the
+        documents of the whole linkage are retrieved once and kept with this
+        object for as long as the session's query cache would keep their
+        pages, so that the accessors reading the same linkage share them.
+
+        Args:
+            linkage (str): The linkage pointing from the nodes to this one.
+            node_types (tuple): The node types to keep.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
+
+        Returns:
+            An iterable of the documents, in the order OSDF returns them.
+        """
+        from .paging import oql_docs
+
+        if session is None:
+            session = iHMPSession.get_session()
+
+        cache = session.get_query_cache()
+        linked = self._linked.get(linkage)
+
+        if linked is not None:
+            (generation, expires, docs) = linked
+
+            if cache is None or generation != cache.generation or \
+                    time.time() >= expires:
+                del self._linked[linkage]
+                linked = None
+
+        query = '"{}"[linkage.{}]'.format(self.id, linkage)
+
+        if linked is None:
+            if len(node_types) == 1:
+                query = '{} && "{}"[node_type]'.format(query, node_types[0])
+                return oql_docs(self.namespace, query, session=session,
+                                fan_out=fan_out)
+
+            generation = None if cache is None else cache.generation
+            docs = list(oql_docs(self.namespace, query, session=session,
+                                 fan_out=fan_out))
+
+            if cache is not None and cache.enabled and \
+                    generation == cache.generation:
+                self._linked[linkage] = (generation, time.time() + cache.ttl,
+                                         docs)
+
+        return [doc for doc in docs if doc['node_type'] in node_types]
+
+    def asave(self, session=None):
+        """
+        The non-blocking counterpart of save().
+
+        Args:
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
+
+        Returns:
+            A Future whose result() is True if the save was successful.
+        """
+        if session is None:
+            session = iHMPSession.get_session()
+
+        return session.submit(self.save, session=session)
+
+    def adelete(self, session=None):
+        """
+        The non-blocking counterpart of delete().
+
+        Args:
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
+
+        Returns:
+            A Future whose result() is True if the deletion was successful.
+        """
+        if session is None:
+            session = iHMPSession.get_session()
+
+        return session.submit(self.delete, session=session)
+
+    def achildren(self, session=None):
+        """
+        The non-blocking counterpart of children(flatten=True).
+
+        Args:
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
+
+        Returns:
+            A Future whose result() is the list of all descendant nodes.
+        """
+        if session is None:
+            session = iHMPSession.get_session()
+
+        return session.submit(lambda: list(self.children(flatten=True,
+                                                         session=session)))
+
+    def children(self, flatten=False, session=None, workers=None,
+                 ordered=True, max_frontier=None, types=None, max_depth=None,
+                 ids_only=False):
+        """
+        Returns the children of this node. Flattened, the descendants are
+        yielded as they are retrieved, with the children of the next nodes
+        to be reached retrieved together, one query per linkage. Otherwise
+        the tree below the node is retrieved one level at a time, once the
+        result is first iterated over. Given a number of workers, sibling
+        subtrees are explored concurrently instead, and nodes are yielded as
+        soon as they are found.
+
+        Args:
+            flatten (bool): Whether to return all of the descendants, depth
+                            first, instead of a generator per child that
+                            yields the child and the generators of its own
+                            children.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
+            workers (int): The number of threads exploring the tree at once.
+                           Defaults to None (no threads).
+            ordered (bool): With flatten and workers, whether to yield the
+                            descendants depth first, or in the order they are
+                            found, each of them once.
+            max_frontier (int): With workers, the maximum number of nodes
+                                found ahead of the caller. Defaults to None
+                                (no limit).
+            types (list): The node types wanted, e.g. ['abundance_matrix'].
+                          Subtrees that cannot hold one of them are not
+                          retrieved. With flatten, only nodes of these types
+                          are yielded; otherwise the nodes leading to them
+                          are kept too. Defaults to None (all of them).
+            max_depth (int): The number of levels below this node to
+                             retrieve. Defaults to None (no limit).
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the node objects.
+
+        Returns:
+            A generator of the children.
+        """
         self.logger.debug("In children.")
 
         # local imports to avoid cyclic imports
-        from .dependency import dependency_methods
         from .dependency import generator_flatten
+        from .traversal import Pruner, descendants, subtrees, walk
+
+        if workers is not None and workers < 1:
+            raise ValueError("Invalid number of workers. Must be positive.")
+
+        prune = None
+
+        if types is not None or max_depth is not None:
+            prune = Pruner(types=types, max_depth=max_depth)
+
+        if not ordered:
+            if not flatten or workers is None:
+                raise ValueError("Unordered children need flatten and workers.")
 
-        def _children(obj):
-            yield obj
-            name = obj.__class__.__name__
-            dep_method = getattr(obj, dependency_methods.get(name, ''), None)
-            if dep_method:
-                for child in dep_method():
-                    yield _children(child)
-        cs = islice(_children(self), 1, None)
-        if flatten:
-            return generator_flatten(cs)
+            cs = descendants(self, session=session, workers=workers,
+                             max_frontier=max_frontier, prune=prune,
+                             ids_only=ids_only)
+        elif flatten and workers is None:
+            cs = walk(self, session=session, prune=prune, ids_only=ids_only)
         else:
-            return cs
+            cs = subtrees(self, session=session, workers=workers,
+                          max_frontier=max_frontier, prune=prune,
+                          ids_only=ids_only)
+
+            if not flatten:
+                return cs
+
+            cs = generator_flatten(cs)
+
+        if prune is not None and prune.types is not None:
+            cs = (node for node in cs if prune.wants(node))
+
+        return cs
+
+    def export_subtree(self, dest, types=None, compress=None, progress=None,
+                       session=None, workers=4):
+        """
+        Writes the raw document of every node below this one to a file, one
+        JSON document per line (NDJSON), while the tree is being explored.
+        Documents are written as soon as their nodes are found, so the
+        export does not hold the whole tree in memory.
+
+        Args:
+            dest (str or file): The path of the file to write, or an open
+                                file object to write to.
+            types (list): The node types to export, e.g. ['sample', 'visit'].
+                          Subtrees that cannot hold one of them are not
+                          retrieved. Defaults to None (all of them).
+            compress (bool): Whether to gzip the output. Defaults to
+                             compressing paths ending in '.gz'.
+            progress (callable): Called with the number of documents written
+                                 so far after every 1000 documents, and once
+                                 at the end.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
+            workers (int): The number of threads exploring the tree at once.
+
+        Returns:
+            The number of documents written.
+
+        Exceptions:
+            ValueError: If a node type is unknown.
+        """
+        self.logger.debug("In export_subtree.")
+
+        nodes = self.children(flatten=True, session=session, workers=workers,
+                              ordered=False, types=types)
+
+        if isinstance(dest, basestring):
+            if compress is None:
+                compress = dest.endswith(".gz")
+
+            out = gzip.open(dest, "wb") if compress else open(dest, "wb")
+        elif compress:
+            out = gzip.GzipFile(fileobj=dest, mode="wb")
+        else:
+            out = dest
+
+        written = 0
+
+        try:
+            for node in nodes:
+                out.write(json.dumps(node._get_raw_doc(), sort_keys=True))
+                out.write("\n")
+                written += 1
+
+                if progress is not None and written % 1000 == 0:
+                    progress(written)
+        finally:
+            if out is not dest:
+                out.close()
+
+        self.logger.info("Exported %s documents.", written)
+
+        if progress is not None:
+            progress(written)
+
+        return written
 
     def __call__(self):
         return self
@@ -317,6 +785,25 @@ class Base(object):
 
     __repr__ = __str__
 
+    def __getstate__(self):
+        """
+        Returns the state of the object for pickling: the value of each of
+        its slots that is set, and its __dict__ if it has one. Objects with
+        __slots__ cannot be pickled with protocols 0 and 1 otherwise.
+        """
+        state = dict(getattr(self, '__dict__', {}))
+
+        for slot in self._slots:
+            if hasattr(self, slot):
+                state[slot] = getattr(self, slot)
+
+        return state
+
+    def __setstate__(self, state):
+        """ Restores the state returned by __getstate__(). """
+        for (attr, value) in state.items():
+            object.__setattr__(self, attr, value)
+
     def __hash__(self):
         if not self._id:
             raise TypeError("Unhashable; must have ID: '{}')".format(str(self)))
@@ -9,7 +9,9 @@ import logging
 import os
 import string
 from cutlass.iHMPSession import iHMPSession
+from cutlass.identity import identity_mapped
 from cutlass.Base import Base
+from cutlass.fields import Field
 from cutlass.aspera import aspera
 from cutlass.Util import *
 
@@ -18,6 +20,19 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+def _check_size(size):
+    """
+    Checks a new file size.
+
+    Args:
+        size (int): The size of the file in bytes.
+
+    Returns:
+        None
+    """
+    if size < 0:
+        raise ValueError("The size must be non-negative.")
+
 class ClusteredSeqSet(Base):
     """
     The class encapsulates iHMP clustered sequence set data. It contains all
@@ -33,6 +48,32 @@ class ClusteredSeqSet(Base):
 
     date_format = '%Y-%m-%d'
 
+    __slots__ = ("_urls",)
+
+    checksums = Field(dict, "The clustered sequence set's checksum data.",
+                      required=True, default=dict)
+    clustering_process = Field(str, "The software and version used to "
+                               "generate clusters.", required=True,
+                               strict=False)
+    comment = Field(str, "A descriptive comment.", required=True)
+    date = Field(str, "The date on which the annotations were generated.",
+                 check=check_past_date)
+    format = Field(str, "The file format of the clustered seq set file.",
+                   required=True, strict=False)
+    format_doc = Field(str, "URL for documentation of file format.")
+    local_file = Field(str, "Path to the local file to upload to the server.",
+                       meta=False)
+    private_files = Field(
+        bool, "Whether this object describes private data that should not be "
+        "uploaded to the DCC. Defaults to false.")
+    sequence_type = Field(str, "Specifies whether the file contains peptide "
+                          "or nucleotide data.", required=True, strict=False)
+    size = Field(int, "The size of the file in bytes.", required=True,
+                 check=_check_size, strict=False)
+    sop = Field(str, "URL for documentation of procedures used in clustering.")
+    study = Field(str, "One of the 3 studies that are part of the iHMP.",
+                  required=True)
+
     def __init__(self):
         """
         Constructor for the ClusteredSeqSet class. This initializes the
@@ -41,339 +82,9 @@ class ClusteredSeqSet(Base):
         Args:
             None
         """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        # These are common to all objects
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        # Required properties
-        self._checksums = {}
-        self._comment = None
-        self._format = None
-        self._clustering_process = None
-        self._sequence_type = None
-        self._size = None
-        self._study = None
-        self._subtype = None
         self._urls = ['']
 
-        # Optional properties
-        self._date = None
-        self._format_doc = None
-        self._local_file = None
-        self._private_files = None
-        self._sop = None
-
-    @property
-    def checksums(self):
-        """
-        dict: The clustered sequence set's checksum data.
-        """
-        self.logger.debug("In 'checksums' getter.")
-        return self._checksums
-
-    @checksums.setter
-    @enforce_dict
-    def checksums(self, checksums):
-        """
-        The setter for the checksum data.
-
-        Args:
-            checksums (dict): The checksums.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'checksums' setter.")
-
-        self._checksums = checksums
-
-    @property
-    def clustering_process(self):
-        """
-        str: The software and version used to generate clusters.
-        """
-        self.logger.debug("In 'clustering_process' getter.")
-
-        return self._clustering_process
-
-    @clustering_process.setter
-    @enforce_string
-    def clustering_process(self, clustering_process):
-        """
-        The setter for the software and version used for clustering.
-
-        Args:
-            clustering_process (str): Software name and version.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'clustering_process' setter.")
-
-        self._clustering_process = clustering_process
-
-    @property
-    def comment(self):
-        """
-        str: A descriptive comment.
-        """
-        self.logger.debug("In 'comment' getter.")
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for a descriptive comment.
-
-        Args:
-            comment (str): The comment text.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'comment' setter.")
-
-        self._comment = comment
-
-    @property
-    def date(self):
-        """
-        str: The date on which the annotations were generated.
-        """
-        self.logger.debug("In 'date' getter.")
-
-        return self._date
-
-    @date.setter
-    @enforce_string
-    @enforce_past_date
-    def date(self, date):
-        """
-        The setter for the date the annotations were generated.
-
-        Args:
-            date (str): The date in YYYY-MM-DD format.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'date' setter.")
-
-        self._date = date
-
-    @property
-    def format(self):
-        """
-        str: The file format of the clustered seq set file.
-        """
-        self.logger.debug("In 'format' getter.")
-
-        return self._format
-
-    @format.setter
-    @enforce_string
-    def format(self, format):
-        """
-        The setter for the file format of the clustered seq set.
-
-        Args:
-            format (str): The file format of the clustered seq set.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format' setter.")
-
-        self._format = format
-
-    @property
-    def format_doc(self):
-        """
-        str: URL for documentation of file format.
-        """
-        self.logger.debug("In 'format_doc' getter.")
-
-        return self._format_doc
-
-    @format_doc.setter
-    @enforce_string
-    def format_doc(self, format_doc):
-        """
-        The setter for the URL for the documentation of the file format.
-
-        Args:
-            format_doc (str): URL for file format documentation.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format_doc' setter.")
-
-        self._format_doc = format_doc
-
-    @property
-    def local_file(self):
-        """
-        str: Path to the local file to upload to the server.
-        """
-        self.logger.debug("In 'local_file' getter.")
-
-        return self._local_file
-
-    @local_file.setter
-    @enforce_string
-    def local_file(self, local_file):
-        """
-        The setter for the ClusteredSeqSet local file.
-
-        Args:
-            local_file (str): The path to the local file that should be uploaded
-            to the server.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_file' setter.")
-
-        self._local_file = local_file
-
-    @property
-    def private_files(self):
-        """
-        bool: Whether this object describes private data that should not
-        be uploaded to the DCC. Defaults to false.
-        """
-        self.logger.debug("In 'private_files' getter.")
-
-        return self._private_files
-
-    @private_files.setter
-    @enforce_bool
-    def private_files(self, private_files):
-        """
-        The setter for the private files flag to denote this object
-        describes data that should not be uploaded to the DCC.
-
-        Args:
-            private_files (bool):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'private_files' setter.")
-
-        self._private_files = private_files
-
-    @property
-    def sequence_type(self):
-        """
-        str: Specifies whether the file contains peptide or nucleotide data.
-        """
-        self.logger.debug("In 'sequence_type' getter.")
-
-        return self._sequence_type
-
-    @sequence_type.setter
-    @enforce_string
-    def sequence_type(self, sequence_type):
-        """
-        Sets whether the file contains peptide or nucleotide data.
-
-        Args:
-            sequence_type (str): The sequence type.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sequence_type' setter.")
-
-        self._sequence_type = sequence_type
-
-    @property
-    def size(self):
-        """
-        str: The size of the file in bytes.
-        """
-        self.logger.debug("In 'size' getter.")
-
-        return self._size
-
-    @size.setter
-    @enforce_int
-    def size(self, size):
-        """
-        Sets whether the file contains peptide or nucleotide data.
-
-        Args:
-            size (int): The size of the file in bytes.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'size' setter.")
-
-        if size < 0:
-            raise ValueError("The size must be non-negative.")
-
-        self._size = size
-
-    @property
-    def sop(self):
-        """
-        str: URL for documentation of procedures used in clustering.
-        """
-        self.logger.debug("In 'sop' getter.")
-
-        return self._sop
-
-    @sop.setter
-    @enforce_string
-    def sop(self, sop):
-        """
-        URL for the documentation of procedures used in clustering of
-        genomic/metagenomic sequences.
-
-        Args:
-            sop (str): A URL pointing to the document.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sop' setter.")
-
-        self._sop = sop
-
-    @property
-    def study(self):
-        """
-        str: One of the 3 studies that are part of the iHMP.
-        """
-        self.logger.debug("In 'study' getter.")
-
-        return self._study
-
-    @study.setter
-    @enforce_string
-    def study(self, study):
-        """
-        One of the 3 studies that are part of the iHMP.
-
-        Args:
-            study (str): One of the 3 studies that are part of the iHMP.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'study' setter.")
-
-        self._study = study
+        super(ClusteredSeqSet, self).__init__()
 
     @property
     def urls(self):
@@ -385,14 +96,15 @@ class ClusteredSeqSet(Base):
 
         return self._urls
 
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -402,7 +114,8 @@ class ClusteredSeqSet(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -429,7 +142,7 @@ class ClusteredSeqSet(Base):
 
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -437,7 +150,8 @@ class ClusteredSeqSet(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -445,7 +159,7 @@ class ClusteredSeqSet(Base):
         """
         self.logger.debug("In is_valid.")
 
-        problems = self.validate()
+        problems = self.validate(session=session)
 
         valid = True
 
@@ -473,52 +187,9 @@ class ClusteredSeqSet(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [ClusteredSeqSet.namespace]
-            },
-            'linkage': self._links,
-            'ns': ClusteredSeqSet.namespace,
-            'node_type': 'clustered_seq_set',
-            'meta': {
-                'checksums': self._checksums,
-                'clustering_process': self._clustering_process,
-                'comment': self._comment,
-                'format': self._format,
-                'sequence_type': self._sequence_type,
-                'size': self._size,
-                'study': self._study,
-                'subtype': self._study,
-                'tags': self._tags,
-                'urls': self._urls
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("Object has the OSDF id set.")
-            doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("Object has the OSDF version set.")
-            doc['ver'] = self._version
-
-        # Handle optional properties
-        if self._date is not None:
-            self.logger.debug("Object has the 'date' property set.")
-            doc['meta']['date'] = self._date
-
-        if self._format_doc is not None:
-            self.logger.debug("Object has the 'format_doc' property set.")
-            doc['meta']['format_doc'] = self._format_doc
-
-        if self._private_files is not None:
-            self.logger.debug("Object has the 'private_files' property set.")
-            doc['meta']['private_files'] = self._private_files
-
-        if self._sop is not None:
-            self.logger.debug("Object has the 'sop' property set.")
-            doc['meta']['sop'] = self._sop
+        doc = super(ClusteredSeqSet, self)._get_raw_doc()
+        doc['meta']['subtype'] = self._study
+        doc['meta']['urls'] = self._urls
 
         return doc
 
@@ -536,7 +207,7 @@ class ClusteredSeqSet(Base):
         return ("checksums", "clustering_process", "comment", "format",
                 "local_file", "sequence_type", "size", "study", "tags")
 
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object (self) from OSDF. If the object has not been
         previously saved (node ID is not set), then an error message will be
@@ -545,7 +216,8 @@ class ClusteredSeqSet(Base):
         instance, and this object must be re-saved in order to use it again.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True upon successful deletion, False otherwise.
@@ -558,7 +230,8 @@ class ClusteredSeqSet(Base):
 
         clustered_seq_set_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -575,7 +248,7 @@ class ClusteredSeqSet(Base):
         return success
 
     @staticmethod
-    def search(query="\"clustered_seq_set\"[node_type]"):
+    def search(query="\"clustered_seq_set\"[node_type]", session=None):
         """
         Searches OSDF for ClusteredSeqSet nodes. Any criteria the user wishes to
         add is provided by the user in the query language specifications
@@ -590,6 +263,8 @@ class ClusteredSeqSet(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          ClusteredSeqSet node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of ClusteredSeqSet objects. It returns an empty list
@@ -598,7 +273,8 @@ class ClusteredSeqSet(Base):
         module_logger.debug("In search.")
 
         # Searching without any parameters will return all different results
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"clustered_seq_set"[node_type]':
@@ -615,12 +291,14 @@ class ClusteredSeqSet(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                css_result = ClusteredSeqSet.load_clustered_seq_set(result)
+                css_result = ClusteredSeqSet.load_clustered_seq_set(
+                    result, session=session)
                 result_list.append(css_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_clustered_seq_set(css_data):
         """
         Takes the provided JSON string and converts it to a
@@ -637,39 +315,18 @@ class ClusteredSeqSet(Base):
 
         module_logger.debug("Filling in %s details.", __name__)
 
-        # The attributes commmon to all iHMP nodes
-        css._set_id(css_data['id'])
-        css.links = css_data['linkage']
-        css.version = css_data['ver']
-
-        # Required fields
-        css.checksums = css_data['meta']['checksums']
-        css.comment = css_data['meta']['comment']
-        css.study = css_data['meta']['study']
-        css.tags = css_data['meta']['tags']
+        css._load_doc(css_data)
         # We need to use the private attribute here because there is no
         # public setter.
         css._urls = css_data['meta']['urls']
 
-        # Optional fields
-        if 'date' in css_data['meta']:
-            css.date = css_data['meta']['date']
-
-        if 'format_doc' in css_data['meta']:
-            css.format_doc = css_data['meta']['format_doc']
-
-        if 'sop' in css_data['meta']:
-            css.format = css_data['meta']['sop']
-
-        if 'private_files' in css_data['meta']:
-            css.private_files = css_data['meta']['private_files']
 
         module_logger.debug("Returning loaded %s", __name__)
 
         return css
 
     @staticmethod
-    def load(seq_set_id):
+    def load(seq_set_id, session=None):
         """
         Loads the data for the specified input ID from the OSDF instance to
         this object.  If the provided ID does not exist, then an error message
@@ -677,6 +334,8 @@ class ClusteredSeqSet(Base):
 
         Args:
             seq_set_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A ClusteredSeqSet object with all the available OSDF data loaded
@@ -684,19 +343,21 @@ class ClusteredSeqSet(Base):
         """
         module_logger.debug("In load. Specified ID: %s", seq_set_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         css_data = session.get_osdf().get_node(seq_set_id)
-        css = ClusteredSeqSet.load_clustered_seq_set(css_data)
+        css = ClusteredSeqSet.load_clustered_seq_set(css_data, session=session)
 
         module_logger.debug("Returning loaded %s.", __name__)
 
         return css
 
-    def _upload_data(self):
+    def _upload_data(self, session=None):
         self.logger.debug("In _upload_data.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         study = self._study
 
         study2dir = {
@@ -733,7 +394,7 @@ class ClusteredSeqSet(Base):
         else:
             self._urls = ["fasp://" + ClusteredSeqSet.aspera_server + remote_path]
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in OSDF. The JSON form of the current data for the
         instance is first validated. If the data is not valid, then the data
@@ -743,7 +404,8 @@ class ClusteredSeqSet(Base):
         save, will be assigned to the alphanumeric ID found in OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -753,18 +415,19 @@ class ClusteredSeqSet(Base):
         # If node previously saved, use edit_node instead since ID
         # is given (an update in a way)
         # can also use get_node to check if the node already exists
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid.")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         if self._private_files:
             self._urls = ["<private>"]
         else:
             try:
-                self._upload_data()
+                self._upload_data(session=session)
             except Exception as upload_exception:
                 self.logger.exception(upload_exception)
                 # Don't bother continuing...
@@ -7,7 +7,9 @@ import logging
 import os
 import string
 from cutlass.iHMPSession import iHMPSession
+from cutlass.identity import identity_mapped
 from cutlass.Base import Base
+from cutlass.fields import Field
 from cutlass.aspera import aspera
 from cutlass.Util import *
 
@@ -31,6 +33,21 @@ class Cytokine(Base):
 
     aspera_server = "aspera.microbiome-bioactives.org"
 
+    __slots__ = ("_urls",)
+
+    checksums = Field(dict, "The cytokines's checksum data.", required=True,
+                      default=dict)
+    comment = Field(str, "A descriptive comment for the cytokine.")
+    format = Field(str, "The file format of the cytokine file.")
+    format_doc = Field(str, "URL for documentation of file format.")
+    private_files = Field(
+        bool, "Whether this object describes private data that should not be "
+        "uploaded to the DCC. Defaults to false.")
+    study = Field(str, "One of the 3 studies that are part of the iHMP.",
+                  required=True)
+    local_file = Field(str, "Path to the local file to upload to the server.",
+                       meta=False)
+
     def __init__(self, *args, **kwargs):
         """
         Constructor for the Cytokine class. This initializes the
@@ -39,207 +56,10 @@ class Cytokine(Base):
         Args:
             None
         """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        # Required properties
-        self._checksums = {}
-        self._study = None
         self._urls = ['']
 
-        # Optional properties
-        self._comment = None
-        self._format = None
-        self._format_doc = None
-        self._local_file = None
-        self._private_files = None
-
         super(Cytokine, self).__init__(*args, **kwargs)
 
-    @property
-    def checksums(self):
-        """
-        dict: The cytokines's checksum data.
-        """
-        self.logger.debug("In 'checksums' getter.")
-
-        return self._checksums
-
-    @checksums.setter
-    @enforce_dict
-    def checksums(self, checksums):
-        """
-        The setter for the Cytokine's checksums.
-
-        Args:
-            checksums (dict): The checksums.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'checksums' setter.")
-        if not isinstance(checksums, dict):
-            raise ValueError("Invalid type for checksums.")
-
-        self._checksums = checksums
-
-    @property
-    def comment(self):
-        """
-        str: A descriptive comment for the cytokine.
-        """
-        self.logger.debug("In 'comment' getter.")
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for a descriptive comment for the cytokine.
-
-        Args:
-            comment (str): The comment text.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'comment' setter.")
-
-        self._comment = comment
-
-    @property
-    def format(self):
-        """
-        str: The file format of the cytokine file.
-        """
-        self.logger.debug("In 'format' getter.")
-
-        return self._format
-
-    @format.setter
-    @enforce_string
-    def format(self, format):
-        """
-        The setter for the file format of the cytokine file.
-
-        Args:
-            format (str): The file format of the cytokine file.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format' setter.")
-
-        self._format = format
-
-    @property
-    def format_doc(self):
-        """
-        str: URL for documentation of file format.
-        """
-        self.logger.debug("In 'format_doc' getter.")
-        return self._format_doc
-
-    @format_doc.setter
-    @enforce_string
-    def format_doc(self, format_doc):
-        """
-        The setter for the URL for the documentation of the file format.
-
-        Args:
-            format_doc (str): URL for file format documentation.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format_doc' setter.")
-
-        self._format_doc = format_doc
-
-    @property
-    def private_files(self):
-        """
-        bool: Whether this object describes private data that should not
-        be uploaded to the DCC. Defaults to false.
-        """
-        self.logger.debug("In 'private_files' getter.")
-
-        return self._private_files
-
-    @private_files.setter
-    @enforce_bool
-    def private_files(self, private_files):
-        """
-        The setter for the private files flag to denote this object
-        describes data that should not be uploaded to the DCC.
-
-        Args:
-            private_files (bool):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'private_files' setter.")
-
-        self._private_files = private_files
-
-    @property
-    def study(self):
-        """
-        str: One of the 3 studies that are part of the iHMP.
-        """
-        self.logger.debug("In 'study' getter.")
-
-        return self._study
-
-    @study.setter
-    @enforce_string
-    def study(self, study):
-        """
-        One of the 3 studies that are part of the iHMP.
-
-        Args:
-            study (str): One of the 3 studies that are part of the iHMP.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'study' setter.")
-
-        self._study = study
-
-    @property
-    def local_file(self):
-        """
-        str: Path to the local file to upload to the server.
-        """
-        self.logger.debug("In 'local_file' getter.")
-
-        return self._local_file
-
-    @local_file.setter
-    @enforce_string
-    def local_file(self, local_file):
-        """
-        The setter for the Cytokine local file.
-
-        Args:
-            local_file (str): The path to the local file that should be uploaded
-            to the server.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_file' setter.")
-
-        self._local_file = local_file
-
     @property
     def urls(self):
         """
@@ -250,14 +70,15 @@ class Cytokine(Base):
 
         return self._urls
 
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -267,7 +88,8 @@ class Cytokine(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -294,7 +116,7 @@ class Cytokine(Base):
 
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -302,7 +124,8 @@ class Cytokine(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -310,7 +133,7 @@ class Cytokine(Base):
         """
         self.logger.debug("In is_valid.")
 
-        problems = self.validate()
+        problems = self.validate(session=session)
 
         valid = True
         if len(problems):
@@ -337,51 +160,9 @@ class Cytokine(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [Cytokine.namespace]
-            },
-            'linkage': self._links,
-            'ns': Cytokine.namespace,
-            'node_type': 'cytokine',
-            'meta': {
-                'checksums': self._checksums,
-                'study': self._study,
-                'subtype': self._study,
-                'tags': self._tags,
-                'urls': self._urls
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("Object has the OSDF id set.")
-            doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("Object has the OSDF version set.")
-            doc['ver'] = self._version
-
-        # Handle optional properties
-        if self._comment is not None:
-            self.logger.debug("Object has the 'comment' property set.")
-            doc['meta']['comment'] = self._comment
-
-        if self._format is not None:
-            self.logger.debug("Object has the 'format' property set.")
-            doc['meta']['format'] = self._format
-
-        if self._format_doc is not None:
-            self.logger.debug("Object has the 'format_doc' property set.")
-            doc['meta']['format_doc'] = self._format_doc
-
-        if self._format_doc is not None:
-            self.logger.debug("Object has the 'format_doc' property set.")
-            doc['meta']['format_doc'] = self._format_doc
-
-        if self._private_files is not None:
-            self.logger.debug("Object has the 'private_files' property set.")
-            doc['meta']['private_files'] = self._private_files
+        doc = super(Cytokine, self)._get_raw_doc()
+        doc['meta']['subtype'] = self._study
+        doc['meta']['urls'] = self._urls
 
         return doc
 
@@ -398,7 +179,7 @@ class Cytokine(Base):
         module_logger.debug("In required fields.")
         return ("checksums", "local_file", "study", "tags")
 
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object (self) from OSDF. If the object has not been
         previously saved (node ID is not set), then an error message will be
@@ -407,7 +188,8 @@ class Cytokine(Base):
         instance, and this object must be re-saved in order to use it again.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True upon successful deletion, False otherwise.
@@ -420,7 +202,8 @@ class Cytokine(Base):
 
         cytokine_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -437,7 +220,7 @@ class Cytokine(Base):
         return success
 
     @staticmethod
-    def search(query="\"cytokine\"[node_type]"):
+    def search(query="\"cytokine\"[node_type]", session=None):
         """
         Searches OSDF for Cytokine nodes. Any criteria the user wishes to
         add is provided by the user in the query language specifications
@@ -452,6 +235,8 @@ class Cytokine(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          Cytokine node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of Cytokine objects. It returns an empty list
@@ -460,7 +245,8 @@ class Cytokine(Base):
         module_logger.debug("In search.")
 
         # Searching without any parameters will return all different results
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"cytokine"[node_type]':
@@ -476,12 +262,13 @@ class Cytokine(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                cyto_result = Cytokine.load_cytokine(result)
+                cyto_result = Cytokine.load_cytokine(result, session=session)
                 result_list.append(cyto_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_cytokine(cyto_data):
         """
         Takes the provided JSON string and converts it to a
@@ -497,36 +284,16 @@ class Cytokine(Base):
         cyto = Cytokine()
 
         module_logger.debug("Filling in %s details.", __name__)
-        cyto._set_id(cyto_data['id'])
-        cyto.links = cyto_data['linkage']
-        cyto.version = cyto_data['ver']
-
-        # Required fields
-        cyto.checksums = cyto_data['meta']['checksums']
-        cyto.study = cyto_data['meta']['study']
-        cyto.tags = cyto_data['meta']['tags']
+        cyto._load_doc(cyto_data)
         # We need to use the private attribute here because there is no
         # public setter.
         cyto._urls = cyto_data['meta']['urls']
 
-        # Optional fields
-        if 'comment' in cyto_data['meta']:
-            cyto.comment = cyto_data['meta']['comment']
-
-        if 'format' in cyto_data['meta']:
-            cyto.format = cyto_data['meta']['format']
-
-        if 'format_doc' in cyto_data['meta']:
-            cyto.format_doc = cyto_data['meta']['format_doc']
-
-        if 'private_files' in cyto_data['meta']:
-            cyto.private_files = cyto_data['meta']['private_files']
-
         module_logger.debug("Returning loaded %s.", __name__)
         return cyto
 
     @staticmethod
-    def load(cyto_id):
+    def load(cyto_id, session=None):
         """
         Loads the data for the specified input ID from the OSDF instance to
         this object.  If the provided ID does not exist, then an error message
@@ -534,6 +301,8 @@ class Cytokine(Base):
 
         Args:
             cyto_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A Cytokine object with all the available OSDF data loaded
@@ -541,19 +310,21 @@ class Cytokine(Base):
         """
         module_logger.debug("In load. Specified ID: %s", cyto_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         cyto_data = session.get_osdf().get_node(cyto_id)
-        cyto = Cytokine.load_cytokine(cyto_data)
+        cyto = Cytokine.load_cytokine(cyto_data, session=session)
 
         module_logger.debug("Returning loaded %s.", __name__)
 
         return cyto
 
-    def _upload_data(self):
+    def _upload_data(self, session=None):
         self.logger.debug("In _upload_data.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         study = self._study
 
         study2dir = {
@@ -589,7 +360,7 @@ class Cytokine(Base):
         else:
             self._urls = ["fasp://" + Cytokine.aspera_server + remote_path]
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in OSDF. The JSON form of the current data for the
         instance is first validated. If the data is not valid, then the data
@@ -599,7 +370,8 @@ class Cytokine(Base):
         save, will be assigned to the alphanumeric ID found in OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -610,18 +382,19 @@ class Cytokine(Base):
         # If node previously saved, use edit_node instead since ID
         # is given (an update in a way)
         # can also use get_node to check if the node already exists
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid.")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         if self._private_files:
             self._urls = ["<private>"]
         else:
             try:
-                self._upload_data()
+                self._upload_data(session=session)
             except Exception as upload_exception:
                 self.logger.exception(upload_exception)
                 # Don't bother continuing...
@@ -1,13 +1,10 @@
 import json
-import logging
-from Util import enforce_string
+from Util import ClassLogger, enforce_string
 
 class DiseaseMeta(object):
-    def __init__(self):
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
+    logger = ClassLogger()
 
+    def __init__(self):
         self._comment = None
         self._name = None
         self._description = None
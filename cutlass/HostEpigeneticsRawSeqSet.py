@@ -7,7 +7,9 @@ import logging
 import os
 import string
 from cutlass.iHMPSession import iHMPSession
+from cutlass.identity import identity_mapped
 from cutlass.Base import Base
+from cutlass.fields import Field
 from cutlass.aspera import aspera
 from cutlass.Util import *
 
@@ -19,6 +21,75 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+def _check_exp_length(exp_length):
+    """
+    Checks a new number of raw bases or color space calls.
+
+    Args:
+        exp_length (int): The new exp_length for the current instance.
+
+    Returns:
+        None
+    """
+    if exp_length < 0:
+        raise ValueError("The 'exp_length' must be non-negative.")
+
+def _check_format(format_str):
+    """
+    Checks a new format. This must be either 'fasta' or 'fastq'.
+
+    Args:
+        format_str (str): The new format string for the current object.
+
+    Returns:
+        None
+    """
+    formats = ["fasta", "fastq"]
+    if format_str not in formats:
+        raise Exception("Format must be either fasta or fastq.")
+
+def _check_sequence_type(sequence_type):
+    """
+    Checks a new sequence type.
+
+    Args:
+        sequence_type (str): The new sequence type.
+
+    Returns:
+        None
+    """
+    types = ["peptide", "nucleotide"]
+    if sequence_type not in types:
+        raise Exception("Sequence type must be either peptide or nucleotide")
+
+def _check_size(size):
+    """
+    Checks a new file size in bytes.
+
+    Args:
+        size (int): The size of the seq set in bytes.
+
+    Returns:
+        None
+    """
+    if size < 0:
+        raise ValueError("The size must be non-negative.")
+
+def _check_study(study):
+    """
+    Checks a new sequence set's study. This is restricted to be one
+    of preg_preterm, ibd, or prediabetes.
+
+    Args:
+        study (str): The study of the sequence set.
+
+    Returns:
+        None
+    """
+    studies = ["preg_preterm", "ibd", "prediabetes"]
+    if study not in studies:
+        raise Exception("Not a valid study.")
+
 class HostEpigeneticsRawSeqSet(Base):
     """
     The class models host epigenetics raw sequence set data for the iHMP
@@ -32,6 +103,34 @@ class HostEpigeneticsRawSeqSet(Base):
 
     aspera_server = "aspera.microbiome-bioactives.org"
 
+    __slots__ = ("_urls",)
+
+    checksums = Field(dict, "One or more checksums used to ensure file "
+                      "integrity.", required=True)
+    assay_type = Field(str, "The assay_type for the sequence set. Identifies "
+                       "the type of assay peformed.", required=True)
+    comment = Field(str, "Free-text comment.", required=True)
+    exp_length = Field(
+        int, "The number of raw bases or color space calls expected for the "
+        "read, includes both mate pairs and all technical portions.",
+        required=True, check=_check_exp_length)
+    format = Field(str, "The file format of the sequence file.", required=True,
+                   check=_check_format)
+    format_doc = Field(str, "URL for documentation of file format.",
+                       required=True)
+    local_file = Field(str, "URL to the local file to upload to the server.",
+                       meta=False)
+    private_files = Field(
+        bool, "Whether this object describes private data that should not be "
+        "uploaded to the DCC. Defaults to false.")
+    seq_model = Field(str, "Sequencing instrument model.", required=True)
+    sequence_type = Field(str, "Specifies whether the file contains peptide "
+                          "or nucleotide data.", check=_check_sequence_type)
+    size = Field(int, "The size of the file in bytes.", required=True,
+                 check=_check_size)
+    study = Field(str, "One of the 3 studies that are part of the iHMP.",
+                  required=True, check=_check_study)
+
     def __init__(self, *args, **kwargs):
         """
         Constructor for the HostEpigeneticsRawSeqSet class. This initializes
@@ -40,44 +139,19 @@ class HostEpigeneticsRawSeqSet(Base):
         Args:
             None
         """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        # These are common to all objects
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        # These are particular to HostEpigeneticsRawSeqSet objects
-        self._assay_type = None
-        self._checksums = None
-        self._comment = None
-        self._exp_length = None
-        self._format = None
-        self._format_doc = None
-        self._local_file = None
-        self._seq_model = None
-        self._size = None
-        self._study = None
-        self._subtype = None
         self._urls = ['']
 
-        # Optional properties
-        self._private_files = None
-        self._sequence_type = None
-
         super(HostEpigeneticsRawSeqSet, self).__init__(*args, **kwargs)
 
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -87,7 +161,8 @@ class HostEpigeneticsRawSeqSet(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -114,7 +189,7 @@ class HostEpigeneticsRawSeqSet(Base):
 
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -122,7 +197,8 @@ class HostEpigeneticsRawSeqSet(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -130,7 +206,7 @@ class HostEpigeneticsRawSeqSet(Base):
         """
         self.logger.debug("In is_valid.")
 
-        problems = self.validate()
+        problems = self.validate(session=session)
 
         valid = True
         if len(problems):
@@ -141,332 +217,6 @@ class HostEpigeneticsRawSeqSet(Base):
 
         return valid
 
-    @property
-    def checksums(self):
-        """
-        str: One or more checksums used to ensure file integrity.
-        """
-        self.logger.debug("In 'checksums' getter.")
-
-        return self._checksums
-
-    @checksums.setter
-    @enforce_dict
-    def checksums(self, checksums):
-        """
-        The setter for the checksum data.
-
-        Args:
-            checksums (dict): The checksums for the data file.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'checksums' setter.")
-
-        self._checksums = checksums
-
-    @property
-    def assay_type(self):
-        """
-        str: The assay_type for the sequence set. Identifies the type of
-        assay peformed.
-        """
-        self.logger.debug("In 'assay_type' getter.")
-
-        return self._assay_type
-
-    @assay_type.setter
-    @enforce_string
-    def assay_type(self, assay_type):
-        """
-        The setter for the assay_type, which identifies the type of assay
-        peformed. Must be one of RRBS, MBD-Seq, ChIP-Seq, or ATAC-Seq.
-
-        Args:
-            assay_type (str): The assay_type for the sequence set.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'assay_type' setter.")
-
-        self._assay_type = assay_type
-
-    @property
-    def comment(self):
-        """
-        str: Free-text comment.
-        """
-        self.logger.debug("In 'comment' getter.")
-
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for the comment field. The comment must be a string,
-        and less than 512 characters.
-
-        Args:
-            comment (str): The new comment to add to the string.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'comment' setter.")
-
-        self._comment = comment
-
-    @property
-    def exp_length(self):
-        """
-        int: The number of raw bases or color space calls expected for the read,
-             includes both mate pairs and all technical portions.
-        """
-        self.logger.debug("In 'exp_length' getter.")
-
-        return self._exp_length
-
-    @exp_length.setter
-    @enforce_int
-    def exp_length(self, exp_length):
-        """
-        The setter for the number of raw bases or color space calls.
-
-        Args:
-            exp_length (int): The new exp_length for the current instance.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'exp_length' setter.")
-        if exp_length < 0:
-            raise ValueError("The 'exp_length' must be non-negative.")
-
-        self._exp_length = exp_length
-
-    @property
-    def format(self):
-        """
-        str: The file format of the sequence file.
-        """
-        self.logger.debug("In 'format' getter.")
-
-        return self._format
-
-    @format.setter
-    @enforce_string
-    def format(self, format_str):
-        """
-        The setter for the format. This must be either 'fasta' or 'fastq'.
-
-        Args:
-            format_str (str): The new format string for the current object.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format' setter.")
-
-        formats = ["fasta", "fastq"]
-        if format_str in formats:
-            self._format = format_str
-        else:
-            raise Exception("Format must be either fasta or fastq.")
-
-    @property
-    def format_doc(self):
-        """
-        str: URL for documentation of file format.
-        """
-        self.logger.debug("In 'format_doc' getter.")
-
-        return self._format_doc
-
-    @format_doc.setter
-    @enforce_string
-    def format_doc(self, format_doc):
-        """
-        The setter for the file format documentation URL.
-
-        Args:
-            format_doc (str): The new format_doc for the current object.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format_doc' setter.")
-
-        self._format_doc = format_doc
-
-    @property
-    def local_file(self):
-        """
-        str: URL to the local file to upload to the server.
-        """
-        self.logger.debug("In 'local_file' getter.")
-
-        return self._local_file
-
-    @local_file.setter
-    @enforce_string
-    def local_file(self, local_file):
-        """
-        The setter for the local file.
-
-        Args:
-            local_file (str): The URL to the local file that should
-                              be uploaded to the server.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_file' setter.")
-
-        self._local_file = local_file
-
-    @property
-    def private_files(self):
-        """
-        bool: Whether this object describes private data that should not
-        be uploaded to the DCC. Defaults to false.
-        """
-        self.logger.debug("In 'private_files' getter.")
-
-        return self._private_files
-
-    @private_files.setter
-    @enforce_bool
-    def private_files(self, private_files):
-        """
-        The setter for the private files flag to denote this object
-        describes data that should not be uploaded to the DCC.
-
-        Args:
-            private_files (bool):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'private_files' setter.")
-
-        self._private_files = private_files
-
-    @property
-    def seq_model(self):
-        """
-        str: Sequencing instrument model.
-        """
-        self.logger.debug("In 'seq_model' getter.")
-
-        return self._seq_model
-
-    @seq_model.setter
-    @enforce_string
-    def seq_model(self, seq_model):
-        """
-        The setter for the sequencing instrument model.
-
-        Args:
-            seq_model (str): The new sequencing instrument model.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'seq_model' setter.")
-
-        self._seq_model = seq_model
-
-    @property
-    def sequence_type(self):
-        """
-        str: Specifies whether the file contains peptide or nucleotide data.
-        """
-        self.logger.debug("In 'sequence_type' getter.")
-
-        return self._sequence_type
-
-    @sequence_type.setter
-    @enforce_string
-    def sequence_type(self, sequence_type):
-        """
-        The setter for the sequence type.
-
-        Args:
-            sequence_type (str): The new sequence type.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sequence_type' setter.")
-
-        types = ["peptide", "nucleotide"]
-        if sequence_type in types:
-            self._sequence_type = sequence_type
-        else:
-            raise Exception("Sequence type must be either peptide or nucleotide")
-
-    @property
-    def size(self):
-        """
-        int: The size of the file in bytes.
-        """
-        self.logger.debug("In 'size' getter.")
-
-        return self._size
-
-    @size.setter
-    @enforce_int
-    def size(self, size):
-        """
-        The setter for the file size in bytes.
-
-        Args:
-            size (int): The size of the seq set in bytes.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'size' setter.")
-
-        if size < 0:
-            raise ValueError("The size must be non-negative.")
-
-        self._size = size
-
-    @property
-    def study(self):
-        """
-        str: One of the 3 studies that are part of the iHMP.
-        """
-        self.logger.debug("In 'study' getter.")
-
-        return self._study
-
-    @study.setter
-    @enforce_string
-    def study(self, study):
-        """
-        The setter for the sequence set's study. This is restricted to be one
-        of preg_preterm, ibd, or prediabetes.
-
-        Args:
-            study (str): The study of the sequence set.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'study' setter.")
-
-        studies = ["preg_preterm", "ibd", "prediabetes"]
-
-        if study in studies:
-            self._study = study
-        else:
-            raise Exception("Not a valid study.")
-
     @property
     def urls(self):
         """
@@ -508,51 +258,14 @@ class HostEpigeneticsRawSeqSet(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [HostEpigeneticsRawSeqSet.namespace]
-            },
-            'linkage': self._links,
-            'ns': HostEpigeneticsRawSeqSet.namespace,
-            'node_type': 'host_epigenetics_raw_seq_set',
-            'meta': {
-                "assay_type": self._assay_type,
-                "checksums": self._checksums,
-                "comment": self._comment,
-                "exp_length": self._exp_length,
-                "format": self._format,
-                "format_doc": self._format_doc,
-                "seq_model": self._seq_model,
-                "size": self._size,
-                "study": self._study,
-                "subtype": "host",
-                'tags': self._tags,
-                "urls": self._urls
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("%s object has the OSDF id set.", __name__)
-            doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("%s object has the OSDF version set.", __name__)
-            doc['ver'] = self._version
-
-        # Handle optional properties
-        if self._private_files is not None:
-            self.logger.debug("Object has the 'private_files' property set.")
-            doc['meta']['private_files'] = self._private_files
-
-        if self._sequence_type is not None:
-            self.logger.debug("Object has the 'sequence_type' property set.")
-            doc['meta']['sequence_type'] = self._sequence_type
+        doc = super(HostEpigeneticsRawSeqSet, self)._get_raw_doc()
+        doc['meta']['subtype'] = "host"
+        doc['meta']['urls'] = self._urls
 
         return doc
 
     @staticmethod
-    def search(query="\"host_epigenetics_raw_seq_set\"[node_type]"):
+    def search(query="\"host_epigenetics_raw_seq_set\"[node_type]", session=None):
         """
         Searches the OSDF database through all HostEpigeneticsRawSeqSet
         nodes. Any criteria the user wishes to add is provided by the user
@@ -568,6 +281,8 @@ class HostEpigeneticsRawSeqSet(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          HostEpigeneticsRawSeqSet node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of HostEpigeneticsRawSeqSet objects. It returns
@@ -575,7 +290,8 @@ class HostEpigeneticsRawSeqSet(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"host_epigenetics_raw_seq_set"[node_type]':
@@ -598,6 +314,7 @@ class HostEpigeneticsRawSeqSet(Base):
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_host_epigenetics_raw_seq_set(seq_set_data):
         """
         Takes the provided JSON string and converts it to a
@@ -614,38 +331,16 @@ class HostEpigeneticsRawSeqSet(Base):
 
         module_logger.debug("Filling in %s details.", __name__)
 
-        # The attributes commmon to all iHMP nodes
-        seq_set._set_id(seq_set_data['id'])
-        seq_set.version = seq_set_data['ver']
-        seq_set.links = seq_set_data['linkage']
-
-        # The attributes that are required
-        seq_set.assay_type = seq_set_data['meta']['assay_type']
-        seq_set.checksums = seq_set_data['meta']['checksums']
-        seq_set.comment = seq_set_data['meta']['comment']
-        seq_set.exp_length = seq_set_data['meta']['exp_length']
-        seq_set.format = seq_set_data['meta']['format']
-        seq_set.format_doc = seq_set_data['meta']['format_doc']
-        seq_set.seq_model = seq_set_data['meta']['seq_model']
-        seq_set.size = seq_set_data['meta']['size']
-        seq_set.tags = seq_set_data['meta']['tags']
-        seq_set.study = seq_set_data['meta']['study']
+        seq_set._load_doc(seq_set_data)
         # We need to use the private attribute here because there is no
         # public setter.
         seq_set._urls = seq_set_data['meta']['urls']
 
-        # Optional fields.
-        if 'sequence_type' in seq_set_data['meta']:
-            seq_set.sequence_type = seq_set_data['meta']['sequence_type']
-
-        if 'private_files' in seq_set_data['meta']:
-            seq_set.private_files = seq_set_data['meta']['private_files']
-
         module_logger.debug("Returning loaded %s", __name__)
         return seq_set
 
     @staticmethod
-    def load(seq_set_id):
+    def load(seq_set_id, session=None):
         """
         Loads the data for the specified input ID from OSDF to this object. If
         the provided ID does not exist, then an error message is provided
@@ -653,6 +348,8 @@ class HostEpigeneticsRawSeqSet(Base):
 
         Args:
             seq_set_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A HostEpigeneticsRawSeqSet object with all the available OSDF
@@ -660,19 +357,22 @@ class HostEpigeneticsRawSeqSet(Base):
         """
         module_logger.debug("In load. Specified ID: %s", seq_set_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         seq_set_data = session.get_osdf().get_node(seq_set_id)
-        seq_set = HostEpigeneticsRawSeqSet.load_host_epigenetics_raw_seq_set(seq_set_data)
+        seq_set = HostEpigeneticsRawSeqSet.load_host_epigenetics_raw_seq_set(
+            seq_set_data, session=session)
 
         module_logger.debug("Returning loaded %s", __name__)
 
         return seq_set
 
-    def _upload_data(self):
+    def _upload_data(self, session=None):
         self.logger.debug("In _upload_data.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
 
         study = self._study
 
@@ -711,7 +411,7 @@ class HostEpigeneticsRawSeqSet(Base):
         else:
             self._urls = ["fasp://" + HostEpigeneticsRawSeqSet.aspera_server + remote_path]
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in OSDF. The JSON form of the current data for the
         instance is validated in the save function. If the data is not valid,
@@ -722,18 +422,20 @@ class HostEpigeneticsRawSeqSet(Base):
         OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
         """
         self.logger.debug("In save.")
 
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         success = False
@@ -742,7 +444,7 @@ class HostEpigeneticsRawSeqSet(Base):
             self._urls = ["<private>"]
         else:
             try:
-                self._upload_data()
+                self._upload_data(session=session)
             except Exception as uploadException:
                 self.logger.exception(uploadException)
                 # Don't bother continuing...
@@ -7,7 +7,9 @@ import logging
 import os
 import string
 from cutlass.iHMPSession import iHMPSession
+from cutlass.identity import identity_mapped
 from cutlass.Base import Base
+from cutlass.fields import Field
 from cutlass.aspera import aspera
 from cutlass.Util import *
 
@@ -19,6 +21,48 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+def _check_format(format_str):
+    """
+    Checks a new format. This must be either 'vcf' or 'txt'.
+
+    Args:
+        format_str (str): The new format string for the current object.
+
+    Returns:
+        None
+    """
+    formats = ["vcf", "txt"]
+    if format_str not in formats:
+        raise Exception("Format must be either vcf or txt.")
+
+def _check_size(size):
+    """
+    Checks a new file size in bytes.
+
+    Args:
+        size (int): The size of the seq set in bytes.
+
+    Returns:
+        None
+    """
+    if size < 0:
+        raise ValueError("The size must be non-negative.")
+
+def _check_study(study):
+    """
+    Checks a new sequence set's study. This is restricted to be one
+    of preg_preterm, ibd, or prediabetes.
+
+    Args:
+        study (str): The study of the sequence set.
+
+    Returns:
+        None
+    """
+    studies = ["preg_preterm", "ibd", "prediabetes"]
+    if study not in studies:
+        raise Exception("Not a valid study.")
+
 class HostVariantCall(Base):
     """
     The class models host variant call data for the iHMP project. This class
@@ -31,6 +75,33 @@ class HostVariantCall(Base):
 
     aspera_server = "aspera.microbiome-bioactives.org"
 
+    __slots__ = ("_urls",)
+
+    checksums = Field(dict, "One or more checksums used to ensure file "
+                      "integrity.", required=True)
+    comment = Field(str, "Free-text comment.", required=True)
+    date = Field(str, "Date on which the output were generated.",
+                 check=check_past_date, meta=False)
+    format = Field(str, "The file format of the sequence file.", required=True,
+                   check=_check_format)
+    format_doc = Field(str, "URL for documentation of file format.")
+    local_file = Field(str, "URL to the local file to upload to the server.",
+                       meta=False)
+    private_files = Field(
+        bool, "Whether this object describes private data that should not be "
+        "uploaded to the DCC. Defaults to false.")
+    reference = Field(str, "The reference used for variant calling, eg "
+                      "Homo_sapiens assembly19.", required=True)
+    size = Field(int, "The size of the file in bytes.", required=True,
+                 check=_check_size)
+    sop = Field(str, "The URL for documentation of procedures used in variant "
+                "calling.")
+    study = Field(str, "One of the 3 studies that are part of the iHMP.",
+                  required=True, check=_check_study)
+    variant_calling_process = Field(
+        str, "The software and version used to perform variant calling.",
+        required=True)
+
     def __init__(self, *args, **kwargs):
         """
         Constructor for the HostVariantCall class. This initializes
@@ -39,44 +110,19 @@ class HostVariantCall(Base):
         Args:
             None
         """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        # These are common to all objects
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        # These are particular to HostVariantCall objects
-        self._checksums = None
-        self._comment = None
-        self._date = None
-        self._format = None
-        self._local_file = None
-        self._reference = None
-        self._size = None
-        self._study = None
-        self._subtype = None
         self._urls = ['']
-        self._variant_calling_process = None
-
-        # Optional properties
-        self._format_doc = None
-        self._private_files = None
-        self._sop = None
 
         super(HostVariantCall, self).__init__(*args, **kwargs)
 
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for that specific object. All required fields
         for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -86,7 +132,8 @@ class HostVariantCall(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -113,7 +160,7 @@ class HostVariantCall(Base):
 
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -121,7 +168,8 @@ class HostVariantCall(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -129,7 +177,7 @@ class HostVariantCall(Base):
         """
         self.logger.debug("In is_valid.")
 
-        problems = self.validate()
+        problems = self.validate(session=session)
 
         valid = True
         if len(problems):
@@ -140,302 +188,6 @@ class HostVariantCall(Base):
 
         return valid
 
-    @property
-    def checksums(self):
-        """
-        str: One or more checksums used to ensure file integrity.
-        """
-        self.logger.debug("In 'checksums' getter.")
-
-        return self._checksums
-
-    @checksums.setter
-    @enforce_dict
-    def checksums(self, checksums):
-        """
-        The setter for the checksum data.
-
-        Args:
-            checksums (dict): The checksums for the data file.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'checksums' setter.")
-
-        self._checksums = checksums
-
-    @property
-    def comment(self):
-        """
-        str: Free-text comment.
-        """
-        self.logger.debug("In 'comment' getter.")
-
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for the comment field. The comment must be a string,
-        and less than 512 characters.
-
-        Args:
-            comment (str): The new comment to add to the string.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'comment' setter.")
-
-        self._comment = comment
-
-    @property
-    def date(self):
-        """
-        str: Date on which the output were generated.
-        """
-        self.logger.debug("In 'date' getter.")
-
-        return self._date
-
-    @date.setter
-    @enforce_string
-    @enforce_past_date
-    def date(self, date):
-        """
-        The date on which the output were generated. The date
-        must be in the past.
-
-        Args:
-            date (str): The date.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'date' setter.")
-
-        self._date = date
-
-    @property
-    def format(self):
-        """
-        str: The file format of the sequence file.
-        """
-        self.logger.debug("In 'format' getter.")
-
-        return self._format
-
-    @format.setter
-    @enforce_string
-    def format(self, format_str):
-        """
-        The setter for the format. This must be either 'fasta' or 'fastq'.
-
-        Args:
-            format_str (str): The new format string for the current object.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format' setter.")
-
-        formats = ["vcf", "txt"]
-        if format_str in formats:
-            self._format = format_str
-        else:
-            raise Exception("Format must be either vcf or txt.")
-
-    @property
-    def format_doc(self):
-        """
-        str: URL for documentation of file format.
-        """
-        self.logger.debug("In 'format_doc' getter.")
-
-        return self._format_doc
-
-    @format_doc.setter
-    @enforce_string
-    def format_doc(self, format_doc):
-        """
-        The setter for the file format documentation URL.
-
-        Args:
-            format_doc (str): The new format_doc for the current object.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format_doc' setter.")
-
-        self._format_doc = format_doc
-
-    @property
-    def local_file(self):
-        """
-        str: URL to the local file to upload to the server.
-        """
-        self.logger.debug("In 'local_file' getter.")
-
-        return self._local_file
-
-    @local_file.setter
-    @enforce_string
-    def local_file(self, local_file):
-        """
-        The setter for the local file.
-
-        Args:
-            local_file (str): The URL to the local file that should
-                              be uploaded to the server.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_file' setter.")
-
-        self._local_file = local_file
-
-    @property
-    def private_files(self):
-        """
-        bool: Whether this object describes private data that should not
-        be uploaded to the DCC. Defaults to false.
-        """
-        self.logger.debug("In 'private_files' getter.")
-
-        return self._private_files
-
-    @private_files.setter
-    @enforce_bool
-    def private_files(self, private_files):
-        """
-        The setter for the private files flag to denote this object
-        describes data that should not be uploaded to the DCC.
-
-        Args:
-            private_files (bool):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'private_files' setter.")
-
-        self._private_files = private_files
-
-    @property
-    def reference(self):
-        """
-        str: The reference used for variant calling, eg Homo_sapiens assembly19.
-        """
-        self.logger.debug("In 'reference' getter.")
-
-        return self._reference
-
-    @reference.setter
-    @enforce_string
-    def reference(self, reference):
-        """
-        The setter for the reference used for variant calling, eg
-        Homo_sapiens assembly19.
-
-        Args:
-            reference (str): The reference .
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'reference' setter.")
-
-        self._reference = reference
-
-    @property
-    def size(self):
-        """
-        int: The size of the file in bytes.
-        """
-        self.logger.debug("In 'size' getter.")
-
-        return self._size
-
-    @size.setter
-    @enforce_int
-    def size(self, size):
-        """
-        The setter for the file size in bytes.
-
-        Args:
-            size (int): The size of the seq set in bytes.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'size' setter.")
-
-        if size < 0:
-            raise ValueError("The size must be non-negative.")
-
-        self._size = size
-
-
-    @property
-    def sop(self):
-        """
-        str: The URL for documentation of procedures used in variant calling.
-        """
-        self.logger.debug("In 'sop' getter.")
-
-        return self._sop
-
-    @sop.setter
-    @enforce_string
-    def sop(self, sop):
-        """
-        Set the URL for documentation of procedures used in variant calling.
-
-        Args:
-            sop (str): The documentation URL.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sop' setter.")
-
-        self._sop = sop
-
-    @property
-    def study(self):
-        """
-        str: One of the 3 studies that are part of the iHMP.
-        """
-        self.logger.debug("In 'study' getter.")
-
-        return self._study
-
-    @study.setter
-    @enforce_string
-    def study(self, study):
-        """
-        The setter for the sequence set's study. This is restricted to be one
-        of preg_preterm, ibd, or prediabetes.
-
-        Args:
-            study (str): The study of the sequence set.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'study' setter.")
-
-        studies = ["preg_preterm", "ibd", "prediabetes"]
-
-        if study in studies:
-            self._study = study
-        else:
-            raise Exception("Not a valid study.")
-
     @property
     def urls(self):
         """
@@ -446,32 +198,6 @@ class HostVariantCall(Base):
 
         return self._urls
 
-    @property
-    def variant_calling_process(self):
-        """
-        str: The software and version used to perform variant calling.
-        """
-        self.logger.debug("In 'variant_calling_process' getter.")
-
-        return self._variant_calling_process
-
-    @variant_calling_process.setter
-    @enforce_string
-    def variant_calling_process(self, variant_calling_process):
-        """
-        The software and version used to perform variant calling.
-
-        Args:
-            variant_calling_process (str): The software and version used to
-            perform variant calling.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'variant_calling_process' setter.")
-
-        self._variant_calling_process = variant_calling_process
-
     @staticmethod
     def required_fields():
         """
@@ -503,53 +229,14 @@ class HostVariantCall(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [HostVariantCall.namespace]
-            },
-            'linkage': self._links,
-            'ns': HostVariantCall.namespace,
-            'node_type': 'host_variant_call',
-            'meta': {
-                "checksums": self._checksums,
-                "comment": self._comment,
-                "format": self._format,
-                "reference": self._reference,
-                "size": self._size,
-                "study": self._study,
-                "subtype": "host",
-                'tags': self._tags,
-                "urls": self._urls,
-                "variant_calling_process": self._variant_calling_process
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("%s object has the OSDF id set.", __name__)
-            doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("%s object has the OSDF version set.", __name__)
-            doc['ver'] = self._version
-
-        # Handle optional properties
-        if self._format_doc is not None:
-            self.logger.debug("Object has the 'format_doc' property set.")
-            doc['meta']['format_doc'] = self._format_doc
-
-        if self._private_files is not None:
-            self.logger.debug("Object has the 'private_files' property set.")
-            doc['meta']['private_files'] = self._private_files
-
-        if self._sop is not None:
-            self.logger.debug("Object has the 'sop' property set.")
-            doc['meta']['sop'] = self._sop
+        doc = super(HostVariantCall, self)._get_raw_doc()
+        doc['meta']['subtype'] = "host"
+        doc['meta']['urls'] = self._urls
 
         return doc
 
     @staticmethod
-    def search(query="\"host_variant_call\"[node_type]"):
+    def search(query="\"host_variant_call\"[node_type]", session=None):
         """
         Searches the OSDF database through all HostVariantCall nodes. Any
         criteria the user wishes to add is provided by the user in the query
@@ -564,6 +251,8 @@ class HostVariantCall(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          HostVariantCall node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of HostVariantCall objects. It returns
@@ -571,7 +260,8 @@ class HostVariantCall(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"host_variant_call"[node_type]':
@@ -587,12 +277,14 @@ class HostVariantCall(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                loaded_result = HostVariantCall.load_host_variant_call(result)
+                loaded_result = HostVariantCall.load_host_variant_call(
+                    result, session=session)
                 result_list.append(loaded_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_host_variant_call(call_data):
         """
         Takes the provided JSON string and converts it to a
@@ -609,39 +301,16 @@ class HostVariantCall(Base):
 
         module_logger.debug("Filling in %s details.", __name__)
 
-        # The attributes commmon to all iHMP nodes
-        call._set_id(call_data['id'])
-        call.version = call_data['ver']
-        call.links = call_data['linkage']
-
-        # The attributes that are required
-        call.checksums = call_data['meta']['checksums']
-        call.comment = call_data['meta']['comment']
-        call.format = call_data['meta']['format']
-        call.reference = call_data['meta']['reference']
-        call.size = call_data['meta']['size']
-        call.study = call_data['meta']['study']
-        call.tags = call_data['meta']['tags']
-        call.variant_calling_process = call_data['meta']['variant_calling_process']
+        call._load_doc(call_data)
         # We need to use the private attribute here because there is no
         # public setter.
         call._urls = call_data['meta']['urls']
 
-        # Optional fields.
-        if 'format_doc' in call_data['meta']:
-            call.format_doc = call_data['meta']['format_doc']
-
-        if 'private_files' in call_data['meta']:
-            call.private_files = call_data['meta']['private_files']
-
-        if 'sop' in call_data['meta']:
-            call.sop = call_data['meta']['sop']
-
         module_logger.debug("Returning loaded %s", __name__)
         return call
 
     @staticmethod
-    def load(call_id):
+    def load(call_id, session=None):
         """
         Loads the data for the specified input ID from OSDF to this object. If
         the provided ID does not exist, then an error message is provided
@@ -649,6 +318,8 @@ class HostVariantCall(Base):
 
         Args:
             call_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A HostVariantCall object with all the available OSDF data loaded
@@ -656,19 +327,21 @@ class HostVariantCall(Base):
         """
         module_logger.debug("In load. Specified ID: %s", call_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         data = session.get_osdf().get_node(call_id)
-        call = HostVariantCall.load_host_variant_call(data)
+        call = HostVariantCall.load_host_variant_call(data, session=session)
 
         module_logger.debug("Returning loaded %s", __name__)
 
         return call
 
-    def _upload_data(self):
+    def _upload_data(self, session=None):
         self.logger.debug("In _upload_data.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
 
         study = self._study
 
@@ -707,7 +380,7 @@ class HostVariantCall(Base):
         else:
             self._urls = ["fasp://" + HostVariantCall.aspera_server + remote_path]
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in OSDF. The JSON form of the current data for the
         instance is validated in the save function. If the data is not valid,
@@ -718,18 +391,20 @@ class HostVariantCall(Base):
         OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
         """
         self.logger.debug("In save.")
 
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         success = False
@@ -738,7 +413,7 @@ class HostVariantCall(Base):
             self._urls = ["<private>"]
         else:
             try:
-                self._upload_data()
+                self._upload_data(session=session)
             except Exception as uploadException:
                 self.logger.exception(uploadException)
                 # Don't bother continuing...
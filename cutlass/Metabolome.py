@@ -7,7 +7,9 @@ import logging
 import os
 import string
 from cutlass.iHMPSession import iHMPSession
+from cutlass.identity import identity_mapped
 from cutlass.Base import Base
+from cutlass.fields import Field
 from cutlass.aspera import aspera
 from cutlass.Util import *
 
@@ -31,6 +33,23 @@ class Metabolome(Base):
 
     aspera_server = "aspera.microbiome-bioactives.org"
 
+    __slots__ = ("_urls",)
+
+    checksums = Field(dict, "The metabolome's checksum data.", required=True,
+                      default=dict)
+    comment = Field(str, "A descriptive comment for the metabolome.")
+    format = Field(str, "The file format of the metabolome file.")
+    format_doc = Field(str, "URL for documentation of file format.")
+    study = Field(str, "One of the 3 studies that are part of the iHMP.",
+                  required=True)
+    subtype = Field(str, "String describing if this metabolome is host or "
+                    "microbiome related.", required=True)
+    local_file = Field(str, "Path to the local file to upload to the server.",
+                       meta=False)
+    private_files = Field(
+        bool, "Whether this object describes private data that should not be "
+        "uploaded to the DCC. Defaults to false.")
+
     def __init__(self, *args, **kwargs):
         """
         Constructor for the Metabolome class. This initializes the
@@ -39,235 +58,10 @@ class Metabolome(Base):
         Args:
             None
         """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        # Required properties
-        self._checksums = {}
-        self._study = None
-        self._subtype = None
         self._urls = ['']
 
-        # Optional properties
-        self._comment = None
-        self._format = None
-        self._format_doc = None
-        self._local_file = None
-        self._private_files = None
-
         super(Metabolome, self).__init__(*args, **kwargs)
 
-    @property
-    def checksums(self):
-        """
-        dict: The metabolome's checksum data.
-        """
-        self.logger.debug("In 'checksums' getter.")
-
-        return self._checksums
-
-    @checksums.setter
-    @enforce_dict
-    def checksums(self, checksums):
-        """
-        The setter for the metabolome's checksums.
-
-        Args:
-            checksums (dict): The checksums.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'checksums' setter.")
-        if type(checksums) is not dict:
-            raise ValueError("Invalid type for checksums.")
-
-        self._checksums = checksums
-
-    @property
-    def comment(self):
-        """
-        str: A descriptive comment for the metabolome.
-        """
-        self.logger.debug("In 'comment' getter.")
-
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for a descriptive comment for the metabolome.
-
-        Args:
-            comment (str): The comment text.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'comment' setter.")
-
-        self._comment = comment
-
-    @property
-    def format(self):
-        """
-        str: The file format of the metabolome file.
-        """
-        self.logger.debug("In 'format' getter.")
-
-        return self._format
-
-    @format.setter
-    @enforce_string
-    def format(self, format):
-        """
-        The setter for the file format of the metabolome file.
-
-        Args:
-            format (str): The file format of the metabolome file.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format' setter.")
-
-        self._format = format
-
-    @property
-    def format_doc(self):
-        """
-        str: URL for documentation of file format.
-        """
-        self.logger.debug("In 'format_doc' getter.")
-
-        return self._format_doc
-
-    @format_doc.setter
-    @enforce_string
-    def format_doc(self, format_doc):
-        """
-        The setter for the URL for the documentation of the file format.
-
-        Args:
-            format_doc (str): URL for file format documentation.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format_doc' setter.")
-
-        self._format_doc = format_doc
-
-    @property
-    def study(self):
-        """
-        str: One of the 3 studies that are part of the iHMP.
-        """
-        self.logger.debug("In 'study' getter.")
-
-        return self._study
-
-    @study.setter
-    @enforce_string
-    def study(self, study):
-        """
-        One of the 3 studies that are part of the iHMP.
-
-        Args:
-            study (str): One of the 3 studies that are part of the iHMP.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'study' setter.")
-
-        self._study = study
-
-    @property
-    def subtype(self):
-        """
-        str: String describing if this metabolome is host or microbiome related.
-        """
-        self.logger.debug("In 'subtype' getter.")
-
-        return self._subtype
-
-    @subtype.setter
-    @enforce_string
-    def subtype(self, subtype):
-        """
-        String describing if this metabolome is host or microbiome related.
-
-        Args:
-            subtype (str): Either "host" or "microbiome".
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'subtype' setter.")
-
-        self._subtype = subtype
-
-    @property
-    def local_file(self):
-        """
-        str: Path to the local file to upload to the server.
-        """
-        self.logger.debug("In 'local_file' getter.")
-
-        return self._local_file
-
-    @local_file.setter
-    @enforce_string
-    def local_file(self, local_file):
-        """
-        The setter for the metabolome local file.
-
-        Args:
-            local_file (str): The path to the local file that should be uploaded
-            to the server.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_file' setter.")
-
-        self._local_file = local_file
-
-    @property
-    def private_files(self):
-        """
-        bool: Whether this object describes private data that should not
-        be uploaded to the DCC. Defaults to false.
-        """
-        self.logger.debug("In 'private_files' getter.")
-
-        return self._private_files
-
-    @private_files.setter
-    @enforce_bool
-    def private_files(self, private_files):
-        """
-        The setter for the private files flag to denote this object
-        describes data that should not be uploaded to the DCC.
-
-        Args:
-            private_files (bool):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'private_files' setter.")
-
-        self._private_files = private_files
-
     @property
     def urls(self):
         """
@@ -278,14 +72,15 @@ class Metabolome(Base):
 
         return self._urls
 
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -295,7 +90,8 @@ class Metabolome(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -312,7 +108,7 @@ class Metabolome(Base):
         self.logger.debug("Number of validation problems: %s.", len(problems))
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -320,7 +116,8 @@ class Metabolome(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -330,7 +127,8 @@ class Metabolome(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, _error_message) = session.get_osdf().validate_node(document)
@@ -358,47 +156,8 @@ class Metabolome(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [Metabolome.namespace]
-            },
-            'linkage': self._links,
-            'ns': Metabolome.namespace,
-            'node_type': 'metabolome',
-            'meta': {
-                'checksums': self._checksums,
-                'study': self._study,
-                'subtype': self._subtype,
-                'tags': self._tags,
-                'urls': self._urls
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("Object has the OSDF id set.")
-            doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("Object has the OSDF version set.")
-            doc['ver'] = self._version
-
-        # Handle optional properties
-        if self._comment is not None:
-            self.logger.debug("Object has the 'comment' property set.")
-            doc['meta']['comment'] = self._comment
-
-        if self._format is not None:
-            self.logger.debug("Object has the 'format' property set.")
-            doc['meta']['format'] = self._format
-
-        if self._format_doc is not None:
-            self.logger.debug("Object has the 'format_doc' property set.")
-            doc['meta']['format_doc'] = self._format_doc
-
-        if self._private_files is not None:
-            self.logger.debug("Object has the 'private_files' property set.")
-            doc['meta']['private_files'] = self._private_files
+        doc = super(Metabolome, self)._get_raw_doc()
+        doc['meta']['urls'] = self._urls
 
         return doc
 
@@ -416,7 +175,7 @@ class Metabolome(Base):
 
         return ("checksums", "subtype", "study", "tags")
 
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object (self) from OSDF. If the object has not been
         previously saved (node ID is not set), then an error message will be
@@ -425,7 +184,8 @@ class Metabolome(Base):
         instance, and this object must be re-saved in order to use it again.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True upon successful deletion, False otherwise.
@@ -438,7 +198,8 @@ class Metabolome(Base):
 
         metabolome_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -455,7 +216,7 @@ class Metabolome(Base):
         return success
 
     @staticmethod
-    def search(query="\"metabolome\"[node_type]"):
+    def search(query="\"metabolome\"[node_type]", session=None):
         """
         Searches OSDF for Metabolome nodes. Any criteria the user wishes to
         add is provided by the user in the query language specifications
@@ -470,6 +231,8 @@ class Metabolome(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          Metabolome node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of Metabolome objects. It returns an empty list
@@ -477,7 +240,8 @@ class Metabolome(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"metabolome"[node_type]':
@@ -493,12 +257,13 @@ class Metabolome(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                node_result = Metabolome.load_metabolome(result)
+                node_result = Metabolome.load_metabolome(result, session=session)
                 result_list.append(node_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_metabolome(data):
         """
         Takes the provided JSON string and converts it to a
@@ -514,35 +279,14 @@ class Metabolome(Base):
         node = Metabolome()
 
         module_logger.debug("Filling in Metabolome details.")
-        node._set_id(data['id'])
-        node.links = data['linkage']
-        node.version = data['ver']
-
-        # Required fields
-        node.checksums = data['meta']['checksums']
-        node.subtype = data['meta']['subtype']
-        node.study = data['meta']['study']
-        node.tags = data['meta']['tags']
+        node._load_doc(data)
         node._urls = data['meta']['urls']
 
-        # Optional fields
-        if 'comment' in data['meta']:
-            node.comment = data['meta']['comment']
-
-        if 'format' in data['meta']:
-            node.format = data['meta']['format']
-
-        if 'format_doc' in data['meta']:
-            node.format_doc = data['meta']['format_doc']
-
-        if 'private_files' in data['meta']:
-            node.private_files = data['meta']['private_files']
-
         module_logger.debug("Returning loaded Metabolome.")
         return node
 
     @staticmethod
-    def load(node_id):
+    def load(node_id, session=None):
         """
         Loads the data for the specified input ID from the OSDF instance to
         this object. If the provided ID does not exist, then an error message
@@ -550,6 +294,8 @@ class Metabolome(Base):
 
         Args:
             node_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A Metabolome object with all the available OSDF data loaded
@@ -557,20 +303,22 @@ class Metabolome(Base):
         """
         module_logger.debug("In load. Specified ID: %s", node_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         node_data = session.get_osdf().get_node(node_id)
 
-        node = Metabolome.load_metabolome(node_data)
+        node = Metabolome.load_metabolome(node_data, session=session)
 
         module_logger.debug("Returning loaded %s.", __name__)
 
         return node
 
-    def _upload_data(self):
+    def _upload_data(self, session=None):
         self.logger.debug("In _upload_data.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
 
         study = self._study
 
@@ -607,7 +355,7 @@ class Metabolome(Base):
         else:
             self._urls = ["fasp://" + Metabolome.aspera_server + remote_path]
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in OSDF. The JSON form of the current data for the
         instance is first validated. If the data is not valid, then the data
@@ -617,7 +365,8 @@ class Metabolome(Base):
         save, will be assigned to the alphanumeric ID found in OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -628,18 +377,19 @@ class Metabolome(Base):
         # If node previously saved, use edit_node instead since ID
         # is given (an update in a way)
         # can also use get_node to check if the node already exists
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid.")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         if self._private_files:
             self._urls = ["<private>"]
         else:
             try:
-                self._upload_data()
+                self._upload_data(session=session)
             except Exception as e:
                 self.logger.exception(e)
                 # Don't bother continuing...
@@ -7,7 +7,9 @@ import logging
 import os
 import string
 from cutlass.iHMPSession import iHMPSession
+from cutlass.identity import identity_mapped
 from cutlass.Base import Base
+from cutlass.fields import Field
 from cutlass.aspera import aspera
 from cutlass.Util import *
 
@@ -18,6 +20,61 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+def _check_exp_length(exp_length):
+    """
+    Checks a new number of raw bases or color space calls.
+
+    Args:
+        exp_length (int): The new exp_length for the current instance.
+
+    Returns:
+        None
+    """
+    if exp_length < 0:
+        raise ValueError("The 'exp_length' must be non-negative.")
+
+def _check_sequence_type(sequence_type):
+    """
+    Checks a new sequence type.
+
+    Args:
+        sequence_type (str): The new sequence type.
+
+    Returns:
+        None
+    """
+    types = ["peptide", "nucleotide"]
+    if sequence_type not in types:
+        raise Exception("Sequence type must be either peptide or nucleotide")
+
+def _check_size(size):
+    """
+    Checks a new file size in bytes.
+
+    Args:
+        size (int): The size of the seq set in bytes.
+
+    Returns:
+        None
+    """
+    if size < 0:
+        raise ValueError("The size must be non-negative.")
+
+def _check_study(study):
+    """
+    Checks a new sequence set's study. This is restricted to be one
+    of preg_preterm, ibd, or prediabetes.
+
+    Args:
+        study (str): The study of the sequence set.
+
+    Returns:
+        None
+    """
+    studies = ["preg_preterm", "ibd", "prediabetes"]
+    if study not in studies:
+        raise Exception("Not a valid study.")
+
 class MicrobTranscriptomicsRawSeqSet(Base):
     """
     The class models microbe transcriptomics raw sequence set data for the
@@ -31,6 +88,31 @@ class MicrobTranscriptomicsRawSeqSet(Base):
 
     aspera_server = "aspera.microbiome-bioactives.org"
 
+    __slots__ = ("_urls",)
+
+    checksums = Field(dict, "One or more checksums used to ensure file "
+                      "integrity.", required=True)
+    comment = Field(str, "Free-text comment.", required=True)
+    exp_length = Field(
+        int, "The number of raw bases or color space calls expected for the "
+        "read, includes both mate pairs and all technical portions.",
+        required=True, check=_check_exp_length)
+    format = Field(str, "The file format of the sequence file.", required=True)
+    format_doc = Field(str, "URL for documentation of file format.",
+                       required=True)
+    local_file = Field(str, "URL to the local file to upload to the server.",
+                       meta=False)
+    private_files = Field(
+        bool, "Whether this object describes private data that should not be "
+        "uploaded to the DCC. Defaults to false.")
+    seq_model = Field(str, "Sequencing instrument model.", required=True)
+    sequence_type = Field(str, "Specifies whether the file contains peptide "
+                          "or nucleotide data.", check=_check_sequence_type)
+    size = Field(int, "The size of the file in bytes.", required=True,
+                 check=_check_size)
+    study = Field(str, "One of the 3 studies that are part of the iHMP.",
+                  required=True, check=_check_study)
+
     def __init__(self, *args, **kwargs):
         """
         Constructor for the MicrobTranscriptomicsRawSeqSet class. This initializes
@@ -39,42 +121,19 @@ class MicrobTranscriptomicsRawSeqSet(Base):
         Args:
             None
         """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        # These are common to all objects
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        # Required properties
-        self._checksums = None
-        self._comment = None
-        self._exp_length = None
-        self._format = None
-        self._format_doc = None
-        self._seq_model = None
-        self._sequence_type = None
-        self._size = None
-        self._study = None
         self._urls = ['']
 
-        # Optional properties
-        self._local_file = None
-        self._private_files = None
-
         super(MicrobTranscriptomicsRawSeqSet, self).__init__(*args, **kwargs)
 
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -84,7 +143,8 @@ class MicrobTranscriptomicsRawSeqSet(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -111,7 +171,7 @@ class MicrobTranscriptomicsRawSeqSet(Base):
 
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -119,7 +179,8 @@ class MicrobTranscriptomicsRawSeqSet(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -127,7 +188,7 @@ class MicrobTranscriptomicsRawSeqSet(Base):
         """
         self.logger.debug("In is_valid.")
 
-        problems = self.validate()
+        problems = self.validate(session=session)
 
         valid = True
         if len(problems):
@@ -138,301 +199,6 @@ class MicrobTranscriptomicsRawSeqSet(Base):
 
         return valid
 
-    @property
-    def checksums(self):
-        """
-        str: One or more checksums used to ensure file integrity.
-        """
-        self.logger.debug("In 'checksums' getter.")
-
-        return self._checksums
-
-    @checksums.setter
-    @enforce_dict
-    def checksums(self, checksums):
-        """
-        The setter for the checksum data.
-
-        Args:
-            checksums (dict): The checksums for the data file.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'checksums' setter.")
-
-        self._checksums = checksums
-
-    @property
-    def comment(self):
-        """
-        str: Free-text comment.
-        """
-        self.logger.debug("In 'comment' getter.")
-
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for the comment field. The comment must be a string,
-        and less than 512 characters.
-
-        Args:
-            comment (str): The new comment to add to the string.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'comment' setter.")
-
-        self._comment = comment
-
-    @property
-    def exp_length(self):
-        """
-        int: The number of raw bases or color space calls expected for the read,
-             includes both mate pairs and all technical portions.
-        """
-        self.logger.debug("In 'exp_length' getter.")
-
-        return self._exp_length
-
-    @exp_length.setter
-    @enforce_int
-    def exp_length(self, exp_length):
-        """
-        The setter for the number of raw bases or color space calls.
-
-        Args:
-            exp_length (int): The new exp_length for the current instance.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'exp_length' setter.")
-        if exp_length < 0:
-            raise ValueError("The 'exp_length' must be non-negative.")
-
-        self._exp_length = exp_length
-
-    @property
-    def format(self):
-        """
-        str: The file format of the sequence file.
-        """
-        self.logger.debug("In 'format' getter.")
-
-        return self._format
-
-    @format.setter
-    @enforce_string
-    def format(self, format_str):
-        """
-        The setter for the format. This must be either 'fasta' or 'fastq'.
-
-        Args:
-            format_str (str): The new format string for the current object.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format' setter.")
-
-        self._format = format_str
-
-    @property
-    def format_doc(self):
-        """
-        str: URL for documentation of file format.
-        """
-        self.logger.debug("In 'format_doc' getter.")
-
-        return self._format_doc
-
-    @format_doc.setter
-    @enforce_string
-    def format_doc(self, format_doc):
-        """
-        The setter for the file format documentation URL.
-
-        Args:
-            format_doc (str): The new format_doc for the current object.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format_doc' setter.")
-
-        self._format_doc = format_doc
-
-    @property
-    def local_file(self):
-        """
-        str: URL to the local file to upload to the server.
-        """
-        self.logger.debug("In 'local_file' getter.")
-
-        return self._local_file
-
-    @local_file.setter
-    @enforce_string
-    def local_file(self, local_file):
-        """
-        The setter for the local file.
-
-        Args:
-            local_file (str): The URL to the local file that should
-                              be uploaded to the server.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_file' setter.")
-
-        self._local_file = local_file
-
-    @property
-    def private_files(self):
-        """
-        bool: Whether this object describes private data that should not
-        be uploaded to the DCC. Defaults to false.
-        """
-        self.logger.debug("In 'private_files' getter.")
-
-        return self._private_files
-
-    @private_files.setter
-    @enforce_bool
-    def private_files(self, private_files):
-        """
-        The setter for the private files flag to denote this object
-        describes data that should not be uploaded to the DCC.
-
-        Args:
-            private_files (bool):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'private_files' setter.")
-
-        self._private_files = private_files
-
-    @property
-    def seq_model(self):
-        """
-        str: Sequencing instrument model.
-        """
-        self.logger.debug("In 'seq_model' getter.")
-
-        return self._seq_model
-
-    @seq_model.setter
-    @enforce_string
-    def seq_model(self, seq_model):
-        """
-        The setter for the sequencing instrument model.
-
-        Args:
-            seq_model (str): The new sequencing instrument model.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'seq_model' setter.")
-
-        self._seq_model = seq_model
-
-    @property
-    def sequence_type(self):
-        """
-        str: Specifies whether the file contains peptide or nucleotide data.
-        """
-        self.logger.debug("In 'sequence_type' getter.")
-
-        return self._sequence_type
-
-    @sequence_type.setter
-    @enforce_string
-    def sequence_type(self, sequence_type):
-        """
-        The setter for the sequence type.
-
-        Args:
-            sequence_type (str): The new sequence type.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sequence_type' setter.")
-
-        types = ["peptide", "nucleotide"]
-        if sequence_type in types:
-            self._sequence_type = sequence_type
-        else:
-            raise Exception("Sequence type must be either peptide or nucleotide")
-
-    @property
-    def size(self):
-        """
-        int: The size of the file in bytes.
-        """
-        self.logger.debug("In 'size' getter.")
-
-        return self._size
-
-    @size.setter
-    @enforce_int
-    def size(self, size):
-        """
-        The setter for the file size in bytes.
-
-        Args:
-            size (int): The size of the seq set in bytes.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'size' setter.")
-
-        if size < 0:
-            raise ValueError("The size must be non-negative.")
-
-        self._size = size
-
-    @property
-    def study(self):
-        """
-        str: One of the 3 studies that are part of the iHMP.
-        """
-        self.logger.debug("In 'study' getter.")
-
-        return self._study
-
-    @study.setter
-    @enforce_string
-    def study(self, study):
-        """
-        The setter for the sequence set's study. This is restricted to be one
-        of preg_preterm, ibd, or prediabetes.
-
-        Args:
-            study (str): The study of the sequence set.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'study' setter.")
-
-        studies = ["preg_preterm", "ibd", "prediabetes"]
-
-        if study in studies:
-            self._study = study
-        else:
-            raise Exception("Not a valid study.")
-
     @property
     def urls(self):
         """
@@ -472,50 +238,14 @@ class MicrobTranscriptomicsRawSeqSet(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [MicrobTranscriptomicsRawSeqSet.namespace]
-            },
-            'linkage': self._links,
-            'ns': MicrobTranscriptomicsRawSeqSet.namespace,
-            'node_type': 'microb_transcriptomics_raw_seq_set',
-            'meta': {
-                "checksums": self._checksums,
-                "comment": self._comment,
-                "exp_length": self._exp_length,
-                "format": self._format,
-                "format_doc": self._format_doc,
-                "seq_model": self.seq_model,
-                "size": self._size,
-                "study": self._study,
-                "subtype": "microb",
-                'tags': self._tags,
-                "urls": self._urls
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("%s object has the OSDF id set.", __name__)
-            doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("%s object has the OSDF version set.", __name__)
-            doc['ver'] = self._version
-
-        # Handle optional properties
-        if self._sequence_type is not None:
-            self.logger.debug("%s object has the sequence_type set.", __name__)
-            doc['meta']['sequence_type'] = self._sequence_type
-
-        if self._private_files is not None:
-            self.logger.debug("%s object has the 'private_files' property set.", __name__)
-            doc['meta']['private_files'] = self._private_files
+        doc = super(MicrobTranscriptomicsRawSeqSet, self)._get_raw_doc()
+        doc['meta']['subtype'] = "microb"
+        doc['meta']['urls'] = self._urls
 
         return doc
 
     @staticmethod
-    def search(query="\"microb_transcriptomics_raw_seq_set\"[node_type]"):
+    def search(query="\"microb_transcriptomics_raw_seq_set\"[node_type]", session=None):
         """
         Searches the OSDF database through all MicrobTranscriptomicsRawSeqSet
         nodes. Any criteria the user wishes to add is provided by the user
@@ -531,6 +261,8 @@ class MicrobTranscriptomicsRawSeqSet(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          MicrobTranscriptomicsRawSeqSet node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of MicrobTranscriptomicsRawSeqSet objects. It returns
@@ -538,7 +270,8 @@ class MicrobTranscriptomicsRawSeqSet(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"microb_transcriptomics_raw_seq_set"[node_type]':
@@ -561,6 +294,7 @@ class MicrobTranscriptomicsRawSeqSet(Base):
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_microb_transcriptomics_raw_seq_set(seq_set_data):
         """
         Takes the provided JSON string and converts it to a
@@ -577,40 +311,18 @@ class MicrobTranscriptomicsRawSeqSet(Base):
 
         module_logger.debug("Filling in %s details.", __name__)
 
-        # The attributes commmon to all iHMP nodes
-        seq_set._set_id(seq_set_data['id'])
-        seq_set.links = seq_set_data['linkage']
-        seq_set.version = seq_set_data['ver']
-
-        # Required fields
-        seq_set.checksums = seq_set_data['meta']['checksums']
-        seq_set.comment = seq_set_data['meta']['comment']
-        seq_set.exp_length = seq_set_data['meta']['exp_length']
-        seq_set.format = seq_set_data['meta']['format']
-        seq_set.format_doc = seq_set_data['meta']['format_doc']
-        seq_set.seq_model = seq_set_data['meta']['seq_model']
-        seq_set.size = seq_set_data['meta']['size']
-        seq_set.tags = seq_set_data['meta']['tags']
-        seq_set.study = seq_set_data['meta']['study']
+        seq_set._load_doc(seq_set_data)
 
         # We need to use the private attribute here because there is no
         # public setter.
         seq_set._urls = seq_set_data['meta']['urls']
 
-        # Optional fields
-        if 'sequence_type' in seq_set_data['meta']:
-            module_logger.info("%s data has 'sequence_type' present.", __name__)
-            seq_set.sequence_type = seq_set_data['meta']['sequence_type']
-
-        if 'private_files' in seq_set_data['meta']:
-            seq_set.private_files = seq_set_data['meta']['private_files']
-
         module_logger.debug("Returning loaded %s.", __name__)
 
         return seq_set
 
     @staticmethod
-    def load(seq_set_id):
+    def load(seq_set_id, session=None):
         """
         Loads the data for the specified input ID from OSDF to this object. If
         the provided ID does not exist, then an error message is provided
@@ -618,6 +330,8 @@ class MicrobTranscriptomicsRawSeqSet(Base):
 
         Args:
             seq_set_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A MicrobTranscriptomicsRawSeqSet object with all the available OSDF
@@ -625,19 +339,22 @@ class MicrobTranscriptomicsRawSeqSet(Base):
         """
         module_logger.debug("In load. Specified ID: %s", seq_set_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         data = session.get_osdf().get_node(seq_set_id)
-        seq_set = MicrobTranscriptomicsRawSeqSet.load_microb_transcriptomics_raw_seq_set(data)
+        seq_set = MicrobTranscriptomicsRawSeqSet.load_microb_transcriptomics_raw_seq_set(
+            data, session=session)
 
         module_logger.debug("Returning loaded %s.", __name__)
 
         return seq_set
 
-    def _upload_data(self):
+    def _upload_data(self, session=None):
         self.logger.debug("In _upload_data.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         study = self._study
 
         study2dir = {
@@ -676,7 +393,7 @@ class MicrobTranscriptomicsRawSeqSet(Base):
                 MicrobTranscriptomicsRawSeqSet.aspera_server + \
                 remote_path]
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in OSDF. The JSON form of the current data for the
         instance is first validated. If the data is not valid, then the data
@@ -686,7 +403,8 @@ class MicrobTranscriptomicsRawSeqSet(Base):
         save, will be assigned to the alphanumeric ID found in OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -697,18 +415,19 @@ class MicrobTranscriptomicsRawSeqSet(Base):
         # If node previously saved, use edit_node instead since ID
         # is given (an update in a way)
         # can also use get_node to check if the node already exists
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         if self._private_files:
             self._urls = ["<private>"]
         else:
             try:
-                self._upload_data()
+                self._upload_data(session=session)
             except Exception as upload_exception:
                 self.logger.exception(upload_exception)
                 # Don't bother continuing...
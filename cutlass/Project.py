@@ -3,10 +3,12 @@ Models the project object.
 """
 
 import logging
-from itertools import count
 from cutlass.iHMPSession import iHMPSession
+from cutlass.identity import identity_mapped
+from cutlass.paging import oql_docs
 from cutlass.mixs import MIXS, MixsException
-from cutlass.Base import Base
+from cutlass.Base import Base, node_ref
+from cutlass.fields import Field
 from cutlass.Study import Study
 from cutlass.Util import *
 
@@ -17,6 +19,22 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+def _check_mixs(mixs):
+    """
+    Checks a new Project's MIXS. The MIXS dictionary input must
+    validate with the MIXS class, and all minimal/required fields must be
+    included.
+
+    Args:
+        mixs (dict): The new MIXS dictionary to assign to this instance.
+
+    Returns:
+        None
+    """
+    valid_dictionary = MIXS.check_dict(mixs)
+    if not valid_dictionary:
+        raise MixsException("Invalid MIXS data detected.")
+
 class Project(Base):
     """
     The class encapsulating the project data for an iHMP instance.
@@ -28,111 +46,13 @@ class Project(Base):
     """
     namespace = "hmbr"
 
-    def __init__(self, *args, **kwargs):
-        """
-        Constructor for the Project class. This initializes the fields specific to the
-        Project class, and inherits from the Base class.
-
-        Args:
-            None
-        """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-        self.logger.addHandler(logging.NullHandler())
-
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        self._name = None
-        self._description = None
-        self._mixs = None
-
-        super(Project, self).__init__(*args, **kwargs)
-
-    @property
-    def name(self):
-        """
-        str: The name of the project within which the sequencing was organized.
-        """
-        self.logger.debug("In 'name' getter.")
-
-        return self._name
-
-    @name.setter
-    @enforce_string
-    def name(self, name):
-        """
-        The setter for the Project name.
-
-        Args:
-            name (str): The new name to assign to this instance.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'name' setter.")
-
-        self._name = name
-
-    @property
-    def description(self):
-        """
-        str: A longer description of the project
-        """
-        self.logger.debug("In 'description' getter.")
-
-        return self._description
-
-    @description.setter
-    @enforce_string
-    def description(self, description):
-        """
-        The setter for the Project description.
-
-        Args:
-            description (str): The new description to assign to this instance.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'description' setter.")
-
-        self._description = description
-
-    @property
-    def mixs(self):
-        """
-        dict: Minimal information for any system. "project_name" is the minimal
-              required field for this dictionary.
-        """
-        self.logger.debug("In 'mixs' getter.")
-
-        return self._mixs
-
-    @mixs.setter
-    @enforce_dict
-    def mixs(self, mixs):
-        """
-        The setter for the Project's MIXS. The MIXS dictionary input must
-        validate with the MIXS class, and all minimal/required fields must be
-        included.
-
-        Args:
-            mixs (dict): The new MIXS dictionary to assign to this instance.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'mixs' setter.")
-        valid_dictionary = MIXS.check_dict(mixs)
-
-        # Validate the incoming MIXS data
-        if valid_dictionary:
-            self.logger.debug("MIXS data seems correct.")
-            self._mixs = mixs
-        else:
-            raise MixsException("Invalid MIXS data detected.")
+    name = Field(str, "The name of the project within which the sequencing "
+                 "was organized.", required=True)
+    description = Field(str, "A longer description of the project",
+                        required=True)
+    mixs = Field(dict, "Minimal information for any system. 'project_name' "
+                 "is the minimal required field for this dictionary.",
+                 required=True, check=_check_mixs)
 
     @staticmethod
     def required_fields():
@@ -148,7 +68,7 @@ class Project(Base):
         fields = ('name', 'description', 'mixs', 'tags')
         return fields
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in the current instance. The JSON form of the current
         data for the instance is validated in the save function. If the data is
@@ -159,7 +79,8 @@ class Project(Base):
         Also, the version is updated as the data is saved in OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -170,14 +91,15 @@ class Project(Base):
         # if node previously saved, use edit_node instead since ID is given
         # (an update in a way) can also use get_node to check if the
         # node already exists
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid")
             return False
 
         # Before save, make sure that linkage is non-empty, the key should
         # be collected-during
         self.logger.debug("In save.")
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         osdf = session.get_osdf()
@@ -225,7 +147,7 @@ class Project(Base):
 
         return success
 
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object (self) from the OSDF instance. If the object
         has not been saved previously (node ID is not set), then an error
@@ -235,7 +157,8 @@ class Project(Base):
         use it again.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True upon successful deletion, False otherwise.
@@ -248,7 +171,8 @@ class Project(Base):
 
         project_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -264,7 +188,7 @@ class Project(Base):
         return success
 
     @staticmethod
-    def search(query="\"project\"[node_type]"):
+    def search(query="\"project\"[node_type]", session=None):
         """
         Searches the OSDF database through all Project node types. Any criteria
         the user wishes to add is provided by the user in the query language
@@ -279,6 +203,8 @@ class Project(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          Project node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of Project objects. It returns an empty list if
@@ -286,7 +212,8 @@ class Project(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"project"[node_type]':
@@ -302,13 +229,13 @@ class Project(Base):
 
         if len(all_results) > 0:
             for i in all_results:
-                project_result = Project.load_project(i)
+                project_result = Project.load_project(i, session=session)
                 result_list.append(project_result)
 
         return result_list
 
     @staticmethod
-    def load(project_id):
+    def load(project_id, session=None):
         """
         Loads the data for the specified input ID from the OSDF instance to
         this object. If the provided ID does not exist, then an error message
@@ -316,6 +243,8 @@ class Project(Base):
 
         Args:
             project_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A Project object with all the available OSDF data loaded into it.
@@ -323,19 +252,21 @@ class Project(Base):
         module_logger.debug("In load. Specified ID: %s", project_id)
 
         # use OSDF get_node() to load the data
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         project_data = session.get_osdf().get_node(project_id)
 
         module_logger.info("Creating a template %s.", __name__)
-        project = Project.load_project(project_data)
+        project = Project.load_project(project_data, session=session)
 
         module_logger.debug("Returning loaded %s.", __name__)
 
         return project
 
     @staticmethod
+    @identity_mapped
     def load_project(project_data):
         """
         Takes the provided JSON string and converts it to a Project object
@@ -352,15 +283,7 @@ class Project(Base):
 
         module_logger.debug("Filling in %s details.", __name__)
 
-        project._set_id(project_data['id'])
-
-        # For version, the key to use is simply 'ver'
-        project.links = project_data['linkage']
-        project.version = project_data['ver']
-        project.tags = project_data['meta']['tags']
-        project.mixs = project_data['meta']['mixs']
-        project.description = project_data['meta']['description']
-        project.name = project_data['meta']['name']
+        project._load_doc(project_data)
 
         module_logger.debug("Returning loaded %s.", __name__)
 
@@ -382,49 +305,22 @@ class Project(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        project_doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [Project.namespace]
-            },
-            'linkage': self._links,
-            'ns': Project.namespace,
-            'node_type': 'project',
-            'meta': {
-                'name': self._name,
-                'mixs': self._mixs,
-                'tags': self._tags,
-                'description': self._description,
-                'subtype': Project.namespace
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("%s object has the OSDF id set.", __name__)
-            project_doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("%s object has the OSDF version set.", __name__)
-            project_doc['ver'] = self._version
+        project_doc = super(Project, self)._get_raw_doc()
+        project_doc['meta']['subtype'] = Project.namespace
 
         return project_doc
 
-
-    def studies(self):
+    def studies(self, ids_only=False, fan_out=None):
         """
         Returns an iterator of all studies connected to this project.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         linkage_query = '"{}"[linkage.part_of]'.format(self.id)
-        query = iHMPSession.get_session().get_osdf().oql_query
-
-        for page_no in count(1):
-            res = query(Project.namespace, linkage_query, page=page_no)
-            res_count = res['result_count']
-
-            for doc in res['results']:
-                yield Study.load_study(doc)
-
-            res_count -= len(res['results'])
 
-            if res_count < 1:
-                break
+        for doc in oql_docs(Project.namespace, linkage_query, fan_out=fan_out):
+            yield node_ref(doc) if ids_only else Study.load_study(doc)
@@ -7,9 +7,11 @@ import logging
 import os
 import string
 from cutlass.iHMPSession import iHMPSession
+from cutlass.identity import identity_mapped
 from cutlass.Base import Base
+from cutlass.fields import Field
 from cutlass.aspera import aspera
-from cutlass.Util import enforce_bool, enforce_dict, enforce_past_date, enforce_list, enforce_string
+from cutlass.Util import check_past_date
 
 # pylint: disable=C0302, W0703, C1801
 
@@ -18,6 +20,35 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+def _check_study(study):
+    """
+    Checks a new study. This must be one of the 3 studies that are part of
+    the iHMP.
+
+    Args:
+        study (str): One of the 3 studies that are part of the iHMP.
+
+    Returns:
+        None
+    """
+    studies = ["preg_preterm", "ibd", "prediabetes"]
+    if study not in studies:
+        raise Exception("Invalid study.")
+
+def _check_subtype(subtype):
+    """
+    Checks a new subtype. This must be either host or microbiome.
+
+    Args:
+        subtype (str): The subtype of the proteome.
+
+    Returns:
+        None
+    """
+    subtypes = ["host", "microbiome"]
+    if subtype not in subtypes:
+        raise Exception("Invalid subtype.")
+
 class Proteome(Base):
     """
     The class encapsulating iHMP proteome data required for submission to PRIDE.
@@ -37,6 +68,71 @@ class Proteome(Base):
 
     aspera_server = "aspera.microbiome-bioactives.org"
 
+    __slots__ = ("_other_url", "_peak_url", "_raw_url", "_result_url")
+
+    checksums = Field(dict, "The proteome's checksum data.", required=True,
+                      default=dict)
+    comment = Field(str, "A descriptive comment for the proteome.",
+                    required=True)
+    date = Field(str, "The date on which the spectra were generated.",
+                 check=check_past_date)
+    pride_id = Field(str, "PRIDE identifier corresponding to study.",
+                     required=True)
+    private_files = Field(
+        bool, "Whether this object describes private data that should not be "
+        "uploaded to the DCC. Defaults to false.", meta=False)
+    sample_name = Field(str, "The short label that is referable to the sample "
+                        "used to generate the dataset.", required=True)
+    title = Field(str, "The description of the particular experiment.",
+                  required=True)
+    short_label = Field(str, "The short label/nomenclature used to "
+                        "group/organize experiments.", required=True)
+    reference = Field(str, "Link to literature citation for which this "
+                      "experiment provides supporting evidence.")
+    protocol_name = Field(str, "The protocol title with versioning.",
+                          required=True)
+    protocol_steps = Field(str, "Description of the sample processing steps.")
+    exp_description = Field(str, "Description of the goals and objectives of "
+                            "this study.", required=True)
+    data_processing_protocol = Field(
+        str, "Description of the data processing protocol.", required=True)
+    sample_description = Field(str, "Expansible description of the sample "
+                               "used to generate the dataset.")
+    instrument_name = Field(str, "Descriptive name of the instrument make, "
+                            "model, significant customizations.",
+                            required=True)
+    source = Field(str, "Ion source information, child of term MS:1000008, "
+                   "e.g. MS:1000398 nanoelectrospray.", required=True)
+    analyzer = Field(
+        str, "Single or multiple components of the mass analyzer, children "
+        "terms of MS:1000443, e.g. MS:1000081 quadrupole.", required=True)
+    detector = Field(str, "Detector type used, children terms of MS:1000026 "
+                     "e.g. MS:1000114: microchannel plate detector.",
+                     required=True)
+    software = Field(str, "Software used during data acquisition and data "
+                     "processing.", required=True)
+    processing_method = Field(str, "Description of the default peak "
+                              "processing method.", required=True)
+    search_engine = Field(str, "Name of the protein search engine used, e.g. "
+                          "Mascot 2.2.1.", required=True)
+    xml_generation = Field(str, "Software used to generate the PRIDE xml "
+                           "file, e.g. PRIDE Converter Toolsuite 2.0.")
+    modification = Field(
+        list, "An array of ontology strings describing protein modifications. "
+        "PSI-MOD and Unimod CV terms are allowed.", default=lambda: [''])
+    local_raw_file = Field(str, "Local path where the raw file is located.",
+                           meta=False)
+    local_result_file = Field(
+        str, "Local path where the result file is located.", meta=False)
+    local_other_file = Field(
+        str, "Local path where the other file is located.", meta=False)
+    local_peak_file = Field(str, "Local path where the peak file is located.",
+                            meta=False)
+    study = Field(str, "One of the 3 studies that are part of the iHMP.",
+                  required=True, check=_check_study)
+    subtype = Field(str, "The subtype of the proteome.", required=True,
+                    check=_check_subtype)
+
     def __init__(self, *args, **kwargs):
         """
         Constructor for the Proteome class. This initializes the fields specific to the
@@ -45,648 +141,13 @@ class Proteome(Base):
         Args:
             None
         """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        self._analyzer = None
-        self._checksums = {}
-        self._comment = None
-        self._data_processing_protocol = None
-        self._detector = None
-        self._exp_description = None
-        self._instrument_name = None
-        self._modification = ['']
         self._result_url = ['']
-        self._pride_id = None
-        self._private_files = None
-        self._processing_method = None
-        self._protocol_name = None
         self._peak_url = ['']
-        self._sample_name = None
-        self._search_engine = None
-        self._short_label = None
-        self._software = None
-        self._source = None
-        self._study = None
-        self._subtype = None
         self._raw_url = ['']
         self._other_url = ['']
-        self._result_url = ['']
-        self._local_raw_file = None
-        self._local_other_file = None
-        self._local_result_file = None
-        self._local_peak_file = None
-        self._title = None
-
-        # Optional properties
-        self._date = None
-        self._protocol_steps = None
-        self._reference = None
-        self._sample_description = None
-        self._xml_generation = None
 
         super(Proteome, self).__init__(*args, **kwargs)
 
-    @property
-    def checksums(self):
-        """
-        dict: The proteome's checksum data.
-        """
-        self.logger.debug("In 'checksums' getter.")
-        return self._checksums
-
-    @checksums.setter
-    @enforce_dict
-    def checksums(self, checksums):
-        """
-        The setter for the Proteome's checksums.
-
-        Args:
-            checksums (dict): The checksums.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'checksums' setter.")
-
-        self._checksums = checksums
-
-    @property
-    def comment(self):
-        """
-        str: A descriptive comment for the proteome.
-        """
-        self.logger.debug("In 'comment' getter.")
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for a descriptive comment for the proteome object.
-
-        Args:
-            comment (str): The comment text.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'comment' setter.")
-
-        self._comment = comment
-
-    @property
-    def date(self):
-        """
-        str: The date on which the spectra were generated.
-        """
-        self.logger.debug("In 'date' getter.")
-        return self._date
-
-    @date.setter
-    @enforce_string
-    @enforce_past_date
-    def date(self, date):
-        """
-        The setter the date on which the spectra were generated.
-
-        Args:
-            date (str): The date in YYYY-MM-DD format.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'date' setter.")
-
-        self._date = date
-
-    @property
-    def pride_id(self):
-        """
-        str: PRIDE identifier corresponding to study.
-        """
-        self.logger.debug("In 'pride_id' getter.")
-        return self._pride_id
-
-    @pride_id.setter
-    @enforce_string
-    def pride_id(self, pride_id):
-        """
-        The setter for the PRIDE identifier corresponding to study.
-
-        Args:
-            pride_id (str): The PRIDE identifier
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'pride_id' setter.")
-
-        self._pride_id = pride_id
-
-    @property
-    def private_files(self):
-        """
-        bool: Whether this object describes private data that should not
-        be uploaded to the DCC. Defaults to false.
-        """
-        self.logger.debug("In 'private_files' getter.")
-
-        return self._private_files
-
-    @private_files.setter
-    @enforce_bool
-    def private_files(self, private_files):
-        """
-        The setter for the private files flag to denote this object
-        describes data that should not be uploaded to the DCC.
-
-        Args:
-            private_files (bool):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'private_files' setter.")
-
-        self._private_files = private_files
-
-    @property
-    def sample_name(self):
-        """
-        str: The short label that is referable to the sample used to
-        generate the dataset.
-        """
-        self.logger.debug("In 'sample_name' getter.")
-        return self._sample_name
-
-    @sample_name.setter
-    @enforce_string
-    def sample_name(self, sample_name):
-        """
-        The setter for the short label that is referable to the sample
-        used to generate the dataset.
-
-        Args:
-            sample_name (str): Short label for the sample.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sample_name' setter.")
-
-        self._sample_name = sample_name
-
-    @property
-    def title(self):
-        """
-        str: The description of the particular experiment.
-        """
-        self.logger.debug("In 'title' getter.")
-        return self._title
-
-    @title.setter
-    @enforce_string
-    def title(self, title):
-        """
-        The setter for the description of the particular experiment.
-
-        Args:
-            title (str): Experiment title
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'title' setter.")
-
-        self._title = title
-
-    @property
-    def short_label(self):
-        """
-        str: The short label/nomenclature used to group/organize experiments.
-        """
-        self.logger.debug("In 'short_label' getter.")
-        return self._short_label
-
-    @short_label.setter
-    @enforce_string
-    def short_label(self, short_label):
-        """
-        Set the short label/nomenclature used to group/organize experiments.
-
-        Args:
-            short_label (str): Short label used to group experiments
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'short_label' setter.")
-
-        self._short_label = short_label
-
-    @property
-    def reference(self):
-        """
-        str: Link to literature citation for which this experiment provides
-        supporting evidence.
-        """
-        self.logger.debug("In 'reference' getter.")
-
-        return self._reference
-
-    @reference.setter
-    @enforce_string
-    def reference(self, reference):
-        """
-        Set the literature citation for which this experiment provides
-        supporting evidence.
-
-        Args:
-            reference (str): Supporting evidence link.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'reference' setter.")
-
-        self._reference = reference
-
-    @property
-    def protocol_name(self):
-        """
-        str: The protocol title with versioning.
-        """
-        self.logger.debug("In 'protocol_name' getter.")
-
-        return self._protocol_name
-
-    @protocol_name.setter
-    @enforce_string
-    def protocol_name(self, protocol_name):
-        """
-        Set the protocol title with versioning.
-
-        Args:
-            protocol_name (str): Protocol title with versioning, ideally,
-            pointing to a URL.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'protocol_name' setter.")
-
-        self._protocol_name = protocol_name
-
-    @property
-    def protocol_steps(self):
-        """
-        str: Description of the sample processing steps.
-        """
-        self.logger.debug("In 'protocol_steps' getter.")
-        return self._protocol_steps
-
-    @protocol_steps.setter
-    @enforce_string
-    def protocol_steps(self, protocol_steps):
-        """
-        Set the description of the sample processing steps using PRIDE
-        controlled vocabulary terms.
-
-        Args:
-            protocol_steps (str):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'protocol_steps' setter.")
-
-        self._protocol_steps = protocol_steps
-
-    @property
-    def exp_description(self):
-        """
-        str: Description of the goals and objectives of this study.
-        """
-        self.logger.debug("In 'exp_description' getter.")
-        return self._exp_description
-
-    @exp_description.setter
-    @enforce_string
-    def exp_description(self, exp_description):
-        """
-        Set the description of the goals and objectives of this study,
-        summary of the abstract, optimally 2-3 sentences.
-
-        Args:
-            exp_description (str): Description of the goals/objectives
-            of the study.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'exp_description' setter.")
-
-        self._exp_description = exp_description
-
-    @property
-    def data_processing_protocol(self):
-        """
-		str: Description of the data processing protocol.
-		"""
-        self.logger.debug("In 'data_processing_protocol' getter.")
-        return self._data_processing_protocol
-
-    @data_processing_protocol.setter
-    @enforce_string
-    def data_processing_protocol(self, data_processing_protocol):
-        """
-		A short description of the data processing protocol followed to
-		generate associated data sets, optimally 2-3 sentences.
-
-		Args:
-			data_processing_protocol (str): Description of the goals/objectives
-			of the study.
-
-		Returns:
-			None
-		"""
-        self.logger.debug("In 'data_processing_protocol' setter.")
-
-        self._data_processing_protocol = data_processing_protocol
-
-    @property
-    def sample_description(self):
-        """
-        str: Expansible description of the sample used to generate the
-        dataset.
-        """
-        self.logger.debug("In 'sample_description' getter.")
-
-        return self._sample_description
-
-    @sample_description.setter
-    @enforce_string
-    def sample_description(self, sample_description):
-        """
-        Set the expansible description of the sample used to generate the
-        dataset
-
-        Args:
-            sample_description (str): Expansible description of the sample
-            used to generate the dataset
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sample_description' setter.")
-
-        self._sample_description = sample_description
-
-    @property
-    def instrument_name(self):
-        """
-        str: Descriptive name of the instrument make, model, significant
-        customizations.
-        """
-        self.logger.debug("In 'instrument_name' getter.")
-        return self._instrument_name
-
-    @instrument_name.setter
-    @enforce_string
-    def instrument_name(self, instrument_name):
-        """
-        Descriptive name of the instrument make, model, significant
-        customizations.
-
-        Args:
-            instrument_name (str): Expansible description of the sample
-            used to generate the dataset
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'instrument_name' setter.")
-
-        self._instrument_name = instrument_name
-
-    @property
-    def source(self):
-        """
-        str: Ion source information, child of term MS:1000008, e.g. MS:1000398
-        nanoelectrospray.
-        """
-        self.logger.debug("In 'source' getter.")
-        return self._source
-
-    @source.setter
-    @enforce_string
-    def source(self, source):
-        """
-        Ion source information, child of term MS:1000008, e.g. MS:1000398
-        nanoelectrospray.
-
-        Args:
-            source (str):  Ion source information.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'source' setter.")
-
-        self._source = source
-
-    @property
-    def analyzer(self):
-        """
-        str: Single or multiple components of the mass analyzer, children terms
-        of MS:1000443, e.g. MS:1000081 quadrupole.
-        """
-        self.logger.debug("In 'analyzer' getter.")
-
-        return self._analyzer
-
-    @analyzer.setter
-    @enforce_string
-    def analyzer(self, analyzer):
-        """
-        Single or multiple components of the mass analyzer, children terms of
-        MS:1000443, e.g. MS:1000081 quadrupole.
-
-        Args:
-            analyzer (str): Single or multiple components of the mass analyzer.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'analyzer' setter.")
-
-        self._analyzer = analyzer
-
-    @property
-    def detector(self):
-        """
-        str: Detector type used, children terms of MS:1000026 e.g. MS:1000114:
-        microchannel plate detector.
-        """
-        self.logger.debug("In 'detector' getter.")
-
-        return self._detector
-
-    @detector.setter
-    @enforce_string
-    def detector(self, detector):
-        """
-        Detector type used, children terms of MS:1000026 e.g. MS:1000114:
-        microchannel plate detector.
-
-        Args:
-            detector (str): Detector type used.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'detector' setter.")
-
-        self._detector = detector
-
-    @property
-    def software(self):
-        """
-        str: Software used during data acquisition and data processing.
-        """
-        self.logger.debug("In 'software' getter.")
-
-        return self._software
-
-    @software.setter
-    @enforce_string
-    def software(self, software):
-        """
-        Software used during data acquisition and data processing, including
-        the software that produced the peak list, with versions."
-
-        Args:
-            software (str): Software used during data acquisition.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'software' setter.")
-
-        self._software = software
-
-    @property
-    def processing_method(self):
-        """
-        str: Description of the default peak processing method.
-        """
-        self.logger.debug("In 'processing_method' getter.")
-
-        return self._processing_method
-
-    @processing_method.setter
-    @enforce_string
-    def processing_method(self, processing_method):
-        """
-        Description of the default peak processing method, children terms of
-        MS:1000452, e.g. MS:1000033 deisotoping."
-
-        Args:
-            processing_method (str): Description of the default
-            peak processing method.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'processing_method' setter.")
-
-        self._processing_method = processing_method
-
-    @property
-    def search_engine(self):
-        """
-        str: Name of the protein search engine used, e.g. Mascot 2.2.1.
-        """
-        self.logger.debug("In 'search_engine' getter.")
-        return self._search_engine
-
-    @search_engine.setter
-    @enforce_string
-    def search_engine(self, search_engine):
-        """
-        Name of the protein search engine used, e.g. Mascot 2.2.1.
-
-        Args:
-            search_engine (str): Name of the protein search engine.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'search_engine' setter.")
-
-        self._search_engine = search_engine
-
-    @property
-    def xml_generation(self):
-        """
-        str: Software used to generate the PRIDE xml file, e.g. PRIDE Converter
-        Toolsuite 2.0.
-        """
-        self.logger.debug("In 'xml_generation' getter.")
-
-        return self._xml_generation
-
-    @xml_generation.setter
-    @enforce_string
-    def xml_generation(self, xml_generation):
-        """
-        Software used to generate the PRIDE xml file, e.g. PRIDE Converter
-        Toolsuite 2.0.
-
-        Args:
-            xml_generation (str): Software used to generate the PRIDE xml file.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'xml_generation' setter.")
-
-        self._xml_generation = xml_generation
-
-    @property
-    def modification(self):
-        """
-        list: An array of ontology strings describing protein modifications.
-        PSI-MOD and Unimod CV terms are allowed.
-        """
-        self.logger.debug("In 'modification' getter.")
-
-        return self._modification
-
-    @modification.setter
-    @enforce_list
-    def modification(self, modification):
-        """
-        list: An array of ontology strings describing protein modifications.
-        PSI-MOD and Unimod CV terms are allowed.
-
-        Args:
-            modification (list): An array of ontology strings describing protein modifications.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'modification' setter.")
-
-        self._modification = modification
-
     @property
     def raw_url(self):
         """
@@ -705,84 +166,6 @@ class Proteome(Base):
 
         return self._other_url
 
-    @property
-    def local_raw_file(self):
-        """
-        str: Local path where the raw file is located.
-        """
-        self.logger.debug("In 'local_raw_file' getter.")
-
-        return self._local_raw_file
-
-    @local_raw_file.setter
-    @enforce_string
-    def local_raw_file(self, local_raw_file):
-        """
-        Local file where raw data is located. This data will be
-        uploaded via Aspera when the node is saved.
-
-        Args:
-            local_raw_file (str):  Local file containing the raw data.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_raw_file' setter.")
-
-        self._local_raw_file = local_raw_file
-
-    @property
-    def local_result_file(self):
-        """
-        str: Local path where the result file is located.
-        """
-        self.logger.debug("In 'local_result_file' getter.")
-
-        return self._local_result_file
-
-    @local_result_file.setter
-    @enforce_string
-    def local_result_file(self, local_result_file):
-        """
-        Local file where result data is located. This data will be
-        uploaded via Aspera when the node is saved.
-
-        Args:
-            local_result_file (str):  Local file containing the result data.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_result_file' setter.")
-
-        self._local_result_file = local_result_file
-
-    @property
-    def local_other_file(self):
-        """
-        str: Local path where the other file is located.
-        """
-        self.logger.debug("In 'local_other_file' getter.")
-
-        return self._local_other_file
-
-    @local_other_file.setter
-    @enforce_string
-    def local_other_file(self, local_other_file):
-        """
-        Local file where other data is located. This data will be
-        uploaded via Aspera when the node is saved.
-
-        Args:
-            local_other_file (str):  Local file containing the other data.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_other_file' setter.")
-
-        self._local_other_file = local_other_file
-
     @property
     def peak_url(self):
         """
@@ -792,33 +175,6 @@ class Proteome(Base):
 
         return self._peak_url
 
-    @property
-    def local_peak_file(self):
-        """
-        str: Local path where the peak file is located.
-        """
-        self.logger.debug("In 'local_peak_file' getter.")
-
-        return self._local_peak_file
-
-    @local_peak_file.setter
-    @enforce_string
-    def local_peak_file(self, local_peak_file):
-        """
-        Local file where peak data is located. This data will
-        be uploaded via Aspera when the node is saved.
-
-        Args:
-            local_peak_file (str):  Local file containing the protein
-            identification data.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_peak_file' setter.")
-
-        self._local_peak_file = local_peak_file
-
     @property
     def result_url(self):
         """
@@ -827,73 +183,14 @@ class Proteome(Base):
         self.logger.debug("In 'result_url' getter.")
         return self._result_url
 
-    @property
-    def study(self):
-        """
-        str: One of the 3 studies that are part of the iHMP.
-        """
-        self.logger.debug("In 'study' getter.")
-
-        return self._study
-
-    @study.setter
-    @enforce_string
-    def study(self, study):
-        """
-        One of the 3 studies that are part of the iHMP.
-
-        Args:
-            study (str): One of the 3 studies that are part of the iHMP.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'study' setter.")
-
-        studies = ["preg_preterm", "ibd", "prediabetes"]
-
-        if study in studies:
-            self._study = study
-        else:
-            raise Exception("Invalid study.")
-
-    @property
-    def subtype(self):
-        """
-        str: The subtype of the proteome.
-        """
-        self.logger.debug("In 'subtype' getter.")
-
-        return self._subtype
-
-    @subtype.setter
-    @enforce_string
-    def subtype(self, subtype):
-        """
-        One of the 3 studies that are part of the iHMP.
-
-        Args:
-            subtype (str): The subtype of the proteome.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'subtype' setter.")
-
-        subtypes = ["host", "microbiome"]
-
-        if subtype in subtypes:
-            self._subtype = subtype
-        else:
-            raise Exception("Invalid subtype.")
-
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
         Returns:
             A list of strings, where each string is the error that the
             validation raised during OSDF validation
@@ -902,7 +199,8 @@ class Proteome(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -918,7 +216,7 @@ class Proteome(Base):
         self.logger.debug("Number of validation problems: %s.", len(problems))
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -926,7 +224,8 @@ class Proteome(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -936,7 +235,8 @@ class Proteome(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, _error_message) = session.get_osdf().validate_node(document)
@@ -964,77 +264,11 @@ class Proteome(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        proteome_doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [Proteome.namespace]
-            },
-            'linkage': self._links,
-            'ns': Proteome.namespace,
-            'node_type': 'proteome',
-            'meta': {
-                'analyzer': self._analyzer,
-                'checksums': self._checksums,
-                'comment': self._comment,
-                'data_processing_protocol': self._data_processing_protocol,
-                'detector': self._detector,
-                'exp_description': self._exp_description,
-                'instrument_name': self._instrument_name,
-                'other_url': self._other_url,
-                'peak_url': self._peak_url,
-                'pride_id': self._pride_id,
-                'processing_method': self._processing_method,
-                'protocol_name': self._protocol_name,
-                'raw_url': self._raw_url,
-                'result_url': self._result_url,
-                'sample_name': self._sample_name,
-                'search_engine': self._search_engine,
-                'short_label': self._short_label,
-                'software': self._software,
-                'source': self._source,
-                'study': self._study,
-                'subtype': self._subtype,
-                'tags': self._tags,
-                'title': self._title
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("Proteome object has the OSDF id set.")
-            proteome_doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("%s object has the OSDF version set.", __name__)
-            proteome_doc['ver'] = self._version
-
-        # Handle Proteome optional properties
-        if self._date is not None:
-            self.logger.debug("Proteome object has the 'date' property set.")
-            proteome_doc['meta']['date'] = self._date
-
-        if self._modification is not None:
-            self.logger.debug("Proteome object has the 'modification' property set.")
-            proteome_doc['meta']['modification'] = self._modification
-
-        if self._other_url is not None:
-            self.logger.debug("%s object has the 'other_url' property set.", __name__)
-            proteome_doc['meta']['other_url'] = self._other_url
-
-        if self._reference is not None:
-            self.logger.debug("%s object has the 'reference' property set.", __name__)
-            proteome_doc['meta']['reference'] = self._reference
-
-        if self._protocol_steps is not None:
-            self.logger.debug("%s object has the 'protocol_steps' property set.", __name__)
-            proteome_doc['meta']['protocol_steps'] = self._protocol_steps
-
-        if self._sample_description is not None:
-            self.logger.debug("%s object has the 'sample_description' property set.", __name__)
-            proteome_doc['meta']['sample_description'] = self._sample_description
-
-        if self._xml_generation is not None:
-            self.logger.debug("%s object has the 'xml_generation' property set.", __name__)
-            proteome_doc['meta']['xml_generation'] = self._xml_generation
+        proteome_doc = super(Proteome, self)._get_raw_doc()
+        proteome_doc['meta']['other_url'] = self._other_url
+        proteome_doc['meta']['peak_url'] = self._peak_url
+        proteome_doc['meta']['raw_url'] = self._raw_url
+        proteome_doc['meta']['result_url'] = self._result_url
 
         return proteome_doc
 
@@ -1056,7 +290,7 @@ class Proteome(Base):
                 "protocol_name", "sample_name", "search_engine", "short_label", "software",
                 "source", "study", "subtype", "title")
 
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object (self) from OSDF. If the object has not been
         previously saved (node ID is not set), then an error message will be
@@ -1064,7 +298,8 @@ class Proteome(Base):
         in the OSDF instance, then the object will be deleted from the OSDF
         instance, and this object must be re-saved in order to use it again.
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
         Returns:
             True upon successful deletion, False otherwise.
         """
@@ -1076,7 +311,8 @@ class Proteome(Base):
 
         proteome_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -1093,7 +329,7 @@ class Proteome(Base):
         return success
 
     @staticmethod
-    def search(query="\"proteome\"[node_type]"):
+    def search(query="\"proteome\"[node_type]", session=None):
         """
         Searches OSDF for Proteome nodes. Any criteria the user wishes to add
         is provided by the user in the query language specifications provided
@@ -1108,6 +344,8 @@ class Proteome(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          Proteome node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of Proteome objects. It returns an empty list if
@@ -1115,7 +353,8 @@ class Proteome(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"proteome"[node_type]':
@@ -1131,12 +370,13 @@ class Proteome(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                proteome_result = Proteome.load_proteome(result)
+                proteome_result = Proteome.load_proteome(result, session=session)
                 result_list.append(proteome_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_proteome(prot_data):
         """
         Takes the provided JSON string and converts it to a Proteome object
@@ -1152,67 +392,21 @@ class Proteome(Base):
 
         module_logger.debug("Filling in %s details.", __name__)
 
-        # Node required fields
-        prot._set_id(prot_data['id'])
-        prot.links = prot_data['linkage']
-        prot.version = prot_data['ver']
-
-        # Proteome required fields
-        prot.analyzer = prot_data['meta']['analyzer']
-        prot.checksums = prot_data['meta']['checksums']
-        prot.comment = prot_data['meta']['comment']
-        prot.data_processing_protocol = prot_data['meta']['data_processing_protocol']
-        prot.detector = prot_data['meta']['detector']
-        prot.exp_description = prot_data['meta']['exp_description']
-        prot.instrument_name = prot_data['meta']['instrument_name']
-        prot.processing_method = prot_data['meta']['processing_method']
-        prot.pride_id = prot_data['meta']['pride_id']
-        prot.protocol_name = prot_data['meta']['protocol_name']
-        prot.sample_name = prot_data['meta']['sample_name']
-        prot.search_engine = prot_data['meta']['search_engine']
-        prot.short_label = prot_data['meta']['short_label']
-        prot.software = prot_data['meta']['software']
-        prot.source = prot_data['meta']['source']
-        prot.study = prot_data['meta']['study']
-        prot.subtype = prot_data['meta']['subtype']
-        prot.tags = prot_data['meta']['tags']
-        prot.title = prot_data['meta']['title']
+        prot._load_doc(prot_data)
         prot._other_url = prot_data['meta']['other_url']
         prot._peak_url = prot_data['meta']['peak_url']
         prot._raw_url = prot_data['meta']['raw_url']
         prot._result_url = prot_data['meta']['result_url']
 
-        # Handle Proteome optional properties
-        if 'date' in prot_data['meta']:
-            prot.date = prot_data['meta']['date']
-
-        if 'modification' in prot_data['meta']:
-            prot.modification = prot_data['meta']['modification']
-
-        if 'other_url' in prot_data['meta']:
-            prot._other_url = prot_data['meta']['other_url']
-
-        if 'reference' in prot_data['meta']:
-            prot.reference = prot_data['meta']['reference']
-
         if 'private_files' in prot_data['meta']:
             prot.private_files = prot_data['meta']['private_files']
 
-        if 'protocol_steps' in prot_data['meta']:
-            prot.protocol_steps = prot_data['meta']['protocol_steps']
-
-        if 'sample_description' in prot_data['meta']:
-            prot.sample_description = prot_data['meta']['sample_description']
-
-        if 'xml_generation' in prot_data['meta']:
-            prot.xml_generation = prot_data['meta']['xml_generation']
-
         module_logger.debug("Returning loaded %s.", __name__)
 
         return prot
 
     @staticmethod
-    def load(proteome_id):
+    def load(proteome_id, session=None):
         """
         Loads the data for the specified input ID from the OSDF instance to this object.
         If the provided ID does not exist, then an error message is provided stating the
@@ -1220,24 +414,27 @@ class Proteome(Base):
 
         Args:
             proteome_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A Proteome object with all the available OSDF data loaded into it.
         """
         module_logger.debug("In load. Specified ID: %s", proteome_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         proteome_data = session.get_osdf().get_node(proteome_id)
 
         module_logger.info("Creating a template %s.", __name__)
-        proteome = Proteome.load_proteome(proteome_data)
+        proteome = Proteome.load_proteome(proteome_data, session=session)
 
         module_logger.debug("Returning loaded %s.", __name__)
 
         return proteome
 
-    def _upload_files(self, file_map):
+    def _upload_files(self, file_map, session=None):
         self.logger.debug("In _upload_files.")
 
         study2dir = {
@@ -1256,7 +453,8 @@ class Proteome(Base):
         remote_paths = {}
 
         # Get the session so we can get the username and password
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         username = session.username
         password = session.password
 
@@ -1290,7 +488,7 @@ class Proteome(Base):
 
         return remote_paths
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in OSDF. The JSON form of the current data for the
         instance is validated in the save function. If the data is not valid,
@@ -1301,7 +499,8 @@ class Proteome(Base):
         Also, the version is updated as the data is saved in OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -1312,11 +511,12 @@ class Proteome(Base):
         # If node previously saved, use edit_node instead since ID
         # is given (an update in a way)
         # can also use get_node to check if the node already exists
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid.")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
 
         self.logger.info("Got iHMP session.")
 
@@ -1337,7 +537,7 @@ class Proteome(Base):
 
             remote_files = {}
             try:
-                remote_files = self._upload_files(files)
+                remote_files = self._upload_files(files, session=session)
             except Exception as upload_exception:
                 self.logger.exception("Unable to transmit data via Aspera. Reason: %s",
                                       upload_exception)
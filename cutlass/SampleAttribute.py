@@ -6,8 +6,9 @@ Models the sample attribute object.
 import json
 import logging
 from cutlass.iHMPSession import iHMPSession
+from cutlass.identity import identity_mapped
 from cutlass.Base import Base
-from cutlass.Util import enforce_string
+from cutlass.fields import Field
 
 # pylint: disable=W0703, C1801
 
@@ -26,164 +27,26 @@ class SampleAttribute(Base):
     """
     namespace = "hmbr"
 
-    def __init__(self, *args, **kwargs):
-        """
-        Constructor for the SampleAttribute class. This initializes the
-        fields specific to the class, and inherits from the Base class.
-
-        Args:
-            None
-        """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        # Required properties
-        self._fecalcal = None
-        self._study = None
-
-        # Optional properties
-        self._sample_desc = None
-        self._sample_type = None
-        self._subproject = None
-
-        super(SampleAttribute, self).__init__(*args, **kwargs)
-
-    @property
-    def fecalcal(self):
-        """
-        str: FecalCal result.
-        """
-        self.logger.debug("In 'fecalcal' getter.")
-        return self._fecalcal
-
-    @fecalcal.setter
-    @enforce_string
-    def fecalcal(self, fecalcal):
-        """
-        FecalCal result.
-
-        Args:
-            fecalcal (str): FecalCal result.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'fecalcal' setter.")
-
-        self._fecalcal = fecalcal
-
-    @property
-    def sample_desc(self):
-        """
-        str: Optional sample description property to indicate sample source/omic type.
-        """
-        self.logger.debug("In 'sample_desc' getter.")
-        return self._sample_desc
-
-    @sample_desc.setter
-    @enforce_string
-    def sample_desc(self, sample_desc):
-        """
-        Optional sample description to indicate sample source/omic type.
-
-        Args:
-            sample_desc (str): The sample description.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sample_desc' setter.")
-
-        self._sample_desc = sample_desc
-
-    @property
-    def sample_type(self):
-        """
-        str: Optional sample type property.
-        """
-        self.logger.debug("In 'sample_type' getter.")
-        return self._sample_type
-
-    @sample_type.setter
-    @enforce_string
-    def sample_type(self, sample_type):
-        """
-        The sample type.
+    fecalcal = Field(str, "FecalCal result.", required=True)
+    sample_desc = Field(str, "Optional sample description property to "
+                        "indicate sample source/omic type.")
+    sample_type = Field(str, "Optional sample type property.")
+    study = Field(str, "One of the 3 studies that are part of the iHMP.",
+                  required=True)
+    subproject = Field(
+        str, "Optional subproject the sample belongs to, currently limited to "
+        "VCU but controlled vocabulary could be expanded to include more "
+        "projects.")
 
-        Args:
-            sample_type (str): The sample type.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sample_type' setter.")
-
-        self._sample_type = sample_type
-
-    @property
-    def study(self):
-        """
-        str: One of the 3 studies that are part of the iHMP.
-        """
-        self.logger.debug("In 'study' getter.")
-        return self._study
-
-    @study.setter
-    @enforce_string
-    def study(self, study):
-        """
-        One of the 3 studies that are part of the iHMP.
-
-        Args:
-            study (str): One of the 3 studies that are part of the iHMP.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'study' setter.")
-
-        self._study = study
-
-    @property
-    def subproject(self):
-        """
-        str: Optional subproject the sample belongs to, currently limited to
-        VCU but controlled vocabulary could be expanded to include more
-        projects.
-        """
-        self.logger.debug("In 'subproject' getter.")
-        return self._subproject
-
-    @subproject.setter
-    @enforce_string
-    def subproject(self, subproject):
-        """
-        The sample subproject.
-
-        Args:
-            subproject (str): The subproject that the sample belongs to.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'subproject' setter.")
-
-        self._subproject = subproject
-
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -193,7 +56,8 @@ class SampleAttribute(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -210,7 +74,7 @@ class SampleAttribute(Base):
 
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -218,7 +82,8 @@ class SampleAttribute(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -228,7 +93,8 @@ class SampleAttribute(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, _error_message) = session.get_osdf().validate_node(document)
@@ -256,42 +122,8 @@ class SampleAttribute(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        attrib_doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [SampleAttribute.namespace]
-            },
-            'linkage': self._links,
-            'ns': SampleAttribute.namespace,
-            'node_type': 'sample_attr',
-            'meta': {
-                'fecalcal': self._fecalcal,
-                'study': self._study,
-                'subtype': self._study,
-                'tags': self._tags
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("%s object has the OSDF id set.", __name__)
-            attrib_doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("%s object has the OSDF version set.", __name__)
-            attrib_doc['ver'] = self._version
-
-        # Handle SampleAttribute optional properties
-        if self.sample_desc is not None:
-            self.logger.debug("%s object has the 'sample_desc' property set.", __name__)
-            attrib_doc['meta']['sample_desc'] = self.sample_desc
-
-        if self.sample_type is not None:
-            self.logger.debug("%s object has the 'sample_type' property set.", __name__)
-            attrib_doc['meta']['sample_type'] = self.sample_type
-
-        if self.subproject is not None:
-            self.logger.debug("%s object has the 'subproject' property set.", __name__)
-            attrib_doc['meta']['subproject'] = self.subproject
+        attrib_doc = super(SampleAttribute, self)._get_raw_doc()
+        attrib_doc['meta']['subtype'] = self._study
 
         return attrib_doc
 
@@ -309,7 +141,7 @@ class SampleAttribute(Base):
 
         return ("fecalcal", "study", "tags")
 
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object (self) from OSDF. If the object has not been
         previously saved (node ID is not set), then an error message will be
@@ -318,7 +150,8 @@ class SampleAttribute(Base):
         instance, and this object must be re-saved in order to use it again.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True upon successful deletion, False otherwise.
@@ -331,7 +164,8 @@ class SampleAttribute(Base):
 
         attrib_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -350,7 +184,7 @@ class SampleAttribute(Base):
         return success
 
     @staticmethod
-    def search(query="\"sample_attr\"[node_type]"):
+    def search(query="\"sample_attr\"[node_type]", session=None):
         """
         Searches OSDF for SampleAttribute nodes. Any criteria the user wishes to
         add is provided by the user in the query language specifications
@@ -365,6 +199,8 @@ class SampleAttribute(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          SampleAttribute node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of SampleAttribute objects. It returns an empty
@@ -373,7 +209,8 @@ class SampleAttribute(Base):
         module_logger.debug("In search.")
 
         # Searching without any parameters will return all different results
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"sample_attr"[node_type]':
@@ -389,12 +226,13 @@ class SampleAttribute(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                attrib_result = SampleAttribute.load_sample_attr(result)
+                attrib_result = SampleAttribute.load_sample_attr(result, session=session)
                 result_list.append(attrib_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_sample_attr(attrib_data):
         """
         Takes the provided JSON string and converts it to a
@@ -410,31 +248,14 @@ class SampleAttribute(Base):
         attrib = SampleAttribute()
 
         module_logger.debug("Filling in %s details.", __name__)
-        attrib._set_id(attrib_data['id'])
-        attrib.links = attrib_data['linkage']
-        attrib.version = attrib_data['ver']
-
-        # Required fields
-        attrib.fecalcal = attrib_data['meta']['fecalcal']
-        attrib.study = attrib_data['meta']['study']
-        attrib.tags = attrib_data['meta']['tags']
-
-        # Handle SampleAttribute optional properties
-        if 'sample_desc' in attrib_data['meta']:
-            attrib.sample_desc = attrib_data['meta']['sample_desc']
-
-        if 'sample_type' in attrib_data['meta']:
-            attrib.sample_type = attrib_data['meta']['sample_type']
-
-        if 'subproject' in attrib_data['meta']:
-            attrib.subproject = attrib_data['meta']['subproject']
+        attrib._load_doc(attrib_data)
 
         module_logger.debug("Returning loaded %s.", __name__)
 
         return attrib
 
     @staticmethod
-    def load(attrib_id):
+    def load(attrib_id, session=None):
         """
         Loads the data for the specified ID from the OSDF instance to
         this object. If the provided ID does not exist, then an error message
@@ -442,6 +263,8 @@ class SampleAttribute(Base):
 
         Args:
             attrib_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A SampleAttribute object with all the available OSDF data loaded
@@ -449,15 +272,16 @@ class SampleAttribute(Base):
         """
         module_logger.debug("In load. Specified ID: %s", attrib_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         attrib_data = session.get_osdf().get_node(attrib_id)
-        attrib = SampleAttribute.load_sample_attr(attrib_data)
+        attrib = SampleAttribute.load_sample_attr(attrib_data, session=session)
 
         module_logger.debug("Returning loaded %s.", __name__)
         return attrib
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in OSDF. The JSON form of the current data for the
         instance is validated in the save function. If the data is not valid,
@@ -468,7 +292,8 @@ class SampleAttribute(Base):
         Also, the version is updated as the data is saved in OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -479,11 +304,12 @@ class SampleAttribute(Base):
         # If node previously saved, use edit_node instead since ID
         # is given (an update in a way)
         # can also use get_node to check if the node already exists
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid.")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         osdf = session.get_osdf()
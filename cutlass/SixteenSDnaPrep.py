@@ -3,10 +3,12 @@ Models the 16S DNA prep object.
 """
 
 import logging
-from itertools import count
 from cutlass.iHMPSession import iHMPSession
+from cutlass.identity import identity_mapped
+from cutlass.paging import oql_docs
 from cutlass.mimarks import MIMARKS, MimarksException
-from cutlass.Base import Base
+from cutlass.Base import Base, node_ref
+from cutlass.fields import Field
 from cutlass.SixteenSRawSeqSet import SixteenSRawSeqSet
 from cutlass.Util import *
 
@@ -17,6 +19,63 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+def _check_frag_size(frag_size):
+    """
+    Checks a new SixteenSDnaPrep fragment size. The size must be an
+    integer, and greater than 0.
+
+    Args:
+        frag_size (int): The new fragment size.
+
+    Returns:
+        None
+    """
+    if frag_size < 0:
+        raise ValueError("Invalid frag_size. Must be non-negative.")
+
+def _check_mimarks(mimarks):
+    """
+    Checks a new MIMARKS data. The provided dictionary
+    must validate based on the MIMARKS class.
+
+    Args:
+        mimars (dict): The new MIMARKS dictionary.
+
+    Returns:
+        None
+    """
+    valid_dictionary = MIMARKS.check_dict(mimarks)
+    if not valid_dictionary:
+        raise MimarksException("Invalid MIMARKS data detected.")
+
+def _check_srs_id(srs_id):
+    """
+    Checks a new SixteenSDnaPrep SRS ID. The ID must be a string, and
+    greater than 3 characters long.
+
+    Args:
+        srs_id (str): The new SRS ID.
+
+    Returns:
+        None
+    """
+    if len(srs_id) < 3:
+        raise Exception("SRS ID is too short, must be more than 3 characters.")
+
+def _check_storage_duration(storage_duration):
+    """
+    Checks a new storage duration. The duration must
+    be an integer, and greater than 0.
+
+    Args:
+        storage_duration (int): The new storage duration.
+
+    Returns:
+        None
+    """
+    if storage_duration < 0:
+        raise ValueError("Invalid storage_duration. Must be non-negative.")
+
 class SixteenSDnaPrep(Base):
     """
     The class encapsulating the project data for an iHMP instance.
@@ -28,45 +87,39 @@ class SixteenSDnaPrep(Base):
     """
     namespace = "hmbr"
 
-    def __init__(self, *args, **kwargs):
-        """
-        Constructor for the SixteenSDnaPrep class. This initializes the fields
-        specific to the SixteenSDnaPrep class, and inherits from the Base class.
-
-        Args:
-            None
-        """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        self._comment = None
-        self._frag_size = None
-        self._lib_layout = None
-        self._lib_selection = None
-        self._mimarks = None
-        self._ncbi_taxon_id = None
-        self._prep_id = None
-        self._sequencing_center = None
-        self._sequencing_contact = None
-        self._srs_id = None
-        self._storage_duration = None
-
-        super(SixteenSDnaPrep, self).__init__(*args, **kwargs)
-
-    def validate(self):
+    comment = Field(str, "Free-text comment.", required=True)
+    frag_size = Field(int, "Target library fragment size after shearing.",
+                      check=_check_frag_size)
+    lib_layout = Field(
+        str, "Specification of the layout: fragment/paired, and if paired, "
+        "then nominal insert size and standard deviation.", required=True)
+    lib_selection = Field(
+        str, "A controlled vocabulary of terms describing selection or "
+        "reduction method used in library construction. Terms used by "
+        "TCGA include (random, hybrid selection)", required=True)
+    mimarks = Field(dict, "mimarks: Genomic Standards Consortium MIMARKS "
+                    "fields.", required=True, check=_check_mimarks)
+    ncbi_taxon_id = Field(str, "NCBI taxon id.", required=True)
+    prep_id = Field(str, "Nucleic Acid Prep ID.", required=True)
+    srs_id = Field(str, "NCBI Sequence Read Archive sample ID of the form "
+                   "SRS012345.", check=_check_srs_id)
+    sequencing_center = Field(str, "The center responsible for generating the "
+                              "16S DNA Prep.", required=True)
+    sequencing_contact = Field(str, "Name and email of the primary contact at "
+                               "the sequencing center.", required=True)
+    storage_duration = Field(
+        int, "Duration for which sample was stored in days.", required=True,
+        check=_check_storage_duration)
+
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current schema in
         OSDF for that specific object. All required fields for the object must
         be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -76,7 +129,8 @@ class SixteenSDnaPrep(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -93,7 +147,7 @@ class SixteenSDnaPrep(Base):
         self.logger.debug("Number of validation problems: %s.", len(problems))
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in OSDF for the specific object. However, unlike
@@ -101,7 +155,8 @@ class SixteenSDnaPrep(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of fields in
@@ -111,7 +166,8 @@ class SixteenSDnaPrep(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, _error_message) = session.get_osdf().validate_node(document)
@@ -124,304 +180,6 @@ class SixteenSDnaPrep(Base):
 
         return valid
 
-    @property
-    def comment(self):
-        """
-        str: Free-text comment.
-        """
-        self.logger.debug("In 'comment' getter.")
-
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for the comment. The comment must be a string.
-
-        Args:
-            comment (str): The new comment to add to the string.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'comment' setter.")
-
-        self._comment = comment
-
-    @property
-    def frag_size(self):
-        """
-        int: Target library fragment size after shearing.
-        """
-        self.logger.debug("In 'frag_size' getter.")
-
-        return self._frag_size
-
-    @frag_size.setter
-    @enforce_int
-    def frag_size(self, frag_size):
-        """
-        The setter for the SixteenSDnaPrep fragment size. The size must be an
-        integer, and greater than 0.
-
-        Args:
-            frag_size (int): The new fragment size.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'frag_size' setter.")
-
-        if frag_size < 0:
-            raise ValueError("Invalid frag_size. Must be non-negative.")
-
-        self._frag_size = frag_size
-
-    @property
-    def lib_layout(self):
-        """
-        str: Specification of the layout: fragment/paired, and if paired,
-             then nominal insert size and standard deviation.
-        """
-        self.logger.debug("In 'lib_layout' getter.")
-
-        return self._lib_layout
-
-    @lib_layout.setter
-    @enforce_string
-    def lib_layout(self, lib_layout):
-        """
-        The setter for the SixteenSDnaPrep lib layout.
-
-        Args:
-            lib_layout (str): The new lib layout.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'lib_layout' setter.")
-
-        self._lib_layout = lib_layout
-
-    @property
-    def lib_selection(self):
-        """
-        str: A controlled vocabulary of terms describing selection or reduction
-             method used in library construction. Terms used by TCGA include
-             (random, hybrid selection)
-        """
-        self.logger.debug("In 'lib_selection' getter.")
-
-        return self._lib_selection
-
-    @lib_selection.setter
-    @enforce_string
-    def lib_selection(self, lib_selection):
-        """
-        The setter for the SixteenSDnaPrep lib selection.
-
-        Args:
-            lib_selection (str): The new lib selection.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'lib_selection' setter.")
-
-        self._lib_selection = lib_selection
-
-    @property
-    def mimarks(self):
-        """
-        mimarks: Genomic Standards Consortium MIMARKS fields.
-        """
-        self.logger.debug("In 'mimarks' getter.")
-
-        return self._mimarks
-
-    @mimarks.setter
-    @enforce_dict
-    def mimarks(self, mimarks):
-        """
-        The setter for the MIMARKS data. The provided dictionary
-        must validate based on the MIMARKS class.
-
-        Args:
-            mimars (dict): The new MIMARKS dictionary.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'mimarks' setter.")
-
-        valid_dictionary = MIMARKS.check_dict(mimarks)
-
-        # Validate the incoming MIMARKS data
-        if valid_dictionary:
-            self.logger.debug("MIMARKS data seems correct.")
-            self._mimarks = mimarks
-        else:
-            raise MimarksException("Invalid MIMARKS data detected.")
-
-    @property
-    def ncbi_taxon_id(self):
-        """
-        str: NCBI taxon id.
-        """
-        self.logger.debug("In 'ncbi_taxon_id' getter.")
-
-        return self._ncbi_taxon_id
-
-    @ncbi_taxon_id.setter
-    @enforce_string
-    def ncbi_taxon_id(self, ncbi_taxon_id):
-        """
-        The setter for the NCBI Taxon ID.
-
-        Args:
-            ncbi_taxon_id (str): The new NCBI Taxon ID.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'ncbi_taxon_id' setter.")
-
-        self._ncbi_taxon_id = ncbi_taxon_id
-
-    @property
-    def prep_id(self):
-        """
-        str: Nucleic Acid Prep ID.
-        """
-        self.logger.debug("In 'prep_id' getter.")
-
-        return self._prep_id
-
-    @prep_id.setter
-    @enforce_string
-    def prep_id(self, prep_id):
-        """
-        The setter for the prep ID.
-
-        Args:
-            prep_id (str): The new prep ID.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'prep_id' setter.")
-
-        self._prep_id = prep_id
-
-    @property
-    def srs_id(self):
-        """
-        str: NCBI Sequence Read Archive sample ID of the form SRS012345.
-        """
-        self.logger.debug("In 'srs_id' getter.")
-
-        return self._srs_id
-
-    @srs_id.setter
-    @enforce_string
-    def srs_id(self, srs_id):
-        """
-        The setter for the SixteenSDnaPrep SRS ID. The ID must be a string, and
-        greater than 3 characters long.
-
-        Args:
-            srs_id (str): The new SRS ID.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'srs_id' setter.")
-
-        if len(srs_id) < 3:
-            raise Exception("SRS ID is too short, must be more than 3 characters.")
-
-        self._srs_id = srs_id
-
-    @property
-    def sequencing_center(self):
-        """
-        str: The center responsible for generating the 16S DNA Prep.
-        """
-        self.logger.debug("In 'sequencing_center' getter.")
-
-        return self._sequencing_center
-
-    @sequencing_center.setter
-    @enforce_string
-    def sequencing_center(self, sequencing_center):
-        """
-        The setter for the SixteenSDnaPrep sequencing center.
-
-        Args:
-            sequencing_center (str): The new sequencing center.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sequencing_center' setter.")
-
-        self._sequencing_center = sequencing_center
-
-    @property
-    def sequencing_contact(self):
-        """
-        str: Name and email of the primary contact at the sequencing center.
-        """
-        self.logger.debug("In 'sequencing_contact' getter.")
-
-        return self._sequencing_contact
-
-    @sequencing_contact.setter
-    @enforce_string
-    def sequencing_contact(self, sequencing_contact):
-        """
-        The setter for the SixteenSDnaPrep sequencing_contact.
-
-        Args:
-            sequencing_contact (str): The new sequencing_contact.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sequencing_contact' setter.")
-
-        self._sequencing_contact = sequencing_contact
-
-    @property
-    def storage_duration(self):
-        """
-        int: Duration for which sample was stored in days.
-        """
-        self.logger.debug("In 'storage_duration' getter.")
-
-        return self._storage_duration
-
-    @storage_duration.setter
-    @enforce_int
-    def storage_duration(self, storage_duration):
-        """
-        The setter for the storage duration. The duration must
-        be an integer, and greater than 0.
-
-        Args:
-            storage_duration (int): The new storage duration.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'storage_duration' setter.")
-
-        if storage_duration < 0:
-            raise ValueError("Invalid storage_duration. Must be non-negative.")
-
-        self._storage_duration = storage_duration
-
     @staticmethod
     def required_fields():
         """
@@ -453,49 +211,13 @@ class SixteenSDnaPrep(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        sixteen_s_doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [SixteenSDnaPrep.namespace]
-            },
-            'linkage': self._links,
-            'ns': SixteenSDnaPrep.namespace,
-            'node_type': '16s_dna_prep',
-            'meta': {
-                'comment': self._comment,
-                'lib_layout': self._lib_layout,
-                'lib_selection': self._lib_selection,
-                'mimarks': self._mimarks,
-                'ncbi_taxon_id': self._ncbi_taxon_id,
-                'prep_id': self._prep_id,
-                'sequencing_center': self._sequencing_center,
-                'sequencing_contact': self._sequencing_contact,
-                'storage_duration': self._storage_duration,
-                'subtype': "16s",
-                'tags': self._tags
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("%s object has the OSDF id set.", __name__)
-            sixteen_s_doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("%s object has the OSDF version set.", __name__)
-            sixteen_s_doc['ver'] = self._version
-
-        if self._frag_size is not None:
-            self.logger.debug("%s object has the frag_size set.", __name__)
-            sixteen_s_doc['meta']['frag_size'] = self._frag_size
-
-        if self._srs_id is not None:
-            self.logger.debug("%s object has the srs_id set.", __name__)
-            sixteen_s_doc['meta']['srs_id'] = self._srs_id
+        sixteen_s_doc = super(SixteenSDnaPrep, self)._get_raw_doc()
+        sixteen_s_doc['meta']['subtype'] = "16s"
 
         return sixteen_s_doc
 
     @staticmethod
-    def search(query="\"16s_dna_prep\"[node_type]"):
+    def search(query="\"16s_dna_prep\"[node_type]", session=None):
         """
         Searches the OSDF database through all 16s DNA prep nodes. Any criteria
         the user wishes to add is provided by the user in the query language
@@ -510,6 +232,8 @@ class SixteenSDnaPrep(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          Subject node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of Subject objects. It returns an empty list if
@@ -517,7 +241,8 @@ class SixteenSDnaPrep(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"16s_dna_prep"[node_type]':
@@ -536,12 +261,14 @@ class SixteenSDnaPrep(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                sixteens_dna_prep_result = SixteenSDnaPrep.load_sixteenSDnaPrep(result)
+                sixteens_dna_prep_result = SixteenSDnaPrep.load_sixteenSDnaPrep(
+                    result, session=session)
                 result_list.append(sixteens_dna_prep_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_sixteenSDnaPrep(prep_data):
         """
         Takes the provided JSON string and converts it to a Subject object
@@ -557,36 +284,13 @@ class SixteenSDnaPrep(Base):
 
         module_logger.debug("Filling in %s details.", __name__)
 
-        # The attributes commmon to all iHMP nodes
-        prep._set_id(prep_data['id'])
-        prep.version = prep_data['ver']
-        prep.links = prep_data['linkage']
-
-        # The attributes that are particular to SixteenSDnaPrep documents
-        prep.comment = prep_data['meta']['comment']
-        prep.lib_layout = prep_data['meta']['lib_layout']
-        prep.lib_selection = prep_data['meta']['lib_selection']
-        prep.mimarks = prep_data['meta']['mimarks']
-        prep.ncbi_taxon_id = prep_data['meta']['ncbi_taxon_id']
-        prep.prep_id = prep_data['meta']['prep_id']
-        prep.sequencing_center = prep_data['meta']['sequencing_center']
-        prep.sequencing_contact = prep_data['meta']['sequencing_contact']
-        prep.storage_duration = prep_data['meta']['storage_duration']
-        prep.tags = prep_data['meta']['tags']
-
-        if 'frag_size' in prep_data['meta']:
-            module_logger.info("%s data has 'frag_size' present.", __name__)
-            prep.frag_size = prep_data['meta']['frag_size']
-
-        if 'srs_id' in prep_data['meta']:
-            module_logger.info(__name__ + " data has 'srs_id' present.")
-            prep.srs_id = prep_data['meta']['srs_id']
+        prep._load_doc(prep_data)
 
         module_logger.debug("Returning loaded %s.", __name__)
 
         return prep
 
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object (self) from the OSDF instance. If the object
         has not been saved previously (node ID is not set), then an error message
@@ -595,7 +299,8 @@ class SixteenSDnaPrep(Base):
         OSDF instance, and this object must be re-saved in order to use it again.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True upon successful deletion, False otherwise.
@@ -608,7 +313,8 @@ class SixteenSDnaPrep(Base):
 
         prep_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -625,7 +331,7 @@ class SixteenSDnaPrep(Base):
         return success
 
     @staticmethod
-    def load(prep_id):
+    def load(prep_id, session=None):
         """
         Loads the data for the specified input ID from the OSDF instance to this object.
         If the provided ID does not exist, then an error message is provided stating the
@@ -633,52 +339,27 @@ class SixteenSDnaPrep(Base):
 
         Args:
             prep_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A SixteenSDnaPrep object with all the available OSDF data loaded into it.
         """
         module_logger.debug("In load. Specified ID: %s.", prep_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         prep_data = session.get_osdf().get_node(prep_id)
 
-        module_logger.info("Creating a template %s.", __name__)
-        prep = SixteenSDnaPrep()
-
-        module_logger.debug("Filling in %s details.", __name__)
-
-        # The attributes commmon to all iHMP nodes
-        prep._set_id(prep_data['id'])
-        prep.version = prep_data['ver']
-        prep.links = prep_data['linkage']
-
-        # The attributes that are particular to SixteenSDnaPrep documents
-        prep.comment = prep_data['meta']['comment']
-        prep.lib_layout = prep_data['meta']['lib_layout']
-        prep.lib_selection = prep_data['meta']['lib_selection']
-        prep.mimarks = prep_data['meta']['mimarks']
-        prep.ncbi_taxon_id = prep_data['meta']['ncbi_taxon_id']
-        prep.prep_id = prep_data['meta']['prep_id']
-        prep.sequencing_center = prep_data['meta']['sequencing_center']
-        prep.sequencing_contact = prep_data['meta']['sequencing_contact']
-        prep.storage_duration = prep_data['meta']['storage_duration']
-        prep.tags = prep_data['meta']['tags']
-
-        if 'frag_size' in prep_data['meta']:
-            module_logger.info("%s data has 'frag_size' present.", __name__)
-            prep.frag_size = prep_data['meta']['frag_size']
-
-        if 'srs_id' in prep_data['meta']:
-            module_logger.info("%s data has 'srs_id' present.", __name__)
-            prep.srs_id = prep_data['meta']['srs_id']
+        prep = SixteenSDnaPrep.load_sixteenSDnaPrep(prep_data, session=session)
 
         module_logger.debug("Returning loaded %s.", __name__)
 
         return prep
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in the current instance. The JSON form of the current data
         for the instance is validated in the save function. If the data is not valid,
@@ -689,7 +370,8 @@ class SixteenSDnaPrep(Base):
         version is updated as the data is saved in the OSDF instance.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -697,11 +379,12 @@ class SixteenSDnaPrep(Base):
         """
         self.logger.debug("In save.")
 
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         success = False
@@ -737,22 +420,17 @@ class SixteenSDnaPrep(Base):
 
         return success
 
-
-    def raw_seq_sets(self):
+    def raw_seq_sets(self, ids_only=False, fan_out=None):
         """
         Return iterator of all raw_seq_sets sequenced from this prep.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         linkage_query = '"{}"[linkage.sequenced_from]'.format(self.id)
-        query = iHMPSession.get_session().get_osdf().oql_query
-
-        for page_no in count(1):
-            res = query(SixteenSDnaPrep.namespace, linkage_query, page=page_no)
-            res_count = res['result_count']
-
-            for doc in res['results']:
-                yield SixteenSRawSeqSet.load_16s_raw_seq_set(doc)
-
-            res_count -= len(res['results'])
 
-            if res_count < 1:
-                break
+        for doc in oql_docs(SixteenSDnaPrep.namespace, linkage_query, fan_out=fan_out):
+            yield node_ref(doc) if ids_only else SixteenSRawSeqSet.load_16s_raw_seq_set(doc)
@@ -6,9 +6,11 @@ import json
 import logging
 import os
 import string
-from itertools import count
 from cutlass.iHMPSession import iHMPSession
-from cutlass.Base import Base
+from cutlass.identity import identity_mapped
+from cutlass.paging import oql_docs
+from cutlass.Base import Base, node_ref
+from cutlass.fields import Field
 from cutlass.aspera import aspera
 from cutlass.Util import *
 
@@ -19,6 +21,89 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+def _check_checksums(checksums):
+    """
+    Checks a new SixteenSRawSeqSet checksums.
+
+    Args:
+        checksums (dict): The checksums for the SixteenSRawSeqSet.
+
+    Returns:
+        None
+    """
+    if 'md5' not in checksums:
+        raise ValueError("Checksum data must contain at least the 'md5' value")
+
+def _check_exp_length(exp_length):
+    """
+    Checks a new SixteenSRawSeqSet exp length.
+
+    Args:
+        exp_length (int): The new exp_length for the current instance.
+
+    Returns:
+        None
+    """
+    if exp_length < 0:
+        raise ValueError("The exp_length must be non-negative.")
+
+def _check_format(format_str):
+    """
+    Checks a new SixteenSRawSeqSet format. This must be either fasta or fastq.
+
+    Args:
+        format_str (str): The new format string for the current object.
+
+    Returns:
+        None
+    """
+    formats = ["fasta", "fastq"]
+    if format_str not in formats:
+        raise Exception("Format must be either 'fasta' or 'fastq'.")
+
+def _check_sequence_type(sequence_type):
+    """
+    Checks a new SixteenSRawSeqSet sequence type. This must be either
+    peptide or nucleotide.
+
+    Args:
+        sequence_type (str): The new sequence type.
+
+    Returns:
+        None
+    """
+    types = ["peptide", "nucleotide"]
+    if sequence_type not in types:
+        raise Exception("Sequence type must be either peptide or nucleotide")
+
+def _check_size(size):
+    """
+    Checks a new SixteenSRawSeqSet size in bytes.
+
+    Args:
+        size (int): The size of the sequence set in bytes.
+
+    Returns:
+        None
+    """
+    if size < 0:
+        raise ValueError("The size must be non-negative.")
+
+def _check_study(study):
+    """
+    Checks a new SixteenSRawSeqSet study. This is restricted to one
+    of preg_preterm, ibd, or prediabetes.
+
+    Args:
+        study (str): The study of the seq set.
+
+    Returns:
+        None
+    """
+    studies = ["preg_preterm", "ibd", "prediabetes", "risk", "jl_crohns", "herfarth_ccfa", "mucosal_ibd", "protect"]
+    if study not in studies:
+        raise Exception("Not a valid study")
+
 class SixteenSRawSeqSet(Base):
     """
     The class encapsulates the SixteenSRawSeqSet data for the iHMP project.
@@ -32,6 +117,32 @@ class SixteenSRawSeqSet(Base):
 
     aspera_server = "aspera.microbiome-bioactives.org"
 
+    __slots__ = ("_urls",)
+
+    checksums = Field(dict, "One or more checksums used to ensure file "
+                      "integrity.", required=True, check=_check_checksums)
+    comment = Field(str, "Free-text comment.", required=True)
+    exp_length = Field(
+        int, "The number of raw bases or color space calls expected for the "
+        "read, includes both mate pairs and all technical portions.",
+        required=True, check=_check_exp_length)
+    format = Field(str, "The file format of the sequence file.", required=True,
+                   check=_check_format)
+    format_doc = Field(str, "URL for documentation of file format.",
+                       required=True)
+    local_file = Field(str, "The path to the local file to upload to the iHMP "
+                       "DCC.", meta=False)
+    private_files = Field(
+        bool, "Whether this object describes private data that should not be "
+        "uploaded to the DCC. Defaults to false.")
+    seq_model = Field(str, "Sequencing instrument model.", required=True)
+    sequence_type = Field(str, "Specifies whether the file contains peptide "
+                          "or nucleotide data.", check=_check_sequence_type)
+    size = Field(int, "The size of the file in bytes.", required=True,
+                 check=_check_size)
+    study = Field(str, "One of the 3 studies that are part of the iHMP.",
+                  required=True, check=_check_study)
+
     def __init__(self, *args, **kwargs):
         """
         Constructor for the SixteenSRawSeqSet class. This initializes the fields
@@ -40,40 +151,17 @@ class SixteenSRawSeqSet(Base):
         Args:
             None
         """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        # These are common to all objects
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        # These are particular to SixteenSRawSeqSet objects
-        self._checksums = None
-        self._comment = None
-        self._exp_length = None
-        self._format = None
-        self._format_doc = None
-        self._local_file = None
-        self._seq_model = None
-        self._sequence_type = None
-        self._size = None
-        self._study = None
         self._urls = ['']
 
-        # Optional properties
-        self._private_files = None
-
         super(SixteenSRawSeqSet, self).__init__(*args, **kwargs)
 
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data against the schema in the OSDF instance.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is a validation error that the
@@ -83,7 +171,8 @@ class SixteenSRawSeqSet(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -110,7 +199,7 @@ class SixteenSRawSeqSet(Base):
 
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -118,7 +207,8 @@ class SixteenSRawSeqSet(Base):
         it simply returns whether the data is valid or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -126,7 +216,7 @@ class SixteenSRawSeqSet(Base):
         """
         self.logger.debug("In is_valid.")
 
-        problems = self.validate()
+        problems = self.validate(session=session)
 
         valid = True
         if len(problems):
@@ -137,306 +227,6 @@ class SixteenSRawSeqSet(Base):
 
         return valid
 
-    @property
-    def checksums(self):
-        """
-        str: One or more checksums used to ensure file integrity.
-        """
-        self.logger.debug("In 'checksums' getter.")
-
-        return self._checksums
-
-    @checksums.setter
-    @enforce_dict
-    def checksums(self, checksums):
-        """
-        The setter for the SixteenSRawSeqSet checksums.
-
-        Args:
-            checksums (dict): The checksums for the SixteenSRawSeqSet.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'checksums' setter.")
-
-        if 'md5' not in checksums:
-            raise ValueError("Checksum data must contain at least the 'md5' value")
-
-        self._checksums = checksums
-
-    @property
-    def comment(self):
-        """
-        str: Free-text comment.
-        """
-        self.logger.debug("In 'comment' getter.")
-
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for the SixteenSRawSeqSet comment. The comment must be a string.
-
-        Args:
-            comment (str): The new comment to add to the string.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'comment' setter.")
-
-        self._comment = comment
-
-    @property
-    def exp_length(self):
-        """
-        int: The number of raw bases or color space calls expected for the read,
-        includes both mate pairs and all technical portions.
-        """
-        self.logger.debug("In 'exp_length' getter.")
-
-        return self._exp_length
-
-    @exp_length.setter
-    @enforce_int
-    def exp_length(self, exp_length):
-        """
-        The setter for the SixteenSRawSeqSet exp length.
-
-        Args:
-            exp_length (int): The new exp_length for the current instance.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'exp_length' setter.")
-        if exp_length < 0:
-            raise ValueError("The exp_length must be non-negative.")
-
-        self._exp_length = exp_length
-
-    @property
-    def format(self):
-        """
-        str: The file format of the sequence file.
-        """
-        self.logger.debug("In 'format' getter.")
-
-        return self._format
-
-    @format.setter
-    @enforce_string
-    def format(self, format_str):
-        """
-        The setter for the SixteenSRawSeqSet format. This must be either fasta or fastq.
-
-        Args:
-            format_str (str): The new format string for the current object.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format' setter.")
-
-        formats = ["fasta", "fastq"]
-        if format_str in formats:
-            self._format = format_str
-        else:
-            raise Exception("Format must be either 'fasta' or 'fastq'.")
-
-    @property
-    def format_doc(self):
-        """
-        str: URL for documentation of file format.
-        """
-        self.logger.debug("In 'format_doc' getter.")
-
-        return self._format_doc
-
-    @format_doc.setter
-    @enforce_string
-    def format_doc(self, format_doc):
-        """
-        The setter for the SixteenSRawSeqSet format doc.
-
-        Args:
-            format_doc (str): The new format_doc for the current object.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format_doc' setter.")
-
-        self._format_doc = format_doc
-
-    @property
-    def local_file(self):
-        """
-        str: The path to the local file to upload to the iHMP DCC.
-        """
-        self.logger.debug("In 'local_file' getter.")
-
-        return self._local_file
-
-    @local_file.setter
-    @enforce_string
-    def local_file(self, local_file):
-        """
-        The setter for the SixteenSRawSeqSet local file.
-
-        Args:
-            local_file (str): The URL to the local file that should be uploaded to the
-                              server.
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_file' setter.")
-
-        self._local_file = local_file
-
-    @property
-    def private_files(self):
-        """
-        bool: Whether this object describes private data that should not
-        be uploaded to the DCC. Defaults to false.
-        """
-        self.logger.debug("In 'private_files' getter.")
-
-        return self._private_files
-
-    @private_files.setter
-    @enforce_bool
-    def private_files(self, private_files):
-        """
-        The setter for the private files flag to denote this object
-        describes data that should not be uploaded to the DCC.
-
-        Args:
-            private_files (bool):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'private_files' setter.")
-
-        self._private_files = private_files
-
-    @property
-    def seq_model(self):
-        """
-        str: Sequencing instrument model.
-        """
-        self.logger.debug("In 'seq_model' getter.")
-
-        return self._seq_model
-
-    @seq_model.setter
-    @enforce_string
-    def seq_model(self, seq_model):
-        """
-        The setter for the SixteenSRawSeqSet seq model.
-
-        Args:
-            seq_model (str): The new seq model.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'seq_model' setter.")
-
-        self._seq_model = seq_model
-
-    @property
-    def sequence_type(self):
-        """
-        str: Specifies whether the file contains peptide or nucleotide data.
-        """
-        self.logger.debug("In 'sequence_type' getter.")
-
-        return self._sequence_type
-
-    @sequence_type.setter
-    @enforce_string
-    def sequence_type(self, sequence_type):
-        """
-        The setter for the SixteenSRawSeqSet sequence type. This must be either
-        peptide or nucleotide.
-
-        Args:
-            sequence_type (str): The new sequence type.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sequence_type' setter.")
-
-        types = ["peptide", "nucleotide"]
-        if sequence_type in types:
-            self._sequence_type = sequence_type
-        else:
-            raise Exception("Sequence type must be either peptide or nucleotide")
-
-    @property
-    def size(self):
-        """
-        int: The size of the file in bytes.
-        """
-        self.logger.debug("In 'size' getter.")
-
-        return self._size
-
-    @size.setter
-    @enforce_int
-    def size(self, size):
-        """
-        The setter for the SixteenSRawSeqSet size in bytes.
-
-        Args:
-            size (int): The size of the sequence set in bytes.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'size' setter.")
-        if size < 0:
-            raise ValueError("The size must be non-negative.")
-
-        self._size = size
-
-    @property
-    def study(self):
-        """
-        str: One of the 3 studies that are part of the iHMP.
-        """
-        self.logger.debug("In 'study' getter.")
-
-        return self._study
-
-    @study.setter
-    @enforce_string
-    def study(self, study):
-        """
-        The setter for the SixteenSRawSeqSet study. This is restricted to one
-        of preg_preterm, ibd, or prediabetes.
-
-        Args:
-            study (str): The study of the seq set.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'study' setter.")
-
-        studies = ["preg_preterm", "ibd", "prediabetes", "risk", "jl_crohns", "herfarth_ccfa", "mucosal_ibd", "protect"]
-
-        if study in studies:
-            self._study = study
-        else:
-            raise Exception("Not a valid study")
-
     @property
     def urls(self):
         """
@@ -478,50 +268,14 @@ class SixteenSRawSeqSet(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [SixteenSRawSeqSet.namespace]
-            },
-            'linkage': self._links,
-            'ns': SixteenSRawSeqSet.namespace,
-            'node_type': '16s_raw_seq_set',
-            'meta': {
-                "checksums": self._checksums,
-                "comment": self._comment,
-                "exp_length": self._exp_length,
-                "format": self._format,
-                "format_doc": self._format_doc,
-                "seq_model": self.seq_model,
-                "size": self._size,
-                "study": self._study,
-                'subtype':'16s',
-                "urls": self._urls,
-                'tags': self._tags
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug(__name__ + " object has the OSDF id set.")
-            doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug(__name__ + " object has the OSDF version set.")
-            doc['ver'] = self._version
-
-        # Handle optional properties
-        if self._sequence_type is not None:
-            self.logger.debug("Object has the 'sequence_type' set.")
-            doc['meta']['sequence_type'] = self._sequence_type
-
-        if self._private_files is not None:
-            self.logger.debug("Object has the 'private_files' set.")
-            doc['meta']['private_files'] = self._private_files
+        doc = super(SixteenSRawSeqSet, self)._get_raw_doc()
+        doc['meta']['subtype'] = '16s'
+        doc['meta']['urls'] = self._urls
 
         return doc
 
     @staticmethod
-    def search(query="\"16s_raw_seq_set\"[node_type]"):
+    def search(query="\"16s_raw_seq_set\"[node_type]", session=None):
         """
         Searches the OSDF database through all SixteenSRawSeqSet node types.
         Any criteria the user wishes to add is provided by the user in the
@@ -536,6 +290,8 @@ class SixteenSRawSeqSet(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          SixteenSRawSeqSet node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of SixteenSRawSeqSet objects. It returns an empty
@@ -543,7 +299,8 @@ class SixteenSRawSeqSet(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != "\"16s_raw_seq_set\"[node_type]":
@@ -559,13 +316,13 @@ class SixteenSRawSeqSet(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                seq_set_result = SixteenSRawSeqSet.load_16s_raw_seq_set(result)
+                seq_set_result = SixteenSRawSeqSet.load_16s_raw_seq_set(
+                    result, session=session)
                 result_list.append(seq_set_result)
 
         return result_list
 
-
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object (self) from the OSDF instance. If the object
         has not been saved previously (node ID is not set), then an error message
@@ -574,7 +331,8 @@ class SixteenSRawSeqSet(Base):
         OSDF instance, and this object must be re-saved in order to use it again.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True upon successful deletion, False otherwise.
@@ -587,7 +345,8 @@ class SixteenSRawSeqSet(Base):
 
         prep_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -604,6 +363,7 @@ class SixteenSRawSeqSet(Base):
         return success
 
     @staticmethod
+    @identity_mapped
     def load_16s_raw_seq_set(seq_set_data):
         """
         Takes the provided JSON string and converts it to a SixteenSRawSeqSet
@@ -620,35 +380,14 @@ class SixteenSRawSeqSet(Base):
 
         module_logger.debug("Filling in %s details.", __name__)
 
-        # The attributes commmon to all iHMP nodes
-        seq_set._set_id(seq_set_data['id'])
-        seq_set.version = seq_set_data['ver']
-        seq_set.links = seq_set_data['linkage']
-
-        # The attributes that are required
-        seq_set.checksums = seq_set_data['meta']['checksums']
-        seq_set.comment = seq_set_data['meta']['comment']
-        seq_set.exp_length = seq_set_data['meta']['exp_length']
-        seq_set.format = seq_set_data['meta']['format']
-        seq_set.format_doc = seq_set_data['meta']['format_doc']
-        seq_set.seq_model = seq_set_data['meta']['seq_model']
-        seq_set.size = seq_set_data['meta']['size']
-        seq_set.tags = seq_set_data['meta']['tags']
-        seq_set.study = seq_set_data['meta']['study']
+        seq_set._load_doc(seq_set_data)
         seq_set._urls = seq_set_data['meta']['urls']
 
-        # Optional fields.
-        if 'sequence_type' in seq_set_data['meta']:
-            seq_set.sequence_type = seq_set_data['meta']['sequence_type']
-
-        if 'private_files' in seq_set_data['meta']:
-            seq_set.private_files = seq_set_data['meta']['private_files']
-
         module_logger.debug("Returning loaded %s", __name__)
         return seq_set
 
     @staticmethod
-    def load(seq_set_id):
+    def load(seq_set_id, session=None):
         """
         Loads the data for the specified ID from OSDF instance.  If the
         provided ID does not exist, then an error message is provided stating
@@ -656,6 +395,8 @@ class SixteenSRawSeqSet(Base):
 
         Args:
             seq_set_id (str): The OSDF ID for the SixteenSRawSeqSet to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A SixteenSRawSeqSet object with all the available OSDF data loaded
@@ -663,19 +404,21 @@ class SixteenSRawSeqSet(Base):
         """
         module_logger.debug("In load. Specified ID: %s", seq_set_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         seq_set_data = session.get_osdf().get_node(seq_set_id)
-        seq_set = SixteenSRawSeqSet.load_16s_raw_seq_set(seq_set_data)
+        seq_set = SixteenSRawSeqSet.load_16s_raw_seq_set(seq_set_data, session=session)
 
         module_logger.debug("Returning loaded %s", __name__)
 
         return seq_set
 
-    def _upload_data(self):
+    def _upload_data(self, session=None):
         self.logger.debug("In _upload_data.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
 
         study = self._study
 
@@ -719,7 +462,7 @@ class SixteenSRawSeqSet(Base):
         else:
             self._urls = ["fasp://" + SixteenSRawSeqSet.aspera_server + remote_path]
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in OSDF. The JSON form of the current data for the
         instance is validated in the save function. If the data is not valid,
@@ -730,18 +473,20 @@ class SixteenSRawSeqSet(Base):
         OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
         """
         self.logger.debug("In save.")
 
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         success = False
@@ -750,7 +495,7 @@ class SixteenSRawSeqSet(Base):
             self._urls = ["<private>"]
         else:
             try:
-                self._upload_data()
+                self._upload_data(session=session)
             except Exception as upload_exception:
                 self.logger.exception(upload_exception)
                 # Don't bother continuing...
@@ -809,26 +554,24 @@ class SixteenSRawSeqSet(Base):
         self.logger.debug("Returning " + str(success))
         return success
 
-    def trimmed_seq_sets(self):
+    def trimmed_seq_sets(self, ids_only=False, fan_out=None):
         """
         Return iterator of all trimmed sequence sets that were computed from
         this sequence set.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         self.logger.debug("In trimmed_seq_sets().")
 
         linkage_query = '"{}"[linkage.computed_from]'.format(self.id)
-        query = iHMPSession.get_session().get_osdf().oql_query
-
         from cutlass.SixteenSTrimmedSeqSet import SixteenSTrimmedSeqSet
 
-        for page_no in count(1):
-            res = query(SixteenSRawSeqSet.namespace, linkage_query, page=page_no)
-            res_count = res['result_count']
-
-            for doc in res['results']:
+        for doc in oql_docs(SixteenSRawSeqSet.namespace, linkage_query, fan_out=fan_out):
+            if ids_only:
+                yield node_ref(doc)
+            else:
                 yield SixteenSTrimmedSeqSet.load_sixteenSTrimmedSeqSet(doc)
-
-            res_count -= len(res['results'])
-
-            if res_count < 1:
-                break
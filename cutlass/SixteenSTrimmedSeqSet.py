@@ -6,9 +6,11 @@ import json
 import logging
 import os
 import string
-from itertools import count
 from cutlass.iHMPSession import iHMPSession
-from cutlass.Base import Base
+from cutlass.identity import identity_mapped
+from cutlass.paging import oql_docs
+from cutlass.Base import Base, node_ref
+from cutlass.fields import Field
 from cutlass.aspera import aspera
 from cutlass.Util import *
 
@@ -19,302 +21,122 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
-class SixteenSTrimmedSeqSet(Base):
+def _check_checksums(checksums):
     """
-    The class encapsulating the 16S Trimmed Sequence set data for an iHMP instance.
-    This class contains all the fields required to save a 16S Trimmed sequence set
-    object in the OSDF instance.
-
-    Attributes:
-        namespace (str): The namespace this class will use in the OSDF instance
-    """
-    namespace = "hmbr"
-
-    aspera_server = "aspera.microbiome-bioactives.org"
-
-    def __init__(self, *args, **kwargs):
-        """
-        Constructor for the SixteenSTrimmedSeqSet class. This initializes the
-        fields specific to the class, and inherits from the Base class.
-
-        Args:
-            None
-        """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        # These are common to all objects
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        # Required properties
-        self._checksums = None
-        self._comment = None
-        self._format = None
-        self._format_doc = None
-        self._size = None
-        self._study = None
-        self._urls = ['']
+    Checks a new SixteenSTrimmedSeqSet checksums.
 
-        # Optional properties
-        self._local_file = None
-        self._private_files = None
-        self._sequence_type = None
-
-        super(SixteenSTrimmedSeqSet, self).__init__(*args, **kwargs)
-
-    @property
-    def checksums(self):
-        """
-        str: One or more checksums used to ensure file integrity.
-        """
-        self.logger.debug("In 'checksums' getter.")
-
-        return self._checksums
-
-    @checksums.setter
-    @enforce_dict
-    def checksums(self, checksums):
-        """
-        The setter for the SixteenSTrimmedSeqSet checksums.
-
-        Args:
-            checksums (dict): The checksums for the SixteenSTrimmedSeqSet.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In checksums setter.")
-
-        if 'md5' not in checksums:
-            raise ValueError("Checksum data must contain at least the 'md5' value")
-
-        self._checksums = checksums
-
-    @property
-    def comment(self):
-        """
-        str: Free-text comment.
-        """
-        self.logger.debug("In 'comment' getter.")
+    Args:
+        checksums (dict): The checksums for the SixteenSTrimmedSeqSet.
 
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for the SixteenSTrimmedSeqSet comment. The comment must be a
-        string, and less than 512 characters.
-
-        Args:
-            comment (str): The new comment to add to the string.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'comment' setter.")
-
-        self._comment = comment
-
-    @property
-    def format(self):
-        """
-        str: The file format of the sequence file.
-        """
-        self.logger.debug("In 'format' getter.")
-
-        return self._format
-
-    @format.setter
-    @enforce_string
-    def format(self, format_str):
-        """
-        The setter for the SixteenSTrimmedSeqSet format. This must be either
-        fasta or fastq.
-
-        Args:
-            format_str (str): The new format string for the current object.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format' setter.")
-
-        formats = ["fasta", "fastq"]
-        if format_str in formats:
-            self._format = format_str
-        else:
-            raise Exception("Format must be one of 'fasta' or 'fastq'.")
-
-    @property
-    def format_doc(self):
-        """
-        str: URL for documentation of file format.
-        """
-        self.logger.debug("In 'format_doc' getter.")
-
-        return self._format_doc
-
-    @format_doc.setter
-    @enforce_string
-    def format_doc(self, format_doc):
-        """
-        The setter for the SixteenSTrimmedSeqSet format doc.
-
-        Args:
-            format_doc (str): The new format_doc for the current object.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format_doc' setter.")
-
-        self._format_doc = format_doc
-
-    @property
-    def local_file(self):
-        """
-        str: Path to the local file to upload to the server.
-        """
-        self.logger.debug("In 'local_file' getter.")
-
-        return self._local_file
-
-    @local_file.setter
-    @enforce_string
-    def local_file(self, local_file):
-        """
-        The setter for the SixteenSTrimmedSeqSet local file.
-
-        Args:
-            local_file (str): The path to the local file that should be uploaded
-            to the server.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_file' setter.")
-
-        self._local_file = local_file
-
-    @property
-    def private_files(self):
-        """
-        bool: Whether this object describes private data that should not
-        be uploaded to the DCC. Defaults to false.
-        """
-        self.logger.debug("In 'private_files' getter.")
-
-        return self._private_files
-
-    @private_files.setter
-    @enforce_bool
-    def private_files(self, private_files):
-        """
-        The setter for the private files flag to denote this object
-        describes data that should not be uploaded to the DCC.
-
-        Args:
-            private_files (bool):
+    Returns:
+        None
+    """
+    if 'md5' not in checksums:
+        raise ValueError("Checksum data must contain at least the 'md5' value")
 
-        Returns:
-            None
-        """
-        self.logger.debug("In 'private_files' setter.")
+def _check_format(format_str):
+    """
+    Checks a new SixteenSTrimmedSeqSet format. This must be either
+    fasta or fastq.
 
-        self._private_files = private_files
+    Args:
+        format_str (str): The new format string for the current object.
 
-    @property
-    def sequence_type(self):
-        """
-        str: Specifies whether the file contains peptide or nucleotide data.
-        """
-        self.logger.debug("In 'sequence_type' getter.")
+    Returns:
+        None
+    """
+    formats = ["fasta", "fastq"]
+    if format_str not in formats:
+        raise Exception("Format must be one of 'fasta' or 'fastq'.")
 
-        return self._sequence_type
+def _check_sequence_type(sequence_type):
+    """
+    Checks a new SixteenSTrimmedSeqSet sequence type. This must be
+    either peptide or nucleotide.
 
-    @sequence_type.setter
-    @enforce_string
-    def sequence_type(self, sequence_type):
-        """
-        The setter for the SixteenSTrimmedSeqSet sequence type. This must be
-        either peptide or nucleotide.
+    Args:
+        sequence_type (str): The new sequence type.
 
-        Args:
-            sequence_type (str): The new sequence type.
+    Returns:
+        None
+    """
+    types = ["peptide", "nucleotide"]
+    if sequence_type not in types:
+        raise Exception("Sequence type must be either peptide or nucleotide")
 
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sequence_type' setter.")
+def _check_size(size):
+    """
+    Checks a new SixteenSTrimmedSeqSet size in bytes.
 
-        types = ["peptide", "nucleotide"]
-        if sequence_type in types:
-            self._sequence_type = sequence_type
-        else:
-            raise Exception("Sequence type must be either peptide or nucleotide")
+    Args:
+        size (int): The size of the seq set.
 
-    @property
-    def size(self):
-        """
-        int: The size of the file in bytes.
-        """
-        self.logger.debug("In 'size' getter.")
+    Returns:
+        None
+    """
+    if size <= 0:
+        raise ValueError("The size must be a non-negative integer.")
 
-        return self._size
+def _check_study(study):
+    """
+    Checks a new SixteenSTrimmedSeqSet study. This is restricted to
+    be either preg_preterm, ibd, or prediabetes.
 
-    @size.setter
-    @enforce_int
-    def size(self, size):
-        """
-        The setter for the SixteenSTrimmedSeqSet size in bytes.
+    Args:
+        study (str): The study of the seq set.
 
-        Args:
-            size (int): The size of the seq set.
+    Returns:
+        None
+    """
+    studies = ["preg_preterm", "ibd", "prediabetes", "risk", "protect", "mucosal_ibd", "herfarth_ccfa", "jl_crohns"]
+    if study not in studies:
+        raise Exception("Not a valid study")
 
-        Returns:
-            None
-        """
-        self.logger.debug("In 'size' setter.")
-        if size <= 0:
-            raise ValueError("The size must be a non-negative integer.")
+class SixteenSTrimmedSeqSet(Base):
+    """
+    The class encapsulating the 16S Trimmed Sequence set data for an iHMP instance.
+    This class contains all the fields required to save a 16S Trimmed sequence set
+    object in the OSDF instance.
 
-        self._size = size
+    Attributes:
+        namespace (str): The namespace this class will use in the OSDF instance
+    """
+    namespace = "hmbr"
 
-    @property
-    def study(self):
-        """
-        str: One of the 3 studies that are part of the iHMP.
-        """
-        self.logger.debug("In 'study' getter.")
+    aspera_server = "aspera.microbiome-bioactives.org"
 
-        return self._study
+    __slots__ = ("_urls",)
+
+    checksums = Field(dict, "One or more checksums used to ensure file "
+                      "integrity.", required=True, check=_check_checksums)
+    comment = Field(str, "Free-text comment.", required=True)
+    format = Field(str, "The file format of the sequence file.", required=True,
+                   check=_check_format)
+    format_doc = Field(str, "URL for documentation of file format.",
+                       required=True)
+    local_file = Field(str, "Path to the local file to upload to the server.",
+                       meta=False)
+    private_files = Field(
+        bool, "Whether this object describes private data that should not be "
+        "uploaded to the DCC. Defaults to false.")
+    sequence_type = Field(str, "Specifies whether the file contains peptide "
+                          "or nucleotide data.", check=_check_sequence_type)
+    size = Field(int, "The size of the file in bytes.", required=True,
+                 check=_check_size)
+    study = Field(str, "One of the 3 studies that are part of the iHMP.",
+                  required=True, check=_check_study, strict=False)
 
-    @study.setter
-    @enforce_string
-    def study(self, study):
+    def __init__(self, *args, **kwargs):
         """
-        The setter for the SixteenSTrimmedSeqSet study. This is restricted to
-        be either preg_preterm, ibd, or prediabetes.
+        Constructor for the SixteenSTrimmedSeqSet class. This initializes the
+        fields specific to the class, and inherits from the Base class.
 
         Args:
-            study (str): The study of the seq set.
-
-        Returns:
             None
         """
-        self.logger.debug("In 'study' setter.")
-
-        studies = ["preg_preterm", "ibd", "prediabetes", "risk", "protect", "mucosal_ibd", "herfarth_ccfa", "jl_crohns"]
+        self._urls = ['']
 
-        if study in studies:
-            self._study = study
-        else:
-            raise Exception("Not a valid study")
+        super(SixteenSTrimmedSeqSet, self).__init__(*args, **kwargs)
 
     @property
     def urls(self):
@@ -326,14 +148,15 @@ class SixteenSTrimmedSeqSet(Base):
 
         return self._urls
 
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -343,7 +166,8 @@ class SixteenSTrimmedSeqSet(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -370,7 +194,7 @@ class SixteenSTrimmedSeqSet(Base):
 
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -378,7 +202,8 @@ class SixteenSTrimmedSeqSet(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -386,7 +211,7 @@ class SixteenSTrimmedSeqSet(Base):
         """
         self.logger.debug("In is_valid.")
 
-        problems = self.validate()
+        problems = self.validate(session=session)
 
         valid = True
 
@@ -428,48 +253,14 @@ class SixteenSTrimmedSeqSet(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [SixteenSTrimmedSeqSet.namespace]
-            },
-            'linkage': self._links,
-            'ns': SixteenSTrimmedSeqSet.namespace,
-            'node_type': '16s_trimmed_seq_set',
-            'meta': {
-                "checksums": self._checksums,
-                "comment": self._comment,
-                "format": self._format,
-                "format_doc": self._format_doc,
-                "size": self._size,
-                "study": self._study,
-                'subtype':'16s',
-                "urls": self._urls,
-                'tags': self._tags
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("Object has the OSDF id set.")
-            doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("Object has the OSDF version set.")
-            doc['ver'] = self._version
-
-        # Handle optional properties
-        if self._sequence_type is not None:
-            self.logger.debug("Object has the 'sequence_type' set.")
-            doc['meta']['sequence_type'] = self._sequence_type
-
-        if self._private_files is not None:
-            self.logger.debug("Object has the 'private_files' property set.")
-            doc['meta']['private_files'] = self._private_files
+        doc = super(SixteenSTrimmedSeqSet, self)._get_raw_doc()
+        doc['meta']['subtype'] = '16s'
+        doc['meta']['urls'] = self._urls
 
         return doc
 
     @staticmethod
-    def search(query="\"16s_trimmed_seq_set\"[node_type]"):
+    def search(query="\"16s_trimmed_seq_set\"[node_type]", session=None):
         """
         Searches the OSDF database through all SixteenSTrimmedSeqSet node
         types. Any criteria the user wishes to add is provided by the user in
@@ -484,6 +275,8 @@ class SixteenSTrimmedSeqSet(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          SixteenSTrimmedSeqSet node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of SixteenSTrimmedSeqSet objects. It returns an
@@ -492,7 +285,8 @@ class SixteenSTrimmedSeqSet(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"16s_trimmed_seq_set"[node_type]':
@@ -512,12 +306,14 @@ class SixteenSTrimmedSeqSet(Base):
         if len(all_results) > 0:
             for result in all_results:
                 sixteens_trimmed_seq_set_result = \
-                    SixteenSTrimmedSeqSet.load_sixteenSTrimmedSeqSet(result)
+                    SixteenSTrimmedSeqSet.load_sixteenSTrimmedSeqSet(
+                        result, session=session)
                 result_list.append(sixteens_trimmed_seq_set_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_sixteenSTrimmedSeqSet(seq_set_data):
         """
         Takes the provided JSON string and converts it to a
@@ -534,34 +330,15 @@ class SixteenSTrimmedSeqSet(Base):
 
         module_logger.debug("Filling in %s details.", __name__)
 
-        # The attributes commmon to all iHMP nodes
-        seq_set._set_id(seq_set_data['id'])
-        seq_set.links = seq_set_data['linkage']
-        seq_set.version = seq_set_data['ver']
-
-        # Required fields
-        seq_set.checksums = seq_set_data['meta']['checksums']
-        seq_set.comment = seq_set_data['meta']['comment']
-        seq_set.format = seq_set_data['meta']['format']
-        seq_set.format_doc = seq_set_data['meta']['format_doc']
-        seq_set.size = seq_set_data['meta']['size']
-        seq_set.tags = seq_set_data['meta']['tags']
+        seq_set._load_doc(seq_set_data)
         seq_set._urls = seq_set_data['meta']['urls']
 
-        # Optional fields
-        if 'sequence_type' in seq_set_data['meta']:
-            module_logger.info("%s data has 'sequence_type' present.", __name__)
-            seq_set.sequence_type = seq_set_data['meta']['sequence_type']
-
-        if 'private_files' in seq_set_data['meta']:
-            seq_set.private_files = seq_set_data['meta']['private_files']
-
         module_logger.debug("Returning loaded %s.", __name__)
 
         return seq_set
 
     @staticmethod
-    def load(seq_set_id):
+    def load(seq_set_id, session=None):
         """
 	Loads the data for the specified input ID from the OSDF instance to
 	this object. If the provided ID does not exist, then an error message
@@ -569,6 +346,8 @@ class SixteenSTrimmedSeqSet(Base):
 
         Args:
             seq_set_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A SixteenSTrimmedSeqSet object with all the available OSDF data
@@ -576,19 +355,22 @@ class SixteenSTrimmedSeqSet(Base):
         """
         module_logger.debug("In load. Specified ID: %s", seq_set_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         seq_set_data = session.get_osdf().get_node(seq_set_id)
-        seq_set = SixteenSTrimmedSeqSet.load_sixteenSTrimmedSeqSet(seq_set_data)
+        seq_set = SixteenSTrimmedSeqSet.load_sixteenSTrimmedSeqSet(
+            seq_set_data, session=session)
 
         module_logger.debug("Returning loaded %s.", __name__)
 
         return seq_set
 
-    def _upload_data(self):
+    def _upload_data(self, session=None):
         self.logger.debug("In _upload_data.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         study = self._study
 
         study2dir = {
@@ -630,7 +412,7 @@ class SixteenSTrimmedSeqSet(Base):
         else:
             self._urls = ["fasp://" + SixteenSTrimmedSeqSet.aspera_server + remote_path]
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in the current instance. The JSON form of the current
         data for the instance is validated in the save function. If the data is
@@ -641,7 +423,8 @@ class SixteenSTrimmedSeqSet(Base):
         OSDF. Also, the version is updated as the data is saved in OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -652,18 +435,19 @@ class SixteenSTrimmedSeqSet(Base):
         # If node previously saved, use edit_node instead since ID
         # is given (an update in a way)
         # can also use get_node to check if the node already exists
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid.")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         if self._private_files:
             self._urls = ["<private>"]
         else:
             try:
-                self._upload_data()
+                self._upload_data(session=session)
             except Exception as e:
                 self.logger.exception(e)
                 # Don't bother continuing...
@@ -726,28 +510,22 @@ class SixteenSTrimmedSeqSet(Base):
         self.logger.debug("Returning " + str(success))
         return success
 
-    def abundance_matrices(self):
+    def abundance_matrices(self, ids_only=False, fan_out=None):
         """
         Returns an iterator of all AbundanceMatrix nodes connected to this
         object.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         self.logger.debug("In abundance_matrices().")
 
         linkage_query = '"{}"[linkage.computed_from]'.format(self.id)
 
-        query = iHMPSession.get_session().get_osdf().oql_query
-
         from cutlass.AbundanceMatrix import AbundanceMatrix
 
-        for page_no in count(1):
-            res = query(SixteenSTrimmedSeqSet.namespace, linkage_query,
-                        page=page_no)
-            res_count = res['result_count']
-
-            for doc in res['results']:
-                yield AbundanceMatrix.load_abundance_matrix(doc)
-
-            res_count -= len(res['results'])
-
-            if res_count < 1:
-                break
+        for doc in oql_docs(SixteenSTrimmedSeqSet.namespace, linkage_query, fan_out=fan_out):
+            yield node_ref(doc) if ids_only else AbundanceMatrix.load_abundance_matrix(doc)
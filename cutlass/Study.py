@@ -3,9 +3,11 @@ This module models the study object.
 """
 
 import logging
-from itertools import count
 from cutlass.iHMPSession import iHMPSession
-from cutlass.Base import Base
+from cutlass.identity import identity_mapped
+from cutlass.paging import oql_docs
+from cutlass.Base import Base, node_ref
+from cutlass.fields import Field
 from cutlass.Subject import Subject
 from cutlass.Util import *
 
@@ -16,218 +18,85 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
-class Study(Base):
-    """
-    The class encapsulating the data for an iHMP Study.
-    This class contains all the fields required to save a study into
-    OSDF.
-
-    Attributes:
-        namespace (str): The namespace this class will use in OSDF.
+def _check_center(center):
     """
-    namespace = "hmbr"
-
-    def __init__(self, *args, **kwargs):
-        """
-        Constructor for the Study class. This initializes the fields specific to the
-        Study class, and inherits from the Base class.
-
-        Args:
-            None
-        """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
+    Checks a new Study center. The center must be one of the
+    following:
 
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
+    Virginia Commonwealth University,
+    Broad Institute,
+    Stanford University / Jackson Laboratory,
+    Stanford University,
+    Jackson Laboratory.
 
-        self._name = None
-        self._description = None
-        self._center = None
-        self._contact = None
-        self._subtype = None
-        self._srp_id = None
-
-        super(Study, self).__init__(*args, **kwargs)
-
-    @property
-    def name(self):
-        """
-        The name of the study within which the sequencing was organized.
-        """
-        self.logger.debug("In 'name' getter.")
-
-        return self._name
-
-    @name.setter
-    @enforce_string
-    def name(self, name):
-        """
-        The setter for the study name.
-
-        Args:
-            name (str): The new name to assign to this instance.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'name' setter.")
-
-        self._name = name
-
-    @property
-    def description(self):
-        """
-        A longer description of the study.
-        """
-        self.logger.debug("In 'description' getter.")
-
-        return self._description
-
-    @description.setter
-    @enforce_string
-    def description(self, description):
-        """
-        The setter for the study description.
-
-        Args:
-            description (str): The new description to assign to this instance.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'description' setter.")
-
-        self._description = description
-
-    @property
-    def center(self):
-        """
-        The center/organization where the study was performed.
-        """
-        self.logger.debug("In center getter.")
-
-        return self._center
-
-    @center.setter
-    @enforce_string
-    def center(self, center):
-        """
-        The setter for the Study center. The center must be one of the
-        following:
-
-        Virginia Commonwealth University,
-        Broad Institute,
-        Stanford University / Jackson Laboratory,
-        Stanford University,
-        Jackson Laboratory.
-
-        Args:
-            center (str): The new center.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In center setter.")
-        centers = ["Virginia Commonwealth University",
-                   "Broad Institute",
-                   "Stanford University / Jackson Laboratory",
-                   "Stanford University",
-                   "Jackson Laboratory"]
-
-        if center in centers:
-            self._center = center
-        else:
-            raise Exception("Please provide a valid center for the study.")
-
-    @property
-    def contact(self):
-        """
-        The study's primary contact at the sequencing center.
-        """
-        self.logger.debug("In 'contact' getter.")
-
-        return self._contact
-
-    @contact.setter
-    @enforce_string
-    def contact(self, contact):
-        """
-        The setter for the Study contact. The contact information must
-        be between 3 and 128 characters.
+    Args:
+        center (str): The new center.
 
-        Args:
-            contact (str): The new contact for the study.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'contact' setter.")
-
-        if len(contact) < 3:
-            raise ValueError("'contact' must be more than 3 characters.")
-
-        if len(contact) > 128:
-            raise ValueError("'contact' must be less than 128 characters.")
-
-        self._contact = contact
-
-    @property
-    def srp_id(self):
-        """
-        str: NCBI Sequence Read Archive (SRA) project ID
-        """
-        self.logger.debug("In 'srp_id' getter.")
-        return self._srp_id
-
-    @srp_id.setter
-    @enforce_string
-    def srp_id(self, srp_id):
-        """
-        The setter for the Study srp_id.
-
-        Args:
-            srp_id (str): The new srp ID for the study.
+    Returns:
+        None
+    """
+    centers = ["Virginia Commonwealth University",
+               "Broad Institute",
+               "Stanford University / Jackson Laboratory",
+               "Stanford University",
+               "Jackson Laboratory"]
+    if center not in centers:
+        raise Exception("Please provide a valid center for the study.")
+
+def _check_contact(contact):
+    """
+    Checks a new Study contact. The contact information must
+    be between 3 and 128 characters.
 
-        Returns:
-            None
-        """
-        self.logger.debug("In 'srp_id' setter.")
+    Args:
+        contact (str): The new contact for the study.
 
-        self._srp_id = srp_id
+    Returns:
+        None
+    """
+    if len(contact) < 3:
+        raise ValueError("'contact' must be more than 3 characters.")
 
-    @property
-    def subtype(self):
-        """
-        The study subtype. One of "prediabetes", "ibd", or "preg_preterm",
-        """
-        self.logger.debug("In subtype getter.")
-        return self._subtype
+    if len(contact) > 128:
+        raise ValueError("'contact' must be less than 128 characters.")
 
-    @subtype.setter
-    @enforce_string
-    def subtype(self, subtype):
-        """
-        The setter for the Study subtype.
+def _check_subtype(subtype):
+    """
+    Checks a new Study subtype.
 
-        Args:
-            subtype (str): The subtype for the study.
+    Args:
+        subtype (str): The subtype for the study.
 
-        Returns:
-            None
-        """
-        self.logger.debug("In 'subtype' setter.")
+    Returns:
+        None
+    """
+    subtypes = ["preg_preterm", "ibd", "prediabetes"]
+    if subtype not in subtypes:
+        raise Exception("Not a valid subtype.")
 
-        subtypes = ["preg_preterm", "ibd", "prediabetes"]
+class Study(Base):
+    """
+    The class encapsulating the data for an iHMP Study.
+    This class contains all the fields required to save a study into
+    OSDF.
 
-        if subtype in subtypes:
-            self._subtype = subtype
-        else:
-            raise Exception("Not a valid subtype.")
+    Attributes:
+        namespace (str): The namespace this class will use in OSDF.
+    """
+    namespace = "hmbr"
 
+    name = Field(str, "The name of the study within which the sequencing was "
+                 "organized.", required=True)
+    description = Field(str, "A longer description of the study.",
+                        required=True)
+    center = Field(str, "The center/organization where the study was "
+                   "performed.", required=True, check=_check_center)
+    contact = Field(str, "The study's primary contact at the sequencing "
+                    "center.", required=True, check=_check_contact)
+    srp_id = Field(str, "NCBI Sequence Read Archive (SRA) project ID",
+                   meta=False)
+    subtype = Field(str, "The study subtype. One of 'prediabetes', 'ibd', or "
+                    "'preg_preterm'.", required=True, check=_check_subtype)
 
     @staticmethod
     def required_fields():
@@ -258,31 +127,7 @@ class Study(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        study_doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [Study.namespace]
-            },
-            'linkage': self._links,
-            'ns': Study.namespace,
-            'node_type': 'study',
-            'meta': {
-                'name': self._name,
-                'description': self._description,
-                'center': self._center,
-                'contact': self._contact,
-                'subtype': self._subtype,
-                'tags': self._tags
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("Study object has the OSDF id set.")
-            study_doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("Study object has the OSDF version set.")
-            study_doc['ver'] = self._version
+        study_doc = super(Study, self)._get_raw_doc()
 
         if self._srp_id is not None:
             self.logger.debug("Study object has the OSDF srp id set.")
@@ -291,7 +136,7 @@ class Study(Base):
         return study_doc
 
     @staticmethod
-    def search(query="\"study\"[node_type]"):
+    def search(query="\"study\"[node_type]", session=None):
         """
         Searches the OSDF database through all Study node types. Any criteria
         the user wishes to add is provided by the user in the query language
@@ -306,6 +151,8 @@ class Study(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          Study node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of Study objects. It returns an empty list if
@@ -313,7 +160,8 @@ class Study(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"study"[node_type]':
@@ -329,12 +177,13 @@ class Study(Base):
 
         if len(all_results) > 0:
             for i in all_results:
-                study_result = Study.load_study(i)
+                study_result = Study.load_study(i, session=session)
                 result_list.append(study_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_study(study_data):
         """
         Takes the provided JSON string and converts it to a Study object
@@ -351,18 +200,7 @@ class Study(Base):
 
         module_logger.debug("Filling in %s details.", __name__)
 
-        study._set_id(study_data['id'])
-        # For version, the key to use is simply 'ver'
-        study.version = study_data['ver']
-        study.links = study_data['linkage']
-
-        # The attributes that are particular to Study objects
-        study.name = study_data['meta']['name']
-        study.description = study_data['meta']['description']
-        study.center = study_data['meta']['center']
-        study.contact = study_data['meta']['contact']
-        study.tags = study_data['meta']['tags']
-        study.subtype = study_data['meta'].get('subtype', None)
+        study._load_doc(study_data)
 
         if 'srp_id' in study_data['meta']:
             study.srp_id = study_data['meta']['srp_id']
@@ -370,7 +208,7 @@ class Study(Base):
         module_logger.debug("Returning loaded Study.")
         return study
 
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object (self) from the OSDF instance. If the object
         has not been saved previously (node ID is not set), then an error
@@ -380,7 +218,8 @@ class Study(Base):
         use it again.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True upon successful deletion, False otherwise.
@@ -393,7 +232,8 @@ class Study(Base):
 
         study_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -410,7 +250,7 @@ class Study(Base):
         return success
 
     @staticmethod
-    def load(study_id):
+    def load(study_id, session=None):
         """
         Loads the data for the specified input ID from the OSDF instance to
         this object.  If the provided ID does not exist, then an error message
@@ -418,42 +258,26 @@ class Study(Base):
 
         Args:
             study_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A Study object with all the available OSDF data loaded into it.
         """
         module_logger.debug("In load. Specified ID: %s", study_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         study_data = session.get_osdf().get_node(study_id)
 
-        module_logger.info("Creating a template Study.")
-
-        study = Study()
-
-        module_logger.debug("Filling in Study details.")
-
-        study._set_id(study_data['id'])
-        # For version, the key to use is simply 'ver'
-        study.version = study_data['ver']
-        study.links = study_data['linkage']
-
-        # The attributes that are particular to Study objects
-        study.name = study_data['meta']['name']
-        study.description = study_data['meta']['description']
-        study.center = study_data['meta']['center']
-        study.contact = study_data['meta']['contact']
-        study.tags = study_data['meta']['tags']
-
-        if 'srp_id' in study_data['meta']:
-            study.srp_id = study_data['meta']['srp_id']
+        study = Study.load_study(study_data, session=session)
 
         module_logger.debug("Returning loaded %s.", __name__)
         return study
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in the current instance. The JSON form of the current
         data for the instance is validated in the save function. If the data is
@@ -465,7 +289,8 @@ class Study(Base):
         the OSDF instance.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -476,13 +301,14 @@ class Study(Base):
         # If node previously saved, use edit_node instead since ID
         # is given (an update in a way)
         # can also use get_node to check if the node already exists
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid.")
             return False
 
         # Before save, make sure that linkage is non-empty, the key should be
         # collected-during
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         success = False
@@ -520,7 +346,7 @@ class Study(Base):
 
         return success
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -528,7 +354,8 @@ class Study(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -538,7 +365,8 @@ class Study(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # _error_message is intentionally unused
@@ -552,44 +380,36 @@ class Study(Base):
 
         return valid
 
-    def studies(self):
+    def studies(self, ids_only=False, fan_out=None):
         """
         Return iterator of all studies that are subsets of this study.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         self.logger.debug("In studies.")
 
         linkage_query = '"{}"[linkage.subset_of]'.format(self.id)
-        query = iHMPSession.get_session().get_osdf().oql_query
-
-        for page_no in count(1):
-            res = query(Study.namespace, linkage_query, page=page_no)
-            res_count = res['result_count']
 
-            for doc in res['results']:
-                yield Study.load_study(doc)
+        for doc in oql_docs(Study.namespace, linkage_query, fan_out=fan_out):
+            yield node_ref(doc) if ids_only else Study.load_study(doc)
 
-            res_count -= len(res['results'])
-            if res_count < 1:
-                break
-
-
-    def subjects(self):
+    def subjects(self, ids_only=False, fan_out=None):
         """
         Return iterator of all subjects that participate in this study.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         self.logger.debug("In subjects.")
 
         linkage_query = '"{}"[linkage.participates_in]'.format(self.id)
-        query = iHMPSession.get_session().get_osdf().oql_query
-
-        for page_no in count(1):
-            res = query(Study.namespace, linkage_query, page=page_no)
-            res_count = res['result_count']
-
-            for doc in res['results']:
-                yield Subject.load_subject(doc)
-
-            res_count -= len(res['results'])
 
-            if res_count < 1:
-                break
+        for doc in oql_docs(Study.namespace, linkage_query, fan_out=fan_out):
+            yield node_ref(doc) if ids_only else Subject.load_subject(doc)
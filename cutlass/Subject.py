@@ -4,9 +4,11 @@ Models the subject object.
 
 import json
 import logging
-from itertools import count
 from cutlass.iHMPSession import iHMPSession
-from cutlass.Base import Base
+from cutlass.identity import identity_mapped
+from cutlass.paging import oql_docs
+from cutlass.Base import Base, node_ref
+from cutlass.fields import Field
 from cutlass.Util import *
 
 # pylint: disable=W0703, C1801
@@ -16,6 +18,41 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+def _check_gender(gender):
+    """
+    Checks a new Subject's gender.
+    The gender must be male, female, or unknown.
+
+    Args:
+        gender (str): The new gender.
+
+    Returns:
+        None
+    """
+    if gender not in Subject.valid_genders:
+        raise ValueError("Invalid gender: %s" % gender)
+
+def _check_race(race):
+    """
+    Checks a new Subject's race. The race must be one of the following:
+
+    "african_american",
+    "american_indian_or_alaska_native",
+    "asian", "caucasian",
+    "hispanic_or_latino",
+    "native_hawaiian",
+    "ethnic_other",
+    "unknown"
+
+    Args:
+        race (str): The new race.
+
+    Returns:
+        None
+    """
+    if race not in Subject.valid_races:
+        raise ValueError("Invalid race: %s" % race)
+
 class Subject(Base):
     """
     The class encapsulating the subject data for an iHMP instance.
@@ -33,124 +70,21 @@ class Subject(Base):
 
     valid_genders = ("male", "female", "unknown")
 
+    gender = Field(str, "The subject's sex.", required=True,
+                   check=_check_gender)
+    race = Field(str, "The subject's race/ethnicity.", check=_check_race)
+    rand_subject_id = Field(str, "Randomized subject id used to anonymize "
+                            "subject identity.", required=True)
 
-    def __init__(self, *args, **kwargs):
-        """
-        Constructor for the Subject class. This initializes the fields specific to the
-        Subject class, and inherits from the Base class.
-
-        Args:
-            None
-        """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        self._rand_subject_id = None
-        self._gender = None
-        self._race = None
-
-        super(Subject, self).__init__(*args, **kwargs)
-
-    @property
-    def gender(self):
-        """
-        str: The subject's sex.
-        """
-        self.logger.debug("In 'gender' getter.")
-        return self._gender
-
-    @gender.setter
-    @enforce_string
-    def gender(self, gender):
-        """
-        The setter for the Subject's gender.
-        The gender must be male, female, or unknown.
-
-        Args:
-            gender (str): The new gender.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'gender' setter.")
-
-        if gender not in Subject.valid_genders:
-            raise ValueError("Invalid gender: %s" % gender)
-
-        self._gender = gender
-
-    @property
-    def race(self):
-        """
-        str: The subject's race/ethnicity.
-        """
-        self.logger.debug("In 'race' getter.")
-        return self._race
-
-    @race.setter
-    @enforce_string
-    def race(self, race):
-        """
-        The setter for the Subject's race. The race must be one of the following:
-
-        "african_american",
-        "american_indian_or_alaska_native",
-        "asian", "caucasian",
-        "hispanic_or_latino",
-        "native_hawaiian",
-        "ethnic_other",
-        "unknown"
-
-        Args:
-            race (str): The new race.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In race setter.")
-        if race not in Subject.valid_races:
-            raise ValueError("Invalid race: %s" % race)
-
-        self._race = race
-
-    @property
-    def rand_subject_id(self):
-        """
-        Randomized subject id used to anonymize subject identity.
-        """
-        self.logger.debug("In 'rand_subject_id' getter.")
-        return self._rand_subject_id
-
-    @rand_subject_id.setter
-    @enforce_string
-    def rand_subject_id(self, rand_subject_id):
-        """
-        The setter for the Subject's random ID.
-        The ID must be between 1 and 10 characters.
-
-        Args:
-            rand_subject_id (str): The new random subject ID.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'rand_subject_id' setter.")
-        self._rand_subject_id = rand_subject_id
-
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -160,7 +94,8 @@ class Subject(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -176,7 +111,7 @@ class Subject(Base):
         self.logger.debug("Number of validation problems: %s.", len(problems))
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -184,7 +119,8 @@ class Subject(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -194,7 +130,8 @@ class Subject(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, _error_message) = session.get_osdf().validate_node(document)
@@ -222,34 +159,8 @@ class Subject(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        subject_doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [Subject.namespace]
-            },
-            'linkage': self._links,
-            'ns': Subject.namespace,
-            'node_type': 'subject',
-            'meta': {
-                'gender': self._gender,
-                'rand_subject_id': self._rand_subject_id,
-                'subtype': self._gender,
-                'tags': self._tags
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("%s object has the OSDF id set.", __name__)
-            subject_doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("%s object has the OSDF version set.", __name__)
-            subject_doc['ver'] = self._version
-
-        # Handle optional properties
-        if self._race is not None:
-            self.logger.debug("Subject object has the race property set.")
-            subject_doc['meta']['race'] = self._race
+        subject_doc = super(Subject, self)._get_raw_doc()
+        subject_doc['meta']['subtype'] = self._gender
 
         return subject_doc
 
@@ -266,7 +177,7 @@ class Subject(Base):
         module_logger.debug("In required_fields.")
         return ("rand_subject_id", "gender", "tags")
 
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object (self) from the OSDF instance. If the object
         has not been saved previously (node ID is not set), then an error message
@@ -275,7 +186,8 @@ class Subject(Base):
         OSDF instance, and this object must be re-saved in order to use it again.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True upon successful deletion, False otherwise.
@@ -288,7 +200,8 @@ class Subject(Base):
 
         subject_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -305,7 +218,7 @@ class Subject(Base):
         return success
 
     @staticmethod
-    def search(query="\"subject\"[node_type]"):
+    def search(query="\"subject\"[node_type]", session=None):
         """
         Searches the OSDF database through all Subject node types. Any criteria
         the user wishes to add is provided by the user in the query language
@@ -320,6 +233,8 @@ class Subject(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          Subject node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of Subject objects. It returns an empty list if
@@ -327,7 +242,8 @@ class Subject(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"subject"[node_type]':
@@ -343,12 +259,13 @@ class Subject(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                subject_result = Subject.load_subject(result)
+                subject_result = Subject.load_subject(result, session=session)
                 result_list.append(subject_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_subject(subject_data):
         """
         Takes the provided JSON string and converts it to a Subject object
@@ -363,22 +280,13 @@ class Subject(Base):
         subject = Subject()
 
         module_logger.debug("Filling in Subject details.")
-        subject._set_id(subject_data['id'])
-        subject.links = subject_data['linkage']
-        subject.version = subject_data['ver']
-
-        subject.gender = subject_data['meta']['gender']
-        subject.rand_subject_id = subject_data['meta']['rand_subject_id']
-        subject.tags = subject_data['meta']['tags']
-
-        if 'race' in subject_data['meta']:
-            subject.race = subject_data['meta']['race']
+        subject._load_doc(subject_data)
 
         module_logger.debug("Returning loaded %s.", __name__)
         return subject
 
     @staticmethod
-    def load(subject_id):
+    def load(subject_id, session=None):
         """
         Loads the data for the specified input ID from the OSDF instance to this object.
         If the provided ID does not exist, then an error message is provided stating the
@@ -386,21 +294,24 @@ class Subject(Base):
 
         Args:
             subject_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A Subject object with all the available OSDF data loaded into it.
         """
         module_logger.debug("In load. Specified ID: %s", subject_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         subject_data = session.get_osdf().get_node(subject_id)
-        subject = Subject.load_subject(subject_data)
+        subject = Subject.load_subject(subject_data, session=session)
 
         module_logger.debug("Returning loaded %s.", __name__)
         return subject
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in the current instance. The JSON form of the current data
         for the instance is validated in the save function. If the data is not valid,
@@ -411,7 +322,8 @@ class Subject(Base):
         version is updated as the data is saved in the OSDF instance.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -422,11 +334,12 @@ class Subject(Base):
         # If node previously saved, use edit_node instead since ID
         # is given (an update in a way)
         # can also use get_node to check if the node already exists
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid.")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         osdf = session.get_osdf()
@@ -473,59 +386,57 @@ class Subject(Base):
 
         return success
 
-    def visits(self):
+    def visits(self, ids_only=False, fan_out=None):
         """
         Return iterator of all visits by this subject.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         from cutlass.Visit import Visit
 
         linkage_query = '"{}"[linkage.by]'.format(self.id)
-        query = iHMPSession.get_session().get_osdf().oql_query
-
-        for page_no in count(1):
-            res = query(Subject.namespace, linkage_query, page=page_no)
-            res_count = res['result_count']
 
-            for doc in res['results']:
-                yield Visit.load_visit(doc)
+        for doc in oql_docs(Subject.namespace, linkage_query, fan_out=fan_out):
+            yield node_ref(doc) if ids_only else Visit.load_visit(doc)
 
-            res_count -= len(res['results'])
-
-            if res_count < 1:
-                break
-
-    def attributes(self):
+    def attributes(self, ids_only=False, fan_out=None):
         """
         Return iterator of all subject attribute objects associoted with this
         subject.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         from cutlass.SubjectAttribute import SubjectAttribute
 
         linkage_query = '"{}"[linkage.associated_with]'.format(self.id)
-        query = iHMPSession.get_session().get_osdf().oql_query
-
-        for page_no in count(1):
-            res = query(Subject.namespace, linkage_query, page=page_no)
-            res_count = res['result_count']
 
-            for doc in res['results']:
-                yield SubjectAttribute.load_subject_attr(doc)
+        for doc in oql_docs(Subject.namespace, linkage_query, fan_out=fan_out):
+            yield node_ref(doc) if ids_only else SubjectAttribute.load_subject_attr(doc)
 
-            res_count -= len(res['results'])
-
-            if res_count < 1:
-                break
-
-    def derivations(self):
+    def derivations(self, ids_only=False, fan_out=None):
         """
         Returns an iterator of all nodes connected to this object.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         self.logger.debug("In derivations().")
 
         self.logger.debug("Fetching visits.")
-        for visit in self.visits():
+        for visit in self.visits(ids_only=ids_only, fan_out=fan_out):
             yield visit
 
         self.logger.debug("Fetching subject attributes.")
-        for subj_attrib in self.attributes():
+        for subj_attrib in self.attributes(ids_only=ids_only, fan_out=fan_out):
             yield subj_attrib
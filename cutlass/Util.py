@@ -4,9 +4,11 @@ Provide utility decorators and python version checking.
 
 from datetime import datetime
 
+import logging
 import os
 import sys
 import inspect
+import threading
 
 # pylint: disable=C0123,C0111
 
@@ -14,6 +16,30 @@ DATE_FORMAT = '%Y-%m-%d'
 PYTHON_MIN_VERSION = (2, 7, 0)
 PYTHON_MAX_VERSION = (3, 0, 0)
 
+class ClassLogger(object):
+    """
+    A class attribute that hands out the logger of a class, named after its
+    module and class. The logger and its NullHandler are set up once per
+    class, the first time they are used, so objects carry no logging state.
+    """
+    def __init__(self):
+        self._loggers = {}
+        self._lock = threading.Lock()
+
+    def __get__(self, instance, owner):
+        logger = self._loggers.get(owner)
+
+        if logger is None:
+            with self._lock:
+                logger = self._loggers.get(owner)
+
+                if logger is None:
+                    logger = logging.getLogger(owner.__module__ + '.' + owner.__name__)
+                    logger.addHandler(logging.NullHandler())
+                    self._loggers[owner] = logger
+
+        return logger
+
 def enforce_bool(func):
     """
     Decorator to enforce a boolean argument.
@@ -87,19 +113,26 @@ def enforce_string(func):
     return wrapper
 
 
+def check_past_date(date):
+    """
+    Raises a ValueError unless the date string is in YYYY-MM-DD format and
+    is not in the future.
+    """
+    try:
+        parsed = datetime.strptime(date, DATE_FORMAT)
+    except ValueError:
+        raise ValueError("Invalid date. Must be in YYYY-MM-DD format.")
+
+    now = datetime.now()
+    if parsed > now:
+        raise ValueError("Date must be in the past, not the future.")
+
 def enforce_past_date(func):
     """
     Decorator to enforce date strings that are provided occur in the past.
     """
     def wrapper(self, date):
-        try:
-            parsed = datetime.strptime(date, DATE_FORMAT)
-        except ValueError:
-            raise ValueError("Invalid date. Must be in YYYY-MM-DD format.")
-
-        now = datetime.now()
-        if parsed > now:
-            raise ValueError("Date must be in the past, not the future.")
+        check_past_date(date)
 
         func(self, date)
 
@@ -4,9 +4,11 @@ Models the visit object.
 
 import json
 import logging
-from itertools import count
 from cutlass.iHMPSession import iHMPSession
-from cutlass.Base import Base
+from cutlass.identity import identity_mapped
+from cutlass.paging import oql_docs
+from cutlass.Base import Base, node_ref
+from cutlass.fields import Field
 from cutlass.Sample import Sample
 from cutlass.VisitAttribute import VisitAttribute
 from cutlass.Util import *
@@ -18,6 +20,33 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+def _check_visit_number(visit_number):
+    """
+    Checks a new Visit's visit number
+
+    Args:
+        visit_number (str): The new visit number.
+
+    Returns:
+        None
+    """
+    if visit_number < 1:
+        raise ValueError("'visit_number' must be greater than or equal to 1.")
+
+def _check_interval(interval):
+    """
+    Checks a new Visit's interval since the last visit for this subject.
+    The interval must be non-negative.
+
+    Args:
+        interval (int): The new interval.
+
+    Returns:
+        None
+    """
+    if interval < 0:
+        raise ValueError("Invalid interval. Must be positive.")
+
 class Visit(Base):
     """
     The class encapsulating the data for an iHMP visit by a subject.
@@ -29,66 +58,19 @@ class Visit(Base):
     """
     namespace = "hmbr"
 
-    def __init__(self, *args, **kwargs):
-        """
-        Constructor for the Visit class. This initializes the fields specific to
-        the Visit class, and inherits from the Base class.
-
-        Args:
-            None
-        """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        self._visit_id = None
-        self._visit_number = None
-        self._date = None
-        self._interval = None
-        self._clinic_id = None
-
-        super(Visit, self).__init__(*args, **kwargs)
-
-    @property
-    def visit_id(self):
-        """
-        str: The identifier used by the sequence center to uniquely
-             identify the visit.
-        """
-        self.logger.debug("In visit_id getter.")
-
-        return self._visit_id
-
-    @visit_id.setter
-    @enforce_string
-    def visit_id(self, visit_id):
-        """
-        The setter for the Visit's ID
-
-        Args:
-            visit_id (str): The new visit ID
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'visit_id' setter.")
-
-        self._visit_id = visit_id
-
-    @property
-    def visit_number(self):
-        """
-        int: A sequential number that is assigned as visits occur for
-        that subject.
-        """
-        self.logger.debug("In 'visit_number' getter.")
-
-        return self._visit_number
+    visit_id = Field(str, "The identifier used by the sequence center to "
+                     "uniquely identify the visit.", strict=True)
+    visit_number = Field(int, "A sequential number that is assigned as visits "
+                         "occur for that subject.", required=True,
+                         check=_check_visit_number)
+    date = Field(str, "Date when the visit occurred. Can be different from "
+                 "sample dates, a visit may encompass a set of sampling "
+                 "points.", check=check_past_date)
+    interval = Field(int, "The amount of time since the last visit (in days). "
+                     "Use 0 for the first visit.", required=True,
+                     check=_check_interval)
+    clinic_id = Field(str, "The identifier used by the sequence center to "
+                      "uniquely identify where the visit occurred.")
 
     def increment_visit_number(self):
         """
@@ -96,109 +78,6 @@ class Visit(Base):
         """
         self._visit_number = self._visit_number + 1
 
-    @visit_number.setter
-    @enforce_int
-    def visit_number(self, visit_number):
-        """
-        The setter for the Visit's visit number
-
-        Args:
-            visit_number (str): The new visit number.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In visit_number setter.")
-
-        if visit_number < 1:
-            raise ValueError("'visit_number' must be greater than or equal to 1.")
-
-        self._visit_number = visit_number
-
-    @property
-    def date(self):
-        """
-        str: Date when the visit occurred. Can be different from sample dates,
-             a visit may encompass a set of sampling points.
-        """
-        self.logger.debug("In 'date' getter.")
-
-        return self._date
-
-    @date.setter
-    @enforce_string
-    @enforce_past_date
-    def date(self, date):
-        """
-        The setter for the Visit's most recent visit date.
-        The date must follow the format YYYY-MM-DD.
-
-        Args:
-            date (str): The new date.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'date' setter.")
-
-        self._date = date
-
-    @property
-    def interval(self):
-        """
-        int: The amount of time since the last visit (in days).
-             Use 0 for the first visit.
-        """
-        self.logger.debug("In 'interval' getter.")
-
-        return self._interval
-
-    @interval.setter
-    @enforce_int
-    def interval(self, interval):
-        """
-        The setter for the Visit's interval since the last visit for this subject.
-        The interval must be non-negative.
-
-        Args:
-            interval (int): The new interval.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'interval' setter.")
-
-        if interval < 0:
-            raise ValueError("Invalid interval. Must be positive.")
-
-        self._interval = interval
-
-    @property
-    def clinic_id(self):
-        """
-        str: The identifier used by the sequence center to uniquely identify
-                 where the visit occurred.
-        """
-        self.logger.debug("In 'clinic_id' getter.")
-
-        return self._clinic_id
-
-    @clinic_id.setter
-    @enforce_string
-    def clinic_id(self, clinic_id):
-        """
-        The setter for the Visit's clinic ID.
-
-        Args:
-            clinic_id (str): The new clinic ID.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'clinic_id' setter.")
-
-        self._clinic_id = clinic_id
-
     @staticmethod
     def required_fields():
         """
@@ -229,48 +108,12 @@ class Visit(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        visit_doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [Visit.namespace]
-            },
-            'linkage': self._links,
-            'ns': Visit.namespace,
-            'node_type': 'visit',
-            'meta': {
-                'visit_number': self._visit_number,
-                'subtype': "visit",
-                'interval': self._interval,
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("Visit object has the OSDF id set.")
-            visit_doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("Visit object has the OSDF version set.")
-            visit_doc['ver'] = self._version
-
-        if self._tags is not None:
-            self.logger.debug("Visit object has the OSDF tags set.")
-            visit_doc['meta']['tags'] = self._tags
-
-        if self._date is not None:
-            self.logger.debug("Visit object has the date set.")
-            visit_doc['meta']['date'] = self._date
-
-        if self._clinic_id is not None:
-            self.logger.debug("Visit object has the clinic_id set.")
-            visit_doc['meta']['clinic_id'] = self._clinic_id
-
-        if self._visit_id is not None:
-            self.logger.debug("Visit object has the visit_id set.")
-            visit_doc['meta']['visit_id'] = self._visit_id
+        visit_doc = super(Visit, self)._get_raw_doc()
+        visit_doc['meta']['subtype'] = "visit"
 
         return visit_doc
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -278,7 +121,8 @@ class Visit(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -288,7 +132,8 @@ class Visit(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, _error_message) = session.get_osdf().validate_node(document)
@@ -324,7 +169,7 @@ class Visit(Base):
         return json_str
 
     @staticmethod
-    def search(query="\"visit\"[node_type]"):
+    def search(query="\"visit\"[node_type]", session=None):
         """
         Searches the OSDF database through all Visit node types. Any criteria
         the user wishes to add is provided by the user in the query language
@@ -339,6 +184,8 @@ class Visit(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          Visit node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of Visit objects. It returns an empty list if
@@ -346,7 +193,8 @@ class Visit(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"visit"[node_type]':
@@ -362,12 +210,13 @@ class Visit(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                visit_result = Visit.load_visit(result)
+                visit_result = Visit.load_visit(result, session=session)
                 result_list.append(visit_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_visit(visit_data):
         """
         Takes the provided JSON string and converts it to a Visit object
@@ -383,33 +232,13 @@ class Visit(Base):
 
         module_logger.debug("Filling in Visit details.")
 
-        # The attributes commmon to all iHMP nodes
-        visit._set_id(visit_data['id'])
-        visit.version = visit_data['ver']
-        visit.links = visit_data['linkage']
-
-        # The attributes that are particular to Visit objects
-        visit.visit_id = visit_data['meta']['visit_id']
-        visit.visit_number = visit_data['meta']['visit_number']
-        visit.interval = visit_data['meta']['interval']
-
-        if 'date' in visit_data['meta']:
-            module_logger.info("Visit data has 'date' present.")
-            visit.date = visit_data['meta']['date']
-
-        if 'clinic_id' in visit_data['meta']:
-            module_logger.info("Visit data has 'clinic_id' present.")
-            visit.clinic_id = visit_data['meta']['clinic_id']
-
-        if 'tags' in visit_data['meta']:
-            module_logger.info("Visit data has 'tags' present.")
-            visit.tags = visit_data['meta']['tags']
+        visit._load_doc(visit_data, require_tags=False)
 
         module_logger.debug("Returning loaded %s.", __name__)
 
         return visit
 
-    def delete(self):
+    def delete(self, session=None):
         """
         Deletes the current object (self) from the OSDF instance. If the object
         has not been saved previously (node ID is not set), then an error message
@@ -418,7 +247,8 @@ class Visit(Base):
         OSDF instance, and this object must be re-saved in order to use it again.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True upon successful deletion, False otherwise.
@@ -431,7 +261,8 @@ class Visit(Base):
 
         visit_node_id = self._id
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         # Assume failure
@@ -450,7 +281,7 @@ class Visit(Base):
         return success
 
     @staticmethod
-    def load(visit_node_id):
+    def load(visit_node_id, session=None):
         """
         Loads the data for the specified input ID from the OSDF instance to this object.
         If the provided ID does not exist, then an error message is provided stating the
@@ -458,49 +289,27 @@ class Visit(Base):
 
         Args:
             visit_node_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A Visit object with all the available OSDF data loaded into it.
         """
         module_logger.debug("In load. Specified ID: %s", visit_node_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         visit_data = session.get_osdf().get_node(visit_node_id)
 
-        module_logger.info("Creating a template %s.", __name__)
-        visit = Visit()
-
-        module_logger.debug("Filling in %s details.", __name__)
-
-        # The attributes commmon to all iHMP nodes
-        visit._set_id(visit_data['id'])
-        visit.version = visit_data['ver']
-        visit.links = visit_data['linkage']
-
-        # The attributes that are particular to Visit objects
-        visit.visit_id = visit_data['meta']['visit_id']
-        visit.visit_number = visit_data['meta']['visit_number']
-        visit.interval = visit_data['meta']['interval']
-
-        if 'date' in visit_data['meta']:
-            module_logger.info("%s data has 'date' present.", __name__)
-            visit.date = visit_data['meta']['date']
-
-        if 'clinic_id' in visit_data['meta']:
-            module_logger.info("%s data has 'clinic_id' present.", __name__)
-            visit.clinic_id = visit_data['meta']['clinic_id']
-
-        if 'tags' in visit_data['meta']:
-            module_logger.info("%s data has 'tags' present.", __name__)
-            visit.tags = visit_data['meta']['tags']
+        visit = Visit.load_visit(visit_data, session=session)
 
         module_logger.debug("Returning loaded Visit.")
 
         return visit
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in the current instance. The JSON form of the current data
         for the instance is validated in the save function. If the data is not valid,
@@ -511,7 +320,8 @@ class Visit(Base):
         version is updated as the data is saved in the OSDF instance.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -519,11 +329,12 @@ class Visit(Base):
         """
         self.logger.debug("In save.")
 
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         success = False
@@ -557,33 +368,31 @@ class Visit(Base):
 
         return success
 
-    def samples(self):
+    def samples(self, ids_only=False, fan_out=None):
         """
         Return iterator of all samples collected during this visit.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         linkage_query = '"{}"[linkage.collected_during]'.format(self.id)
 
-        query = iHMPSession.get_session().get_osdf().oql_query
-
-        for page_no in count(1):
-            res = query(Visit.namespace, linkage_query, page=page_no)
-            res_count = res['result_count']
-
-            for doc in res['results']:
-                yield Sample.load_sample(doc)
+        for doc in oql_docs(Visit.namespace, linkage_query, fan_out=fan_out):
+            yield node_ref(doc) if ids_only else Sample.load_sample(doc)
 
-            res_count -= len(res['results'])
-
-            if res_count < 1:
-                break
-
-    def visit_attributes(self):
+    def visit_attributes(self, ids_only=False, fan_out=None):
         """
         Return an iterator of the visit attributes associated with this
         specific visit.
 
         Args:
-            None
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
 
         Returns:
             A collection of all VisitAttribute objects associated with
@@ -592,16 +401,6 @@ class Visit(Base):
         from VisitAttribute import VisitAttribute
 
         linkage_query = '"{}"[linkage.associated_with]'.format(self.id)
-        query = iHMPSession.get_session().get_osdf().oql_query
-
-        for page_no in count(1):
-            res = query(Visit.namespace, linkage_query, page=page_no)
-            res_count = res['result_count']
-
-            for doc in res['results']:
-                yield VisitAttribute.load_visit_attr(doc)
-
-            res_count -= len(res['results'])
 
-            if res_count < 1:
-                break
+        for doc in oql_docs(Visit.namespace, linkage_query, fan_out=fan_out):
+            yield node_ref(doc) if ids_only else VisitAttribute.load_visit_attr(doc)
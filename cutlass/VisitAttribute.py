@@ -4,6 +4,7 @@ Models the visit attribute object.
 
 import logging
 from cutlass.iHMPSession import iHMPSession
+from cutlass.identity import identity_mapped
 from cutlass.DiseaseMeta import DiseaseMeta
 from cutlass.Base import Base
 from cutlass.Util import enforce_bool, enforce_dict, enforce_float, \
@@ -16,6 +17,16 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+# The type checks of the field types.
+_ENFORCERS = {
+    bool: enforce_bool,
+    dict: enforce_dict,
+    float: enforce_float,
+    int: enforce_int,
+    list: enforce_list,
+    str: enforce_string
+}
+
 class VisitAttribute(Base):
     """
     The class encapsulating the data for an iHMP visit attribute.
@@ -27,6 +38,16 @@ class VisitAttribute(Base):
     """
     namespace = "hmbr"
 
+    # The fields delegated to the DiseaseMeta object, and the names they have
+    # there. Filled in by _bind_fields().
+    _disease_fields = {}
+
+    # The other fields by section of the document, with the keys leading to
+    # their values in the section. Filled in by _bind_fields().
+    _sections = {}
+
+    __slots__ = ("_disease_meta", "_dm_dirty", "_d")
+
     __dict = {
         'comment': [str, None],
         'mother_child': [str, None],
@@ -232,22 +253,13 @@ class VisitAttribute(Base):
     @staticmethod
     def _bindWrite(name, t):
         # pylint: disable=C0111
-        def setXXXX(self, val):
-            func = VisitAttribute._setx
-
-            if t == str:
-                func = enforce_string(func)
-            elif t == int:
-                func = enforce_int(func)
-            elif t == float:
-                func = enforce_float(func)
-            elif t == list:
-                func = enforce_list(func)
-            elif t == bool:
-                func = enforce_bool(func)
-            elif t == dict:
-                func = enforce_dict(func)
+        func = VisitAttribute._setx
+        enforce = _ENFORCERS.get(t)
+
+        if enforce is not None:
+            func = enforce(func)
 
+        def setXXXX(self, val):
             func(self, val, name)
 
         setXXXX.__name__ = name
@@ -261,10 +273,6 @@ class VisitAttribute(Base):
         Args:
             None
         """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
         # An instance of the DieseaseMeta class (composition).
         self._disease_meta = DiseaseMeta()
 
@@ -281,31 +289,61 @@ class VisitAttribute(Base):
             "tags": []
         }
 
-        for propname, spec in VisitAttribute.__dict.iteritems():
-            t = spec[0]
-            x = property(VisitAttribute._bindRead(propname), VisitAttribute._bindWrite(propname, t))
-            setattr(self.__class__, propname, x)
-
         super(VisitAttribute, self).__init__(*args, **kwargs)
 
+    @staticmethod
+    def _bind_fields():
+        """
+        Adds a property, with its type check, to the class for each of the
+        fields. This is done once, when the module is loaded.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        module_logger.debug("In _bind_fields.")
+
+        for (propname, spec) in VisitAttribute.__dict.iteritems():
+            prop = property(VisitAttribute._bindRead(propname),
+                            VisitAttribute._bindWrite(propname, spec[0]))
+            setattr(VisitAttribute, propname, prop)
+
+            (_cls, section) = spec
+
+            if type(_cls) == str and _cls.startswith("DiseaseMeta."):
+                VisitAttribute._disease_fields[propname] = \
+                    _cls.replace("DiseaseMeta.", "", 1)
+
+            if not section:
+                continue
+
+            # Handle any special cases that we need too.
+            if (section == "excercise" or
+                    (propname.startswith('breakfast') or propname.startswith('lunch') or
+                     propname.startswith('dinner'))):
+                keys = tuple(propname.split('_', 1))
+            elif propname == "sixtym_gluc":
+                keys = ('60m_gluc',)
+            elif propname == "thirtym_gluc":
+                keys = ('30m_gluc',)
+            else:
+                keys = (propname,)
+
+            fields = VisitAttribute._sections.setdefault(section, [])
+            fields.append((propname, _cls, keys))
+
     def __setattr__(self, name, value):
-        if name == "_d":
-            self.__dict__[name] = value
-            return
+        dm_name = VisitAttribute._disease_fields.get(name)
 
-        if name not in VisitAttribute.__dict:
+        if dm_name is None:
             super(VisitAttribute, self).__setattr__(name, value)
         else:
-            nameType = self.__dict[name][0]
-            if type(nameType) == str and nameType.startswith("DiseaseMeta."):
-                dm_name = nameType.replace("DiseaseMeta.", "", 1)
-                self.logger.debug("Setting %s %s property.", __name__, dm_name)
-                setattr(self._disease_meta, dm_name, value)
-                self.logger.debug("Setting flag that DiseaseMeta is dirty.")
-                self._dm_dirty = True
-            else:
-                func = getattr(self.__class__, name)
-                func.__set__(self, value)
+            self.logger.debug("Setting %s %s property.", __name__, dm_name)
+            setattr(self._disease_meta, dm_name, value)
+            self.logger.debug("Setting flag that DiseaseMeta is dirty.")
+            self._dm_dirty = True
 
     @staticmethod
     def required_fields():
@@ -322,6 +360,7 @@ class VisitAttribute(Base):
         return ("comment", "study", "tags")
 
     @staticmethod
+    @identity_mapped
     def load_visit_attr(attrib_data):
         """
         Takes the provided JSON string and converts it to a
@@ -349,33 +388,24 @@ class VisitAttribute(Base):
 
         # Handle optional fields
         attrib_metadata = attrib_data['meta']
-        for (propname, spec) in VisitAttribute.__dict.iteritems():
-            _cls = spec[0]
-            section = spec[1]
+        # DiseaseMeta props have no section and are handled separately below.
+        for (section, fields) in VisitAttribute._sections.iteritems():
+            values = attrib_metadata.get(section)
 
-            ## We need to handle any DiseaseMeta props separately here
-            if not section:
+            if not values:
                 continue
 
             module_logger.debug("In section %s", section)
 
-            # Handle any special cases that we need too.
-            if (section == "excercise" or
-                    (propname.startswith('breakfast') or propname.startswith('lunch') or
-                     propname.startswith('dinner'))):
-                (propbase, propkey) = propname.split('_', 1)
+            for (propname, _cls, keys) in fields:
+                propval = values
 
-                propval = attrib_metadata.get(section, {}).get(propbase, {}).get(propkey)
-            elif propname == "sixtym_gluc":
-                propval = attrib_metadata.get(section, {}).get('60m_gluc')
-            elif propname == "thirtym_gluc":
-                propval = attrib_metadata.get(section, {}).get('30m_gluc')
-            else:
-                propval = attrib_metadata.get(section, {}).get(propname)
+                for key in keys:
+                    propval = propval.get(key, {})
 
-            if propval:
-                module_logger.debug("Setting prop %s to %s", propname, propval)
-                setattr(attrib, propname, _cls(propval))
+                if propval:
+                    module_logger.debug("Setting prop %s to %s", propname, propval)
+                    setattr(attrib, propname, _cls(propval))
 
         # If any of the DiseaseMeta props exist we can handle them now
         if attrib_data['meta'].get('disease'):
@@ -383,12 +413,17 @@ class VisitAttribute(Base):
                 attrib.disease_study_status = \
                     attrib_data['meta']['disease'].get('study_disease_status')
 
+            study_disease = attrib_data['meta']['disease'].get('study_disease', {})
+
+            # Only some of the disease fields may be set, so the unset ones
+            # are left alone.
             disease_props = dict(('disease_%s' % key, value) for key, value in
-                                 attrib_data['meta']['disease']['study_disease'].iteritems())
+                                 study_disease.iteritems() if value is not None)
 
             # This will have a double "disease" on it so we need to correct it.
-            disease_props['disease_ontology_id'] = \
-                disease_props.pop('disease_disease_ontology_id')
+            if 'disease_disease_ontology_id' in disease_props:
+                disease_props['disease_ontology_id'] = \
+                    disease_props.pop('disease_disease_ontology_id')
 
             map(lambda key: setattr(attrib, key, disease_props.get(key)), disease_props.keys())
 
@@ -397,13 +432,15 @@ class VisitAttribute(Base):
         return attrib
 
     @staticmethod
-    def load(attrib_id):
+    def load(attrib_id, session=None):
         """
         Loads the data for the node from OSDF to this object. If the provided
         ID does not exist, then an error message is generated.
 
         Args:
             attrib_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A VisitAttribute object with all the available OSDF data loaded
@@ -411,20 +448,22 @@ class VisitAttribute(Base):
         """
         module_logger.debug("In load. Specified ID: %s", attrib_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         data = session.get_osdf().get_node(attrib_id)
-        attrib = VisitAttribute.load_visit_attr(data)
+        attrib = VisitAttribute.load_visit_attr(data, session=session)
 
         return attrib
 
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data against the schema in the OSDF instance.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is a validation error that the
@@ -434,7 +473,8 @@ class VisitAttribute(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -452,7 +492,7 @@ class VisitAttribute(Base):
 
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -460,7 +500,8 @@ class VisitAttribute(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -470,7 +511,8 @@ class VisitAttribute(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, _error_message) = session.get_osdf().validate_node(document)
@@ -622,7 +664,7 @@ class VisitAttribute(Base):
         return doc
 
     @staticmethod
-    def search(query="\"visit_attr\"[node_type]"):
+    def search(query="\"visit_attr\"[node_type]", session=None):
         """
         Searches OSDF for VisitAttribute nodes. Any criteria the user wishes to
         add is provided by the user in the query language specifications
@@ -637,6 +679,8 @@ class VisitAttribute(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          SampleAttribute node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of VisitAttribute objects. It returns an empty
@@ -644,7 +688,8 @@ class VisitAttribute(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"visit_attr"[node_type]':
@@ -660,12 +705,12 @@ class VisitAttribute(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                attrib_result = VisitAttribute.load_visit_attr(result)
+                attrib_result = VisitAttribute.load_visit_attr(result, session=session)
                 result_list.append(attrib_result)
 
         return result_list
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data to OSDF. The JSON form of the object is not valid, then
         the data is not saved. If the instance was saved previously, then the
@@ -676,7 +721,8 @@ class VisitAttribute(Base):
         completed.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -684,11 +730,12 @@ class VisitAttribute(Base):
         """
         self.logger.debug("In save.")
 
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid.")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         success = False
@@ -722,3 +769,5 @@ class VisitAttribute(Base):
                 self.logger.error(msg)
 
         return success
+
+VisitAttribute._bind_fields()
@@ -6,9 +6,10 @@ import json
 import logging
 import os
 import string
-from itertools import count
 from cutlass.iHMPSession import iHMPSession
-from cutlass.Base import Base
+from cutlass.identity import identity_mapped
+from cutlass.Base import Base, node_ref
+from cutlass.fields import Field
 from cutlass.aspera import aspera
 from cutlass.Util import *
 
@@ -19,439 +20,135 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
-class WgsAssembledSeqSet(Base):
+def _check_checksums(checksums):
     """
-    The class encapsulating the Wgs Assembled Sequence Set data for the iHMP.
-    This class contains all the fields required to save a Wgs Assembled
-    Sequence Set object in the OSDF instance.
+    Checks a new WgsAssembledSeqSet checksums.
 
-    Attributes:
-        namespace (str): The namespace this class will use in the OSDF instance
-
-        aspera_server (str): The name of the aspera where files are transferred to
+    Args:
+        checksums (dict): The checksums for the WgsAssembledSeqSet.
 
-        date_format (str): The format of the date
+    Returns:
+        None
     """
-    namespace = "hmbr"
-
-    aspera_server = "aspera.microbiome-bioactives.org"
-
-    def __init__(self, *args, **kwargs):
-        """
-        Constructor for the WgsAssembledSeqSet class. This initializes the
-        fields specific to the WgsAssembledSeqSet class, and inherits from the
-        Base class.
-
-        Args:
-            None
-        """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        # These are common to all objects
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        # These are particular to WgsAssembledSeqSet objects
-        self._assembler = None
-        self._assembly_name = None
-        self._checksums = None
-        self._comment = None
-        self._format = None
-        self._format_doc = None
-        self._sequence_type = None
-        self._size = None
-        self._study = None
-        self._local_file = None
-        self._urls = ['']
-
-        # Optional properties
-        self._date = None
-        self._contact = None
-        self._sop = None
-        self._private_files = None
-
-        super(WgsAssembledSeqSet, self).__init__(*args, **kwargs)
-
-    @property
-    def assembler(self):
-        """
-        str: The software and version used to generate the assembly.
-        """
-        self.logger.debug("In 'assembler' getter.")
-
-        return self._assembler
-
-    @assembler.setter
-    @enforce_string
-    def assembler(self, assembler):
-        """
-        The setter for the assembler.
-
-        Args:
-            assembler (str): The software and version used to generate the
-            assembly.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'assembler' setter.")
-
-        self._assembler = assembler
-
-    @property
-    def assembly_name(self):
-        """
-        str: Get the name of the assembly provided by the submitter.
-        """
-        self.logger.debug("In 'assembly_name' getter.")
-
-        return self._assembly_name
-
-    @assembly_name.setter
-    @enforce_string
-    def assembly_name(self, assembly_name):
-        """
-        Name/version of the assembly provided by the submitter.
-
-        Args:
-            assembly_name (str): Name/version of the assembly provided by the
-            submitter.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'assembly_name' setter.")
-
-        self._assembly_name = assembly_name
-
-    @property
-    def checksums(self):
-        """
-        str: One or more checksums used to ensure file integrity.
-        """
-        self.logger.debug("In 'checksums' getter.")
-
-        return self._checksums
-
-    @checksums.setter
-    @enforce_dict
-    def checksums(self, checksums):
-        """
-        The setter for the WgsAssembledSeqSet checksums.
-
-        Args:
-            checksums (dict): The checksums for the WgsAssembledSeqSet.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'checksums' setter.")
-
-        if 'md5' not in checksums:
-            raise ValueError("Checksum data must contain at least the 'md5' value")
-
-        self._checksums = checksums
-
-    @property
-    def comment(self):
-        """
-        str: Free-text comment.
-        """
-        self.logger.debug("In 'comment' getter.")
-
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for the WgsAssembledSeqSet comment. The comment must be a
-        string.
-
-        Args:
-            comment (str): The new comment to add to the string.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'comment' setter.")
-
-        self._comment = comment
-
-    @property
-    def contact(self):
-        """
-        str: The primary contact.
-        """
-        self.logger.debug("In 'contact' getter.")
-
-        return self._contact
-
-    @contact.setter
-    @enforce_string
-    def contact(self, contact):
-        """
-        The primary contact
-
-        Args:
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'contact' setter.")
-
-        self._contact = contact
-
-    @property
-    def date(self):
-        """
-        str: Date on which the assembly was generated.
-        """
-        self.logger.debug("In 'date' getter.")
-
-        return self._date
-
-    @date.setter
-    @enforce_past_date
-    def date(self, date):
-        """
-        The setter for the date on which the assembly was generated.
-
-        Args:
-            date (str): Date.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'date' setter.")
-
-        self._date = date
-
-    @property
-    def format(self):
-        """
-        str: The file format of the sequence file.
-        """
-        self.logger.debug("In 'format' getter.")
-
-        return self._format
-
-    @format.setter
-    @enforce_string
-    def format(self, format_str):
-        """
-        The setter for the WgsAssembledSeqSet format. This must be either fasta or fastq.
-
-        Args:
-            format_str (str): The new format string for the current object.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format' setter.")
-
-        formats = ["fasta", "fastq"]
-        if format_str in formats:
-            self._format = format_str
-        else:
-            raise Exception("Format must be fasta or fastq only.")
-
-    @property
-    def format_doc(self):
-        """
-        str: URL for documentation of file format.
-        """
-        self.logger.debug("In 'format_doc' getter.")
-
-        return self._format_doc
-
-    @format_doc.setter
-    @enforce_string
-    def format_doc(self, format_doc):
-        """
-        The setter for the WgsAssembledSeqSet format doc.
-
-        Args:
-            format_doc (str): The new format_doc for the current object.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'format_doc' setter.")
-
-        self._format_doc = format_doc
-
-    @property
-    def local_file(self):
-        """
-        str: URL to the local file to upload to the server.
-        """
-        self.logger.debug("In 'local_file' getter.")
-
-        return self._local_file
-
-    @local_file.setter
-    @enforce_string
-    def local_file(self, local_file):
-        """
-        The setter for the WgsAssembledSeqSet local file.
-
-        Args:
-            local_file (str): The URL to the local file that should
-                              be uploaded to the server.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'local_file' setter.")
-
-        self._local_file = local_file
-
-    @property
-    def private_files(self):
-        """
-        bool: Whether this object describes private data that should not
-        be uploaded to the DCC. Defaults to false.
-        """
-        self.logger.debug("In 'private_files' getter.")
-
-        return self._private_files
-
-    @private_files.setter
-    @enforce_bool
-    def private_files(self, private_files):
-        """
-        The setter for the private files flag to denote this object
-        describes data that should not be uploaded to the DCC.
-
-        Args:
-            private_files (bool):
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'private_files' setter.")
-
-        self._private_files = private_files
+    if 'md5' not in checksums:
+        raise ValueError("Checksum data must contain at least the 'md5' value")
 
-    @property
-    def sequence_type(self):
-        """
-        str: Specifies whether the file contains peptide or nucleotide data.
-        """
-        self.logger.debug("In 'sequence_type' getter.")
-
-        return self._sequence_type
-
-    @sequence_type.setter
-    @enforce_string
-    def sequence_type(self, sequence_type):
-        """
-        The setter for the WgsAssembledSeqSet sequence type. This must be either
-        peptide or nucleotide.
-
-        Args:
-            sequence_type (str): The new sequence type.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sequence_type' setter.")
+def _check_format(format_str):
+    """
+    Checks a new WgsAssembledSeqSet format. This must be either fasta or fastq.
 
-        types = ["peptide", "nucleotide"]
+    Args:
+        format_str (str): The new format string for the current object.
 
-        if sequence_type in types:
-            self._sequence_type = sequence_type
-        else:
-            raise Exception("Sequence type must be either peptide or nucleotide")
+    Returns:
+        None
+    """
+    formats = ["fasta", "fastq"]
+    if format_str not in formats:
+        raise Exception("Format must be fasta or fastq only.")
 
-    @property
-    def size(self):
-        """
-        int: The size of the file in bytes.
-        """
-        self.logger.debug("In 'size' getter.")
+def _check_sequence_type(sequence_type):
+    """
+    Checks a new WgsAssembledSeqSet sequence type. This must be either
+    peptide or nucleotide.
 
-        return self._size
+    Args:
+        sequence_type (str): The new sequence type.
 
-    @size.setter
-    @enforce_int
-    def size(self, size):
-        """
-        The setter for the WgsAssembledSeqSet size.
+    Returns:
+        None
+    """
+    types = ["peptide", "nucleotide"]
+    if sequence_type not in types:
+        raise Exception("Sequence type must be either peptide or nucleotide")
 
-        Args:
-            size (int): The size of the sequence set in bytes.
+def _check_size(size):
+    """
+    Checks a new WgsAssembledSeqSet size.
 
-        Returns:
-            None
-        """
-        self.logger.debug("In 'size' setter.")
+    Args:
+        size (int): The size of the sequence set in bytes.
 
-        if size < 0:
-            raise ValueError("The size must be non-negative.")
+    Returns:
+        None
+    """
+    if size < 0:
+        raise ValueError("The size must be non-negative.")
 
-        self._size = size
+def _check_study(study):
+    """
+    Checks a new WgsAssembledSeqSet study. This is restricted to be either
+    preg_preterm, ibd, or prediabetes.
 
-    @property
-    def sop(self):
-        """
-        str: Retrieve the standard operating procedure (SOP).
-        """
-        self.logger.debug("In 'sop' getter.")
+    Args:
+        study (str): The study of the seq set.
 
-        return self._sop
+    Returns:
+        None
+    """
+    studies = ["preg_preterm", "ibd", "prediabetes"]
+    if study not in studies:
+        raise Exception("Not a valid study")
 
-    @sop.setter
-    @enforce_string
-    def sop(self, sop):
-        """
-        The setter for the standard operating procedure.
+class WgsAssembledSeqSet(Base):
+    """
+    The class encapsulating the Wgs Assembled Sequence Set data for the iHMP.
+    This class contains all the fields required to save a Wgs Assembled
+    Sequence Set object in the OSDF instance.
 
-        Args:
-            sop (str): The SOP URL.
+    Attributes:
+        namespace (str): The namespace this class will use in the OSDF instance
 
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sop' setter.")
+        aspera_server (str): The name of the aspera where files are transferred to
 
-        self._sop = sop
+        date_format (str): The format of the date
+    """
+    namespace = "hmbr"
 
-    @property
-    def study(self):
-        """
-        str: One of the 3 studies that are part of the iHMP.
-        """
-        self.logger.debug("In 'study' getter.")
+    aspera_server = "aspera.microbiome-bioactives.org"
 
-        return self._study
+    __slots__ = ("_urls",)
+
+    assembler = Field(str, "The software and version used to generate the "
+                      "assembly.", required=True)
+    assembly_name = Field(str, "Get the name of the assembly provided by the "
+                          "submitter.", required=True)
+    checksums = Field(dict, "One or more checksums used to ensure file "
+                      "integrity.", required=True, check=_check_checksums)
+    comment = Field(str, "Free-text comment.", required=True)
+    contact = Field(str, "The primary contact.")
+    date = Field(doc="str: Date on which the assembly was generated.",
+                 check=check_past_date)
+    format = Field(str, "The file format of the sequence file.", required=True,
+                   check=_check_format)
+    format_doc = Field(str, "URL for documentation of file format.",
+                       required=True)
+    local_file = Field(str, "URL to the local file to upload to the server.",
+                       meta=False)
+    private_files = Field(
+        bool, "Whether this object describes private data that should not be "
+        "uploaded to the DCC. Defaults to false.")
+    sequence_type = Field(
+        str, "Specifies whether the file contains peptide or nucleotide data.",
+        required=True, check=_check_sequence_type)
+    size = Field(int, "The size of the file in bytes.", required=True,
+                 check=_check_size)
+    sop = Field(str, "Retrieve the standard operating procedure (SOP).")
+    study = Field(str, "One of the 3 studies that are part of the iHMP.",
+                  required=True, check=_check_study)
 
-    @study.setter
-    @enforce_string
-    def study(self, study):
+    def __init__(self, *args, **kwargs):
         """
-        The setter for the WgsAssembledSeqSet study. This is restricted to be either
-        preg_preterm, ibd, or prediabetes.
+        Constructor for the WgsAssembledSeqSet class. This initializes the
+        fields specific to the WgsAssembledSeqSet class, and inherits from the
+        Base class.
 
         Args:
-            study (str): The study of the seq set.
-
-        Returns:
             None
         """
-        self.logger.debug("In 'study' setter.")
-
-        studies = ["preg_preterm", "ibd", "prediabetes"]
+        self._urls = ['']
 
-        if study in studies:
-            self._study = study
-        else:
-            raise Exception("Not a valid study")
+        super(WgsAssembledSeqSet, self).__init__(*args, **kwargs)
 
     @property
     def urls(self):
@@ -493,59 +190,14 @@ class WgsAssembledSeqSet(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [WgsAssembledSeqSet.namespace]
-            },
-            'linkage': self._links,
-            'ns': WgsAssembledSeqSet.namespace,
-            'node_type': 'wgs_assembled_seq_set',
-            'meta': {
-                "assembler": self._assembler,
-                "assembly_name": self._assembly_name,
-                "checksums": self._checksums,
-                "comment": self._comment,
-                "format": self._format,
-                "format_doc": self._format_doc,
-                "sequence_type": self.sequence_type,
-                "size": self._size,
-                "study": self._study,
-                "urls": self._urls,
-                "subtype": self._study,
-                'tags': self._tags
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("Object has the OSDF id set.")
-            doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("Object has the OSDF version set.")
-            doc['ver'] = self._version
-
-        # Handle optional properties
-        if self._contact is not None:
-            self.logger.debug("Object has the contact set.")
-            doc['meta']['contact'] = self._contact
-
-        if self._date is not None:
-            self.logger.debug("Object has the date set.")
-            doc['meta']['date'] = self._date
-
-        if self._sop is not None:
-            self.logger.debug("Object has the sop set.")
-            doc['meta']['sop'] = self._sop
-
-        if self._private_files is not None:
-            self.logger.debug("Object has the 'private_files' property set.")
-            doc['meta']['private_files'] = self._private_files
+        doc = super(WgsAssembledSeqSet, self)._get_raw_doc()
+        doc['meta']['urls'] = self._urls
+        doc['meta']['subtype'] = self._study
 
         return doc
 
     @staticmethod
-    def search(query="\"wgs_assembled_seq_set\"[node_type]"):
+    def search(query="\"wgs_assembled_seq_set\"[node_type]", session=None):
         """
         Searches the OSDF database through all WgsAssembledSeqSet node types. Any
         criteria the user wishes to add is provided by the user in the query language
@@ -560,6 +212,8 @@ class WgsAssembledSeqSet(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          WgsAssembledSeqSet node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of WgsAssembledSeqSet objects. It returns an empty list if
@@ -567,7 +221,8 @@ class WgsAssembledSeqSet(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"wgs_assembled_seq_set"[node_type]':
@@ -585,12 +240,14 @@ class WgsAssembledSeqSet(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                wgs_result = WgsAssembledSeqSet.load_wgsAssembledSeqSet(result)
+                wgs_result = WgsAssembledSeqSet.load_wgsAssembledSeqSet(
+                    result, session=session)
                 result_list.append(wgs_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_wgsAssembledSeqSet(seq_set_data):
         """
         Takes the provided JSON string and converts it to a WgsAssembledSeqSet
@@ -607,42 +264,14 @@ class WgsAssembledSeqSet(Base):
 
         module_logger.debug("Filling in %s details.", __name__)
 
-        # The attributes commmon to all iHMP nodes
-        seq_set._set_id(seq_set_data['id'])
-        seq_set.version = seq_set_data['ver']
-        seq_set.links = seq_set_data['linkage']
-
-        # The attributes that are particular to WgsAssembledSeqSet documents
-        seq_set.assembler = seq_set_data['meta']['assembler']
-        seq_set.assembly_name = seq_set_data['meta']['assembly_name']
-        seq_set.checksums = seq_set_data['meta']['checksums']
-        seq_set.comment = seq_set_data['meta']['comment']
-        seq_set.format = seq_set_data['meta']['format']
-        seq_set.format_doc = seq_set_data['meta']['format_doc']
-        seq_set.sequence_type = seq_set_data['meta']['sequence_type']
-        seq_set.size = seq_set_data['meta']['size']
-        seq_set.tags = seq_set_data['meta']['tags']
-        seq_set._study = seq_set_data['meta']['study']
+        seq_set._load_doc(seq_set_data)
         seq_set._urls = seq_set_data['meta']['urls']
 
-        # Optional fields
-        if 'contact' in seq_set_data['meta']:
-            seq_set.contact = seq_set_data['meta']['contact']
-
-        if 'date' in seq_set_data['meta']:
-            seq_set.date = seq_set_data['meta']['date']
-
-        if 'sop' in seq_set_data['meta']:
-            seq_set.sop = seq_set_data['meta']['sop']
-
-        if 'private_files' in seq_set_data['meta']:
-            seq_set.private_files = seq_set_data['meta']['private_files']
-
         module_logger.debug("Returning loaded %s", __name__)
         return seq_set
 
     @staticmethod
-    def load(seq_set_id):
+    def load(seq_set_id, session=None):
         """
         Loads the data for the specified input ID from the OSDF instance to
         this object.  If the provided ID does not exist, then an error message
@@ -650,29 +279,34 @@ class WgsAssembledSeqSet(Base):
 
         Args:
             seq_set_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A WgsAssembledSeqSet object with all the available OSDF data loaded into it.
         """
         module_logger.debug("In load. Specified ID: %s", seq_set_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         seq_set_data = session.get_osdf().get_node(seq_set_id)
-        seq_set = WgsAssembledSeqSet.load_wgsAssembledSeqSet(seq_set_data)
+        seq_set = WgsAssembledSeqSet.load_wgsAssembledSeqSet(
+            seq_set_data, session=session)
 
         module_logger.debug("Returning loaded %s", __name__)
 
         return seq_set
 
-    def validate(self):
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -682,7 +316,8 @@ class WgsAssembledSeqSet(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -709,7 +344,7 @@ class WgsAssembledSeqSet(Base):
 
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -717,7 +352,8 @@ class WgsAssembledSeqSet(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -726,7 +362,7 @@ class WgsAssembledSeqSet(Base):
         """
         self.logger.debug("In is_valid.")
 
-        problems = self.validate()
+        problems = self.validate(session=session)
 
         valid = True
         if len(problems):
@@ -737,10 +373,11 @@ class WgsAssembledSeqSet(Base):
 
         return valid
 
-    def _upload_data(self):
+    def _upload_data(self, session=None):
         self.logger.debug("In _upload_data.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         study = self._study
 
         study2dir = {
@@ -778,7 +415,7 @@ class WgsAssembledSeqSet(Base):
         else:
             self._urls = ["fasp://" + WgsAssembledSeqSet.aspera_server + remote_path]
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in the current instance. The JSON form of the current
         data for the instance is validated in the save function. If the data is
@@ -790,7 +427,8 @@ class WgsAssembledSeqSet(Base):
         the OSDF instance.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -801,11 +439,12 @@ class WgsAssembledSeqSet(Base):
         # If node previously saved, use edit_node instead since ID
         # is given (an update in a way)
         # can also use get_node to check if the node already exists
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         success = False
@@ -814,7 +453,7 @@ class WgsAssembledSeqSet(Base):
             self._urls = ["<private>"]
         else:
             try:
-                self._upload_data()
+                self._upload_data(session=session)
             except Exception as upload_exception:
                 self.logger.exception(upload_exception)
                 # Don't bother continuing...
@@ -873,70 +512,69 @@ class WgsAssembledSeqSet(Base):
         self.logger.debug("Returning %s", str(success))
         return success
 
-    def abundance_matrices(self):
+    def abundance_matrices(self, ids_only=False, fan_out=None):
         """
         Returns an iterator of all AbundanceMatrix nodes connected to this
         object.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         self.logger.debug("In abundance_matrices().")
 
-        linkage_query = '"abundance_matrix"[node_type] && ' + \
-                        '"{}"[linkage.computed_from]'.format(self.id)
-
-        query = iHMPSession.get_session().get_osdf().oql_query
-
         from cutlass.AbundanceMatrix import AbundanceMatrix
 
-        for page_no in count(1):
-            res = query(WgsAssembledSeqSet.namespace, linkage_query,
-                        page=page_no)
-            res_count = res['result_count']
+        for doc in self._linked_docs("computed_from", ("abundance_matrix",), fan_out=fan_out):
+            yield node_ref(doc) if ids_only else AbundanceMatrix.load_abundance_matrix(doc)
 
-            for doc in res['results']:
-                yield AbundanceMatrix.load_abundance_matrix(doc)
-
-            res_count -= len(res['results'])
-
-            if res_count < 1:
-                break
-
-    def annotations(self):
+    def annotations(self, ids_only=False, fan_out=None):
         """
         Returns an iterator of all Annotation nodes connected to this
         object.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         self.logger.debug("In annotations().")
 
-        linkage_query = '"annotation"[node_type] && "{}"[linkage.computed_from]'.format(self.id)
-
-        query = iHMPSession.get_session().get_osdf().oql_query
-
         from cutlass.Annotation import Annotation
 
-        for page_no in count(1):
-            res = query(WgsAssembledSeqSet.namespace, linkage_query,
-                        page=page_no)
-            res_count = res['result_count']
-
-            for doc in res['results']:
-                yield Annotation.load_annotation(doc)
+        for doc in self._linked_docs("computed_from", ("annotation",), fan_out=fan_out):
+            yield node_ref(doc) if ids_only else Annotation.load_annotation(doc)
 
-            res_count -= len(res['results'])
-
-            if res_count < 1:
-                break
-
-    def derivations(self):
+    def derivations(self, ids_only=False, fan_out=None):
         """
         Returns an iterator of all nodes connected to this
         object.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         self.logger.debug("In derivations().")
 
+        from cutlass.AbundanceMatrix import AbundanceMatrix
+        from cutlass.Annotation import Annotation
+
+        # Both node types share the same linkage, so retrieve them at once.
+        docs = list(self._linked_docs("computed_from",
+                                      ("annotation", "abundance_matrix"),
+                                      fan_out=fan_out))
+
         self.logger.debug("Fetching annotations.")
-        for annot in self.annotations():
-            yield annot
+        for doc in docs:
+            if doc['node_type'] == "annotation":
+                yield node_ref(doc) if ids_only else Annotation.load_annotation(doc)
 
         self.logger.debug("Fetching abundance matrices.")
-        for abundance_matrix in self.abundance_matrices():
-            yield abundance_matrix
+        for doc in docs:
+            if doc['node_type'] == "abundance_matrix":
+                yield node_ref(doc) if ids_only else AbundanceMatrix.load_abundance_matrix(doc)
@@ -3,10 +3,11 @@ Models the WGS DNA prep object.
 """
 
 import logging
-from itertools import count
 from cutlass.iHMPSession import iHMPSession
+from cutlass.identity import identity_mapped
 from cutlass.mims import MIMS, MimsException
-from cutlass.Base import Base
+from cutlass.Base import Base, node_ref
+from cutlass.fields import Field
 from cutlass.Util import *
 
 # pylint: disable=W0703, C1801
@@ -16,6 +17,63 @@ module_logger = logging.getLogger(__name__)
 # Add a NullHandler for the case if no logging is configured by the application
 module_logger.addHandler(logging.NullHandler())
 
+def _check_frag_size(frag_size):
+    """
+    Checks a new WgsDnaPrep fragment size. The size must be an
+    integer, and greater than 0.
+
+    Args:
+        frag_size (int): The new fragment size.
+
+    Returns:
+        None
+    """
+    if frag_size < 0:
+        raise ValueError("Invalid frag_size. Must be non-negative.")
+
+def _check_mims(mims):
+    """
+    Checks a new WgsDnaPrep MIMS. The provided dictionary
+    must validate based on the MIMS class.
+
+    Args:
+        mims (dict): A MIMS dictionary.
+
+    Returns:
+        None
+    """
+    valid_dictionary = MIMS.check_dict(mims)
+    if not valid_dictionary:
+        raise MimsException("Invalid MIMS data detected.")
+
+def _check_storage_duration(storage_duration):
+    """
+    Checks a new WgsDnaPrep storage duration. The duration must
+    be an integer, and greater than 0.
+
+    Args:
+        storage_duration (int): The new storage duration.
+
+    Returns:
+        None
+    """
+    if storage_duration < 0:
+        raise ValueError("Invalid storage_duration. Must be non-negative.")
+
+def _check_srs_id(srs_id):
+    """
+    Checks a new WgsDnaPrep SRS ID. The ID must be a string, and
+    greater than 3 characters long.
+
+    Args:
+        srs_id (str): The new SRS ID.
+
+    Returns:
+        None
+    """
+    if len(srs_id) < 3:
+        raise Exception("SRS ID is too short, must be more than 3 characters.")
+
 class WgsDnaPrep(Base):
     """
     The class encapsulates an iHMP WGS DNA Prep for iHMP.
@@ -27,45 +85,43 @@ class WgsDnaPrep(Base):
     """
     namespace = "hmbr"
 
-    def __init__(self, *args, **kwargs):
-        """
-        Constructor for the WgsDnaPrep class. This initializes the fields specific
-        to the WgsDnaPrep class, and inherits from the Base class.
-
-        Args:
-            None
-        """
-        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
-
-        self.logger.addHandler(logging.NullHandler())
-
-        self._id = None
-        self._version = None
-        self._links = {}
-        self._tags = []
-
-        self._comment = None
-        self._frag_size = None
-        self._lib_layout = None
-        self._lib_selection = None
-        self._mims = None
-        self._ncbi_taxon_id = None
-        self._prep_id = None
-        self._sequencing_center = None
-        self._sequencing_contact = None
-        self._srs_id = None
-        self._storage_duration = None
-
-        super(WgsDnaPrep, self).__init__(*args, **kwargs)
-
-    def validate(self):
+    # The node types of the sequence sets sequenced from a prep.
+    _seq_set_types = ("wgs_raw_seq_set", "viral_seq_set",
+                      "microb_transcriptomics_raw_seq_set")
+
+    comment = Field(str, "Free-text comment.", required=True)
+    frag_size = Field(int, "Target library fragment size after shearing.",
+                      check=_check_frag_size)
+    lib_layout = Field(
+        str, "Specification of the layout: fragment/paired, and if paired, "
+        "then nominal insert size and standard deviation.", required=True)
+    lib_selection = Field(
+        str, "A controlled vocabulary of terms describing selection or "
+        "reduction method used in library construction. Terms used by "
+        "TCGA include (random, hybrid selection)", required=True)
+    mims = Field(dict, "mimarks: Genomic Standards Consortium MIMS fields.",
+                 required=True, check=_check_mims)
+    ncbi_taxon_id = Field(str, "NCBI taxon id.", required=True)
+    prep_id = Field(str, "Nucleic Acid Prep ID.", required=True)
+    sequencing_center = Field(str, "The center responsible for generating the "
+                              "16S DNA Prep.", required=True)
+    sequencing_contact = Field(str, "Name and email of the primary contact at "
+                               "the sequencing center.", required=True)
+    storage_duration = Field(
+        int, "Duration for which sample was stored in days.", required=True,
+        check=_check_storage_duration)
+    srs_id = Field(str, "NCBI Sequence Read Archive sample ID of the form "
+                   "SRS012345.", check=_check_srs_id)
+
+    def validate(self, session=None):
         """
         Validates the current object's data/JSON against the current
         schema in the OSDF instance for that specific object. All required
         fields for that specific object must be present.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A list of strings, where each string is the error that the
@@ -75,7 +131,8 @@ class WgsDnaPrep(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, error_message) = session.get_osdf().validate_node(document)
@@ -92,7 +149,7 @@ class WgsDnaPrep(Base):
         self.logger.debug("Number of validation problems: %s.", len(problems))
         return problems
 
-    def is_valid(self):
+    def is_valid(self, session=None):
         """
         Validates the current object's data/JSON against the current schema
         in the OSDF instance for the specific object. However, unlike
@@ -100,7 +157,8 @@ class WgsDnaPrep(Base):
         it states if the validation was successful or not.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             True if the data validates, False if the current state of
@@ -110,7 +168,8 @@ class WgsDnaPrep(Base):
 
         document = self._get_raw_doc()
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         (valid, _error_message) = session.get_osdf().validate_node(document)
@@ -123,304 +182,6 @@ class WgsDnaPrep(Base):
 
         return valid
 
-    @property
-    def comment(self):
-        """
-        str: Free-text comment.
-        """
-        self.logger.debug("In 'comment' getter.")
-
-        return self._comment
-
-    @comment.setter
-    @enforce_string
-    def comment(self, comment):
-        """
-        The setter for the comment. The comment must be a string.
-
-        Args:
-            comment (str): The new comment to add to the string.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'comment' setter.")
-
-        self._comment = comment
-
-    @property
-    def frag_size(self):
-        """
-        int: Target library fragment size after shearing.
-        """
-        self.logger.debug("In 'frag_size' getter.")
-
-        return self._frag_size
-
-    @frag_size.setter
-    @enforce_int
-    def frag_size(self, frag_size):
-        """
-        The setter for the WgsDnaPrep fragment size. The size must be an
-        integer, and greater than 0.
-
-        Args:
-            frag_size (int): The new fragment size.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'frag_size' setter.")
-
-        if frag_size < 0:
-            raise ValueError("Invalid frag_size. Must be non-negative.")
-
-        self._frag_size = frag_size
-
-    @property
-    def lib_layout(self):
-        """
-        str: Specification of the layout: fragment/paired, and if paired,
-             then nominal insert size and standard deviation.
-        """
-        self.logger.debug("In 'lib_layout' getter.")
-
-        return self._lib_layout
-
-    @lib_layout.setter
-    @enforce_string
-    def lib_layout(self, lib_layout):
-        """
-        The setter for the lib layout.
-
-        Args:
-            lib_layout (str): The new lib layout.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'lib_layout' setter.")
-
-        self._lib_layout = lib_layout
-
-    @property
-    def lib_selection(self):
-        """
-        str: A controlled vocabulary of terms describing selection or reduction
-             method used in library construction. Terms used by TCGA include
-             (random, hybrid selection)
-        """
-        self.logger.debug("In 'lib_selection' getter.")
-
-        return self._lib_selection
-
-    @lib_selection.setter
-    @enforce_string
-    def lib_selection(self, lib_selection):
-        """
-        The setter for the WgsDnaPrep lib selection.
-
-        Args:
-            lib_selection (str): The new lib selection.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'lib_selection' setter.")
-
-        self._lib_selection = lib_selection
-
-    @property
-    def mims(self):
-        """
-        mimarks: Genomic Standards Consortium MIMS fields.
-        """
-        self.logger.debug("In mims getter.")
-
-        return self._mims
-
-    @mims.setter
-    @enforce_dict
-    def mims(self, mims):
-        """
-        The setter for the WgsDnaPrep MIMS. The provided dictionary
-        must validate based on the MIMS class.
-
-        Args:
-            mims (dict): A MIMS dictionary.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In mims setter.")
-
-        valid_dictionary = MIMS.check_dict(mims)
-
-        # Validate the incoming MIMS data
-        if valid_dictionary:
-            self.logger.debug("MIMS data seems correct.")
-            self._mims = mims
-        else:
-            raise MimsException("Invalid MIMS data detected.")
-
-    @property
-    def ncbi_taxon_id(self):
-        """
-        str: NCBI taxon id.
-        """
-        self.logger.debug("In 'ncbi_taxon_id' getter.")
-
-        return self._ncbi_taxon_id
-
-    @ncbi_taxon_id.setter
-    @enforce_string
-    def ncbi_taxon_id(self, ncbi_taxon_id):
-        """
-        The setter for the WgsDnaPrep NCBI Taxon ID.
-
-        Args:
-            ncbi_taxon_id (str): The new NCBI Taxon ID.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'ncbi_taxon_id' setter.")
-
-        self._ncbi_taxon_id = ncbi_taxon_id
-
-    @property
-    def prep_id(self):
-        """
-        str: Nucleic Acid Prep ID.
-        """
-        self.logger.debug("In 'prep_id' getter.")
-
-        return self._prep_id
-
-    @prep_id.setter
-    @enforce_string
-    def prep_id(self, prep_id):
-        """
-        The setter for the WgsDnaPrep Prep ID.
-
-        Args:
-            prep_id (str): The new Prep ID.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'prep_id' setter.")
-
-        self._prep_id = prep_id
-
-    @property
-    def sequencing_center(self):
-        """
-        str: The center responsible for generating the 16S DNA Prep.
-        """
-        self.logger.debug("In 'sequencing_center' getter.")
-
-        return self._sequencing_center
-
-    @sequencing_center.setter
-    @enforce_string
-    def sequencing_center(self, sequencing_center):
-        """
-        The setter for the WgsDnaPrep sequencing center.
-
-        Args:
-            sequencing_center (str): The new sequencing center.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sequencing_center' setter.")
-
-        self._sequencing_center = sequencing_center
-
-    @property
-    def sequencing_contact(self):
-        """
-        str: Name and email of the primary contact at the sequencing center.
-        """
-        self.logger.debug("In 'sequencing_contact' getter.")
-
-        return self._sequencing_contact
-
-    @sequencing_contact.setter
-    @enforce_string
-    def sequencing_contact(self, sequencing_contact):
-        """
-        The setter for the WgsDnaPrep sequencing_contact.
-
-        Args:
-            sequencing_contact (str): The new sequencing_contact.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'sequencing_contact' setter.")
-
-        self._sequencing_contact = sequencing_contact
-
-    @property
-    def storage_duration(self):
-        """
-        int: Duration for which sample was stored in days.
-        """
-        self.logger.debug("In 'storage_duration' getter.")
-
-        return self._storage_duration
-
-    @storage_duration.setter
-    @enforce_int
-    def storage_duration(self, storage_duration):
-        """
-        The setter for the WgsDnaPrep storage duration. The duration must
-        be an integer, and greater than 0.
-
-        Args:
-            storage_duration (int): The new storage duration.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'storage_duration' setter.")
-
-        if storage_duration < 0:
-            raise ValueError("Invalid storage_duration. Must be non-negative.")
-
-        self._storage_duration = storage_duration
-
-    @property
-    def srs_id(self):
-        """
-        str: NCBI Sequence Read Archive sample ID of the form SRS012345.
-        """
-        self.logger.debug("In 'srs_id' getter.")
-
-        return self._srs_id
-
-    @srs_id.setter
-    @enforce_string
-    def srs_id(self, srs_id):
-        """
-        The setter for the WgsDnaPrep SRS ID. The ID must be a string, and
-        greater than 3 characters long.
-
-        Args:
-            srs_id (str): The new SRS ID.
-
-        Returns:
-            None
-        """
-        self.logger.debug("In 'srs_id' setter.")
-
-        if len(srs_id) < 3:
-            raise Exception("SRS ID is too short, must be more than 3 characters.")
-
-        self._srs_id = srs_id
-
     @staticmethod
     def required_fields():
         """
@@ -452,49 +213,13 @@ class WgsDnaPrep(Base):
         """
         self.logger.debug("In _get_raw_doc.")
 
-        wgs_doc = {
-            'acl': {
-                'read': ['all'],
-                'write': [WgsDnaPrep.namespace]
-            },
-            'linkage': self._links,
-            'ns': WgsDnaPrep.namespace,
-            'node_type': 'wgs_dna_prep',
-            'meta': {
-                'comment': self._comment,
-                'lib_layout': self._lib_layout,
-                'lib_selection': self._lib_selection,
-                'mims': self._mims,
-                'ncbi_taxon_id': self._ncbi_taxon_id,
-                'prep_id': self._prep_id,
-                'sequencing_center': self._sequencing_center,
-                'sequencing_contact': self._sequencing_contact,
-                'storage_duration': self._storage_duration,
-                'subtype': "wgs",
-                'tags': self._tags
-            }
-        }
-
-        if self._id is not None:
-            self.logger.debug("%s object has the OSDF id set.", __name__)
-            wgs_doc['id'] = self._id
-
-        if self._version is not None:
-            self.logger.debug("%s object has the OSDF version set.", __name__)
-            wgs_doc['ver'] = self._version
-
-        if self._frag_size is not None:
-            self.logger.debug("%s object has the frag_size set.", __name__)
-            wgs_doc['meta']['frag_size'] = self._frag_size
-
-        if self._srs_id is not None:
-            self.logger.debug("%s object has the srs_id set.", __name__)
-            wgs_doc['meta']['srs_id'] = self._srs_id
+        wgs_doc = super(WgsDnaPrep, self)._get_raw_doc()
+        wgs_doc['meta']['subtype'] = "wgs"
 
         return wgs_doc
 
     @staticmethod
-    def search(query="\"wgs_dna_prep\"[node_type]"):
+    def search(query="\"wgs_dna_prep\"[node_type]", session=None):
         """
         Searches the OSDF database through all WgsDnaPrep node types. Any
         criteria the user wishes to add is provided by the user in the query
@@ -509,6 +234,8 @@ class WgsDnaPrep(Base):
         Args:
             query (str): The query for the OSDF framework. Defaults to the
                          WgsDnaPrep node type.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             Returns an array of WgsDnaPrep objects. It returns an empty list if
@@ -516,7 +243,8 @@ class WgsDnaPrep(Base):
         """
         module_logger.debug("In search.")
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
 
         if query != '"wgs_dna_prep"[node_type]':
@@ -532,12 +260,13 @@ class WgsDnaPrep(Base):
 
         if len(all_results) > 0:
             for result in all_results:
-                prep_result = WgsDnaPrep.load_wgsDnaPrep(result)
+                prep_result = WgsDnaPrep.load_wgsDnaPrep(result, session=session)
                 result_list.append(prep_result)
 
         return result_list
 
     @staticmethod
+    @identity_mapped
     def load_wgsDnaPrep(prep_data):
         """
         Takes the provided JSON string and converts it to a WgsDnaPrep object
@@ -553,37 +282,14 @@ class WgsDnaPrep(Base):
 
         module_logger.debug("Filling in %s details.", __name__)
 
-        # The attributes commmon to all iHMP nodes
-        prep._set_id(prep_data['id'])
-        prep.version = prep_data['ver']
-        prep.links = prep_data['linkage']
-
-        # The attributes that are particular to WgsDnaPrep documents
-        prep.comment = prep_data['meta']['comment']
-        prep.lib_layout = prep_data['meta']['lib_layout']
-        prep.lib_selection = prep_data['meta']['lib_selection']
-        prep.mims = prep_data['meta']['mims']
-        prep.ncbi_taxon_id = prep_data['meta']['ncbi_taxon_id']
-        prep.prep_id = prep_data['meta']['prep_id']
-        prep.sequencing_center = prep_data['meta']['sequencing_center']
-        prep.sequencing_contact = prep_data['meta']['sequencing_contact']
-        prep.storage_duration = prep_data['meta']['storage_duration']
-        prep.tags = prep_data['meta']['tags']
-
-        if 'frag_size' in prep_data['meta']:
-            module_logger.info(__name__ + " data has 'frag_size' present.")
-            prep.frag_size = prep_data['meta']['frag_size']
-
-        if 'srs_id' in prep_data['meta']:
-            module_logger.info(__name__ + " data has 'srs_id' present.")
-            prep.srs_id = prep_data['meta']['srs_id']
+        prep._load_doc(prep_data)
 
         module_logger.debug("Returning loaded %s", __name__)
 
         return prep
 
     @staticmethod
-    def load(prep_id):
+    def load(prep_id, session=None):
         """
         Loads the data for the specified input ID from the OSDF instance to
         this object.  If the provided ID does not exist, then an error message
@@ -591,21 +297,24 @@ class WgsDnaPrep(Base):
 
         Args:
             prep_id (str): The OSDF ID for the document to load.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns:
             A WgsDnaPrep object with all the available OSDF data loaded into it.
         """
         module_logger.debug("In load. Specified ID: %s", prep_id)
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         module_logger.info("Got iHMP session.")
         prep_data = session.get_osdf().get_node(prep_id)
-        prep = WgsDnaPrep.load_wgsDnaPrep(prep_data)
+        prep = WgsDnaPrep.load_wgsDnaPrep(prep_data, session=session)
 
         module_logger.debug("Returning loaded %s.", __name__)
         return prep
 
-    def save(self):
+    def save(self, session=None):
         """
         Saves the data in the current instance. The JSON form of the current
         data for the instance is validated in the save function. If the data is
@@ -616,7 +325,8 @@ class WgsDnaPrep(Base):
         OSDF. Also, the version is updated as the data is saved in OSDF.
 
         Args:
-            None
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
 
         Returns;
             True if successful, False otherwise.
@@ -624,11 +334,12 @@ class WgsDnaPrep(Base):
         """
         self.logger.debug("In save.")
 
-        if not self.is_valid():
+        if not self.is_valid(session=session):
             self.logger.error("Cannot save, data is invalid")
             return False
 
-        session = iHMPSession.get_session()
+        if session is None:
+            session = iHMPSession.get_session()
         self.logger.info("Got iHMP session.")
 
         success = False
@@ -671,33 +382,28 @@ class WgsDnaPrep(Base):
 
         return success
 
-    def child_seq_sets(self):
+    def child_seq_sets(self, ids_only=False, fan_out=None):
         """
         Return iterator of all sequence sets descended from this prep.
+
+        Args:
+            ids_only (bool): Whether to yield NodeRef tuples instead of
+                             building the objects.
+            fan_out (int): How many pages may be requested at once.
+                           Defaults to the number of session workers.
         """
         self.logger.debug("In child_seq_sets.")
 
-        linkage_query = '"{}"[linkage.sequenced_from]'.format(self.id)
-
         from cutlass.WgsRawSeqSet import WgsRawSeqSet
         from cutlass.MicrobTranscriptomicsRawSeqSet import MicrobTranscriptomicsRawSeqSet
         from cutlass.ViralSeqSet import ViralSeqSet
 
-        query = iHMPSession.get_session().get_osdf().oql_query
-
-        for page_no in count(1):
-            res = query(WgsDnaPrep.namespace, linkage_query, page=page_no)
-            res_count = res['result_count']
-
-            for doc in res['results']:
-                if doc['node_type'] == "wgs_raw_seq_set":
-                    yield WgsRawSeqSet.load_wgsRawSeqSet(doc)
-                elif doc['node_type'] == "viral_seq_set":
-                    yield ViralSeqSet.load_viral_seq_set(doc)
-                elif doc['node_type'] == "microb_transcriptomics_raw_seq_set":
-                    yield MicrobTranscriptomicsRawSeqSet.load_microb_transcriptomics_raw_seq_set(doc)
-
-            res_count -= len(res['results'])
-
-            if res_count < 1:
-                break
+        for doc in self._linked_docs("sequenced_from", WgsDnaPrep._seq_set_types, fan_out=fan_out):
+            if ids_only:
+                yield node_ref(doc)
+            elif doc['node_type'] == "wgs_raw_seq_set":
+                yield WgsRawSeqSet.load_wgsRawSeqSet(doc)
+            elif doc['node_type'] == "viral_seq_set":
+                yield ViralSeqSet.load_viral_seq_set(doc)
+            elif doc['node_type'] == "microb_transcriptomics_raw_seq_set":
+                yield MicrobTranscriptomicsRawSeqSet.load_microb_transcriptomics_raw_seq_set(doc)
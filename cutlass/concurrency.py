@@ -0,0 +1,318 @@
+"""
+The concurrency module provides a small thread based worker pool and the
+Future objects it hands back. An iHMPSession owns one pool, which is used
+to run OSDF requests in the background so that many of them can be in
+flight at once.
+"""
+
+import logging
+import sys
+import threading
+import traceback
+from Queue import Queue
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+class CancelledError(Exception):
+    """
+    Raised when the result of a Future that was cancelled is requested.
+    """
+    pass
+
+class Future(object):
+    """
+    The eventual result of a call submitted to a WorkerPool. If the result
+    is requested before a worker has picked the call up, it is run right
+    away in the requesting thread, so waiting on a Future from inside
+    another pooled call can never deadlock the pool.
+    """
+    _PENDING = 0
+    _RUNNING = 1
+    _FINISHED = 2
+    _CANCELLED = 3
+
+    def __init__(self, func, args=None, kwargs=None):
+        self._func = func
+        self._args = args or ()
+        self._kwargs = kwargs or {}
+
+        self._cond = threading.Condition()
+        self._state = Future._PENDING
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+
+    def _run(self):
+        with self._cond:
+            if self._state != Future._PENDING:
+                return
+
+            self._state = Future._RUNNING
+
+        result = None
+        exception = None
+
+        try:
+            result = self._func(*self._args, **self._kwargs)
+        except Exception as call_exception:
+            module_logger.debug("Call raised an exception: %s",
+                                "".join(traceback.format_exception(*sys.exc_info())))
+            exception = call_exception
+
+        with self._cond:
+            self._result = result
+            self._exception = exception
+            self._state = Future._FINISHED
+            self._cond.notify_all()
+            callbacks = self._callbacks
+            self._callbacks = []
+
+        self._invoke_callbacks(callbacks)
+
+    def _invoke_callbacks(self, callbacks):
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as callback_exception:
+                module_logger.exception(callback_exception)
+
+    def _wait(self, timeout):
+        self._run()
+
+        with self._cond:
+            if self._state not in (Future._FINISHED, Future._CANCELLED):
+                self._cond.wait(timeout)
+
+            if self._state == Future._CANCELLED:
+                raise CancelledError()
+
+            if self._state != Future._FINISHED:
+                raise RuntimeError("Timed out waiting for the result.")
+
+    def add_done_callback(self, callback):
+        """
+        Registers a callable to be called with this Future once it has
+        finished. If it has already finished, the callable is called at once.
+
+        Args:
+            callback (callable): Called with the Future as its only argument.
+
+        Returns:
+            None
+        """
+        with self._cond:
+            if self._state in (Future._PENDING, Future._RUNNING):
+                self._callbacks.append(callback)
+                return
+
+        self._invoke_callbacks([callback])
+
+    def cancel(self):
+        """
+        Attempts to cancel the call. Calls that are already running or
+        finished cannot be cancelled.
+
+        Args:
+            None
+
+        Returns:
+            True if the call was cancelled, False otherwise.
+        """
+        with self._cond:
+            if self._state != Future._PENDING:
+                return self._state == Future._CANCELLED
+
+            self._state = Future._CANCELLED
+            self._cond.notify_all()
+            callbacks = self._callbacks
+            self._callbacks = []
+
+        self._invoke_callbacks(callbacks)
+
+        return True
+
+    def cancelled(self):
+        """ Returns True if the call was cancelled. """
+        return self._state == Future._CANCELLED
+
+    def done(self):
+        """ Returns True if the call has finished or was cancelled. """
+        return self._state in (Future._FINISHED, Future._CANCELLED)
+
+    def exception(self, timeout=None):
+        """
+        Waits for the call to finish and returns the exception it raised,
+        or None if it completed normally.
+
+        Args:
+            timeout (float): How long to wait, in seconds. None waits forever.
+
+        Returns:
+            The exception raised by the call, or None.
+        """
+        self._wait(timeout)
+
+        return self._exception
+
+    def result(self, timeout=None):
+        """
+        Waits for the call to finish and returns its return value. If the
+        call raised an exception, the same exception is raised here.
+
+        Args:
+            timeout (float): How long to wait, in seconds. None waits forever.
+
+        Returns:
+            The return value of the call.
+        """
+        self._wait(timeout)
+
+        if self._exception is not None:
+            raise self._exception
+
+        return self._result
+
+
+class WorkerPool(object):
+    """
+    A pool of daemon worker threads that run submitted calls. Threads are
+    started lazily, up to the configured number of workers.
+
+    Attributes:
+        workers (int): The maximum number of worker threads.
+    """
+    def __init__(self, workers=8):
+        """
+        Constructor for the WorkerPool class.
+
+        Args:
+            workers (int): The maximum number of worker threads.
+        """
+        if workers < 1:
+            raise ValueError("Invalid number of workers. Must be positive.")
+
+        self.workers = workers
+
+        self._queue = Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._shutdown = False
+
+    def _work(self):
+        while True:
+            future = self._queue.get()
+
+            if future is None:
+                break
+
+            future._run()
+
+    def _start_thread(self):
+        with self._lock:
+            if len(self._threads) >= self.workers:
+                return
+
+            thread = threading.Thread(target=self._work)
+            thread.daemon = True
+            thread.start()
+
+            self._threads.append(thread)
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Schedules func(*args, **kwargs) to be run by a worker thread.
+
+        Args:
+            func (callable): The function to call.
+
+        Returns:
+            A Future for the result of the call.
+        """
+        if self._shutdown:
+            raise RuntimeError("Cannot submit work to a pool that was shut down.")
+
+        future = Future(func, args, kwargs)
+        self._queue.put(future)
+        self._start_thread()
+
+        return future
+
+    def map(self, func, iterable, window=None):
+        """
+        Calls func on every item of the iterable using the pool, yielding
+        the results in the order of the input. At most 'window' calls are
+        submitted ahead of the one being waited on.
+
+        Args:
+            func (callable): The function to call on every item.
+            iterable: The items to process.
+            window (int): How many calls may be in flight at once. Defaults
+                          to the number of workers.
+
+        Returns:
+            A generator of the results, in input order.
+        """
+        if window is None:
+            window = self.workers
+
+        window = max(window, 1)
+        pending = []
+
+        try:
+            for item in iterable:
+                pending.append(self.submit(func, item))
+
+                if len(pending) >= window:
+                    yield pending.pop(0).result()
+
+            while pending:
+                yield pending.pop(0).result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self):
+        """
+        Stops the worker threads once the calls already submitted are done.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._shutdown = True
+            threads = self._threads
+            self._threads = []
+
+        for _thread in threads:
+            self._queue.put(None)
+
+
+def as_completed(futures, timeout=None):
+    """
+    Yields the given futures as they finish, regardless of the order in
+    which they were submitted.
+
+    Args:
+        futures (list): The futures to wait on.
+        timeout (float): How long to wait for each one, in seconds. None
+                         waits forever.
+
+    Returns:
+        A generator of the futures.
+    """
+    finished = Queue()
+    futures = list(futures)
+
+    for future in futures:
+        future.add_done_callback(finished.put)
+
+    for _future in futures:
+        yield finished.get(True, timeout)
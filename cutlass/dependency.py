@@ -1,28 +1,46 @@
 """
-Utility module for retrieving a node's children.
+Utility module for retrieving a node's children, and for mapping OSDF
+node types to the classes (and loader methods) that model them.
 """
 
 import inspect
 
 # pylint: disable=C0302, W0703, C1801
 
+from .AbundanceMatrix import AbundanceMatrix
 from .Annotation import Annotation
+from .ClusteredSeqSet import ClusteredSeqSet
+from .Cytokine import Cytokine
+from .HostAssayPrep import HostAssayPrep
+from .HostEpigeneticsRawSeqSet import HostEpigeneticsRawSeqSet
+from .HostSeqPrep import HostSeqPrep
+from .HostTranscriptomicsRawSeqSet import HostTranscriptomicsRawSeqSet
+from .HostVariantCall import HostVariantCall
+from .HostWgsRawSeqSet import HostWgsRawSeqSet
+from .Lipidome import Lipidome
+from .Metabolome import Metabolome
+from .MicrobTranscriptomicsRawSeqSet import MicrobTranscriptomicsRawSeqSet
+from .MicrobiomeAssayPrep import MicrobiomeAssayPrep
 from .Project import Project
+from .Proteome import Proteome
+from .ProteomeNonPride import ProteomeNonPride
+from .Sample import Sample
+from .SampleAttribute import SampleAttribute
+from .Serology import Serology
+from .SixteenSDnaPrep import SixteenSDnaPrep
+from .SixteenSRawSeqSet import SixteenSRawSeqSet
+from .SixteenSTrimmedSeqSet import SixteenSTrimmedSeqSet
 from .Study import Study
 from .Subject import Subject
+from .SubjectAttribute import SubjectAttribute
+from .ViralSeqSet import ViralSeqSet
 from .Visit import Visit
-from .Sample import Sample
+from .VisitAttribute import VisitAttribute
 from .WgsAssembledSeqSet import WgsAssembledSeqSet
 from .WgsDnaPrep import WgsDnaPrep
 from .WgsRawSeqSet import WgsRawSeqSet
-from .SixteenSDnaPrep import SixteenSDnaPrep
-from .SixteenSRawSeqSet import SixteenSRawSeqSet
-from .SixteenSTrimmedSeqSet import SixteenSTrimmedSeqSet
-from .MicrobiomeAssayPrep import MicrobiomeAssayPrep
-from .HostAssayPrep import HostAssayPrep
-from .HostSeqPrep import HostSeqPrep
 
-# currently used in Base.children()
+# The method of each class that returns its children one node at a time.
 # __name__ attribute used to ensure that if the class or method name
 # changes, the maintainer is forced to update it here, too.
 # pylint: disable=C0330
@@ -43,8 +61,149 @@ dependency_methods = {
                WgsDnaPrep.__name__ : WgsDnaPrep.child_seq_sets.__name__,
              WgsRawSeqSet.__name__ : WgsRawSeqSet.viral_seq_sets.__name__
 }
+
+# The linkages pointing from the children of each class to their parent,
+# with the node types of the children reached through each, in the order
+# the children are walked by Base.children(). This mirrors the methods in
+# dependency_methods, so that a whole level of nodes can be expanded with
+# one query per linkage.
+child_linkages = {
+                  Project.__name__ : [("part_of", ("study",))],
+               Annotation.__name__ : [("computed_from", ("clustered_seq_set",))],
+            HostAssayPrep.__name__ : [("derived_from", ("lipidome", "metabolome",
+                                                        "cytokine", "proteome"))],
+              HostSeqPrep.__name__ : [("sequenced_from", ("host_transcriptomics_raw_seq_set",
+                                                          "host_wgs_raw_seq_set"))],
+      MicrobiomeAssayPrep.__name__ : [("derived_from", ("cytokine", "lipidome",
+                                                        "metabolome", "proteome"))],
+                   Sample.__name__ : [("prepared_from", ("16s_dna_prep", "wgs_dna_prep",
+                                                         "host_seq_prep", "microb_assay_prep",
+                                                         "host_assay_prep")),
+                                      ("associated_with", ("sample_attr",))],
+          SixteenSDnaPrep.__name__ : [("sequenced_from", ("16s_raw_seq_set",))],
+        SixteenSRawSeqSet.__name__ : [("computed_from", ("16s_trimmed_seq_set",))],
+    SixteenSTrimmedSeqSet.__name__ : [("computed_from", ("abundance_matrix",))],
+                    Study.__name__ : [("participates_in", ("subject",))],
+                  Subject.__name__ : [("by", ("visit",)),
+                                      ("associated_with", ("subject_attr",))],
+                    Visit.__name__ : [("collected_during", ("sample",))],
+       WgsAssembledSeqSet.__name__ : [("computed_from", ("annotation",)),
+                                      ("computed_from", ("abundance_matrix",))],
+               WgsDnaPrep.__name__ : [("sequenced_from", ("wgs_raw_seq_set", "viral_seq_set",
+                                                          "microb_transcriptomics_raw_seq_set"))],
+             WgsRawSeqSet.__name__ : [("computed_from", ("viral_seq_set",))]
+}
+
+# The linkages pointing from a node to its parents, the way lineage() follows
+# them up the tree.
+parent_linkages = ("associated_with", "by", "collected_during", "computed_from",
+                   "derived_from", "part_of", "participates_in", "prepared_from",
+                   "sequenced_from", "subset_of")
+
+# The class modeling each OSDF node_type.
+node_classes = {
+                      "abundance_matrix" : AbundanceMatrix,
+                            "annotation" : Annotation,
+                     "clustered_seq_set" : ClusteredSeqSet,
+                              "cytokine" : Cytokine,
+                       "host_assay_prep" : HostAssayPrep,
+          "host_epigenetics_raw_seq_set" : HostEpigeneticsRawSeqSet,
+                         "host_seq_prep" : HostSeqPrep,
+      "host_transcriptomics_raw_seq_set" : HostTranscriptomicsRawSeqSet,
+                     "host_variant_call" : HostVariantCall,
+                  "host_wgs_raw_seq_set" : HostWgsRawSeqSet,
+                              "lipidome" : Lipidome,
+                            "metabolome" : Metabolome,
+    "microb_transcriptomics_raw_seq_set" : MicrobTranscriptomicsRawSeqSet,
+                     "microb_assay_prep" : MicrobiomeAssayPrep,
+                               "project" : Project,
+                              "proteome" : Proteome,
+                     "proteome_nonpride" : ProteomeNonPride,
+                                "sample" : Sample,
+                           "sample_attr" : SampleAttribute,
+                              "serology" : Serology,
+                          "16s_dna_prep" : SixteenSDnaPrep,
+                       "16s_raw_seq_set" : SixteenSRawSeqSet,
+                   "16s_trimmed_seq_set" : SixteenSTrimmedSeqSet,
+                                 "study" : Study,
+                               "subject" : Subject,
+                          "subject_attr" : SubjectAttribute,
+                         "viral_seq_set" : ViralSeqSet,
+                                 "visit" : Visit,
+                            "visit_attr" : VisitAttribute,
+                 "wgs_assembled_seq_set" : WgsAssembledSeqSet,
+                          "wgs_dna_prep" : WgsDnaPrep,
+                       "wgs_raw_seq_set" : WgsRawSeqSet
+}
+
+# The OSDF node_type of each class.
+node_types = dict((node_class.__name__, node_type)
+                  for (node_type, node_class) in node_classes.items())
+
+# The static method of each class that converts a raw OSDF document into
+# an instance of the class.
+loader_methods = {
+                   AbundanceMatrix.__name__ : AbundanceMatrix.load_abundance_matrix.__name__,
+                        Annotation.__name__ : Annotation.load_annotation.__name__,
+                   ClusteredSeqSet.__name__ : ClusteredSeqSet.load_clustered_seq_set.__name__,
+                          Cytokine.__name__ : Cytokine.load_cytokine.__name__,
+                     HostAssayPrep.__name__ : HostAssayPrep.load_host_assay_prep.__name__,
+          HostEpigeneticsRawSeqSet.__name__ : HostEpigeneticsRawSeqSet.load_host_epigenetics_raw_seq_set.__name__,
+                       HostSeqPrep.__name__ : HostSeqPrep.load_host_seq_prep.__name__,
+      HostTranscriptomicsRawSeqSet.__name__ : HostTranscriptomicsRawSeqSet.load_host_transcriptomics_raw_seq_set.__name__,
+                   HostVariantCall.__name__ : HostVariantCall.load_host_variant_call.__name__,
+                  HostWgsRawSeqSet.__name__ : HostWgsRawSeqSet.load_hostWgsRawSeqSet.__name__,
+                          Lipidome.__name__ : Lipidome.load_lipidome.__name__,
+                        Metabolome.__name__ : Metabolome.load_metabolome.__name__,
+    MicrobTranscriptomicsRawSeqSet.__name__ : MicrobTranscriptomicsRawSeqSet.load_microb_transcriptomics_raw_seq_set.__name__,
+               MicrobiomeAssayPrep.__name__ : MicrobiomeAssayPrep.load_microassayprep.__name__,
+                           Project.__name__ : Project.load_project.__name__,
+                          Proteome.__name__ : Proteome.load_proteome.__name__,
+                  ProteomeNonPride.__name__ : ProteomeNonPride.load_proteome_nonpride.__name__,
+                            Sample.__name__ : Sample.load_sample.__name__,
+                   SampleAttribute.__name__ : SampleAttribute.load_sample_attr.__name__,
+                          Serology.__name__ : Serology.load_serology.__name__,
+                   SixteenSDnaPrep.__name__ : SixteenSDnaPrep.load_sixteenSDnaPrep.__name__,
+                 SixteenSRawSeqSet.__name__ : SixteenSRawSeqSet.load_16s_raw_seq_set.__name__,
+             SixteenSTrimmedSeqSet.__name__ : SixteenSTrimmedSeqSet.load_sixteenSTrimmedSeqSet.__name__,
+                             Study.__name__ : Study.load_study.__name__,
+                           Subject.__name__ : Subject.load_subject.__name__,
+                  SubjectAttribute.__name__ : SubjectAttribute.load_subject_attr.__name__,
+                       ViralSeqSet.__name__ : ViralSeqSet.load_viral_seq_set.__name__,
+                             Visit.__name__ : Visit.load_visit.__name__,
+                    VisitAttribute.__name__ : VisitAttribute.load_visit_attr.__name__,
+                WgsAssembledSeqSet.__name__ : WgsAssembledSeqSet.load_wgsAssembledSeqSet.__name__,
+                        WgsDnaPrep.__name__ : WgsDnaPrep.load_wgsDnaPrep.__name__,
+                      WgsRawSeqSet.__name__ : WgsRawSeqSet.load_wgsRawSeqSet.__name__
+}
 # pylint: enable=C0330
 
+def load_document(doc, session=None):
+    """
+    Converts a raw OSDF document into an instance of the class that models
+    its node_type.
+
+    Args:
+        doc (dict): The OSDF document.
+        session (iHMPSession): The session the document was retrieved with.
+                               Defaults to the current session.
+
+    Returns:
+        An instance of the matching node class.
+
+    Exceptions:
+        ValueError: If the document's node_type is not a known node type.
+    """
+    node_type = doc.get('node_type')
+
+    if node_type not in node_classes:
+        raise ValueError("Unknown node type: %s" % node_type)
+
+    node_class = node_classes[node_type]
+    loader = getattr(node_class, loader_methods[node_class.__name__])
+
+    return loader(doc, session=session)
+
 def generator_flatten(gen):
     """ Flatten the result of the generator. """
     for item in gen:
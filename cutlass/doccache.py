@@ -0,0 +1,343 @@
+"""
+The doccache module provides a persistent, on-disk cache of raw OSDF
+documents, so that programs that run repeatedly against mostly unchanged
+data do not have to retrieve every node from OSDF every time. Documents are
+stored compressed in an SQLite database, keyed by their ID and version.
+Entries older than the time to live are revalidated before they are used
+again, and the least recently used entries are evicted once the cache grows
+past its size limit.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT NOT NULL,
+    ver INTEGER NOT NULL,
+    ns TEXT,
+    doc BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    fetched REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (id, ver)
+);
+CREATE INDEX IF NOT EXISTS documents_accessed ON documents (accessed);
+"""
+
+class DocumentCache(object):
+    """
+    A persistent cache of OSDF documents backed by an SQLite database.
+    Several versions of the same node may be held; lookups by ID alone
+    return the newest one.
+
+    Attributes:
+        path (str): The path to the SQLite database file.
+        ttl (float): The number of seconds a cached document is considered
+                     current without being revalidated.
+        max_size (int): The maximum number of compressed bytes held.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups that were not.
+    """
+    def __init__(self, path, ttl=86400, max_size=256 * 1024 * 1024):
+        """
+        Constructor for the DocumentCache class. The database is created if
+        it does not exist yet.
+
+        Args:
+            path (str): The path to the SQLite database file.
+            ttl (float): The time to live of cached documents, in seconds.
+                         Defaults to one day.
+            max_size (int): The maximum number of compressed bytes to hold.
+                            Defaults to 256 MiB.
+        """
+        if ttl < 0:
+            raise ValueError("Invalid ttl. Must not be negative.")
+
+        if max_size < 1:
+            raise ValueError("Invalid max_size. Must be positive.")
+
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM documents").fetchone()[0]
+
+    @staticmethod
+    def _encode(doc):
+        return sqlite3.Binary(zlib.compress(json.dumps(doc)))
+
+    @staticmethod
+    def _decode(blob):
+        return json.loads(zlib.decompress(blob))
+
+    def get(self, node_id, version=None):
+        """
+        Looks up a document in the cache. A specific version never changes,
+        so it is returned however old it is. Without a version, the newest
+        cached version is only returned while it is within its time to live.
+
+        Args:
+            node_id (str): The OSDF ID of the node.
+            version (int): The version of the node. Defaults to the newest.
+
+        Returns:
+            The document, or None if it is not cached or is stale.
+        """
+        now = time.time()
+
+        with self._lock:
+            if version is None:
+                row = self._conn.execute(
+                    "SELECT ver, doc, fetched FROM documents WHERE id = ? "
+                    "ORDER BY ver DESC LIMIT 1", (node_id,)).fetchone()
+
+                if row is not None and row[2] < now - self.ttl:
+                    row = None
+            else:
+                row = self._conn.execute(
+                    "SELECT ver, doc FROM documents WHERE id = ? AND ver = ?",
+                    (node_id, version)).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE documents SET accessed = ? WHERE id = ? AND ver = ?",
+                (now, node_id, row[0]))
+            self._conn.commit()
+
+        return self._decode(row[1])
+
+    def put(self, doc):
+        """
+        Stores a document in the cache, marking it as current. Documents
+        without an ID or version are ignored.
+
+        Args:
+            doc (dict): The OSDF document.
+
+        Returns:
+            None
+        """
+        self.put_many([doc])
+
+    def put_many(self, docs):
+        """
+        Stores many documents in the cache in a single transaction.
+
+        Args:
+            docs (list): The OSDF documents.
+
+        Returns:
+            None
+        """
+        now = time.time()
+        rows = []
+
+        for doc in docs:
+            if 'id' not in doc or 'ver' not in doc:
+                continue
+
+            blob = self._encode(doc)
+            rows.append((doc['id'], doc['ver'], doc.get('ns'), blob, len(blob),
+                         now, now))
+
+        if len(rows) == 0:
+            return
+
+        with self._lock:
+            for row in rows:
+                old = self._conn.execute(
+                    "SELECT size FROM documents WHERE id = ? AND ver = ?",
+                    row[0:2]).fetchone()
+
+                if old is not None:
+                    self._size -= old[0]
+
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    row)
+                self._size += row[4]
+
+            self._evict()
+            self._conn.commit()
+
+    def discard(self, node_id):
+        """
+        Removes all of the cached versions of a node.
+
+        Args:
+            node_id (str): The OSDF ID of the node.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._size -= self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM documents WHERE id = ?",
+                (node_id,)).fetchone()[0]
+            self._conn.execute("DELETE FROM documents WHERE id = ?", (node_id,))
+            self._conn.commit()
+
+    def clear(self):
+        """ Removes all of the documents from the cache. """
+        with self._lock:
+            self._conn.execute("DELETE FROM documents")
+            self._conn.commit()
+            self._size = 0
+
+    def _evict(self):
+        # Drop the least recently used documents until the cache fits.
+        while self._size > self.max_size:
+            rows = self._conn.execute(
+                "SELECT id, ver, size FROM documents ORDER BY accessed LIMIT 100"
+            ).fetchall()
+
+            if len(rows) == 0:
+                self._size = 0
+                break
+
+            for (node_id, version, size) in rows:
+                self._conn.execute(
+                    "DELETE FROM documents WHERE id = ? AND ver = ?",
+                    (node_id, version))
+                self._size -= size
+
+                if self._size <= self.max_size:
+                    break
+
+    def stale(self):
+        """
+        Returns the IDs of the nodes whose newest cached version has outlived
+        its time to live, grouped by namespace.
+
+        Args:
+            None
+
+        Returns:
+            A dictionary of namespaces to lists of node IDs.
+        """
+        with self._lock:
+            # SQLite takes the bare columns from the row with the newest version.
+            rows = self._conn.execute(
+                "SELECT ns, id, MAX(ver), fetched FROM documents GROUP BY id"
+            ).fetchall()
+
+        expired = time.time() - self.ttl
+        stale = {}
+
+        for (namespace, node_id, _version, fetched) in rows:
+            if fetched < expired:
+                stale.setdefault(namespace, []).append(node_id)
+
+        return stale
+
+    def revalidate(self, session, chunk_size=50):
+        """
+        Brings the stale documents in the cache up to date. OSDF has no way of
+        asking for a node's version alone, so the stale IDs are looked up in
+        chunks with one OQL query per chunk instead of one request per node.
+        Unchanged documents are marked current, changed ones are replaced and
+        the ones that are gone from OSDF are removed.
+
+        Args:
+            session (iHMPSession): The session to query OSDF with.
+            chunk_size (int): The number of IDs looked up per query.
+
+        Returns:
+            A dictionary with the number of unchanged, updated and removed
+            documents.
+        """
+        # local import to avoid cyclic imports
+        from cutlass.paging import oql_docs
+
+        if chunk_size < 1:
+            raise ValueError("Invalid chunk size. Must be positive.")
+
+        counts = {"unchanged": 0, "updated": 0, "removed": 0}
+
+        for (namespace, node_ids) in self.stale().items():
+            for start in range(0, len(node_ids), chunk_size):
+                chunk = node_ids[start:start + chunk_size]
+                query = " || ".join(['"{}"[id]'.format(node_id)
+                                     for node_id in chunk])
+
+                # Make sure the session asks OSDF rather than its query cache.
+                session.get_query_cache().invalidate(namespace)
+
+                # The session may store query results itself, so note the
+                # cached versions before querying.
+                cached = self._versions(chunk)
+                docs = list(oql_docs(namespace, query, session=session,
+                                     cache=False))
+                found = set([doc['id'] for doc in docs])
+
+                for doc in docs:
+                    if cached.get(doc['id']) == doc['ver']:
+                        counts['unchanged'] += 1
+                    else:
+                        counts['updated'] += 1
+
+                self.put_many(docs)
+
+                for node_id in chunk:
+                    if node_id not in found:
+                        counts['removed'] += 1
+                        self.discard(node_id)
+
+        module_logger.debug("Revalidated the document cache: %s", counts)
+
+        return counts
+
+    def _versions(self, node_ids):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, MAX(ver) FROM documents WHERE id IN ({}) GROUP BY id"
+                .format(", ".join("?" * len(node_ids))), node_ids).fetchall()
+
+        return dict(rows)
+
+    def stats(self):
+        """
+        Returns the cache's counters.
+
+        Args:
+            None
+
+        Returns:
+            A dictionary with the number of hits, misses, cached documents
+            and compressed bytes held.
+        """
+        with self._lock:
+            count = self._conn.execute(
+                "SELECT COUNT(*) FROM documents").fetchone()[0]
+
+            return {"hits": self.hits, "misses": self.misses,
+                    "documents": count, "bytes": self._size}
+
+    def close(self):
+        """ Closes the database. """
+        with self._lock:
+            self._conn.close()
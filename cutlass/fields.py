@@ -0,0 +1,176 @@
+"""
+The fields module provides the typed properties the node classes declare
+their OSDF fields with. Each class lists its fields once, as Field objects,
+and that table drives the construction and validation of its objects and the
+generation and loading of their OSDF documents (see Base._get_raw_doc() and
+Base._load_doc()). The values are kept in __slots__ rather than in a
+__dict__ per object, which keeps large numbers of node objects small.
+"""
+
+import itertools
+import logging
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+# The wording of the type errors, the same as the enforce_* decorators use.
+_TYPE_NAMES = {
+    bool: "a bool",
+    dict: "a dict",
+    float: "a float",
+    int: "an int",
+    list: "a list",
+    str: "a string"
+}
+
+# Numbers the fields as they are declared, so that FieldsMeta can list them
+# in declaration order.
+_COUNTER = itertools.count()
+
+class Field(object):
+    """
+    A typed property of a node class. The value is kept in a slot named
+    after the field with a leading underscore, so the methods of the class
+    can keep using self._<name>.
+
+    Attributes:
+        name (str): The name of the field, set when the class is created.
+        attr (str): The name of the slot holding the values.
+        kind (type): The type values must have, or None for any type.
+        required (bool): Whether the field is written to the OSDF document
+                         even when it is not set.
+        strict (bool): Whether loading an OSDF document without the field
+                       raises a KeyError.
+        meta (bool): Whether the field is part of the OSDF document.
+    """
+    def __init__(self, kind=None, doc=None, required=False, default=None,
+                 check=None, meta=True, strict=None):
+        """
+        Constructor for the Field class.
+
+        Args:
+            kind (type): The type values must have. One of bool, dict,
+                         float, int, list or str, or None for any type.
+            doc (str): The documentation of the field.
+            required (bool): Whether the field is written to the OSDF
+                             document even when it is not set.
+            default: The value of the field in new objects. A callable,
+                     such as list or dict, is called for a new value for
+                     each object.
+            check (function): Called with each new value, after its type is
+                              checked, to raise an exception if the value is
+                              not acceptable.
+            meta (bool): Whether the field is part of the OSDF document.
+            strict (bool): Whether loading an OSDF document without the
+                           field raises a KeyError. Defaults to the value of
+                           required.
+        """
+        self.name = None
+        self.attr = None
+        self.kind = kind
+        self.required = required
+        self.default = default
+        self.check = check
+        self.meta = meta
+        self.strict = required if strict is None else strict
+        self.order = next(_COUNTER)
+
+        self._slot = None
+
+        if doc is not None and kind is not None:
+            doc = "%s: %s" % (kind.__name__, doc)
+
+        self.__doc__ = doc
+
+    def bind(self, name, slot):
+        """
+        Called by FieldsMeta once the class holding the field is created.
+
+        Args:
+            name (str): The name of the field.
+            slot (member_descriptor): The slot holding the values.
+
+        Returns:
+            None
+        """
+        self.name = name
+        self.attr = slot.__name__
+        self._slot = slot
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+
+        return self._slot.__get__(obj, owner)
+
+    def __set__(self, obj, value):
+        if self.kind is not None and type(value) is not self.kind:
+            raise ValueError("Invalid type provided. Must be %s." %
+                             _TYPE_NAMES[self.kind])
+
+        if self.check is not None:
+            self.check(value)
+
+        self._slot.__set__(obj, value)
+
+    def __repr__(self):
+        return "<Field %s>" % self.name
+
+class FieldsMeta(type):
+    """
+    The metaclass of the node classes. It gives each Field declared by a
+    class a slot, and lists all of the fields of the class, the inherited
+    ones first, in its _fields attribute. A class that declares neither
+    fields nor __slots__ is left with a __dict__ for its objects.
+
+    The loops over the fields in Base run for every object, so the metaclass
+    also flattens the parts of the fields they use into tuples: _defaults
+    holds the slot and default value of each field, and _doc_fields the
+    name, slot, required and strict flags of each field in the OSDF
+    document. _slots names every slot of the class and its bases, which is
+    what Base pickles.
+    """
+    def __new__(mcs, name, bases, namespace):
+        fields = sorted([(attr, value) for (attr, value) in namespace.items()
+                         if isinstance(value, Field)],
+                        key=lambda item: item[1].order)
+
+        if len(fields) > 0 or '__slots__' in namespace:
+            slots = list(namespace.get('__slots__', ()))
+            slots.extend("_" + attr for (attr, _field) in fields)
+            namespace['__slots__'] = tuple(slots)
+
+        cls = super(FieldsMeta, mcs).__new__(mcs, name, bases, namespace)
+
+        for (attr, field) in fields:
+            field.bind(attr, cls.__dict__["_" + attr])
+
+        inherited = []
+
+        for base in bases:
+            for field in getattr(base, '_fields', ()):
+                if field not in inherited:
+                    inherited.append(field)
+
+        cls._fields = tuple(inherited + [field for (_attr, field) in fields])
+
+        cls._defaults = tuple((field.attr, field.default)
+                              for field in cls._fields)
+        cls._doc_fields = tuple((field.name, field.attr, field.required,
+                                 field.strict)
+                                for field in cls._fields if field.meta)
+
+        slots = []
+
+        for klass in reversed(cls.__mro__):
+            for slot in klass.__dict__.get('__slots__', ()):
+                if slot not in ('__dict__', '__weakref__') and slot not in slots:
+                    slots.append(slot)
+
+        cls._slots = tuple(slots)
+
+        return cls
@@ -0,0 +1,368 @@
+"""
+The graph module holds the linkage of a whole OSDF namespace in memory, for
+analyses that look at many nodes at once, such as counting the samples of
+every subject. Instead of one model object per node, OSDF IDs are interned
+to integers and the links are kept as a pair of compressed sparse row (CSR)
+adjacency arrays, one from children to parents and one back, with the link
+type of each entry stored alongside it as a one byte code.
+"""
+
+import logging
+from array import array
+from collections import deque
+from itertools import izip
+from cutlass.iHMPSession import iHMPSession
+from cutlass.paging import oql_docs
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+def _csr(size, sources, edges, count):
+    """
+    Builds the CSR arrays of a set of edges: the edges leaving node i are the
+    entries of indices, and their link type codes the entries of codes, from
+    indptr[i] to indptr[i + 1].
+
+    Args:
+        size (int): The number of nodes.
+        sources (iterable): The source node of each edge.
+        edges (iterable): The (source, target, code) tuple of each edge.
+        count (int): The number of edges.
+
+    Returns:
+        A tuple of the indptr, indices and codes arrays.
+    """
+    indptr = array('I', [0]) * (size + 1)
+
+    for source in sources:
+        indptr[source + 1] += 1
+
+    for index in xrange(size):
+        indptr[index + 1] += indptr[index]
+
+    indices = array('I', [0]) * count
+    codes = array('B', [0]) * count
+    filled = indptr[:-1]
+
+    for (source, target, code) in edges:
+        position = filled[source]
+        indices[position] = target
+        codes[position] = code
+        filled[source] = position + 1
+
+    return (indptr, indices, codes)
+
+def _reversed_edges(csr):
+    """ Yields the edges of a set of CSR arrays, pointing the other way. """
+    (indptr, indices, codes) = csr
+
+    for source in xrange(len(indptr) - 1):
+        for position in xrange(indptr[source], indptr[source + 1]):
+            yield (indices[position], source, codes[position])
+
+class NodeGraph(object):
+    """
+    The nodes of a namespace and the links between them, indexed by integer.
+    Nodes that are linked to but were not retrieved, such as nodes of other
+    namespaces, are kept with a node type of None.
+
+    Attributes:
+        namespace (str): The namespace the nodes were retrieved from.
+    """
+    def __init__(self, namespace):
+        """
+        Constructor for the NodeGraph class. Graphs are normally built with
+        NodeGraph.load() or iHMPSession.load_graph().
+
+        Args:
+            namespace (str): The namespace of the nodes.
+        """
+        self.namespace = namespace
+
+        self._index = {}
+        self._ids = []
+        self._types = array('b')
+        self._type_names = []
+        self._type_codes = {}
+        self._link_names = []
+        self._link_codes = {}
+
+        # The edges, as parallel arrays of the node indices and link type
+        # code of each edge, until build() turns them into CSR arrays.
+        self._edges = (array('I'), array('I'), array('B'))
+        self._parents = None
+        self._children = None
+
+        # The indices of the nodes of each node type, by type code.
+        self._members = {}
+
+    @classmethod
+    def load(cls, namespace, node_types=None, session=None, fan_out=None):
+        """
+        Retrieves every node of a namespace, one node type at a time with
+        paged queries, and keeps their IDs, types and links.
+
+        Args:
+            namespace (str): The namespace to retrieve.
+            node_types (list): The node types to retrieve. Defaults to all
+                               of the node types modeled by cutlass.
+            session (iHMPSession): The session to use. Defaults to the
+                                   current session.
+            fan_out (int): How many pages may be requested at once.
+
+        Returns:
+            A NodeGraph object.
+        """
+        from cutlass.dependency import node_classes
+
+        if session is None:
+            session = iHMPSession.get_session()
+
+        if node_types is None:
+            node_types = sorted(node_classes.keys())
+
+        graph = cls(namespace)
+
+        for node_type in node_types:
+            query = '"{}"[node_type]'.format(node_type)
+
+            for doc in oql_docs(namespace, query, session=session,
+                                fan_out=fan_out, cache=False):
+                graph.add(doc)
+
+        graph.build()
+
+        module_logger.info("Loaded %s nodes and %s links from %s.",
+                           len(graph), graph.edge_count, namespace)
+
+        return graph
+
+    def _intern(self, node_id):
+        index = self._index.get(node_id)
+
+        if index is None:
+            index = len(self._ids)
+            self._index[node_id] = index
+            self._ids.append(node_id)
+            self._types.append(-1)
+
+        return index
+
+    def add(self, doc):
+        """
+        Adds a node document to the graph. Once all of the documents are
+        added, build() must be called before the graph is queried.
+
+        Args:
+            doc (dict): The OSDF document.
+
+        Returns:
+            None
+
+        Exceptions:
+            ValueError: If the graph was already built.
+        """
+        if self._edges is None:
+            raise ValueError("Documents cannot be added after build().")
+
+        index = self._intern(doc['id'])
+        node_type = doc.get('node_type')
+
+        if node_type not in self._type_codes:
+            self._type_codes[node_type] = len(self._type_names)
+            self._type_names.append(node_type)
+
+        self._types[index] = self._type_codes[node_type]
+
+        (sources, parents, links) = self._edges
+
+        for (linkage, targets) in doc.get('linkage', {}).items():
+            if linkage not in self._link_codes:
+                self._link_codes[linkage] = len(self._link_names)
+                self._link_names.append(linkage)
+
+            code = self._link_codes[linkage]
+
+            for target in targets:
+                sources.append(index)
+                parents.append(self._intern(target))
+                links.append(code)
+
+    def build(self):
+        """
+        Builds the adjacency arrays from the documents added so far. The edge
+        lists are dropped as soon as the first CSR arrays are built, and the
+        arrays pointing back are built from those.
+        """
+        size = len(self._ids)
+
+        (sources, targets, links) = self._edges
+        self._edges = None
+
+        self._parents = _csr(size, sources, izip(sources, targets, links),
+                             len(sources))
+        del sources, targets, links
+
+        self._children = _csr(size, self._parents[1],
+                              _reversed_edges(self._parents),
+                              len(self._parents[1]))
+
+        self._members = {}
+
+        for (index, code) in enumerate(self._types):
+            if code >= 0:
+                self._members.setdefault(code, array('I')).append(index)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, node_id):
+        return node_id in self._index
+
+    @property
+    def edge_count(self):
+        """ int: The number of links in the graph. """
+        if self._parents is None:
+            return 0
+
+        return len(self._parents[1])
+
+    @property
+    def linkages(self):
+        """ list: The link types in the graph. """
+        return sorted(self._link_names)
+
+    def node_type(self, node_id):
+        """
+        Returns the node type of a node, or None if it was not retrieved or
+        is not in the graph.
+
+        Args:
+            node_id (str): The OSDF ID of the node.
+
+        Returns:
+            The node type.
+        """
+        index = self._index.get(node_id)
+
+        if index is None:
+            return None
+
+        code = self._types[index]
+
+        return None if code < 0 else self._type_names[code]
+
+    def nodes(self, node_type):
+        """
+        Returns the IDs of the nodes of a node type.
+
+        Args:
+            node_type (str): The node type.
+
+        Returns:
+            A list of OSDF IDs.
+        """
+        code = self._type_codes.get(node_type)
+
+        if code is None:
+            return []
+
+        return [self._ids[index] for index in self._members.get(code, ())]
+
+    def _neighbors(self, adjacency, node_id, linkage):
+        index = self._index.get(node_id)
+
+        if adjacency is None or index is None:
+            return []
+
+        (indptr, indices, codes) = adjacency
+        positions = xrange(indptr[index], indptr[index + 1])
+
+        if linkage is None:
+            # Grouped by link type, in the order of the link type names.
+            names = self._link_names
+            positions = sorted(positions, key=lambda position: names[codes[position]])
+        else:
+            code = self._link_codes.get(linkage)
+            positions = [position for position in positions
+                         if codes[position] == code]
+
+        return [indices[position] for position in positions]
+
+    def parents(self, node_id, linkage=None):
+        """
+        Returns the IDs of the nodes a node links to.
+
+        Args:
+            node_id (str): The OSDF ID of the node.
+            linkage (str): Only follow this link type. Defaults to all.
+
+        Returns:
+            A list of OSDF IDs.
+        """
+        return [self._ids[index] for index in
+                self._neighbors(self._parents, node_id, linkage)]
+
+    def children(self, node_id, linkage=None):
+        """
+        Returns the IDs of the nodes linking to a node.
+
+        Args:
+            node_id (str): The OSDF ID of the node.
+            linkage (str): Only follow this link type. Defaults to all.
+
+        Returns:
+            A list of OSDF IDs.
+        """
+        return [self._ids[index] for index in
+                self._neighbors(self._children, node_id, linkage)]
+
+    def descendants(self, node_id, node_type=None):
+        """
+        Returns the IDs of all of the nodes below a node, breadth first.
+
+        Args:
+            node_id (str): The OSDF ID of the node.
+            node_type (str): Only return nodes of this node type. Defaults
+                             to all of them.
+
+        Returns:
+            A list of OSDF IDs.
+        """
+        start = self._index.get(node_id)
+
+        if start is None:
+            return []
+
+        code = None
+
+        if node_type is not None:
+            code = self._type_codes.get(node_type)
+
+            if code is None:
+                return []
+
+        if self._children is None:
+            return []
+
+        (indptr, indices, _codes) = self._children
+        seen = set([start])
+        queue = deque([start])
+        found = []
+
+        while len(queue) > 0:
+            index = queue.popleft()
+
+            for child in indices[indptr[index]:indptr[index + 1]]:
+                if child not in seen:
+                    seen.add(child)
+                    queue.append(child)
+
+                    if code is None or self._types[child] == code:
+                        found.append(self._ids[child])
+
+        return found
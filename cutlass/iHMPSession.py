@@ -6,7 +6,15 @@ Integrative Human Microbiome Project (iHMP).
 
 import importlib
 import logging
-from osdf import OSDF
+import threading
+from cutlass.concurrency import WorkerPool
+from cutlass.doccache import DocumentCache
+from cutlass.identity import IdentityMap
+from cutlass.querycache import QueryCache
+from cutlass.retry import CircuitBreaker, RetryPolicy
+from cutlass.schemas import SchemaCache
+from cutlass.throttle import Throttle
+from cutlass.transport import ConnectionPool, SessionOSDF
 from cutlass.Util import *
 
 class iHMPSession(object):
@@ -16,17 +24,34 @@ class iHMPSession(object):
     objects in the iHMP OSDF database. Each object contains its own save, load,
     delete feature.
 
+    A session can also be made current for a block of code, and only for
+    the thread running it, by using it as a context manager:
+
+        with iHMPSession(username, password, server=staging):
+            sample = Sample.load(sample_id)
+
     Attributes:
         _single (iHMPSession): The iHMP Session that is currently live. None
         otherwise.
+        _context (threading.local): The per-thread stack of sessions entered
+        with a 'with' statement.
     """
 
     check_python_version(name="Cutlass")
 
     _single = None
+    _context = threading.local()
 
     def __init__(self, username, password, server="osdf.ihmpdcc.org", port=8123,
-                 ssl=True):
+                 ssl=True, pool_size=10, max_idle=60, per_host_limit=None,
+                 workers=8, retries=3, backoff=0.5, failure_threshold=5,
+                 reset_timeout=30, read_rate=None, read_burst=None,
+                 max_reads_in_flight=None, write_rate=None, write_burst=None,
+                 max_writes_in_flight=None, cache_size=1000, doc_cache=None,
+                 doc_cache_ttl=86400, doc_cache_size=256 * 1024 * 1024,
+                 query_cache_ttl=300, query_cache_size=1000,
+                 local_validation=False, schema_cache=None, schema_ttl=86400,
+                 schema_fallback=False, lazy=False):
         """
         The initialization of the iHMPSession for the user.
 
@@ -38,14 +63,121 @@ class iHMPSession(object):
             port (int): The port allowing access to the OSDF instance.
             ssl (bool): Whether the OSDF server is behind SSL/TLS or not.
                         Defaults to true.
+            pool_size (int): The number of idle keep-alive connections to
+                             retain for reuse. Defaults to 10.
+            max_idle (int): The number of seconds an idle connection is
+                            kept in the pool. Defaults to 60.
+            per_host_limit (int): The maximum number of simultaneous
+                                  connections to the OSDF server. Defaults to
+                                  None (no limit).
+            workers (int): The number of threads used to run the session's
+                           non-blocking (aload, asave, ...) calls. Defaults
+                           to 8.
+            retries (int): The maximum number of times a request that failed
+                           with a transient error is retried. Defaults to 3.
+            backoff (float): The base delay, in seconds, of the exponential
+                             backoff between retries. Defaults to 0.5.
+            failure_threshold (int): The number of consecutive failed
+                                     requests after which requests fail
+                                     fast. Defaults to 5.
+            reset_timeout (float): How long, in seconds, requests fail fast
+                                   before the server is tried again.
+                                   Defaults to 30.
+            read_rate (float): The maximum number of reads (node retrievals,
+                               queries and validations) per second. Defaults
+                               to None (no limit).
+            read_burst (int): How many reads may be made at once after a
+                              quiet period. Defaults to one second's worth.
+            max_reads_in_flight (int): The maximum number of simultaneous
+                                       reads. Defaults to None (no limit).
+            write_rate (float): The maximum number of writes (inserts, edits
+                                and deletes) per second. Defaults to None
+                                (no limit).
+            write_burst (int): How many writes may be made at once after a
+                               quiet period. Defaults to one second's worth.
+            max_writes_in_flight (int): The maximum number of simultaneous
+                                        writes. Defaults to None (no limit).
+            cache_size (int): The number of loaded objects kept in the
+                              session's identity map. 0 disables the map.
+                              Defaults to 1000.
+            doc_cache (str): The path to an SQLite file in which retrieved
+                             OSDF documents are kept between runs. Defaults
+                             to None (no persistent cache).
+            doc_cache_ttl (float): The number of seconds a cached document is
+                                   used before it has to be revalidated.
+                                   Defaults to one day.
+            doc_cache_size (int): The maximum number of compressed bytes
+                                  held in the document cache. Defaults to
+                                  256 MiB.
+            query_cache_ttl (float): The number of seconds a page of OQL
+                                     results is reused for. 0 disables the
+                                     query cache. Defaults to 300.
+            query_cache_size (int): The maximum number of pages of OQL
+                                    results held. Defaults to 1000.
+            local_validation (bool): Whether nodes are validated against
+                                     schemas retrieved from OSDF once,
+                                     instead of by OSDF on every call. The
+                                     local validator supports most, but not
+                                     necessarily all, of what OSDF checks.
+                                     Defaults to False.
+            schema_cache (str): The path to a JSON file in which the schemas
+                                are kept between runs. Defaults to None
+                                (retrieved once per session).
+            schema_ttl (float): The number of seconds schemas are used before
+                                they are retrieved again. Defaults to one
+                                day.
+            schema_fallback (bool): Whether nodes whose schema changed since
+                                    it was first retrieved are validated by
+                                    OSDF instead of by the new schema.
+                                    Defaults to False.
+            lazy (bool): Whether nodes read from OSDF, by loads, searches,
+                         linkage accessors or children(), are handed back
+                         as LazyNode stand-ins that only build the full
+                         objects when their properties are first used.
+                         Defaults to False.
         """
         self._username = username
         self._password = password
         self._server = server
         self._port = port
         self._ssl = ssl
-        self._osdf = OSDF(self._server, self._username, self._password,
-                          port=self._port, ssl=self._ssl)
+        self._pool = ConnectionPool(pool_size=pool_size, max_idle=max_idle,
+                                    per_host_limit=per_host_limit)
+        self._retry_policy = RetryPolicy(retries=retries, backoff=backoff)
+        self._breaker = CircuitBreaker(failure_threshold=failure_threshold,
+                                       reset_timeout=reset_timeout)
+        self._read_throttle = Throttle(rate=read_rate, burst=read_burst,
+                                       max_in_flight=max_reads_in_flight)
+        self._write_throttle = Throttle(rate=write_rate, burst=write_burst,
+                                        max_in_flight=max_writes_in_flight)
+        self._identity_map = IdentityMap(size=cache_size)
+        self._query_cache = QueryCache(ttl=query_cache_ttl,
+                                       size=query_cache_size)
+        self._doc_cache = None
+        self._schema_cache = None
+
+        if local_validation:
+            self._schema_cache = SchemaCache(schema_cache, ttl=schema_ttl,
+                                             fallback=schema_fallback)
+
+        if doc_cache is not None:
+            self._doc_cache = DocumentCache(doc_cache, ttl=doc_cache_ttl,
+                                            max_size=doc_cache_size)
+
+        self._osdf = SessionOSDF(self._server, self._username, self._password,
+                                 port=self._port, ssl=self._ssl,
+                                 pool=self._pool,
+                                 retry_policy=self._retry_policy,
+                                 breaker=self._breaker,
+                                 read_throttle=self._read_throttle,
+                                 write_throttle=self._write_throttle,
+                                 identity_map=self._identity_map,
+                                 doc_cache=self._doc_cache,
+                                 query_cache=self._query_cache,
+                                 schema_cache=self._schema_cache)
+        self._executor = WorkerPool(workers=workers)
+        self._local_server = None
+        self._lazy = lazy
 
         self.logger = logging.getLogger(self.__module__ + '.' + \
                                         self.__class__.__name__)
@@ -55,6 +187,54 @@ class iHMPSession(object):
 
         self.logger.info("Using SSL encryption? %s", str(self._ssl))
 
+    @staticmethod
+    def local(page_size=100, latency=0, jitter=0, error_rate=0,
+              error_code=503, seed=None, **kwargs):
+        """
+        Starts an in-process stand-in for an OSDF server and returns a
+        session connected to it. Nothing is sent over the network, which
+        makes it suitable for offline testing and benchmarking.
+
+        Args:
+            page_size (int): The number of OQL results per page.
+            latency (float): Seconds the server waits before every response.
+            jitter (float): The maximum random variation of the latency.
+            error_rate (float): The fraction of requests that fail.
+            error_code (int): The HTTP status of failed requests.
+            seed (int): Seeds the server's random numbers for reproducible
+                        runs.
+            kwargs: Any additional iHMPSession arguments.
+
+        Returns:
+            An iHMPSession connected to the local server.
+        """
+        from cutlass.localosdf import LocalOSDF
+
+        server = LocalOSDF(page_size=page_size, latency=latency, jitter=jitter,
+                           error_rate=error_rate, error_code=error_code,
+                           seed=seed).start()
+
+        session = server.session(**kwargs)
+        session._local_server = server
+
+        return session
+
+    def get_local_server(self):
+        """
+        Returns the local OSDF stand-in server of a session created with
+        local(), which can be used to adjust the injected latency and errors
+        or to seed it with documents.
+
+        Args:
+            None
+
+        Returns:
+            A LocalOSDF object, or None if the session talks to a real
+            OSDF server.
+        """
+        self.logger.debug("In get_local_server.")
+        return self._local_server
+
     def _get_cutlass_instance(self, name):
         self.logger.debug("In _get_cutlass_instance.")
 
@@ -113,8 +293,10 @@ class iHMPSession(object):
         return instance
 
     def __getattr__(self, name):
-        if name.startswith("create_"):
-            class_lower = name[7:]
+        if not name.startswith("create_"):
+            raise AttributeError("%s not defined in %s" % (name, self.__class__))
+
+        class_lower = name[7:]
 
         try:
             instance = self._get_cutlass_instance(class_lower)
@@ -123,10 +305,37 @@ class iHMPSession(object):
 
         return instance
 
+    def __enter__(self):
+        """
+        Makes this session the current one for the calling thread until the
+        'with' block exits. Blocks may be nested.
+        """
+        self.logger.debug("In __enter__.")
+        iHMPSession._context_stack().append(self)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.logger.debug("In __exit__.")
+        iHMPSession._context_stack().pop()
+
+        return False
+
+    @staticmethod
+    def _context_stack():
+        context = iHMPSession._context
+
+        if not hasattr(context, "stack"):
+            context.stack = []
+
+        return context.stack
+
     @staticmethod
     def get_session():
         """
-        Returns the current iHMP session if any is instantiated.
+        Returns the current iHMP session if any is instantiated. A session
+        entered with a 'with' statement in the calling thread takes precedence
+        over the first session ever created.
 
         Args:
             None
@@ -134,6 +343,11 @@ class iHMPSession(object):
         Returns:
             The current iHMP session.
         """
+        stack = iHMPSession._context_stack()
+
+        if len(stack) > 0:
+            return stack[-1]
+
         if iHMPSession._single is None:
             raise Exception("A session has not yet been created.")
 
@@ -152,6 +366,315 @@ class iHMPSession(object):
         self.logger.debug("In get_osdf.")
         return self._osdf
 
+    def get_pool(self):
+        """
+        Returns the keep-alive connection pool shared by all requests made
+        through this session.
+
+        Args:
+            None
+
+        Returns:
+            A ConnectionPool object.
+        """
+        self.logger.debug("In get_pool.")
+        return self._pool
+
+    def get_retry_policy(self):
+        """
+        Returns the policy deciding which failed OSDF requests are retried.
+        Setting its insert_guard allows failed inserts to be retried too.
+
+        Args:
+            None
+
+        Returns:
+            A RetryPolicy object.
+        """
+        self.logger.debug("In get_retry_policy.")
+        return self._retry_policy
+
+    def get_circuit_breaker(self):
+        """
+        Returns the circuit breaker that fails requests fast while the OSDF
+        server is down.
+
+        Args:
+            None
+
+        Returns:
+            A CircuitBreaker object.
+        """
+        self.logger.debug("In get_circuit_breaker.")
+        return self._breaker
+
+    def get_retry_stats(self):
+        """
+        Returns the retry and circuit breaker counters, for monitoring.
+
+        Args:
+            None
+
+        Returns:
+            A dictionary with the number of retries per operation ('read',
+            'insert', 'edit' and 'delete'), the number of requests that
+            failed after exhausting their retries, the state of the circuit
+            breaker, how many times it opened and how many requests it
+            rejected.
+        """
+        self.logger.debug("In get_retry_stats.")
+
+        stats = self._retry_policy.stats()
+        stats["breaker_state"] = self._breaker.state
+        stats["breaker_opened"] = self._breaker.opened
+        stats["breaker_rejected"] = self._breaker.rejected
+
+        return stats
+
+    def get_read_throttle(self):
+        """
+        Returns the throttle limiting the rate and concurrency of the reads
+        (node retrievals, queries and validations) made by this session.
+
+        Args:
+            None
+
+        Returns:
+            A Throttle object.
+        """
+        self.logger.debug("In get_read_throttle.")
+        return self._read_throttle
+
+    def get_write_throttle(self):
+        """
+        Returns the throttle limiting the rate and concurrency of the writes
+        (inserts, edits and deletes) made by this session.
+
+        Args:
+            None
+
+        Returns:
+            A Throttle object.
+        """
+        self.logger.debug("In get_write_throttle.")
+        return self._write_throttle
+
+    def get_identity_map(self):
+        """
+        Returns the session's identity map, which holds on to loaded objects
+        so that loading, searching for or walking to the same version of a
+        node again returns the same object. Its hits and misses counters
+        tell how well it works for a workload.
+
+        Args:
+            None
+
+        Returns:
+            An IdentityMap object.
+        """
+        self.logger.debug("In get_identity_map.")
+        return self._identity_map
+
+    def get_query_cache(self):
+        """
+        Returns the session's cache of OQL result pages. Its hits and misses
+        counters tell how often queries are repeated.
+
+        Args:
+            None
+
+        Returns:
+            A QueryCache object.
+        """
+        self.logger.debug("In get_query_cache.")
+        return self._query_cache
+
+    def get_schema_cache(self):
+        """
+        Returns the schemas that nodes are validated against locally, if the
+        session validates locally. Its hits and misses counters tell how
+        many validations were left to OSDF.
+
+        Args:
+            None
+
+        Returns:
+            A SchemaCache object, or None if the session was created without
+            local validation.
+        """
+        self.logger.debug("In get_schema_cache.")
+        return self._schema_cache
+
+    def get_document_cache(self):
+        """
+        Returns the session's persistent document cache, if it has one.
+
+        Args:
+            None
+
+        Returns:
+            A DocumentCache object, or None if the session was created
+            without one.
+        """
+        self.logger.debug("In get_document_cache.")
+        return self._doc_cache
+
+    def revalidate_cache(self, chunk_size=50):
+        """
+        Checks the documents in the persistent cache that have outlived their
+        time to live against OSDF, a chunk of nodes per query, so that the
+        unchanged ones can be used again without retrieving them one by one.
+
+        Args:
+            chunk_size (int): The number of nodes checked per query.
+
+        Returns:
+            A dictionary with the number of unchanged, updated and removed
+            documents.
+        """
+        self.logger.debug("In revalidate_cache.")
+
+        if self._doc_cache is None:
+            raise ValueError("The session has no document cache.")
+
+        return self._doc_cache.revalidate(self, chunk_size=chunk_size)
+
+    def get_executor(self):
+        """
+        Returns the worker pool that runs this session's background calls.
+
+        Args:
+            None
+
+        Returns:
+            A WorkerPool object.
+        """
+        self.logger.debug("In get_executor.")
+        return self._executor
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Runs func(*args, **kwargs) on the session's worker pool. The call
+        runs with this session as the current one, so any model methods it
+        uses talk to the same OSDF server.
+
+        Args:
+            func (callable): The function to call.
+
+        Returns:
+            A Future for the result of the call.
+        """
+        self.logger.debug("In submit.")
+        return self._executor.submit(self._call_in_context, func, args, kwargs)
+
+    def _call_in_context(self, func, args, kwargs):
+        with self:
+            return func(*args, **kwargs)
+
+    def get_nodes(self, node_ids, window=None):
+        """
+        Retrieves the raw OSDF documents for many node IDs. The documents are
+        fetched concurrently on the session's worker pool.
+
+        Args:
+            node_ids (list): The OSDF IDs of the documents to retrieve.
+            window (int): How many requests may be in flight at once.
+                          Defaults to the number of session workers.
+
+        Returns:
+            A list with the document for each ID, in input order. Documents
+            that could not be retrieved are None.
+        """
+        self.logger.debug("In get_nodes.")
+
+        node_ids = list(node_ids)
+        unique_ids = list(set(node_ids))
+        osdf = self._osdf
+
+        def fetch(node_id):
+            try:
+                return osdf.get_node(node_id)
+            except Exception as fetch_exception:
+                self.logger.warn("Unable to retrieve node %s: %s",
+                                 node_id, fetch_exception)
+                return None
+
+        docs = dict(zip(unique_ids,
+                        self._executor.map(fetch, unique_ids, window=window)))
+
+        return [docs[node_id] for node_id in node_ids]
+
+    def load_many(self, node_ids, window=None):
+        """
+        Loads many nodes, of any type, at once. The documents are fetched
+        concurrently and each one is converted to an instance of the class
+        that models its node_type.
+
+        Args:
+            node_ids (list): The OSDF IDs of the nodes to load.
+            window (int): How many requests may be in flight at once.
+                          Defaults to the number of session workers.
+
+        Returns:
+            A tuple of the list of loaded objects, in input order, and the
+            list of IDs that could not be loaded.
+        """
+        self.logger.debug("In load_many.")
+
+        from cutlass.dependency import load_document
+
+        node_ids = list(node_ids)
+        docs = self.get_nodes(node_ids, window=window)
+
+        nodes = []
+        missing = []
+
+        for (node_id, doc) in zip(node_ids, docs):
+            if doc is None:
+                missing.append(node_id)
+            else:
+                nodes.append(load_document(doc, session=self))
+
+        self.logger.debug("Loaded %s nodes, %s missing.", len(nodes), len(missing))
+
+        return (nodes, missing)
+
+    def load_graph(self, namespace, node_types=None, fan_out=None):
+        """
+        Retrieves the IDs, node types and links of every node of a namespace
+        into a compact in-memory graph, without creating model objects.
+
+        Args:
+            namespace (str): The namespace to retrieve, e.g. 'ihmp'.
+            node_types (list): The node types to retrieve. Defaults to all
+                               of the node types modeled by cutlass.
+            fan_out (int): How many pages may be requested at once. Defaults
+                           to the number of session workers.
+
+        Returns:
+            A NodeGraph object.
+        """
+        self.logger.debug("In load_graph.")
+
+        from cutlass.graph import NodeGraph
+
+        return NodeGraph.load(namespace, node_types=node_types, session=self,
+                              fan_out=fan_out)
+
+    def close(self):
+        """
+        Closes the idle connections held open to the OSDF server. The session
+        remains usable afterwards; new connections are opened as needed.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.logger.debug("In close.")
+        self._pool.close()
+
     def create_object(self, node_type):
         """
         Returns an empty object of the node_type provided. It must be a
@@ -174,6 +697,29 @@ class iHMPSession(object):
 
         return instance
 
+    @property
+    def lazy(self):
+        """
+        bool: Whether nodes are loaded as LazyNode stand-ins.
+        """
+        self.logger.debug("In 'lazy' getter.")
+        return self._lazy
+
+    @lazy.setter
+    @enforce_bool
+    def lazy(self, lazy):
+        """
+        The lazy setter.
+
+        Args:
+            lazy (bool): Whether to load nodes as LazyNode stand-ins.
+
+        Returns:
+            None
+        """
+        self.logger.debug("In 'lazy' setter.")
+        self._lazy = lazy
+
     @property
     def password(self):
         """
@@ -0,0 +1,183 @@
+"""
+The identity module keeps a session-level map from OSDF IDs to the objects
+built for them, so that traversals that come across the same document many
+times reuse one object instead of building a new one every time. The map is
+bounded and evicts the least recently used objects first. Cached objects are
+only handed back while their version matches the document retrieved from
+OSDF, and they are dropped when the node is edited or deleted.
+"""
+
+import functools
+import logging
+import threading
+from collections import OrderedDict
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+class IdentityMap(object):
+    """
+    A thread safe, size bounded map of OSDF IDs to node objects, with least
+    recently used eviction.
+
+    Attributes:
+        size (int): The maximum number of objects held. 0 disables the map.
+        hits (int): The number of lookups answered from the map.
+        misses (int): The number of lookups that were not.
+    """
+    def __init__(self, size=1000):
+        """
+        Constructor for the IdentityMap class.
+
+        Args:
+            size (int): The maximum number of objects to hold.
+        """
+        if size < 0:
+            raise ValueError("Invalid size. Must not be negative.")
+
+        self.size = size
+
+        self._lock = threading.Lock()
+        self._nodes = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._nodes)
+
+    def get(self, node_id, version):
+        """
+        Looks up the object for a node at a given version.
+
+        Args:
+            node_id (str): The OSDF ID of the node.
+            version (int): The version of the node.
+
+        Returns:
+            The cached object, or None if there is no object for that
+            version of the node.
+        """
+        with self._lock:
+            node = self._nodes.pop(node_id, None)
+
+            if node is not None and node.version == version:
+                self._nodes[node_id] = node
+                self.hits += 1
+
+                return node
+
+            self.misses += 1
+
+            return None
+
+    def put(self, node):
+        """
+        Adds an object to the map, evicting the least recently used objects
+        if the map is full.
+
+        Args:
+            node (Base): The object to add. It must have an ID.
+
+        Returns:
+            None
+        """
+        if self.size == 0:
+            return
+
+        with self._lock:
+            self._nodes.pop(node.id, None)
+            self._nodes[node.id] = node
+
+            while len(self._nodes) > self.size:
+                self._nodes.popitem(last=False)
+
+    def discard(self, node_id):
+        """
+        Removes the object for a node from the map, if there is one.
+
+        Args:
+            node_id (str): The OSDF ID of the node.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._nodes.pop(node_id, None)
+
+    def clear(self):
+        """ Removes all of the objects from the map. """
+        with self._lock:
+            self._nodes.clear()
+
+    def stats(self):
+        """
+        Returns the map's counters.
+
+        Args:
+            None
+
+        Returns:
+            A dictionary with the number of hits, misses and held objects.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._nodes)}
+
+
+def identity_mapped(loader):
+    """
+    Decorates the static method of a node class that converts a raw OSDF
+    document into an object, so that it returns the object cached in the
+    session's identity map when the document's version matches. If the
+    session is lazy, a LazyNode standing in for the object is returned
+    instead of building it. The decorated method takes the session the
+    document was retrieved with as an optional 'session' argument, and
+    defaults to the current session.
+
+    Args:
+        loader (function): The method to decorate.
+
+    Returns:
+        The decorated method.
+    """
+    @functools.wraps(loader)
+    def wrapper(doc, session=None):
+        # local import to avoid cyclic imports
+        from cutlass.iHMPSession import iHMPSession
+
+        from cutlass.lazy import LazyNode
+
+        try:
+            if session is None:
+                session = iHMPSession.get_session()
+
+            identity_map = session.get_identity_map()
+        except Exception:
+            return loader(doc)
+
+        if 'id' not in doc:
+            return loader(doc)
+
+        node = None
+
+        if identity_map.size > 0:
+            node = identity_map.get(doc['id'], doc.get('ver'))
+
+        if node is None:
+            if session.lazy:
+                return LazyNode(doc, loader, session=session)
+
+            node = loader(doc)
+
+            if identity_map.size > 0:
+                identity_map.put(node)
+
+        return node
+
+    return wrapper
@@ -0,0 +1,161 @@
+"""
+The lazy module provides stand-ins for node objects that hold on to the raw
+OSDF document and only build the object it describes once one of its modeled
+properties or methods is first used. Walking or searching through many nodes
+to look at their IDs then costs no more than reading the documents.
+"""
+
+import logging
+import threading
+import types
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+class LazyNode(object):
+    """
+    A stand-in for the object of a node, built from its raw OSDF document.
+    The ID, node type, version and links are read from the document. Any
+    other property or method builds the full object first, once, and is then
+    handed to it. isinstance() checks see the class of the full object.
+
+    Attributes:
+        id (str): The OSDF ID of the node.
+        node_type (str): The OSDF node type of the node.
+        doc (dict): The raw OSDF document.
+    """
+    __slots__ = ("id", "node_type", "doc", "_loader", "_session", "_node",
+                 "_lock")
+
+    def __init__(self, doc, loader, session=None):
+        """
+        Constructor for the LazyNode class.
+
+        Args:
+            doc (dict): The raw OSDF document.
+            loader (function): The function that builds the full object
+                               from the document.
+            session (iHMPSession): The session whose identity map the full
+                                   object goes into. Defaults to the
+                                   current session.
+        """
+        object.__setattr__(self, "id", doc['id'])
+        object.__setattr__(self, "node_type", doc.get('node_type'))
+        object.__setattr__(self, "doc", doc)
+        object.__setattr__(self, "_loader", loader)
+        object.__setattr__(self, "_session", session)
+        object.__setattr__(self, "_node", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _node_class(self):
+        # local import to avoid cyclic imports
+        from cutlass.dependency import node_classes
+
+        return node_classes[self.node_type]
+
+    @property
+    def __class__(self):
+        return self._node_class()
+
+    @property
+    def _id(self):
+        # Read by Base.__eq__, which then need not build the full object.
+        return self.id
+
+    @property
+    def loaded(self):
+        """ bool: Whether the full object has been built. """
+        return self._node is not None
+
+    @property
+    def version(self):
+        """ int: The version of the node. """
+        if self._node is not None:
+            return self._node.version
+
+        return self.doc.get('ver')
+
+    @property
+    def links(self):
+        """ dict: The linkage of the node. """
+        if self._node is not None:
+            return self._node.links
+
+        return self.doc.get('linkage', {})
+
+    def load(self):
+        """
+        Builds the full object for the node, unless it was already built.
+
+        Args:
+            None
+
+        Returns:
+            The full object.
+        """
+        with self._lock:
+            if self._node is None:
+                module_logger.debug("Building the %s object for %s.",
+                                    self.node_type, self.id)
+
+                node = self._loader(self.doc)
+                object.__setattr__(self, "_node", node)
+
+                _remember(node, self._session)
+
+        return self._node
+
+    def __getattr__(self, name):
+        # Class level constants, such as the namespace, and static methods do
+        # not need the full object. Properties, fields and slots do.
+        for klass in self._node_class().__mro__:
+            if name in klass.__dict__:
+                value = klass.__dict__[name]
+
+                if not isinstance(value, types.FunctionType) and \
+                   not hasattr(value, "__set__"):
+                    return getattr(klass, name)
+
+                break
+
+        return getattr(self.load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.load(), name, value)
+
+    def __str__(self):
+        return str(self.load())
+
+    def __hash__(self):
+        if not self.id:
+            raise TypeError("Unhashable; must have ID: '{}')".format(repr(self)))
+
+        return hash(self.id)
+
+    def __eq__(self, other):
+        if self.id and getattr(other, "_id", None):
+            return self.id == other._id
+
+        return False
+
+    def __repr__(self):
+        return "<LazyNode %s %s>" % (self.node_type, self.id)
+
+def _remember(node, session=None):
+    # local import to avoid cyclic imports
+    from cutlass.iHMPSession import iHMPSession
+
+    try:
+        if session is None:
+            session = iHMPSession.get_session()
+
+        identity_map = session.get_identity_map()
+    except Exception:
+        return
+
+    if identity_map.size > 0 and node.id is not None:
+        identity_map.put(node)
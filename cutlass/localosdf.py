@@ -0,0 +1,680 @@
+"""
+The localosdf module provides an in-process stand-in for an OSDF server. It
+speaks the same HTTP API as OSDF for the calls cutlass makes (node
+insertion, editing, retrieval, deletion and validation, OQL queries with
+paging and linkage searches) and keeps the nodes in memory. Latency, jitter
+and errors can be injected, so the behaviour of cutlass against a slow or
+flaky server can be measured reproducibly without network access.
+
+The easiest way to use it is through iHMPSession.local():
+
+    session = iHMPSession.local(latency=0.01)
+    study = session.create_study()
+"""
+
+import json
+import logging
+import random
+import re
+import threading
+import time
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+from cutlass.schemas import check_node, compile_schema
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+class OQLError(Exception):
+    """
+    Raised when an OQL query cannot be parsed.
+    """
+    pass
+
+
+_TOKEN_PATTERN = re.compile(r'''
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*")   |
+        (?P<field>\[[^\]]*\])           |
+        (?P<number>-?\d+(?:\.\d+)?)     |
+        (?P<op>&&|\|\||==|!=|<=|>=|<|>|!|\(|\)) |
+        (?P<word>[A-Za-z]+)
+    )''', re.VERBOSE)
+
+_WORD_OPS = {"and": "&&", "or": "||", "not": "!"}
+
+def _tokenize(query):
+    tokens = []
+    position = 0
+    query = query.rstrip()
+
+    while position < len(query):
+        match = _TOKEN_PATTERN.match(query, position)
+
+        if match is None:
+            raise OQLError("Unexpected input at position %s: %s" %
+                           (position, query[position:]))
+
+        kind = match.lastgroup
+        value = match.group(kind)
+
+        if kind == "word":
+            if value.lower() not in _WORD_OPS:
+                raise OQLError("Unknown keyword: %s" % value)
+
+            (kind, value) = ("op", _WORD_OPS[value.lower()])
+        elif kind == "string":
+            value = json.loads(value)
+        elif kind == "field":
+            value = value[1:-1].strip()
+        elif kind == "number":
+            value = float(value)
+
+        tokens.append((kind, value))
+        position = match.end()
+
+    return tokens
+
+def _field_values(doc, field):
+    """
+    Returns the values of a (dotted) field of a document. Fields that are
+    not found at the top level of the document are looked up in its 'meta'
+    section. List values are flattened.
+    """
+    for path in (field, "meta." + field):
+        value = doc
+
+        for part in path.split("."):
+            if not isinstance(value, dict) or part not in value:
+                value = None
+                break
+
+            value = value[part]
+
+        if value is not None:
+            if isinstance(value, list):
+                return value
+
+            return [value]
+
+    return []
+
+_COMPARISONS = {
+    "==": lambda left, right: left == right,
+    "!=": lambda left, right: left != right,
+    "<": lambda left, right: left < right,
+    "<=": lambda left, right: left <= right,
+    ">": lambda left, right: left > right,
+    ">=": lambda left, right: left >= right
+}
+
+class _Parser(object):
+    """
+    A recursive descent parser turning an OQL query into a predicate on
+    node documents.
+    """
+    def __init__(self, query):
+        self.tokens = _tokenize(query)
+        self.position = 0
+
+    def _peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+
+        return (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self.position += 1
+
+        return token
+
+    def _expect(self, kind, value=None):
+        (token_kind, token_value) = self._next()
+
+        if token_kind != kind or (value is not None and token_value != value):
+            raise OQLError("Expected %s but found %s." %
+                           (value or kind, token_value))
+
+        return token_value
+
+    def parse(self):
+        """ Parses the whole query and returns the predicate. """
+        predicate = self._or()
+
+        if self.position != len(self.tokens):
+            raise OQLError("Unexpected token: %s" % (self._peek()[1],))
+
+        return predicate
+
+    def _or(self):
+        terms = [self._and()]
+
+        while self._peek() == ("op", "||"):
+            self._next()
+            terms.append(self._and())
+
+        if len(terms) == 1:
+            return terms[0]
+
+        return lambda doc: any(term(doc) for term in terms)
+
+    def _and(self):
+        terms = [self._not()]
+
+        while self._peek() == ("op", "&&"):
+            self._next()
+            terms.append(self._not())
+
+        if len(terms) == 1:
+            return terms[0]
+
+        return lambda doc: all(term(doc) for term in terms)
+
+    def _not(self):
+        if self._peek() == ("op", "!"):
+            self._next()
+            term = self._not()
+
+            return lambda doc: not term(doc)
+
+        return self._primary()
+
+    def _primary(self):
+        (kind, value) = self._next()
+
+        if (kind, value) == ("op", "("):
+            term = self._or()
+            self._expect("op", ")")
+
+            return term
+
+        if kind == "string":
+            field = self._expect("field")
+
+            return lambda doc: value in _field_values(doc, field)
+
+        if kind == "field":
+            operator = self._expect("op")
+
+            if operator not in _COMPARISONS:
+                raise OQLError("Unknown comparison: %s" % operator)
+
+            (operand_kind, operand) = self._next()
+
+            if operand_kind not in ("number", "string"):
+                raise OQLError("Expected a value to compare %s to." % value)
+
+            compare = _COMPARISONS[operator]
+
+            return lambda doc: any(compare(field_value, operand)
+                                   for field_value in _field_values(doc, value))
+
+        raise OQLError("Unexpected token: %s" % (value,))
+
+def compile_oql(query):
+    """
+    Compiles an OQL query into a predicate on node documents.
+
+    Supported are string matches ("value"[field]), comparisons ([field] >= 5),
+    the boolean operators && (and), || (or) and ! (not), and parentheses.
+
+    Args:
+        query (str): The OQL query.
+
+    Returns:
+        A function taking a node document and returning True if it matches.
+
+    Exceptions:
+        OQLError: If the query cannot be parsed.
+    """
+    return _Parser(query).parse()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Translates the OSDF HTTP API onto the LocalOSDF store.
+    """
+    protocol_version = "HTTP/1.1"
+
+    _routes = [
+        ("GET", re.compile(r"^/nodes/([^/]+)$"), "get_node"),
+        ("GET", re.compile(r"^/nodes/([^/]+)/ver/(\d+)$"), "get_node_by_version"),
+        ("GET", re.compile(r"^/nodes/([^/]+)/in$"), "get_nodes_in"),
+        ("GET", re.compile(r"^/nodes/([^/]+)/out$"), "get_nodes_out"),
+        ("GET", re.compile(r"^/namespaces/([^/]+)/schemas/?$"), "get_schemas"),
+        ("GET", re.compile(r"^/namespaces/([^/]+)/schemas/aux/?$"), "get_aux_schemas"),
+        ("GET", re.compile(r"^/namespaces/([^/]+)/schemas/([^/]+)$"), "get_schema"),
+        ("POST", re.compile(r"^/nodes/?$"), "insert_node"),
+        ("POST", re.compile(r"^/nodes/validate$"), "validate_node"),
+        ("POST", re.compile(r"^/nodes/oql/([^/]+)/page/(\d+)$"), "oql_query"),
+        ("PUT", re.compile(r"^/nodes/([^/]+)$"), "edit_node"),
+        ("DELETE", re.compile(r"^/nodes/([^/]+)$"), "delete_node")
+    ]
+
+    def _dispatch(self):
+        osdf = self.server.osdf
+
+        length = int(self.headers.getheader("Content-Length", 0))
+        body = self.rfile.read(length) if length else ""
+
+        for (method, pattern, name) in self._routes:
+            match = pattern.match(self.path)
+
+            if method == self.command and match:
+                response = osdf.handle(name, match.groups(), body)
+                break
+        else:
+            response = (404, {"X-OSDF-Error": "Unknown resource."}, "")
+
+        (code, headers, content) = response
+
+        self.send_response(code)
+
+        for (header_name, header_value) in headers.items():
+            self.send_header(header_name, header_value)
+
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+    do_PUT = _dispatch
+    do_DELETE = _dispatch
+
+    def log_message(self, *args):
+        """ Log requests to the module logger instead of stderr. """
+        module_logger.debug(*args)
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalOSDF(object):
+    """
+    An in-memory OSDF server running in a background thread.
+
+    Attributes:
+        host (str): The address the server listens on.
+        port (int): The port the server listens on.
+        page_size (int): The number of results per page of OQL results.
+        latency (float): Seconds added to every response.
+        jitter (float): The maximum number of seconds randomly added to or
+                        removed from the latency.
+        error_rate (float): The fraction of requests that fail.
+        error_code (int): The HTTP status of failed requests. A 503 is sent
+                          before the request is processed; any other code is
+                          sent after, as if the response had been lost.
+        schemas (dict): The schemas served per namespace, by schema name.
+                        Documents are validated against the schema named
+                        after their node type.
+        aux_schemas (dict): The auxiliary schemas served per namespace.
+        validator (callable): Called with documents being validated or
+                              written. Returns an error message, or None if
+                              the document is valid.
+        requests (dict): The number of requests handled, by operation.
+    """
+    def __init__(self, host="127.0.0.1", port=0, page_size=100, latency=0,
+                 jitter=0, error_rate=0, error_code=503, seed=None):
+        """
+        Constructor for the LocalOSDF class. The server is not started until
+        start() is called.
+
+        Args:
+            host (str): The address to listen on.
+            port (int): The port to listen on. 0 picks a free port.
+            page_size (int): The number of results per page.
+            latency (float): Seconds added to every response.
+            jitter (float): Maximum random variation of the latency.
+            error_rate (float): The fraction of requests to fail, from 0 to 1.
+            error_code (int): The HTTP status sent for failed requests.
+            seed (int): Seeds the random numbers used for jitter, errors and
+                        node IDs, for reproducible runs.
+        """
+        if page_size < 1:
+            raise ValueError("Invalid page size. Must be positive.")
+
+        if not 0 <= error_rate <= 1:
+            raise ValueError("Invalid error rate. Must be between 0 and 1.")
+
+        self.host = host
+        self.port = port
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.schemas = {}
+        self.aux_schemas = {}
+        self.validator = None
+        self.requests = {}
+
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._nodes = {}
+        self._history = {}
+        self._order = []
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """
+        Starts serving requests in a background thread.
+
+        Args:
+            None
+
+        Returns:
+            The LocalOSDF object, for chaining.
+        """
+        self._server = _Server((self.host, self.port), _Handler)
+        self._server.osdf = self
+        self.port = self._server.server_address[1]
+
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        kwargs={"poll_interval": 0.1})
+        self._thread.daemon = True
+        self._thread.start()
+
+        module_logger.info("Local OSDF listening on %s:%s.", self.host, self.port)
+
+        return self
+
+    def stop(self):
+        """
+        Stops the server.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def session(self, **kwargs):
+        """
+        Creates an iHMPSession talking to this server.
+
+        Args:
+            kwargs: Any additional iHMPSession arguments.
+
+        Returns:
+            An iHMPSession.
+        """
+        from cutlass.iHMPSession import iHMPSession
+
+        return iHMPSession("local", "local", server=self.host, port=self.port,
+                           ssl=False, **kwargs)
+
+    def load(self, docs):
+        """
+        Adds documents to the store directly, bypassing HTTP and validation.
+        Documents without an ID are given one.
+
+        Args:
+            docs (list): The node documents to add.
+
+        Returns:
+            The list of the IDs of the documents.
+        """
+        node_ids = []
+
+        with self._lock:
+            for doc in docs:
+                doc = json.loads(json.dumps(doc))
+                node_id = doc.get("id") or self._new_id()
+                doc["id"] = node_id
+                doc["ver"] = doc.get("ver") or 1
+
+                self._store(doc)
+                node_ids.append(node_id)
+
+        return node_ids
+
+    def node_count(self):
+        """ Returns the number of nodes in the store. """
+        with self._lock:
+            return len(self._nodes)
+
+    def _new_id(self):
+        while True:
+            node_id = "%032x" % self._random.getrandbits(128)
+
+            if node_id not in self._nodes:
+                return node_id
+
+    def _store(self, doc):
+        node_id = doc["id"]
+
+        if node_id not in self._nodes:
+            self._order.append(node_id)
+
+        self._nodes[node_id] = doc
+        self._history.setdefault(node_id, {})[doc["ver"]] = doc
+
+    def _delay(self):
+        delay = self.latency
+
+        if self.jitter:
+            with self._lock:
+                delay += self._random.uniform(-self.jitter, self.jitter)
+
+        if delay > 0:
+            time.sleep(delay)
+
+    def _fails(self):
+        if not self.error_rate:
+            return False
+
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def handle(self, name, args, body):
+        """
+        Handles a request for one of the OSDF operations.
+
+        Args:
+            name (str): The name of the operation.
+            args (tuple): The arguments parsed from the resource.
+            body (str): The body of the request.
+
+        Returns:
+            A tuple of the HTTP status, the response headers and the body.
+        """
+        with self._lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+
+        self._delay()
+
+        failed = self._fails()
+
+        if failed and self.error_code == 503:
+            return (503, {"X-OSDF-Error": "Injected failure."}, "")
+
+        try:
+            response = getattr(self, "_" + name)(body, *args)
+        except Exception as handle_exception:
+            module_logger.exception(handle_exception)
+            response = (500, {"X-OSDF-Error": str(handle_exception)}, "")
+
+        if failed:
+            return (self.error_code, {"X-OSDF-Error": "Injected failure."}, "")
+
+        return response
+
+    @staticmethod
+    def _json(code, data):
+        return (code, {"Content-Type": "application/json"}, json.dumps(data))
+
+    @staticmethod
+    def _error(code, message):
+        return (code, {"X-OSDF-Error": message}, "")
+
+    def _check(self, doc):
+        error = check_node(doc)
+
+        if error is not None:
+            return error
+
+        schema = self.schemas.get(doc["ns"], {}).get(doc["node_type"])
+
+        if schema is not None:
+            aux_schemas = self.aux_schemas.get(doc["ns"], {})
+            problems = compile_schema(schema, aux_schemas)(doc["meta"])
+
+            if len(problems) > 0:
+                return " ".join(problems)
+
+        if self.validator is not None:
+            return self.validator(doc)
+
+        return None
+
+    def _get_node(self, _body, node_id):
+        with self._lock:
+            doc = self._nodes.get(node_id)
+
+        if doc is None:
+            return self._error(404, "Node not found.")
+
+        return self._json(200, doc)
+
+    def _get_node_by_version(self, _body, node_id, version):
+        with self._lock:
+            doc = self._history.get(node_id, {}).get(int(version))
+
+        if doc is None:
+            return self._error(404, "Node version not found.")
+
+        return self._json(200, doc)
+
+    def _get_nodes_in(self, _body, node_id):
+        with self._lock:
+            docs = [self._nodes[other_id] for other_id in self._order
+                    if any(node_id in targets for targets in
+                           self._nodes[other_id]["linkage"].values())]
+
+        return self._json(200, {"result_count": len(docs), "page": 1,
+                                "results": docs})
+
+    def _get_nodes_out(self, _body, node_id):
+        with self._lock:
+            doc = self._nodes.get(node_id)
+
+            if doc is None:
+                return self._error(404, "Node not found.")
+
+            targets = set()
+            for link_targets in doc["linkage"].values():
+                targets.update(link_targets)
+
+            docs = [self._nodes[target] for target in self._order
+                    if target in targets]
+
+        return self._json(200, {"result_count": len(docs), "page": 1,
+                                "results": docs})
+
+    def _get_schemas(self, _body, namespace):
+        return self._json(200, self.schemas.get(namespace, {}))
+
+    def _get_aux_schemas(self, _body, namespace):
+        return self._json(200, self.aux_schemas.get(namespace, {}))
+
+    def _get_schema(self, _body, namespace, schema_name):
+        schema = self.schemas.get(namespace, {}).get(schema_name)
+
+        if schema is None:
+            return self._error(404, "Schema not found.")
+
+        return self._json(200, schema)
+
+    def _insert_node(self, body):
+        doc = json.loads(body)
+        error = self._check(doc)
+
+        if error is not None:
+            return self._error(422, error)
+
+        with self._lock:
+            doc["id"] = self._new_id()
+            doc["ver"] = 1
+            self._store(doc)
+
+        location = "http://%s:%s/nodes/%s" % (self.host, self.port, doc["id"])
+
+        return (201, {"Location": location}, "")
+
+    def _validate_node(self, body):
+        error = self._check(json.loads(body))
+
+        if error is not None:
+            return self._error(422, error)
+
+        return (200, {}, "")
+
+    def _edit_node(self, body, node_id):
+        doc = json.loads(body)
+        error = self._check(doc)
+
+        if error is not None:
+            return self._error(422, error)
+
+        with self._lock:
+            current = self._nodes.get(node_id)
+
+            if current is None:
+                return self._error(404, "Node not found.")
+
+            if doc.get("ver") != current["ver"]:
+                return self._error(409, "Version %s is not the current one (%s)." %
+                                   (doc.get("ver"), current["ver"]))
+
+            doc["id"] = node_id
+            doc["ver"] = current["ver"] + 1
+            self._store(doc)
+
+        return (200, {}, "")
+
+    def _delete_node(self, _body, node_id):
+        with self._lock:
+            if node_id not in self._nodes:
+                return self._error(404, "Node not found.")
+
+            del self._nodes[node_id]
+            self._order.remove(node_id)
+
+        return (204, {}, "")
+
+    def _oql_query(self, body, namespace, page):
+        try:
+            predicate = compile_oql(body)
+        except OQLError as oql_error:
+            return self._error(400, "Invalid OQL query: %s" % oql_error)
+
+        with self._lock:
+            docs = [self._nodes[node_id] for node_id in self._order]
+
+        matches = [doc for doc in docs
+                   if doc.get("ns") == namespace and predicate(doc)]
+
+        page = int(page)
+        start = (page - 1) * self.page_size
+        results = matches[start:start + self.page_size]
+
+        # Past the last page, OSDF reports no results at all.
+        result_count = len(matches) if len(results) > 0 else 0
+        code = 206 if start + self.page_size < len(matches) else 200
+
+        return self._json(code, {"result_count": result_count, "page": page,
+                                 "results": results})
@@ -0,0 +1,141 @@
+"""
+The paging module walks through the pages of results of an OSDF Query
+Language (OQL) query. Once the first page has told how many results there
+are, the remaining pages are fetched concurrently in the background, with a
+bounded fan-out, while the results are still handed back in page order.
+"""
+
+import logging
+from cutlass.iHMPSession import iHMPSession
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+def oql_pages(namespace, query, session=None, prefetch=True, fan_out=None,
+              cache=True):
+    """
+    Issues an OQL query and yields the list of results of each page, in page
+    order, until all of the results reported by OSDF have been retrieved.
+
+    The first page tells how many results there are in total, so the
+    remaining pages are requested concurrently on the session's worker pool,
+    with at most 'fan_out' of them in flight at once. They are still yielded
+    in page order.
+
+    The pages are added to the session's query cache, so that repeated
+    lookups, such as those of the linkage accessors, are answered from it.
+    Scans through a large number of results should pass cache=False, since
+    they would otherwise leave all of their pages held in memory.
+
+    Args:
+        namespace (str): The OSDF namespace to query.
+        query (str): The OQL query.
+        session (iHMPSession): The session to use. Defaults to the current
+                               session.
+        prefetch (bool): Whether to fetch the following pages in the
+                         background while the current one is being consumed.
+                         If False, each page is only requested once the
+                         previous one has been consumed.
+        fan_out (int): How many pages may be requested at once. Defaults to
+                       the number of session workers. Lower values bound
+                       the number of pages held in memory.
+        cache (bool): Whether to add the pages to the session's query
+                      cache. Defaults to True.
+
+    Returns:
+        A generator of lists of OSDF documents.
+    """
+    module_logger.debug("In oql_pages. Query: %s", query)
+
+    if session is None:
+        session = iHMPSession.get_session()
+
+    if fan_out is not None and fan_out < 1:
+        raise ValueError("Invalid fan out. Must be positive.")
+
+    osdf = session.get_osdf()
+
+    def fetch(page_no):
+        return osdf.oql_query(namespace, query, page=page_no, cache=cache)
+
+    res = fetch(1)
+    results = res['results']
+
+    if len(results) == 0:
+        return
+
+    total = res['result_count']
+    seen = len(results)
+    page_no = 1
+
+    yield results
+
+    if prefetch and seen < total:
+        # OSDF does not report its page size, so the number of pages left is
+        # estimated from the size of the first one.
+        page_size = len(results)
+        last_page = 1 + (total - seen + page_size - 1) // page_size
+
+        pages = session.get_executor().map(fetch, range(2, last_page + 1),
+                                           window=fan_out)
+
+        try:
+            for res in pages:
+                page_no += 1
+                results = res['results']
+
+                if len(results) == 0:
+                    return
+
+                seen += len(results)
+
+                yield results
+
+                if seen >= total:
+                    return
+        finally:
+            pages.close()
+
+    # Pick up anything the estimate missed, one page at a time.
+    while seen < total:
+        page_no += 1
+        results = fetch(page_no)['results']
+
+        if len(results) == 0:
+            break
+
+        seen += len(results)
+
+        yield results
+
+def oql_docs(namespace, query, session=None, prefetch=True, fan_out=None,
+             cache=True):
+    """
+    Issues an OQL query and yields every resulting document, across all of
+    the pages of results.
+
+    Args:
+        namespace (str): The OSDF namespace to query.
+        query (str): The OQL query.
+        session (iHMPSession): The session to use. Defaults to the current
+                               session.
+        prefetch (bool): Whether to fetch the following pages in the
+                         background while the current one is being consumed.
+        fan_out (int): How many pages may be requested at once. Defaults to
+                       the number of session workers.
+        cache (bool): Whether to add the pages to the session's query
+                      cache. Defaults to True.
+
+    Returns:
+        A generator of OSDF documents.
+    """
+    pages = oql_pages(namespace, query, session=session, prefetch=prefetch,
+                      fan_out=fan_out, cache=cache)
+
+    for page in pages:
+        for doc in page:
+            yield doc
@@ -0,0 +1,194 @@
+"""
+The querycache module keeps the pages of results of recent OSDF Query
+Language (OQL) queries, so that a session issuing the same query again does
+not have to wait for OSDF. Cached pages expire after a time to live, and a
+write made by the session drops every page of its namespace as soon as it is
+sent, so that the session never reads its own stale results.
+"""
+
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+class QueryCache(object):
+    """
+    A thread safe, size bounded cache of OQL result pages, keyed by
+    namespace, query and page number.
+
+    A write to a node drops every page of the node's namespace. An OQL
+    query may match on any field of the nodes, so there is no telling from
+    the query alone which writes could change its results.
+
+    Attributes:
+        ttl (float): The number of seconds a page is kept. 0 disables the
+                     cache.
+        size (int): The maximum number of pages held.
+        hits (int): The number of queries answered from the cache.
+        misses (int): The number of queries that were not.
+        generation (int): The number of times pages were invalidated or
+                          cleared, so that results kept elsewhere can tell
+                          whether a write may have changed them.
+    """
+    def __init__(self, ttl=300, size=1000):
+        """
+        Constructor for the QueryCache class.
+
+        Args:
+            ttl (float): The number of seconds a page is kept.
+            size (int): The maximum number of pages to hold.
+        """
+        if ttl < 0:
+            raise ValueError("Invalid ttl. Must not be negative.")
+
+        if size < 0:
+            raise ValueError("Invalid size. Must not be negative.")
+
+        self.ttl = ttl
+        self.size = size
+
+        self._lock = threading.Lock()
+        self._pages = OrderedDict()
+        self._namespaces = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pages)
+
+    @property
+    def enabled(self):
+        """
+        bool: Whether the cache holds on to any pages at all.
+        """
+        return self.ttl > 0 and self.size > 0
+
+    def get(self, namespace, query, page):
+        """
+        Looks up a page of results.
+
+        Args:
+            namespace (str): The OSDF namespace queried.
+            query (str): The OQL query.
+            page (int): The page number.
+
+        Returns:
+            A copy of the cached page, or None if it is not cached or has
+            expired.
+        """
+        entry = (namespace, query, page)
+
+        with self._lock:
+            cached = self._pages.pop(entry, None)
+
+            if cached is not None and cached[0] > time.time():
+                self._pages[entry] = cached
+                self.hits += 1
+
+                return copy.deepcopy(cached[1])
+
+            if cached is not None:
+                self._unfile(entry)
+
+            self.misses += 1
+
+            return None
+
+    def put(self, namespace, query, page, data):
+        """
+        Adds a page of results to the cache.
+
+        Args:
+            namespace (str): The OSDF namespace queried.
+            query (str): The OQL query.
+            page (int): The page number.
+            data (dict): The page, as returned by OSDF.
+
+        Returns:
+            None
+        """
+        if not self.enabled:
+            return
+
+        entry = (namespace, query, page)
+        expires = time.time() + self.ttl
+
+        with self._lock:
+            self._pages.pop(entry, None)
+            self._pages[entry] = (expires, copy.deepcopy(data))
+            self._namespaces.setdefault(namespace, set()).add(entry)
+
+            while len(self._pages) > self.size:
+                (evicted, _cached) = self._pages.popitem(last=False)
+                self._unfile(evicted)
+
+    def _unfile(self, entry):
+        entries = self._namespaces.get(entry[0])
+
+        if entries is not None:
+            entries.discard(entry)
+
+            if len(entries) == 0:
+                del self._namespaces[entry[0]]
+
+    def invalidate(self, namespace=None):
+        """
+        Drops the pages that a write to a node could have changed, which are
+        all of the pages of the node's namespace.
+
+        Args:
+            namespace (str): The OSDF namespace of the node written. Defaults
+                             to every namespace, for writes whose namespace
+                             is not known.
+
+        Returns:
+            The number of pages dropped.
+        """
+        with self._lock:
+            self.generation += 1
+
+            if namespace is None:
+                entries = list(self._pages.keys())
+            else:
+                entries = list(self._namespaces.get(namespace, ()))
+
+            for entry in entries:
+                del self._pages[entry]
+                self._unfile(entry)
+
+        module_logger.debug("Dropped %s cached query pages.", len(entries))
+
+        return len(entries)
+
+    def clear(self):
+        """ Removes all of the pages from the cache. """
+        with self._lock:
+            self.generation += 1
+            self._pages.clear()
+            self._namespaces.clear()
+
+    def stats(self):
+        """
+        Returns the cache's counters.
+
+        Args:
+            None
+
+        Returns:
+            A dictionary with the number of hits, misses and held pages.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._pages)}
+
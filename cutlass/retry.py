@@ -0,0 +1,286 @@
+"""
+The retry module decides when a failed OSDF request may be repeated and
+how long to wait before doing so. Transient failures (dropped connections
+and 5xx gateway errors) are retried with jittered exponential backoff, but
+only when repeating the operation cannot apply it twice. A circuit breaker
+stops sending requests altogether while the server appears to be down.
+"""
+
+import logging
+import random
+import threading
+import time
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+# The kinds of OSDF operations, which differ in whether they may be repeated.
+READ = "read"
+INSERT = "insert"
+EDIT = "edit"
+DELETE = "delete"
+
+# POSTs to these resources only read data.
+_READ_POSTS = ("/nodes/oql/", "/nodes/query/", "/nodes/validate")
+
+def classify(method, resource):
+    """
+    Determines the kind of operation an OSDF request performs.
+
+    Args:
+        method (str): The HTTP method of the request.
+        resource (str): The requested resource (path).
+
+    Returns:
+        One of READ, INSERT, EDIT or DELETE.
+    """
+    if method == "GET":
+        return READ
+
+    if method == "POST":
+        if resource.startswith(_READ_POSTS):
+            return READ
+
+        return INSERT
+
+    if method == "PUT":
+        return EDIT
+
+    return DELETE
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of sending a request while the circuit breaker is open.
+    """
+    pass
+
+
+class CircuitBreaker(object):
+    """
+    Fails requests fast once the OSDF server has failed a number of times in
+    a row. After 'reset_timeout' seconds a single trial request is let
+    through: if it succeeds the breaker closes again, otherwise it stays open
+    for another 'reset_timeout' seconds.
+
+    Attributes:
+        failure_threshold (int): The number of consecutive failures that
+                                 opens the breaker.
+        reset_timeout (float): The number of seconds the breaker stays open
+                               before a trial request is allowed.
+        opened (int): The number of times the breaker has opened.
+        rejected (int): The number of requests failed fast.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        """
+        Constructor for the CircuitBreaker class.
+
+        Args:
+            failure_threshold (int): Consecutive failures before opening.
+            reset_timeout (float): Seconds to stay open before a trial.
+        """
+        if failure_threshold < 1:
+            raise ValueError("Invalid failure threshold. Must be positive.")
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = CircuitBreaker.CLOSED
+        self._failures = 0
+        self._opened_at = 0
+
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self):
+        """
+        str: The state of the breaker: 'closed', 'open' or 'half-open'.
+        """
+        return self._state
+
+    def before_call(self):
+        """
+        Checks whether a request may be sent.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Exceptions:
+            CircuitOpenError: If the breaker is open.
+        """
+        with self._lock:
+            if self._state == CircuitBreaker.CLOSED:
+                return
+
+            if self._state == CircuitBreaker.OPEN and \
+               time.time() - self._opened_at >= self.reset_timeout:
+                self._state = CircuitBreaker.HALF_OPEN
+                return
+
+            self.rejected += 1
+
+        raise CircuitOpenError("The OSDF server is unavailable. Not retrying " + \
+                               "for up to %s seconds." % self.reset_timeout)
+
+    def record_success(self):
+        """ Records a request that the server answered. """
+        with self._lock:
+            self._state = CircuitBreaker.CLOSED
+            self._failures = 0
+
+    def record_abort(self):
+        """
+        Records a request that ended without reaching a verdict on the
+        server, such as one that failed locally. It counts as neither a
+        success nor a failure, but a trial request is given back, so that
+        the next request may be tried instead.
+        """
+        with self._lock:
+            if self._state == CircuitBreaker.HALF_OPEN:
+                self._state = CircuitBreaker.OPEN
+
+    def record_failure(self):
+        """ Records a request that failed with a transient error. """
+        with self._lock:
+            self._failures += 1
+
+            if self._state == CircuitBreaker.HALF_OPEN or \
+               self._failures >= self.failure_threshold:
+                if self._state != CircuitBreaker.OPEN:
+                    module_logger.warn("Opening the circuit breaker after " + \
+                                       "%s failures.", self._failures)
+                    self.opened += 1
+
+                self._state = CircuitBreaker.OPEN
+                self._opened_at = time.time()
+
+
+class RetryPolicy(object):
+    """
+    Decides which failed requests are repeated and waits between attempts
+    with full-jitter exponential backoff.
+
+    Reads are always safe to repeat. Inserts, edits and deletes are only
+    repeated when the request never reached the server, since otherwise
+    the operation may already have been applied. An insert may also be
+    repeated if an 'insert_guard' is set: it is called with the document
+    being inserted and must return the ID of the node an earlier attempt
+    created, or None if there is no such node.
+
+    Attributes:
+        retries (int): The maximum number of times a request is repeated.
+        backoff (float): The base delay, in seconds, between attempts.
+        max_backoff (float): The maximum delay, in seconds.
+        insert_guard (callable): Finds nodes created by failed inserts.
+    """
+    # Response codes treated as transient failures.
+    retry_statuses = (500, 502, 503, 504)
+
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30,
+                 insert_guard=None):
+        """
+        Constructor for the RetryPolicy class.
+
+        Args:
+            retries (int): The maximum number of retries per request.
+            backoff (float): The base delay between attempts, in seconds.
+            max_backoff (float): The maximum delay between attempts.
+            insert_guard (callable): Called with a document whose insert
+                                     failed; returns the ID of the node it
+                                     created, or None.
+        """
+        if retries < 0:
+            raise ValueError("Invalid number of retries. Must not be negative.")
+
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.insert_guard = insert_guard
+
+        self._lock = threading.Lock()
+        self._retried = dict((operation, 0)
+                             for operation in (READ, INSERT, EDIT, DELETE))
+        self._exhausted = 0
+
+    def should_retry(self, operation, attempt, sent):
+        """
+        Determines whether a failed request may be repeated.
+
+        Args:
+            operation (str): The kind of operation (READ, INSERT, ...).
+            attempt (int): The number of retries already made.
+            sent (bool): Whether the request may have reached the server.
+
+        Returns:
+            True if the request may be repeated, False otherwise.
+        """
+        if not sent or operation == READ:
+            allowed = True
+        else:
+            allowed = operation == INSERT and self.insert_guard is not None
+
+        if allowed and attempt >= self.retries:
+            with self._lock:
+                self._exhausted += 1
+
+            return False
+
+        return allowed
+
+    def delay(self, attempt):
+        """
+        Returns the time to wait, in seconds, before the given retry.
+
+        Args:
+            attempt (int): The number of retries already made.
+
+        Returns:
+            The delay in seconds.
+        """
+        cap = min(self.max_backoff, self.backoff * (2 ** attempt))
+
+        return random.uniform(0, cap)
+
+    def wait(self, operation, attempt):
+        """
+        Counts a retry of the given operation and sleeps before it.
+
+        Args:
+            operation (str): The kind of operation being retried.
+            attempt (int): The number of retries already made.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._retried[operation] += 1
+
+        time.sleep(self.delay(attempt))
+
+    def stats(self):
+        """
+        Returns the retry counters.
+
+        Args:
+            None
+
+        Returns:
+            A dictionary with the number of retries per operation and the
+            number of requests that failed after using up all their retries.
+        """
+        with self._lock:
+            return {"retries": dict(self._retried),
+                    "exhausted": self._exhausted}
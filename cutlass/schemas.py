@@ -0,0 +1,695 @@
+"""
+The schemas module validates node documents locally, so that validate(),
+is_valid() and save() do not have to ask OSDF whether a document is valid
+before every write. The JSON schemas of a namespace are retrieved from OSDF
+once, optionally kept on disk between runs, and compiled into validators.
+Schemas using JSON Schema features that are not supported here are left to
+OSDF to validate against.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+class SchemaError(Exception):
+    """
+    Raised when a schema uses a JSON Schema feature that cannot be compiled.
+    """
+    pass
+
+
+def check_node(doc):
+    """
+    Checks the parts of a node document that OSDF requires of every node,
+    whatever its node type.
+
+    Args:
+        doc (dict): The node document.
+
+    Returns:
+        An error message, or None if the document is well formed.
+    """
+    if not isinstance(doc, dict):
+        return "The document is not an object."
+
+    for (key, kind) in (("ns", basestring), ("node_type", basestring),
+                        ("acl", dict), ("linkage", dict), ("meta", dict)):
+        if not isinstance(doc.get(key), kind):
+            return "Missing or invalid '%s'." % key
+
+    for key in ("read", "write"):
+        if not isinstance(doc["acl"].get(key), list):
+            return "Missing or invalid 'acl.%s'." % key
+
+    for (link, targets) in doc["linkage"].items():
+        if not isinstance(targets, list):
+            return "Linkage '%s' is not a list." % link
+
+    return None
+
+
+def _is_number(value):
+    return isinstance(value, (int, long, float)) and not isinstance(value, bool)
+
+def _equal(value, other):
+    # True == 1 in Python, but not in JSON.
+    if isinstance(value, bool) != isinstance(other, bool):
+        return False
+
+    return value == other
+
+_TYPES = {
+    "array": lambda value: isinstance(value, list),
+    "boolean": lambda value: isinstance(value, bool),
+    "integer": lambda value: _is_number(value) and value == int(value),
+    "null": lambda value: value is None,
+    "number": _is_number,
+    "object": lambda value: isinstance(value, dict),
+    "string": lambda value: isinstance(value, basestring)
+}
+
+# Keywords that only describe a schema and do not constrain anything.
+_ANNOTATIONS = set(["$schema", "id", "title", "description", "default",
+                    "definitions", "format", "examples", "additionalItems"])
+
+def _where(path):
+    return path or "the document"
+
+class _Compiler(object):
+    """
+    Compiles a JSON schema (draft 4) into a function that takes a value and
+    a path and returns the list of problems found in the value.
+    """
+    def __init__(self, root, aux_schemas):
+        self.root = root
+        self.aux_schemas = aux_schemas or {}
+        self._refs = {}
+
+    def _resolve(self, ref):
+        (name, _hash, pointer) = ref.partition("#")
+
+        if name:
+            name = name.rstrip("/").split("/")[-1]
+
+            if name.endswith(".json"):
+                name = name[:-5]
+
+            if name not in self.aux_schemas:
+                raise SchemaError("Unknown schema reference: %s" % ref)
+
+            target = self.aux_schemas[name]
+        else:
+            target = self.root
+
+        for part in [part for part in pointer.split("/") if part]:
+            part = part.replace("~1", "/").replace("~0", "~")
+
+            if isinstance(target, list) and part.isdigit():
+                part = int(part)
+            elif not isinstance(target, dict) or part not in target:
+                raise SchemaError("Unresolvable schema reference: %s" % ref)
+
+            target = target[part]
+
+        return target
+
+    def _ref(self, ref):
+        if ref not in self._refs:
+            # Filled in after compiling, so that recursive schemas work.
+            self._refs[ref] = None
+            self._refs[ref] = self.compile(self._resolve(ref))
+
+        refs = self._refs
+
+        return lambda value, path: refs[ref](value, path)
+
+    def compile(self, schema):
+        """ Compiles a schema into a validating function. """
+        if not isinstance(schema, dict):
+            raise SchemaError("A schema must be an object.")
+
+        if "$ref" in schema:
+            return self._ref(schema["$ref"])
+
+        checks = []
+
+        for (keyword, argument) in schema.items():
+            if keyword in _ANNOTATIONS:
+                continue
+
+            method = getattr(self, "_" + keyword, None)
+
+            if method is None:
+                raise SchemaError("Unsupported schema keyword: %s" % keyword)
+
+            check = method(argument, schema)
+
+            if check is not None:
+                checks.append(check)
+
+        def validate(value, path):
+            problems = []
+
+            for check in checks:
+                problems.extend(check(value, path))
+
+            return problems
+
+        return validate
+
+    def _type(self, argument, _schema):
+        names = argument if isinstance(argument, list) else [argument]
+
+        for name in names:
+            if name not in _TYPES:
+                raise SchemaError("Unsupported type: %s" % name)
+
+        tests = [_TYPES[name] for name in names]
+
+        def check(value, path):
+            if any(test(value) for test in tests):
+                return []
+
+            return ["%s is not of type %s." % (_where(path), " or ".join(names))]
+
+        return check
+
+    def _enum(self, argument, _schema):
+        def check(value, path):
+            if any(_equal(value, allowed) for allowed in argument):
+                return []
+
+            return ["%s is not one of %s." % (_where(path), argument)]
+
+        return check
+
+    def _properties(self, argument, _schema):
+        compiled = dict([(name, self.compile(subschema))
+                         for (name, subschema) in argument.items()])
+
+        def check(value, path):
+            if not isinstance(value, dict):
+                return []
+
+            problems = []
+
+            for (name, validate) in compiled.items():
+                if name in value:
+                    problems.extend(validate(value[name], _join(path, name)))
+
+            return problems
+
+        return check
+
+    def _patternProperties(self, argument, _schema):
+        compiled = [(re.compile(pattern), self.compile(subschema))
+                    for (pattern, subschema) in argument.items()]
+
+        def check(value, path):
+            if not isinstance(value, dict):
+                return []
+
+            problems = []
+
+            for (name, item) in value.items():
+                for (pattern, validate) in compiled:
+                    if pattern.search(name):
+                        problems.extend(validate(item, _join(path, name)))
+
+            return problems
+
+        return check
+
+    def _additionalProperties(self, argument, schema):
+        known = set(schema.get("properties", {}).keys())
+        patterns = [re.compile(pattern)
+                    for pattern in schema.get("patternProperties", {})]
+
+        if argument is True:
+            return None
+
+        validate = None if argument is False else self.compile(argument)
+
+        def check(value, path):
+            if not isinstance(value, dict):
+                return []
+
+            problems = []
+
+            for (name, item) in value.items():
+                if name in known or any(pattern.search(name)
+                                        for pattern in patterns):
+                    continue
+
+                if validate is None:
+                    problems.append("%s is not allowed." % _join(path, name))
+                else:
+                    problems.extend(validate(item, _join(path, name)))
+
+            return problems
+
+        return check
+
+    def _required(self, argument, _schema):
+        def check(value, path):
+            if not isinstance(value, dict):
+                return []
+
+            return ["%s is required." % _join(path, name)
+                    for name in argument if name not in value]
+
+        return check
+
+    def _items(self, argument, _schema):
+        if isinstance(argument, list):
+            compiled = [self.compile(subschema) for subschema in argument]
+        else:
+            validate = self.compile(argument)
+            compiled = None
+
+        def check(value, path):
+            if not isinstance(value, list):
+                return []
+
+            problems = []
+
+            for (index, item) in enumerate(value):
+                item_path = "%s[%s]" % (path, index)
+
+                if compiled is None:
+                    problems.extend(validate(item, item_path))
+                elif index < len(compiled):
+                    problems.extend(compiled[index](item, item_path))
+
+            return problems
+
+        return check
+
+    def _uniqueItems(self, argument, _schema):
+        if not argument:
+            return None
+
+        def check(value, path):
+            if not isinstance(value, list):
+                return []
+
+            encoded = [json.dumps(item, sort_keys=True) for item in value]
+
+            if len(set(encoded)) == len(encoded):
+                return []
+
+            return ["%s has duplicate items." % _where(path)]
+
+        return check
+
+    @staticmethod
+    def _bound(test, applies, message):
+        def check(value, path):
+            if applies(value) and not test(value):
+                return [message % _where(path)]
+
+            return []
+
+        return check
+
+    def _minItems(self, argument, _schema):
+        return self._bound(lambda value: len(value) >= argument,
+                           lambda value: isinstance(value, list),
+                           "%%s has fewer than %s items." % argument)
+
+    def _maxItems(self, argument, _schema):
+        return self._bound(lambda value: len(value) <= argument,
+                           lambda value: isinstance(value, list),
+                           "%%s has more than %s items." % argument)
+
+    def _minLength(self, argument, _schema):
+        return self._bound(lambda value: len(value) >= argument,
+                           lambda value: isinstance(value, basestring),
+                           "%%s is shorter than %s characters." % argument)
+
+    def _maxLength(self, argument, _schema):
+        return self._bound(lambda value: len(value) <= argument,
+                           lambda value: isinstance(value, basestring),
+                           "%%s is longer than %s characters." % argument)
+
+    def _pattern(self, argument, _schema):
+        pattern = re.compile(argument)
+
+        return self._bound(lambda value: pattern.search(value) is not None,
+                           lambda value: isinstance(value, basestring),
+                           "%%s does not match '%s'." % argument)
+
+    def _minimum(self, argument, schema):
+        if schema.get("exclusiveMinimum") is True:
+            return self._bound(lambda value: value > argument, _is_number,
+                               "%%s is not greater than %s." % argument)
+
+        return self._bound(lambda value: value >= argument, _is_number,
+                           "%%s is less than %s." % argument)
+
+    def _maximum(self, argument, schema):
+        if schema.get("exclusiveMaximum") is True:
+            return self._bound(lambda value: value < argument, _is_number,
+                               "%%s is not less than %s." % argument)
+
+        return self._bound(lambda value: value <= argument, _is_number,
+                           "%%s is greater than %s." % argument)
+
+    def _exclusiveMinimum(self, argument, _schema):
+        if isinstance(argument, bool):
+            # Draft 4: a modifier of 'minimum'.
+            return None
+
+        return self._bound(lambda value: value > argument, _is_number,
+                           "%%s is not greater than %s." % argument)
+
+    def _exclusiveMaximum(self, argument, _schema):
+        if isinstance(argument, bool):
+            # Draft 4: a modifier of 'maximum'.
+            return None
+
+        return self._bound(lambda value: value < argument, _is_number,
+                           "%%s is not less than %s." % argument)
+
+    def _multipleOf(self, argument, _schema):
+        return self._bound(lambda value: (value / float(argument)) ==
+                           int(value / float(argument)), _is_number,
+                           "%%s is not a multiple of %s." % argument)
+
+    def _allOf(self, argument, _schema):
+        compiled = [self.compile(subschema) for subschema in argument]
+
+        def check(value, path):
+            problems = []
+
+            for validate in compiled:
+                problems.extend(validate(value, path))
+
+            return problems
+
+        return check
+
+    def _anyOf(self, argument, _schema):
+        compiled = [self.compile(subschema) for subschema in argument]
+
+        def check(value, path):
+            if any(len(validate(value, path)) == 0 for validate in compiled):
+                return []
+
+            return ["%s does not match any of the allowed schemas." %
+                    _where(path)]
+
+        return check
+
+    def _oneOf(self, argument, _schema):
+        compiled = [self.compile(subschema) for subschema in argument]
+
+        def check(value, path):
+            matches = len([validate for validate in compiled
+                           if len(validate(value, path)) == 0])
+
+            if matches == 1:
+                return []
+
+            return ["%s matches %s of the allowed schemas instead of one." %
+                    (_where(path), matches)]
+
+        return check
+
+    def _not(self, argument, _schema):
+        validate = self.compile(argument)
+
+        def check(value, path):
+            if len(validate(value, path)) > 0:
+                return []
+
+            return ["%s matches a disallowed schema." % _where(path)]
+
+        return check
+
+def _join(path, name):
+    if path:
+        return "%s.%s" % (path, name)
+
+    return name
+
+def compile_schema(schema, aux_schemas=None):
+    """
+    Compiles the JSON schema of a node type into a validator of the 'meta'
+    section of its nodes.
+
+    Supported is the validation vocabulary of JSON Schema draft 4, with
+    references within the schema and to the namespace's auxiliary schemas.
+    Formats are not checked.
+
+    Args:
+        schema (dict): The JSON schema.
+        aux_schemas (dict): The auxiliary schemas of the namespace, by name.
+
+    Returns:
+        A function taking a value and returning the list of problems found
+        with it. The list is empty if the value is valid.
+
+    Exceptions:
+        SchemaError: If the schema cannot be compiled.
+    """
+    validate = _Compiler(schema, aux_schemas).compile(schema)
+
+    return lambda value: validate(value, "meta")
+
+def _fingerprint(schema, aux_schemas):
+    data = json.dumps([schema, aux_schemas], sort_keys=True)
+
+    return hashlib.sha1(data).hexdigest()
+
+
+class SchemaCache(object):
+    """
+    Retrieves the schemas of a namespace from OSDF, keeps them (on disk, if
+    a path is given) and validates node documents against them.
+
+    The schemas are retrieved again once they are older than the time to
+    live, or after OSDF refused a write. A node type whose schema turned out
+    to have changed since it was first compiled is recompiled, unless
+    fallback is set, in which case its nodes are validated by OSDF from then
+    on. Node types without a schema, or whose schema cannot be compiled, are
+    always validated by OSDF.
+
+    Attributes:
+        path (str): The path to the JSON file holding the schemas, or None.
+        ttl (float): The number of seconds schemas are used before they are
+                     retrieved again.
+        fallback (bool): Whether node types with changed schemas are left
+                         to OSDF to validate.
+        hits (int): The number of documents validated locally.
+        misses (int): The number of documents left to OSDF to validate.
+    """
+    def __init__(self, path=None, ttl=86400, fallback=False):
+        """
+        Constructor for the SchemaCache class.
+
+        Args:
+            path (str): The path to a JSON file in which to keep the schemas
+                        between runs. Defaults to None (kept in memory).
+            ttl (float): The time to live of the schemas, in seconds.
+                         Defaults to one day.
+            fallback (bool): Whether to validate nodes whose schema changed
+                             with OSDF instead of recompiling it.
+        """
+        if ttl < 0:
+            raise ValueError("Invalid ttl. Must not be negative.")
+
+        self.path = os.path.expanduser(path) if path is not None else None
+        self.ttl = ttl
+        self.fallback = fallback
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._namespaces = {}
+        self._fingerprints = {}
+        self._validators = {}
+
+    def _read(self):
+        if self.path is None or not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path) as schema_fh:
+                return json.load(schema_fh)
+        except (IOError, ValueError) as read_exception:
+            module_logger.warn("Unable to read the schemas in %s: %s",
+                               self.path, read_exception)
+            return {}
+
+    def _write(self):
+        if self.path is None:
+            return
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+
+        try:
+            (handle, temp_path) = tempfile.mkstemp(dir=directory)
+
+            with os.fdopen(handle, "w") as schema_fh:
+                json.dump(self._namespaces, schema_fh)
+
+            os.rename(temp_path, self.path)
+        except (IOError, OSError) as write_exception:
+            module_logger.warn("Unable to write the schemas to %s: %s",
+                               self.path, write_exception)
+
+    def _current(self, namespace):
+        entry = self._namespaces.get(namespace)
+
+        if entry is None:
+            entry = self._read().get(namespace)
+
+            if entry is not None:
+                self._namespaces[namespace] = entry
+
+        if entry is None or entry["fetched"] < time.time() - self.ttl:
+            return None
+
+        return entry
+
+    @staticmethod
+    def _fetch(osdf, namespace):
+        module_logger.info("Retrieving the schemas of namespace %s.",
+                           namespace)
+
+        return {"fetched": time.time(),
+                "schemas": osdf.get_schemas(namespace),
+                "aux_schemas": osdf.get_aux_schemas(namespace)}
+
+    def _validator(self, key, entry):
+        cached = self._validators.get(key)
+
+        if cached is not None and cached[0] == entry["fetched"]:
+            return cached[1]
+
+        node_type = key[1]
+        schema = entry["schemas"].get(node_type)
+
+        if schema is None:
+            module_logger.debug("No schema for %s nodes.", node_type)
+            self._validators[key] = (entry["fetched"], None)
+            return None
+
+        fingerprint = _fingerprint(schema, entry["aux_schemas"])
+        previous = self._fingerprints.get(key)
+
+        if cached is not None and previous == fingerprint:
+            self._validators[key] = (entry["fetched"], cached[1])
+            return cached[1]
+
+        validator = None
+
+        if previous is not None and previous != fingerprint and self.fallback:
+            module_logger.info("The schema of %s nodes changed; leaving them "
+                               "to OSDF to validate.", node_type)
+        else:
+            try:
+                validator = compile_schema(schema, entry["aux_schemas"])
+                self._fingerprints[key] = fingerprint
+            except (SchemaError, re.error) as schema_error:
+                module_logger.info("Unable to compile the schema of %s "
+                                   "nodes: %s", node_type, schema_error)
+
+        self._validators[key] = (entry["fetched"], validator)
+
+        return validator
+
+    def validate(self, osdf, doc):
+        """
+        Validates a node document locally.
+
+        Args:
+            osdf (OSDF): The client used to retrieve the schemas.
+            doc (dict): The node document.
+
+        Returns:
+            A tuple of a boolean telling whether the document is valid and
+            the error message if it is not, like OSDF.validate_node(), or
+            None if the document has to be validated by OSDF.
+        """
+        error = check_node(doc)
+
+        if error is not None:
+            return (False, error)
+
+        namespace = doc["ns"]
+        fetched = False
+
+        with self._lock:
+            entry = self._current(namespace)
+
+        if entry is None:
+            # Retrieved without holding the lock, so that the threads
+            # validating against schemas already at hand are not held up by
+            # the round trip to OSDF.
+            try:
+                entry = self._fetch(osdf, namespace)
+                fetched = True
+            except Exception as schema_exception:
+                module_logger.warn("Unable to retrieve the schemas of %s: %s",
+                                   namespace, schema_exception)
+
+        with self._lock:
+            if fetched:
+                current = self._namespaces.get(namespace)
+
+                # Another thread may have stored newer schemas meanwhile.
+                if current is None or current["fetched"] < entry["fetched"]:
+                    self._namespaces[namespace] = entry
+                    self._write()
+
+            validator = None
+
+            if entry is not None:
+                validator = self._validator((namespace, doc["node_type"]),
+                                            entry)
+
+            if validator is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        problems = validator(doc["meta"])
+
+        if len(problems) > 0:
+            return (False, " ".join(problems))
+
+        return (True, None)
+
+    def expire(self, namespace=None):
+        """
+        Makes the schemas of a namespace, or of all namespaces, be retrieved
+        again the next time they are needed.
+
+        Args:
+            namespace (str): The namespace. Defaults to all of them.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            for (name, entry) in self._namespaces.items():
+                if namespace is None or name == namespace:
+                    entry["fetched"] = 0
+
+            self._write()
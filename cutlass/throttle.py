@@ -0,0 +1,143 @@
+"""
+The throttle module keeps a session from overwhelming the shared OSDF
+server. A Throttle combines a token bucket, which caps the sustained rate of
+requests, with a limit on the number of requests in flight at once. An
+iHMPSession holds one Throttle for reads and another for writes.
+"""
+
+import logging
+import threading
+import time
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+class TokenBucket(object):
+    """
+    A thread safe token bucket. Tokens are added at a steady rate, up to
+    the burst size, and each request takes one, waiting if none is left.
+
+    Attributes:
+        rate (float): The number of tokens added per second.
+        burst (int): The maximum number of tokens the bucket holds.
+    """
+    def __init__(self, rate, burst=None):
+        """
+        Constructor for the TokenBucket class.
+
+        Args:
+            rate (float): The number of requests allowed per second.
+            burst (int): How many requests may be made at once after a quiet
+                         period. Defaults to one second's worth of requests.
+        """
+        if rate <= 0:
+            raise ValueError("Invalid rate. Must be positive.")
+
+        if burst is None:
+            burst = max(int(rate), 1)
+
+        if burst < 1:
+            raise ValueError("Invalid burst. Must be positive.")
+
+        self.rate = float(rate)
+        self.burst = burst
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._last = time.time()
+
+    def acquire(self):
+        """
+        Takes a token from the bucket, waiting for one if necessary.
+
+        Args:
+            None
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.time()
+                elapsed = max(now - self._last, 0)
+                self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+                self._last = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                delay = (1 - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+
+class Throttle(object):
+    """
+    Limits the rate and the concurrency of a class of requests. Use it as a
+    context manager around each request. Either limit may be None, in which
+    case it is not enforced.
+
+    Attributes:
+        rate (float): The maximum number of requests per second, or None.
+        max_in_flight (int): The maximum number of simultaneous requests, or
+                             None.
+        requests (int): The number of requests let through.
+        waited (float): The total number of seconds requests were held back.
+    """
+    def __init__(self, rate=None, burst=None, max_in_flight=None):
+        """
+        Constructor for the Throttle class.
+
+        Args:
+            rate (float): The maximum number of requests per second.
+            burst (int): How many requests may be made at once after a quiet
+                         period.
+            max_in_flight (int): The maximum number of simultaneous requests.
+        """
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("Invalid max in flight. Must be positive.")
+
+        self.rate = rate
+        self.max_in_flight = max_in_flight
+
+        self._bucket = None
+        self._slots = None
+
+        if rate is not None:
+            self._bucket = TokenBucket(rate, burst)
+
+        if max_in_flight is not None:
+            self._slots = threading.BoundedSemaphore(max_in_flight)
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.waited = 0.0
+
+    def __enter__(self):
+        start = time.time()
+
+        if self._bucket is not None:
+            self._bucket.acquire()
+
+        if self._slots is not None:
+            self._slots.acquire()
+
+        with self._lock:
+            self.requests += 1
+            self.waited += time.time() - start
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._slots is not None:
+            self._slots.release()
+
+        return False
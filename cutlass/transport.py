@@ -0,0 +1,630 @@
+"""
+The transport module holds the HTTP plumbing used by an iHMPSession to
+communicate with OSDF. Connections to the OSDF server are kept alive and
+pooled per host, so that repeated requests (such as walking a large study)
+do not pay for a new TCP and TLS handshake on every call. A single pool is
+safe to share between many threads. Requests that fail with a transient
+error are retried according to the session's RetryPolicy, and reads and
+writes are each held to the limits of their own Throttle.
+"""
+
+import base64
+import httplib
+import json
+import logging
+import select
+import socket
+import threading
+import time
+from osdf import OSDF
+from cutlass.retry import CircuitBreaker, RetryPolicy, INSERT, READ, classify
+from cutlass.throttle import Throttle
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+class ConnectionPool(object):
+    """
+    A thread safe pool of keep-alive HTTP(S) connections, keyed by the
+    (server, port, ssl) combination they were opened against.
+
+    Attributes:
+        pool_size (int): The maximum number of idle connections retained
+                         per host.
+        max_idle (int): The number of seconds an idle connection may sit in
+                        the pool before it is discarded.
+        per_host_limit (int): The maximum number of connections that may be
+                              open to a single host at once. None means no
+                              limit.
+        timeout (float): Socket timeout, in seconds, for new connections.
+                         None uses the global default.
+    """
+    def __init__(self, pool_size=10, max_idle=60, per_host_limit=None,
+                 timeout=None):
+        """
+        Constructor for the ConnectionPool class.
+
+        Args:
+            pool_size (int): The maximum number of idle connections to keep
+                             per host.
+            max_idle (int): How long, in seconds, an idle connection is kept.
+            per_host_limit (int): The maximum number of simultaneous
+                                  connections per host, or None.
+            timeout (float): Socket timeout for new connections, or None.
+        """
+        if pool_size < 0:
+            raise ValueError("Invalid pool size. Must not be negative.")
+
+        if per_host_limit is not None and per_host_limit < 1:
+            raise ValueError("Invalid per host limit. Must be positive.")
+
+        self.pool_size = pool_size
+        self.max_idle = max_idle
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+
+        self._cond = threading.Condition()
+        self._idle = {}
+        self._active = {}
+
+        # Counters, mostly useful for monitoring and testing
+        self.created = 0
+        self.reused = 0
+
+    def _new_connection(self, key):
+        (server, port, ssl) = key
+
+        if ssl:
+            conn = httplib.HTTPSConnection(server, port, timeout=self.timeout)
+        else:
+            conn = httplib.HTTPConnection(server, port, timeout=self.timeout)
+
+        return conn
+
+    @staticmethod
+    def _is_dropped(conn):
+        """
+        Checks whether the server closed an idle connection on us. An idle
+        socket should never be readable, so if it is, the peer has hung up
+        (or sent something unexpected) and the connection must not be reused.
+        """
+        sock = conn.sock
+
+        if sock is None:
+            return False
+
+        try:
+            readable = select.select([sock], [], [], 0.0)[0]
+        except (select.error, socket.error, ValueError):
+            return True
+
+        return len(readable) > 0
+
+    def _prune(self, key, now):
+        idle = self._idle.get(key, [])
+        fresh = []
+
+        for (conn, last_used) in idle:
+            if now - last_used > self.max_idle:
+                conn.close()
+            else:
+                fresh.append((conn, last_used))
+
+        self._idle[key] = fresh
+
+        return fresh
+
+    def acquire(self, server, port, ssl):
+        """
+        Checks out a connection to the given host, reusing an idle one when
+        possible. Blocks if the per host limit has been reached until another
+        thread releases a connection.
+
+        Args:
+            server (str): The server to connect to.
+            port (int): The port to connect to.
+            ssl (bool): Whether to use SSL/TLS or not.
+
+        Returns:
+            A tuple of the connection and a boolean indicating whether the
+            connection was reused from the pool.
+        """
+        key = (server, port, ssl)
+
+        with self._cond:
+            while True:
+                idle = self._prune(key, time.time())
+
+                while idle:
+                    (conn, _last_used) = idle.pop()
+
+                    if self._is_dropped(conn):
+                        conn.close()
+                        continue
+
+                    self._active[key] = self._active.get(key, 0) + 1
+                    self.reused += 1
+
+                    return (conn, True)
+
+                active = self._active.get(key, 0)
+
+                if self.per_host_limit is None or active < self.per_host_limit:
+                    self._active[key] = active + 1
+                    self.created += 1
+                    break
+
+                self._cond.wait()
+
+        return (self._new_connection(key), False)
+
+    def release(self, conn, server, port, ssl, reusable=True):
+        """
+        Returns a connection that was checked out with acquire() to the pool.
+
+        Args:
+            conn: The connection to return.
+            server (str): The server the connection was opened against.
+            port (int): The port the connection was opened against.
+            ssl (bool): Whether the connection uses SSL/TLS or not.
+            reusable (bool): False if the connection is in an unknown state
+                             and must be closed instead of kept alive.
+
+        Returns:
+            None
+        """
+        key = (server, port, ssl)
+
+        with self._cond:
+            self._active[key] = max(self._active.get(key, 0) - 1, 0)
+
+            idle = self._prune(key, time.time())
+
+            if reusable and len(idle) < self.pool_size:
+                idle.append((conn, time.time()))
+            else:
+                conn.close()
+
+            self._cond.notify()
+
+    def idle_count(self, server=None, port=None, ssl=None):
+        """
+        Returns the number of idle connections in the pool, either for a
+        single host or (if no host is specified) overall.
+        """
+        with self._cond:
+            if server is None:
+                return sum([len(idle) for idle in self._idle.values()])
+
+            return len(self._idle.get((server, port, ssl), []))
+
+    def close(self):
+        """
+        Closes all of the idle connections held by the pool. Connections that
+        are checked out are closed when they are released.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        with self._cond:
+            for idle in self._idle.values():
+                for (conn, _last_used) in idle:
+                    conn.close()
+
+            self._idle = {}
+
+
+class _ConnectError(Exception):
+    """
+    Wraps an error raised while connecting, before any part of the request
+    was sent.
+    """
+    def __init__(self, error):
+        super(_ConnectError, self).__init__(str(error))
+        self.error = error
+
+
+class PooledHttpRequest(object):
+    """
+    A drop in replacement for the HttpRequest class of osdf-python that
+    draws its connections from a shared ConnectionPool instead of opening a
+    new connection for every request, retries transient failures and
+    throttles reads and writes.
+    """
+    def __init__(self, pool, server, username, password, port=8123, ssl=False,
+                 retry_policy=None, breaker=None, read_throttle=None,
+                 write_throttle=None):
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+
+        if breaker is None:
+            breaker = CircuitBreaker()
+
+        if read_throttle is None:
+            read_throttle = Throttle()
+
+        if write_throttle is None:
+            write_throttle = Throttle()
+
+        self.pool = pool
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.ssl = ssl
+        self.retry_policy = retry_policy
+        self.breaker = breaker
+        self.read_throttle = read_throttle
+        self.write_throttle = write_throttle
+
+        self._auth = "Basic " + base64.b64encode('%s:%s' % (username, password))
+
+    def _send(self, method, resource, data=None):
+        headers = {"Authorization": self._auth}
+
+        while True:
+            (conn, reused) = self.pool.acquire(self.server, self.port, self.ssl)
+
+            try:
+                if conn.sock is None:
+                    try:
+                        conn.connect()
+                    except socket.error as connect_exception:
+                        raise _ConnectError(connect_exception)
+
+                conn.request(method, resource, data, headers)
+                resp = conn.getresponse()
+                content = resp.read()
+                break
+            except (httplib.HTTPException, socket.error) as http_exception:
+                self.pool.release(conn, self.server, self.port, self.ssl,
+                                  reusable=False)
+
+                # A kept-alive connection may have been closed by the server
+                # just as we used it. Reads are safe to replay on a new one.
+                if reused and method == "GET":
+                    module_logger.debug("Retrying GET %s on a new connection " + \
+                                        "after: %s", resource, http_exception)
+                    continue
+
+                raise
+            except Exception:
+                self.pool.release(conn, self.server, self.port, self.ssl,
+                                  reusable=False)
+                raise
+
+        self.pool.release(conn, self.server, self.port, self.ssl,
+                          reusable=not resp.will_close)
+
+        resp_headers = {}
+
+        for (header_name, header_value) in resp.getheaders():
+            resp_headers[header_name] = header_value
+
+        results = {"headers": resp_headers,
+                   "content": content,
+                   "code": resp.status}
+
+        return results
+
+    def _guard_insert(self, data):
+        """
+        Asks the insert guard whether a failed insert created a node anyway.
+        If it did, a response is made up as if the insert had succeeded.
+        """
+        node_id = self.retry_policy.insert_guard(json.loads(data))
+
+        if node_id is None:
+            return None
+
+        module_logger.info("Failed insert created node %s.", node_id)
+
+        return {"headers": {"location": "/nodes/%s" % node_id},
+                "content": "",
+                "code": 201}
+
+    def _request(self, method, resource, data=None):
+        operation = classify(method, resource)
+        policy = self.retry_policy
+        attempt = 0
+
+        if operation == READ:
+            throttle = self.read_throttle
+        else:
+            throttle = self.write_throttle
+
+        while True:
+            self.breaker.before_call()
+
+            failure = None
+
+            try:
+                with throttle:
+                    results = self._send(method, resource, data)
+            except _ConnectError as connect_error:
+                (failure, sent) = (connect_error.error, False)
+            except (httplib.HTTPException, socket.error) as http_exception:
+                (failure, sent) = (http_exception, True)
+            except Exception:
+                # Not a failure of the server, so it does not count.
+                self.breaker.record_abort()
+                raise
+
+            if failure is None:
+                if results["code"] not in policy.retry_statuses:
+                    self.breaker.record_success()
+                    return results
+
+                # A 503 means the server turned the request away unprocessed.
+                sent = results["code"] != 503
+
+            self.breaker.record_failure()
+
+            if not policy.should_retry(operation, attempt, sent):
+                if failure is None:
+                    return results
+
+                raise failure
+
+            if sent and operation == INSERT:
+                guarded = self._guard_insert(data)
+
+                if guarded is not None:
+                    return guarded
+
+            module_logger.info("Retrying %s %s after a transient failure: %s",
+                               method, resource,
+                               failure if failure is not None else results["code"])
+
+            policy.wait(operation, attempt)
+            attempt += 1
+
+    def delete(self, resource):
+        """ Issue a DELETE request for the resource. """
+        return self._request("DELETE", resource)
+
+    def get(self, resource):
+        """ Issue a GET request for the resource. """
+        return self._request("GET", resource)
+
+    def post(self, resource, data):
+        """ Issue a POST request for the resource with the given body. """
+        return self._request("POST", resource, data)
+
+    def put(self, resource, data):
+        """ Issue a PUT request for the resource with the given body. """
+        return self._request("PUT", resource, data)
+
+
+class SessionOSDF(OSDF):
+    """
+    An OSDF client whose requests go through a shared, keep-alive
+    ConnectionPool, with transient failures retried according to a
+    RetryPolicy, guarded by a CircuitBreaker and limited by separate read
+    and write Throttles. Changing the connection parameters (server, port,
+    credentials, ssl) keeps using the same pool, policy, breaker and
+    throttles. Nodes that are edited or deleted are dropped from the
+    session's identity map, if one is given. If a DocumentCache is given,
+    nodes are read through it and query results are stored in it. If a
+    QueryCache is given, repeated OQL queries are answered from it, and the
+    pages a write could affect are dropped from it. If a SchemaCache is
+    given, nodes are validated locally against it whenever possible.
+    """
+    def __init__(self, server, username, password, port=8123, ssl=False,
+                 pool=None, retry_policy=None, breaker=None,
+                 read_throttle=None, write_throttle=None, identity_map=None,
+                 doc_cache=None, query_cache=None, schema_cache=None):
+        if pool is None:
+            pool = ConnectionPool()
+
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+
+        if breaker is None:
+            breaker = CircuitBreaker()
+
+        if read_throttle is None:
+            read_throttle = Throttle()
+
+        if write_throttle is None:
+            write_throttle = Throttle()
+
+        self._pool = pool
+        self._retry_policy = retry_policy
+        self._breaker = breaker
+        self._read_throttle = read_throttle
+        self._write_throttle = write_throttle
+        self._identity_map = identity_map
+        self._doc_cache = doc_cache
+        self._query_cache = query_cache
+        self._schema_cache = schema_cache
+
+        super(SessionOSDF, self).__init__(server, username, password,
+                                          port=port, ssl=ssl)
+
+    def _set_request(self):
+        self._request = PooledHttpRequest(self._pool, self._server,
+                                          self._username, self._password,
+                                          port=self._port, ssl=self._ssl,
+                                          retry_policy=self._retry_policy,
+                                          breaker=self._breaker,
+                                          read_throttle=self._read_throttle,
+                                          write_throttle=self._write_throttle)
+
+    def _forget(self, node_id=None, json_data=None):
+        if json_data is not None:
+            node_id = json_data.get('id')
+
+        if node_id is not None and self._identity_map is not None:
+            self._identity_map.discard(node_id)
+
+        if node_id is not None and self._doc_cache is not None:
+            self._doc_cache.discard(node_id)
+
+        if self._query_cache is not None:
+            json_data = json_data or {}
+            self._query_cache.invalidate(json_data.get('ns'))
+
+    def get_node(self, node_id):
+        """
+        Retrieves an OSDF node given the node's ID, from the document cache
+        if it holds a current copy.
+        """
+        if self._doc_cache is None:
+            return super(SessionOSDF, self).get_node(node_id)
+
+        data = self._doc_cache.get(node_id)
+
+        if data is not None:
+            return self._byteify(data)
+
+        data = super(SessionOSDF, self).get_node(node_id)
+        self._doc_cache.put(data)
+
+        return data
+
+    def get_node_by_version(self, node_id, version):
+        """
+        Retrieves an OSDF node's data as it was at the given version, from
+        the document cache if it holds that version.
+        """
+        if self._doc_cache is None:
+            return super(SessionOSDF, self).get_node_by_version(node_id, version)
+
+        data = self._doc_cache.get(node_id, version)
+
+        if data is not None:
+            return self._byteify(data)
+
+        data = super(SessionOSDF, self).get_node_by_version(node_id, version)
+        self._doc_cache.put(data)
+
+        return data
+
+    def oql_query(self, namespace, query, page=1, cache=True):
+        """
+        Issues an OQL query against OSDF, unless the query cache holds the
+        page, storing the resulting documents in the document cache. The
+        page is only added to the query cache if 'cache' is True, so that
+        callers streaming through many pages can leave them out of it.
+        """
+        query_cache = self._query_cache
+
+        if query_cache is not None and query_cache.enabled:
+            data = query_cache.get(namespace, query, page)
+
+            if data is not None:
+                return data
+
+        data = super(SessionOSDF, self).oql_query(namespace, query, page=page)
+
+        if self._doc_cache is not None:
+            self._doc_cache.put_many(data.get('results', []))
+
+        if cache and query_cache is not None:
+            query_cache.put(namespace, query, page, data)
+
+        return data
+
+    def _rejected(self, json_data):
+        # OSDF may have refused the write because its schemas changed.
+        if self._schema_cache is not None and isinstance(json_data, dict):
+            self._schema_cache.expire(json_data.get('ns'))
+
+    def validate_node(self, json_data):
+        """
+        Reports whether a node document is valid, checking it against the
+        locally compiled schemas when possible instead of asking OSDF.
+        """
+        if self._schema_cache is not None:
+            result = self._schema_cache.validate(self, json_data)
+
+            if result is not None:
+                return result
+
+        return super(SessionOSDF, self).validate_node(json_data)
+
+    def insert_node(self, json_data):
+        """
+        Inserts a node into OSDF, dropping the cached query pages it could
+        affect.
+        """
+        try:
+            return super(SessionOSDF, self).insert_node(json_data)
+        except Exception:
+            self._rejected(json_data)
+            raise
+        finally:
+            self._forget(json_data=json_data)
+
+    def edit_node(self, json_data):
+        """
+        Updates a node in OSDF, dropping it from the identity map, the
+        document cache and the cached query pages it could affect.
+        """
+        try:
+            return super(SessionOSDF, self).edit_node(json_data)
+        except Exception:
+            self._rejected(json_data)
+            raise
+        finally:
+            self._forget(json_data=json_data)
+
+    def delete_node(self, node_id):
+        """
+        Deletes a node from OSDF, dropping it from the identity map, the
+        document cache and the cached query pages it could affect.
+        """
+        try:
+            return super(SessionOSDF, self).delete_node(node_id)
+        finally:
+            self._forget(node_id=node_id)
+
+    @property
+    def pool(self):
+        """
+        ConnectionPool: The connection pool this client uses.
+        """
+        return self._pool
+
+    @property
+    def retry_policy(self):
+        """
+        RetryPolicy: The policy deciding which failed requests are retried.
+        """
+        return self._retry_policy
+
+    @property
+    def breaker(self):
+        """
+        CircuitBreaker: The circuit breaker guarding the OSDF server.
+        """
+        return self._breaker
+
+    @property
+    def schema_cache(self):
+        """
+        SchemaCache: The schemas nodes are validated against, or None.
+        """
+        return self._schema_cache
+
+    @property
+    def read_throttle(self):
+        """
+        Throttle: The limits applied to reads (gets, queries, validation).
+        """
+        return self._read_throttle
+
+    @property
+    def write_throttle(self):
+        """
+        Throttle: The limits applied to writes (inserts, edits, deletes).
+        """
+        return self._write_throttle
@@ -0,0 +1,747 @@
+"""
+The traversal module walks the tree of nodes below a node one level at a
+time. Instead of asking OSDF for the children of every node separately, the
+children of a whole level are retrieved with one OQL query per linkage,
+naming all of the parents of that level, and the results are handed back to
+their parents. The number of queries grows with the depth of the tree rather
+than with the number of nodes in it.
+
+walk() streams the tree depth first instead, retrieving the children of the
+next nodes to be reached together, so that only those nodes are held in
+memory. Given a number of workers, the tree is explored depth first on a pool
+of threads, with sibling subtrees expanded at the same time, and nodes are
+yielded as soon as they are found.
+
+lineage() walks the other way, from many nodes up to their ancestors, again
+one level at a time for the whole collection.
+"""
+
+import logging
+from collections import OrderedDict, deque
+from Queue import Queue
+from cutlass.concurrency import WorkerPool
+from cutlass.iHMPSession import iHMPSession
+from cutlass.paging import oql_docs
+
+# Create a module logger named after the module
+module_logger = logging.getLogger(__name__)
+# Add a NullHandler for the case if no logging is configured by the application
+module_logger.addHandler(logging.NullHandler())
+
+# pylint: disable=W0703, C1801
+
+# The number of parent IDs named in a single query.
+CHUNK_SIZE = 50
+
+# The node types that can appear below each node type, by node type and
+# number of levels.
+_REACHABLE = {}
+
+def _linkage_query(node_ids, linkage):
+    return " || ".join(['"{}"[linkage.{}]'.format(node_id, linkage)
+                        for node_id in node_ids])
+
+def _node_class(node):
+    """ Returns the class of a node, or of the node a NodeRef stands for. """
+    from cutlass.Base import NodeRef
+    from cutlass.dependency import node_classes
+
+    if isinstance(node, NodeRef):
+        return node_classes[node.node_type]
+
+    return node.__class__
+
+def _build(doc, ids_only, session=None):
+    from cutlass.Base import node_ref
+    from cutlass.dependency import load_document
+
+    return node_ref(doc) if ids_only else load_document(doc, session=session)
+
+def _type_query(node_types):
+    return " || ".join(['"{}"[node_type]'.format(node_type)
+                        for node_type in node_types])
+
+def _reachable(node_type, depth=None):
+    """
+    Returns the node types that can appear below a node type, according to
+    child_linkages, within a number of levels.
+    """
+    key = (node_type, depth)
+
+    if key not in _REACHABLE:
+        from cutlass.dependency import child_linkages, node_classes
+
+        def _child_types(parent_type):
+            node_class = node_classes.get(parent_type)
+
+            if node_class is None:
+                return set()
+
+            return set(child_type for (_linkage, child_types) in
+                       child_linkages.get(node_class.__name__, [])
+                       for child_type in child_types)
+
+        found = set()
+        level = set([node_type])
+        levels = 0
+
+        while len(level) > 0 and (depth is None or levels < depth):
+            level = set(child_type for parent_type in level
+                        for child_type in _child_types(parent_type)) - found
+            found.update(level)
+            levels += 1
+
+        _REACHABLE[key] = frozenset(found)
+
+    return _REACHABLE[key]
+
+class Pruner(object):
+    """
+    Limits a walk to the nodes of some node types, and to a number of levels
+    below its root. The linkages a node is expanded through are narrowed
+    down to the node types that are either wanted or can lead to one within
+    the remaining levels, according to child_linkages, so that subtrees that
+    cannot hold a wanted node are never queried.
+
+    Attributes:
+        types (frozenset): The wanted node types, or None for all of them.
+        max_depth (int): The number of levels to walk, or None for all of
+                         them.
+    """
+    def __init__(self, types=None, max_depth=None):
+        """
+        Constructor for the Pruner class.
+
+        Args:
+            types (list): The wanted node types. Defaults to all of them.
+            max_depth (int): The number of levels below the root to walk.
+                             Defaults to no limit.
+
+        Exceptions:
+            ValueError: If a node type is unknown or max_depth is negative.
+        """
+        from cutlass.dependency import node_classes
+
+        if types is not None:
+            types = frozenset(types)
+            unknown = [node_type for node_type in types
+                       if node_type not in node_classes]
+
+            if len(unknown) > 0:
+                raise ValueError("Unknown node types: %s" % ", ".join(sorted(unknown)))
+
+        if max_depth is not None and max_depth < 0:
+            raise ValueError("Invalid max depth. Must not be negative.")
+
+        self.types = types
+        self.max_depth = max_depth
+
+        self._depth = {}
+
+    def wants(self, node):
+        """ Returns whether a node is of one of the wanted node types. """
+        from cutlass.dependency import node_types
+
+        return self.types is None or \
+            node_types.get(_node_class(node).__name__) in self.types
+
+    def linkages(self, node):
+        """
+        Returns the linkages to expand a node through, each with the node
+        types to keep, in the same form as child_linkages.
+        """
+        from cutlass.dependency import child_linkages
+
+        depth = self._depth.get(node.id, 0)
+
+        if self.max_depth is not None and depth >= self.max_depth:
+            return []
+
+        # The number of levels left below the children of the node.
+        remaining = None if self.max_depth is None else self.max_depth - depth - 1
+        kept = []
+
+        for (linkage, node_types) in child_linkages.get(_node_class(node).__name__, []):
+            node_types = tuple(node_type for node_type in node_types
+                               if self.types is None or node_type in self.types
+                               or self.types & _reachable(node_type, remaining))
+
+            if len(node_types) > 0:
+                kept.append((linkage, node_types))
+
+        return kept
+
+    def descend(self, node_id, children):
+        """ Records the depth of the children of an expanded node. """
+        depth = self._depth.get(node_id, 0) + 1
+
+        for child in children:
+            self._depth.setdefault(child.id, depth)
+
+def child_docs(nodes, session=None, chunk_size=CHUNK_SIZE, prune=None):
+    """
+    Retrieves the documents of the children of many nodes at once, with one
+    query per linkage and chunk of parents.
+
+    Args:
+        nodes (list): The parent nodes.
+        session (iHMPSession): The session to use. Defaults to the current
+                               session.
+        chunk_size (int): The number of parents named in a single query.
+        prune (Pruner): Limits the linkages and node types followed.
+                        Defaults to following all of them.
+
+    Returns:
+        A dictionary of the list of child documents of each parent, by the
+        parent's ID, in the order that the parent's own methods return them.
+    """
+    from cutlass.dependency import child_linkages
+
+    if chunk_size < 1:
+        raise ValueError("Invalid chunk size. Must be positive.")
+
+    if session is None:
+        session = iHMPSession.get_session()
+
+    parents = OrderedDict()
+
+    for node in nodes:
+        if node.id is not None:
+            parents[node.id] = node
+
+    # The linkages to follow from each parent, with the node types to keep.
+    followed = {}
+
+    for node in parents.values():
+        if prune is None:
+            followed[node.id] = child_linkages.get(_node_class(node).__name__, [])
+        else:
+            followed[node.id] = prune.linkages(node)
+
+    # The parents to look up through each linkage, by namespace and by the
+    # node types to narrow the query down to, if not all of them.
+    wanted = OrderedDict()
+
+    for node in parents.values():
+        every = {}
+        kept = {}
+
+        for (linkage, node_types) in child_linkages.get(_node_class(node).__name__, []):
+            every.setdefault(linkage, set()).update(node_types)
+
+        for (linkage, node_types) in followed[node.id]:
+            kept.setdefault(linkage, set()).update(node_types)
+
+        for (linkage, node_types) in kept.items():
+            narrowed = None if node_types == every[linkage] else tuple(sorted(node_types))
+            wanted.setdefault((_node_class(node).namespace, linkage, narrowed),
+                              []).append(node.id)
+
+    found = {}
+
+    for ((namespace, linkage, narrowed), node_ids) in wanted.items():
+        for start in range(0, len(node_ids), chunk_size):
+            chunk = node_ids[start:start + chunk_size]
+            chunk_ids = set(chunk)
+            query = _linkage_query(chunk, linkage)
+
+            if narrowed is not None:
+                query = "({}) && ({})".format(query, _type_query(narrowed))
+
+            for doc in oql_docs(namespace, query, session=session):
+                targets = set(doc.get('linkage', {}).get(linkage, []))
+
+                for node_id in targets & chunk_ids:
+                    found.setdefault((node_id, linkage), []).append(doc)
+
+    module_logger.debug("Retrieved the children of %s nodes with %s linkages.",
+                        len(parents), len(wanted))
+
+    docs = {}
+
+    for node_id in parents.keys():
+        docs[node_id] = [doc for (linkage, node_types) in followed[node_id]
+                         for doc in found.get((node_id, linkage), [])
+                         if doc.get('node_type') in node_types]
+
+    return docs
+
+def expand(root, session=None, chunk_size=CHUNK_SIZE, prune=None,
+           ids_only=False):
+    """
+    Retrieves the whole tree of nodes below a node, one level at a time.
+
+    Args:
+        root (Base): The node at the top of the tree.
+        session (iHMPSession): The session to use. Defaults to the current
+                               session.
+        chunk_size (int): The number of parents named in a single query.
+        prune (Pruner): Limits the linkages and node types followed.
+                        Defaults to following all of them.
+        ids_only (bool): Whether to build NodeRef tuples instead of the
+                         node objects.
+
+    Returns:
+        A dictionary of the list of children of each node in the tree, by
+        the node's ID.
+    """
+    tree = {}
+    level = [root]
+    depth = 0
+
+    while len(level) > 0:
+        docs = child_docs(level, session=session, chunk_size=chunk_size,
+                          prune=prune)
+        next_level = []
+
+        for (node_id, child_list) in docs.items():
+            children = [_build(doc, ids_only, session) for doc in child_list]
+            tree[node_id] = children
+            next_level.extend(children)
+
+            if prune is not None:
+                prune.descend(node_id, children)
+
+        # Nodes with several parents are only expanded once.
+        level = [node for node in next_level
+                 if node.id is not None and node.id not in tree]
+        depth += 1
+
+    module_logger.debug("Walked %s nodes, %s levels deep.", len(tree), depth)
+
+    return tree
+
+def walk(root, session=None, chunk_size=CHUNK_SIZE, prune=None,
+         ids_only=False):
+    """
+    Yields every node below a node, depth first, in the same order as the
+    flattened subtrees(), while the tree is being retrieved. When a node
+    whose children are not known yet is reached, the children of up to
+    chunk_size of the next nodes to be reached are retrieved with it, so
+    the number of queries stays close to that of expand(), but only the
+    nodes waiting to be yielded are held in memory.
+
+    Args:
+        root (Base): The node at the top of the tree.
+        session (iHMPSession): The session to use. Defaults to the current
+                               session.
+        chunk_size (int): The number of nodes expanded at once.
+        prune (Pruner): Limits the linkages and node types followed.
+                        Defaults to following all of them.
+        ids_only (bool): Whether to build NodeRef tuples instead of the
+                         node objects.
+
+    Returns:
+        A generator of nodes.
+    """
+    if session is None:
+        session = iHMPSession.get_session()
+
+    # The children of the nodes expanded before they were reached.
+    known = {}
+
+    def _ahead(waiting):
+        # The next nodes to be reached that are not expanded yet. The known
+        # children of a node are reached right after it.
+        waiting = deque(waiting)
+        batch = OrderedDict()
+
+        while len(waiting) > 0 and len(batch) < chunk_size:
+            node = waiting.popleft()
+
+            if node.id is None:
+                continue
+
+            if node.id in known:
+                waiting.extendleft(reversed(known[node.id]))
+            else:
+                batch[node.id] = node
+
+        return batch.values()
+
+    def _children(node, stack):
+        if node.id is None:
+            return []
+
+        if node.id not in known:
+            batch = _ahead([node] + stack[::-1])
+            docs = child_docs(batch, session=session, chunk_size=chunk_size,
+                              prune=prune)
+
+            for other in batch:
+                children = [_build(doc, ids_only, session)
+                            for doc in docs.get(other.id, [])]
+                known[other.id] = children
+
+                if prune is not None:
+                    prune.descend(other.id, children)
+
+        # Nodes with several parents are expanded again under each of them.
+        return known.pop(node.id)
+
+    stack = list(reversed(_children(root, [])))
+
+    while len(stack) > 0:
+        node = stack.pop()
+
+        yield node
+
+        stack.extend(reversed(_children(node, stack)))
+
+class _Walker(object):
+    """
+    Explores the tree below a node on a pool of worker threads. Nodes whose
+    children are not known yet wait on a stack, so that the tree is explored
+    depth first, and are expanded in batches, one batch per free worker, so
+    that sibling subtrees are explored at the same time.
+    """
+    def __init__(self, session, workers, chunk_size, max_frontier, prune=None,
+                 ids_only=False, keep_tree=True):
+        if session is None:
+            session = iHMPSession.get_session()
+
+        if max_frontier is not None and max_frontier < 1:
+            raise ValueError("Invalid max frontier. Must be positive.")
+
+        self.session = session
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_frontier = max_frontier
+        self.prune = prune
+        self.ids_only = ids_only
+        self.keep_tree = keep_tree
+
+        self.tree = {}
+        self.found = 0
+        self.handed_back = 0
+
+        self._pool = WorkerPool(workers=workers)
+        self._stack = []
+        self._seen = set()
+        self._in_flight = {}
+        self._finished = Queue()
+
+    def _expand(self, batch):
+        docs = child_docs(batch, session=self.session,
+                          chunk_size=self.chunk_size, prune=self.prune)
+        children = {}
+
+        for (node_id, child_list) in docs.items():
+            children[node_id] = [_build(doc, self.ids_only, self.session)
+                                 for doc in child_list]
+
+            if self.prune is not None:
+                self.prune.descend(node_id, children[node_id])
+
+        return children
+
+    def push(self, nodes):
+        """
+        Adds nodes to the ones waiting to be expanded, and returns how many
+        of them had not been seen before.
+        """
+        added = 0
+
+        for node in reversed(nodes):
+            if node.id is not None and node.id not in self._seen:
+                self._seen.add(node.id)
+                self._stack.append(node)
+                added += 1
+
+        return added
+
+    def _submit(self, batch):
+        future = self._pool.submit(self._expand, batch)
+        self._in_flight[future] = batch
+        future.add_done_callback(self._finished.put)
+
+    def _fill(self):
+        while self._stack and len(self._in_flight) < self.workers:
+            # The limit only holds back more work while some is in flight,
+            # so that the walk always makes progress.
+            if self.max_frontier is not None and self._in_flight and \
+                    self.found - self.handed_back >= self.max_frontier:
+                break
+
+            free = self.workers - len(self._in_flight)
+            size = min(self.chunk_size,
+                       max(1, (len(self._stack) + free - 1) // free))
+
+            batch = self._stack[-size:]
+            del self._stack[-size:]
+
+            self._submit(batch)
+
+    def step(self):
+        """
+        Starts expanding as many waiting nodes as there are free workers,
+        and waits for one batch to be expanded.
+
+        Returns:
+            A tuple of the expanded nodes and the dictionary of their
+            children, by ID, or None if there is nothing left to expand.
+        """
+        self._fill()
+
+        if len(self._in_flight) == 0:
+            return None
+
+        future = self._finished.get()
+        batch = self._in_flight.pop(future)
+        children = future.result()
+
+        if self.keep_tree:
+            self.tree.update(children)
+
+        # Nodes with several parents are only counted the first time they
+        # are found, the same as they are only handed back once.
+        for node in batch:
+            self.found += self.push(children.get(node.id, []))
+
+        return (batch, children)
+
+    def children(self, node):
+        """ Returns the children of a node, waiting for them if need be. """
+        if node.id is None:
+            return []
+
+        while node.id not in self.tree:
+            in_flight = any(node.id == other.id
+                            for batch in self._in_flight.values()
+                            for other in batch)
+
+            if not in_flight:
+                # Expand the node now, ahead of the ones on the stack.
+                self._stack = [other for other in self._stack
+                               if other.id != node.id]
+                self._seen.add(node.id)
+                self._submit([node])
+
+            self.step()
+
+        return self.tree[node.id]
+
+    def close(self):
+        """ Stops the worker threads. """
+        self._pool.shutdown()
+
+def _ordered(root, walker):
+    def _subtree(node):
+        walker.handed_back += 1
+        yield node
+
+        for child in walker.children(node):
+            yield _subtree(child)
+
+    try:
+        walker.push([root])
+
+        for child in walker.children(root):
+            yield _subtree(child)
+    finally:
+        walker.close()
+
+def subtrees(root, session=None, chunk_size=CHUNK_SIZE, workers=None,
+             max_frontier=None, prune=None, ids_only=False):
+    """
+    Yields a generator for the subtree of each child of a node. Each of them
+    yields its node, followed by the generators of its children's subtrees.
+
+    Args:
+        root (Base): The node at the top of the tree.
+        session (iHMPSession): The session to use. Defaults to the current
+                               session.
+        chunk_size (int): The number of parents named in a single query.
+        workers (int): The number of threads exploring the tree at once.
+                       Defaults to None, which retrieves the tree one level
+                       at a time before the first node is yielded.
+        max_frontier (int): With workers, the maximum number of nodes found
+                            ahead of the ones yielded so far. Defaults to
+                            None (no limit).
+        prune (Pruner): Limits the linkages and node types followed.
+                        Defaults to following all of them.
+        ids_only (bool): Whether to build NodeRef tuples instead of the
+                         node objects.
+
+    Returns:
+        A generator of generators.
+    """
+    if workers is not None:
+        walker = _Walker(session, workers, chunk_size, max_frontier,
+                         prune=prune, ids_only=ids_only)
+
+        for subtree in _ordered(root, walker):
+            yield subtree
+
+        return
+
+    tree = expand(root, session=session, chunk_size=chunk_size, prune=prune,
+                  ids_only=ids_only)
+
+    def _subtree(node):
+        yield node
+
+        for child in tree.get(node.id, []):
+            yield _subtree(child)
+
+    for child in tree.get(root.id, []):
+        yield _subtree(child)
+
+def descendants(root, session=None, chunk_size=CHUNK_SIZE, workers=8,
+                max_frontier=None, prune=None, ids_only=False):
+    """
+    Yields every node below a node as soon as it is found, in no particular
+    order, while the tree is explored on a pool of worker threads. Nodes
+    reached through several parents are only yielded once. Only the nodes
+    still waiting to be expanded, and the IDs of those already seen, are
+    held in memory.
+
+    Args:
+        root (Base): The node at the top of the tree.
+        session (iHMPSession): The session to use. Defaults to the current
+                               session.
+        chunk_size (int): The number of parents named in a single query.
+        workers (int): The number of threads exploring the tree at once.
+        max_frontier (int): The maximum number of nodes found but not yet
+                            expanded. Defaults to None (no limit).
+        prune (Pruner): Limits the linkages and node types followed.
+                        Defaults to following all of them.
+        ids_only (bool): Whether to build NodeRef tuples instead of the
+                         node objects.
+
+    Returns:
+        A generator of nodes.
+    """
+    walker = _Walker(session, workers, chunk_size, max_frontier, prune=prune,
+                     ids_only=ids_only, keep_tree=False)
+    yielded = set()
+
+    try:
+        walker.push([root])
+
+        while True:
+            expanded = walker.step()
+
+            if expanded is None:
+                break
+
+            (batch, children) = expanded
+
+            for node in batch:
+                for child in children.get(node.id, []):
+                    if child.id not in yielded:
+                        yielded.add(child.id)
+                        walker.handed_back += 1
+
+                        yield child
+    finally:
+        walker.close()
+
+def lineage(nodes, up_to='study', session=None):
+    """
+    Resolves the ancestors of many nodes at once. The parent links of the
+    whole collection are followed one level at a time, with the documents of
+    each level retrieved in one concurrent batch, and every ancestor is only
+    retrieved once, however many of the nodes share it.
+
+    Args:
+        nodes (list): The nodes, their NodeRefs or their IDs.
+        up_to (str): The node type at which to stop climbing. Defaults to
+                     'study'. None climbs as far as the links go.
+        session (iHMPSession): The session to use. Defaults to the current
+                               session.
+
+    Returns:
+        A dictionary, by the ID of each node, of the IDs of its ancestors by
+        node type, nearest first.
+
+    Exceptions:
+        ValueError: If up_to is not a known node type.
+    """
+    from cutlass.Base import NodeRef
+    from cutlass.dependency import node_classes, node_types, parent_linkages
+
+    if up_to is not None and up_to not in node_classes:
+        raise ValueError("Unknown node type: %s" % up_to)
+
+    if session is None:
+        session = iHMPSession.get_session()
+
+    # The node type and parent IDs of every node met so far.
+    node_type = {}
+    parents = {}
+
+    def _record(node_id, doc_type, links):
+        node_type[node_id] = doc_type
+
+        if doc_type == up_to:
+            parents[node_id] = []
+        else:
+            parents[node_id] = [parent_id for linkage in parent_linkages
+                                for parent_id in links.get(linkage, [])]
+
+    node_ids = []
+    level = []
+
+    for node in nodes:
+        if isinstance(node, NodeRef):
+            node = node.id
+
+        if isinstance(node, basestring):
+            node_ids.append(node)
+            level.append(node)
+        elif node.id is not None:
+            node_ids.append(node.id)
+            _record(node.id, node_types.get(node.__class__.__name__), node.links)
+            level.extend(parents[node.id])
+
+    depth = 0
+
+    while True:
+        fetch = list(OrderedDict.fromkeys(
+            node_id for node_id in level if node_id not in node_type))
+
+        if len(fetch) == 0:
+            break
+
+        level = []
+
+        for (node_id, doc) in zip(fetch, session.get_nodes(fetch)):
+            if doc is None:
+                node_type[node_id] = None
+                parents[node_id] = []
+            else:
+                _record(node_id, doc.get('node_type'), doc.get('linkage', {}))
+                level.extend(parents[node_id])
+
+        depth += 1
+
+    module_logger.debug("Resolved the lineage of %s nodes, %s levels up.",
+                        len(node_ids), depth)
+
+    ancestors = {}
+
+    for node_id in node_ids:
+        found = OrderedDict()
+        seen = set([node_id])
+        level = parents.get(node_id, [])
+
+        while len(level) > 0:
+            next_level = []
+
+            for parent_id in level:
+                if parent_id in seen:
+                    continue
+
+                seen.add(parent_id)
+
+                if node_type.get(parent_id) is not None:
+                    found.setdefault(node_type[parent_id], []).append(parent_id)
+
+                next_level.extend(parents.get(parent_id, []))
+
+            level = next_level
+
+        ancestors[node_id] = dict(found)
+
+    return ancestors
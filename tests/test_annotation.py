@@ -383,6 +383,29 @@ class AnnotationTest(unittest.TestCase):
         self.assertTrue(len(required) > 0,
                         "required_field() did not return empty value.")
 
+    def testLoad(self):
+        """ Test that loading a document restores all of its fields. """
+        annot = self.session.create_annotation()
+
+        annot.annotation_pipeline = "test_annotation_pipeline"
+        annot.orf_process = "test_orf_process"
+        annot.study = "prediabetes"
+        annot.format = "gff3"
+        annot.format_doc = "test_format_doc"
+        annot.size = 131313
+        annot.links = {"computed_from": ["610a4911a5ca67de12cdc1e4b4011876"]}
+
+        doc = annot._get_raw_doc()
+        doc['id'] = "annotation_load_test"
+        doc['ver'] = 1
+
+        loaded = Annotation.load_annotation(doc)
+
+        self.assertEqual(loaded.orf_process, "test_orf_process",
+                         "'orf_process' was loaded.")
+        self.assertEqual(loaded.size, 131313, "'size' was loaded.")
+        self.assertEqual(loaded._get_raw_doc(), doc)
+
     def testLoadSaveDeleteAnnotation(self):
         """ Extensive test for the load, edit, save and delete functions. """
 
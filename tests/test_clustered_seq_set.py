@@ -315,6 +315,37 @@ class ClusteredSeqSetTest(unittest.TestCase):
         self.assertTrue(len(required) > 0,
                         "required_field() did not return empty value.")
 
+    def testLoad(self):
+        """ Test that loading a document restores all of its fields. """
+        css = self.session.create_clustered_seq_set()
+
+        css.clustering_process = "test clustering software 1.0"
+        css.comment = "test clustered_seq_set comment"
+        css.study = "prediabetes"
+        css.format = "fasta"
+        css.format_doc = "test_format_doc"
+        css.sequence_type = "nucleotide"
+        css.size = 131313
+        css.sop = "http://google.com"
+        css.links = {"computed_from": ["610a4911a5ca67de12cdc1e4b4011876"]}
+
+        doc = css._get_raw_doc()
+        doc['id'] = "clustered_seq_set_load_test"
+        doc['ver'] = 1
+
+        loaded = ClusteredSeqSet.load_clustered_seq_set(doc)
+
+        self.assertEqual(loaded.clustering_process,
+                         "test clustering software 1.0",
+                         "'clustering_process' was loaded.")
+        self.assertEqual(loaded.sequence_type, "nucleotide",
+                         "'sequence_type' was loaded.")
+        self.assertEqual(loaded.size, 131313, "'size' was loaded.")
+        self.assertEqual(loaded.format, "fasta",
+                         "'format' was not overwritten by the SOP.")
+        self.assertEqual(loaded.sop, "http://google.com", "'sop' was loaded.")
+        self.assertEqual(loaded._get_raw_doc(), doc)
+
     def testLoadSaveDeleteClusteredSeqSet(self):
         """ Extensive test for the load, edit, save and delete functions. """
 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+""" A unittest script for the concurrency module. """
+
+import time
+import unittest
+
+from cutlass import iHMPSession, Subject
+from cutlass.concurrency import CancelledError, Future, WorkerPool, as_completed
+
+# pylint: disable=W0703, C1801
+
+class ConcurrencyTest(unittest.TestCase):
+    """ A unit test class for the concurrency module. """
+
+    def testSubmit(self):
+        """ Test that submitted calls run and return their results. """
+        pool = WorkerPool(workers=2)
+
+        future = pool.submit(lambda x, y: x + y, 1, y=2)
+
+        self.assertEqual(future.result(), 3)
+        self.failUnless(future.done())
+
+        pool.shutdown()
+
+    def testException(self):
+        """ Test that exceptions raised by calls are re-raised. """
+        pool = WorkerPool(workers=1)
+
+        def fail():
+            raise ValueError("boom")
+
+        future = pool.submit(fail)
+
+        with self.assertRaises(ValueError):
+            future.result()
+
+        self.failUnless(isinstance(future.exception(), ValueError))
+
+    def testMapOrder(self):
+        """ Test that map() yields results in input order. """
+        pool = WorkerPool(workers=4)
+
+        def slow_square(num):
+            time.sleep(0.01 * (5 - num % 5))
+            return num * num
+
+        results = list(pool.map(slow_square, range(20), window=6))
+
+        self.assertEqual(results, [num * num for num in range(20)])
+
+    def testNestedWaitDoesNotDeadlock(self):
+        """ Test that a pooled call may wait on other pooled calls. """
+        pool = WorkerPool(workers=1)
+
+        def outer():
+            inner = [pool.submit(lambda num=num: num) for num in range(5)]
+            return sum([future.result() for future in inner])
+
+        self.assertEqual(pool.submit(outer).result(timeout=5), 10)
+
+    def testCancel(self):
+        """ Test that pending calls can be cancelled. """
+        future = Future(lambda: 1)
+
+        self.failUnless(future.cancel())
+        self.failUnless(future.cancelled())
+
+        with self.assertRaises(CancelledError):
+            future.result()
+
+    def testCallbacks(self):
+        """ Test done callbacks and as_completed(). """
+        pool = WorkerPool(workers=3)
+        seen = []
+
+        futures = []
+        for delay in (0.05, 0.01, 0.03):
+            future = pool.submit(lambda delay=delay: time.sleep(delay) or delay)
+            future.add_done_callback(lambda done: seen.append(done.result()))
+            futures.append(future)
+
+        completed = [future.result() for future in as_completed(futures, timeout=5)]
+
+        self.assertEqual(sorted(completed), [0.01, 0.03, 0.05])
+        self.assertEqual(sorted(seen), [0.01, 0.03, 0.05])
+
+    def testInvalidWorkers(self):
+        """ Test that a pool needs at least one worker. """
+        with self.assertRaises(ValueError):
+            WorkerPool(workers=0)
+
+    def testSessionSubmitContext(self):
+        """ Test that session.submit() runs calls with that session current. """
+        session = iHMPSession("test", "test", server="staging")
+
+        future = session.submit(iHMPSession.get_session)
+
+        self.failUnless(future.result() is session)
+
+        with session:
+            self.failUnless(iHMPSession.get_session() is session)
+
+        self.assertEqual(iHMPSession._context_stack(), [])
+
+    def testAload(self):
+        """ Test the non-blocking load of a node. """
+        session = iHMPSession("test", "test", server="staging")
+
+        doc = {
+            "id": "subject1",
+            "ver": 2,
+            "linkage": {"participates_in": ["study1"]},
+            "meta": {
+                "gender": "female",
+                "rand_subject_id": "rand1",
+                "tags": []
+            }
+        }
+
+        session.get_osdf().get_node = lambda node_id: dict(doc, id=node_id)
+
+        subject = Subject.aload("subject9", session=session).result()
+
+        self.failUnless(isinstance(subject, Subject))
+        self.assertEqual(subject.id, "subject9")
+        self.assertEqual(subject.version, 2)
+
+if __name__ == '__main__':
+    unittest.main()
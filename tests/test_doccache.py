@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+""" A unittest script for the doccache module. """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cutlass import iHMPSession, Subject
+from cutlass.doccache import DocumentCache
+
+# pylint: disable=W0703, C1801
+
+def _subject_doc(num, **extra):
+    doc = {
+        "ns": "hmbr",
+        "node_type": "subject",
+        "acl": {"read": ["all"], "write": ["hmbr"]},
+        "linkage": {},
+        "meta": {"gender": "male", "rand_subject_id": "r%s" % num, "tags": []}
+    }
+    doc.update(extra)
+
+    return doc
+
+class DocumentCacheTest(unittest.TestCase):
+    """ A unit test class for the doccache module. """
+
+    def setUp(self):
+        """ Start a local server with a few subjects and a cache file. """
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "docs.sqlite")
+
+        self.session = iHMPSession.local(doc_cache=self.path)
+        self.server = self.session.get_local_server()
+        self.subject_ids = self.server.load([_subject_doc(num)
+                                             for num in range(4)])
+
+    def tearDown(self):
+        """ Stop the local server and remove the cache file. """
+        self.session.close()
+        self.server.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def testPersistence(self):
+        """ Test that documents are reused by later sessions. """
+        with self.session:
+            subject = Subject.load(self.subject_ids[0])
+            self.assertEqual(self.server.requests['get_node'], 1)
+
+        session = self.server.session(doc_cache=self.path, cache_size=0)
+
+        with session:
+            again = Subject.load(self.subject_ids[0])
+
+        self.assertEqual(self.server.requests['get_node'], 1)
+        self.assertEqual(again.rand_subject_id, subject.rand_subject_id)
+        self.failUnless(isinstance(again.rand_subject_id, str))
+
+        cache = session.get_document_cache()
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def testQueriesFillCache(self):
+        """ Test that query results are stored in the cache. """
+        subjects = list(Subject.search_iter(session=self.session))
+        self.assertEqual(len(subjects), 4)
+
+        self.assertEqual(self.session.get_document_cache().stats()['documents'], 4)
+
+        self.session.get_osdf().get_node(self.subject_ids[3])
+        self.failIf('get_node' in self.server.requests)
+
+    def testRevalidate(self):
+        """ Test the bulk revalidation of stale documents. """
+        osdf = self.session.get_osdf()
+        cache = self.session.get_document_cache()
+
+        for node_id in self.subject_ids:
+            osdf.get_node(node_id)
+
+        # Change one node and remove another behind the cache's back.
+        changed = _subject_doc(1, id=self.subject_ids[1], ver=2)
+        changed['meta']['race'] = "asian"
+        self.server.load([changed])
+        osdf.delete_node(self.subject_ids[2])
+        cache.put(_subject_doc(2, id=self.subject_ids[2], ver=1))
+
+        cache.ttl = 0
+        self.assertEqual(len(cache.stale()['hmbr']), 4)
+
+        queries = self.server.requests.get('oql_query', 0)
+        counts = self.session.revalidate_cache(chunk_size=3)
+
+        self.assertEqual(counts, {"unchanged": 2, "updated": 1, "removed": 1})
+        self.assertEqual(self.server.requests['oql_query'] - queries, 2)
+
+        cache.ttl = 3600
+        self.assertEqual(cache.stale(), {})
+        self.assertEqual(osdf.get_node(self.subject_ids[1])['meta']['race'],
+                         "asian")
+        self.failUnless(cache.get(self.subject_ids[2]) is None)
+
+        # Older versions are still served by version.
+        self.assertEqual(cache.get(self.subject_ids[1], 1)['ver'], 1)
+
+    def testInvalidation(self):
+        """ Test that edits drop documents from the cache. """
+        osdf = self.session.get_osdf()
+        doc = osdf.get_node(self.subject_ids[0])
+
+        osdf.edit_node(doc)
+
+        self.assertEqual(osdf.get_node(self.subject_ids[0])['ver'], 2)
+        self.assertEqual(self.server.requests['get_node'], 2)
+
+    def testEviction(self):
+        """ Test that the least recently used documents are evicted. """
+        cache = DocumentCache(os.path.join(self.tmpdir, "small.sqlite"))
+        cache.put(_subject_doc(0, id="a", ver=1))
+        cache.max_size = 2 * cache.stats()['bytes'] + 10
+
+        cache.put(_subject_doc(1, id="b", ver=1))
+        cache.get("a")
+        cache.put(_subject_doc(2, id="c", ver=1))
+
+        self.failUnless(cache.get("b") is None, "b was evicted.")
+        self.failIf(cache.get("a") is None)
+        self.assertEqual(cache.stats()['documents'], 2)
+
+        with self.assertRaises(ValueError):
+            DocumentCache(self.path, ttl=-1)
+
+if __name__ == '__main__':
+    unittest.main()
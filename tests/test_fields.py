@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+
+""" A unittest script for the fields module. """
+
+import pickle
+import unittest
+
+from cutlass import Annotation, Subject, Visit, VisitAttribute
+from cutlass.Base import Base
+from cutlass.fields import Field
+
+# pylint: disable=W0703, C1801
+
+class FieldsTest(unittest.TestCase):
+    """ A unit test class for the Field descriptors of the node classes. """
+
+    def testTables(self):
+        """ Test that each class lists its own fields, in order. """
+        self.assertEqual([field.name for field in Subject._fields],
+                         ["gender", "race", "rand_subject_id"])
+        self.assertEqual(Base._fields, ())
+
+        self.failUnless(isinstance(Subject.gender, Field))
+        self.failUnless(Subject.gender.required)
+        self.failIf(Subject.race.required)
+
+    def testSlots(self):
+        """ Test that objects keep their values in slots, not a __dict__. """
+        subject = Subject()
+
+        self.failIf(hasattr(subject, "__dict__"))
+
+        with self.assertRaises(AttributeError):
+            subject.no_such_field = "value"
+
+    def testDefaults(self):
+        """ Test that each object gets its own copy of a mutable default. """
+        first = Annotation()
+        second = Annotation()
+
+        self.assertEqual(first.checksums, {})
+        self.failIf(first.checksums is second.checksums)
+        self.assertEqual(first.size, None)
+
+    def testTypeCheck(self):
+        """ Test that values of the wrong type are rejected. """
+        subject = Subject()
+
+        with self.assertRaises(ValueError):
+            subject.rand_subject_id = 3
+
+        with self.assertRaises(ValueError):
+            Visit().visit_number = "3"
+
+        self.assertEqual(subject.rand_subject_id, None)
+
+    def testCheck(self):
+        """ Test that the checks of the fields are run. """
+        subject = Subject()
+
+        with self.assertRaises(ValueError):
+            subject.gender = "other"
+
+        subject.gender = "female"
+        self.assertEqual(subject.gender, "female")
+
+        with self.assertRaises(ValueError):
+            Visit().visit_number = 0
+
+    def testRawDoc(self):
+        """ Test that required fields are always in the document. """
+        subject = Subject()
+        subject.rand_subject_id = "1234"
+
+        doc = subject._get_raw_doc()
+
+        self.assertEqual(doc['node_type'], "subject")
+        self.assertEqual(doc['meta']['rand_subject_id'], "1234")
+        self.failUnless('gender' in doc['meta'])
+        self.failIf('race' in doc['meta'])
+        self.failIf('id' in doc)
+
+        subject.race = "unknown"
+        self.assertEqual(subject._get_raw_doc()['meta']['race'], "unknown")
+
+    def testLoadDoc(self):
+        """ Test that loading a document restores the fields. """
+        subject = Subject()
+        subject.gender = "male"
+        subject.rand_subject_id = "1234"
+        subject.race = "asian"
+        subject.tags = ["test"]
+        subject.links = {"participates_in": ["study_id"]}
+
+        doc = subject._get_raw_doc()
+        doc['id'] = "subject_id"
+        doc['ver'] = 2
+
+        loaded = Subject.load_subject(doc)
+
+        self.assertEqual(loaded.id, "subject_id")
+        self.assertEqual(loaded.version, 2)
+        self.assertEqual(loaded._get_raw_doc(), doc)
+
+    def testLoadMissingKeys(self):
+        """ Test that loading a document without a required key fails. """
+        subject = Subject()
+        subject.gender = "male"
+        subject.rand_subject_id = "1234"
+        subject.tags = ["test"]
+        subject._set_id("subject_id")
+        subject.version = 1
+
+        for key in ["rand_subject_id", "tags"]:
+            doc = subject._get_raw_doc()
+            del doc['meta'][key]
+
+            with self.assertRaises(KeyError):
+                Subject.load_subject(doc)
+
+        # Optional fields may be left out.
+        doc = subject._get_raw_doc()
+        self.failIf("race" in doc['meta'])
+        self.assertEqual(Subject.load_subject(doc).race, None)
+
+    def testLoadVisitKeys(self):
+        """ Test that visits need a visit_id, but not tags, to load. """
+        visit = Visit()
+        visit.visit_id = "visit_id"
+        visit.visit_number = 1
+        visit.interval = 1
+        visit.date = "2000-01-01"
+        visit.links = {"by": ["subject_id"]}
+        visit._set_id("visit_id")
+        visit.version = 1
+
+        doc = visit._get_raw_doc()
+        del doc['meta']['tags']
+        self.assertEqual(Visit.load_visit(doc).tags, [])
+
+        del doc['meta']['visit_id']
+        doc['ver'] = 2
+        with self.assertRaises(KeyError):
+            Visit.load_visit(doc)
+
+    def testPickle(self):
+        """ Test that objects survive a pickle round trip. """
+        annot = Annotation()
+        annot.orf_process = "orf_process"
+        annot.size = 10
+        annot.tags = ["test"]
+        annot._set_id("annotation_id")
+        annot._urls = ["url"]
+
+        attr = VisitAttribute()
+        attr.study = "prediabetes"
+        attr.age = 30
+        attr.disease_name = "disease"
+
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            loaded = pickle.loads(pickle.dumps(annot, protocol))
+
+            self.assertEqual(loaded.id, "annotation_id")
+            self.assertEqual(loaded._urls, ["url"])
+            self.assertEqual(loaded._get_raw_doc(), annot._get_raw_doc())
+
+            loaded = pickle.loads(pickle.dumps(attr, protocol))
+
+            self.assertEqual(loaded.age, 30)
+            self.assertEqual(loaded.disease_name, "disease")
+            self.assertEqual(loaded._get_raw_doc(), attr._get_raw_doc())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+""" A unittest script for the graph module. """
+
+import unittest
+
+from cutlass import iHMPSession
+from cutlass.graph import NodeGraph
+
+# pylint: disable=W0703, C1801
+
+def _doc(node_type, linkage, **meta):
+    meta.setdefault("tags", [])
+
+    return {
+        "ns": "hmbr",
+        "node_type": node_type,
+        "acl": {"read": ["all"], "write": ["hmbr"]},
+        "linkage": linkage,
+        "meta": meta
+    }
+
+class GraphTest(unittest.TestCase):
+    """ A unit test class for the graph module. """
+
+    def setUp(self):
+        """ Start a local server holding two subjects with samples. """
+        self.session = iHMPSession.local(page_size=3)
+        self.server = self.session.get_local_server()
+
+        self.study_id = self.server.load([
+            _doc("study", {"part_of": ["project1"]}, name="s")])[0]
+        self.subject_ids = self.server.load([
+            _doc("subject", {"participates_in": [self.study_id]}, rand_subject_id=name)
+            for name in ("a", "b")])
+        self.visit_ids = self.server.load([
+            _doc("visit", {"by": [self.subject_ids[0]]}, visit_id="v1"),
+            _doc("visit", {"by": [self.subject_ids[0]]}, visit_id="v2"),
+            _doc("visit", {"by": [self.subject_ids[1]]}, visit_id="v3")])
+        self.sample_ids = self.server.load([
+            _doc("sample", {"collected_during": [visit_id]}, name=visit_id)
+            for visit_id in self.visit_ids + self.visit_ids[:1]])
+
+    def tearDown(self):
+        """ Stop the local server. """
+        self.session.close()
+        self.server.stop()
+
+    def testLoad(self):
+        """ Test retrieving a namespace and looking nodes up. """
+        graph = self.session.load_graph("hmbr")
+
+        # The project is linked to but not part of the namespace.
+        self.assertEqual(len(graph), 1 + 2 + 3 + 4 + 1)
+        self.assertEqual(graph.edge_count, 2 + 3 + 4 + 1)
+        self.assertEqual(graph.linkages, ["by", "collected_during",
+                                          "part_of", "participates_in"])
+
+        self.assertEqual(graph.node_type(self.subject_ids[0]), "subject")
+        self.assertEqual(graph.node_type("project1"), None)
+        self.assertEqual(graph.node_type("unknown"), None)
+        self.assertEqual(sorted(graph.nodes("visit")), sorted(self.visit_ids))
+        self.assertEqual(graph.nodes("unknown"), [])
+
+        self.assertEqual(graph.parents(self.visit_ids[0]), [self.subject_ids[0]])
+        self.assertEqual(sorted(graph.children(self.subject_ids[0])),
+                         sorted(self.visit_ids[:2]))
+        self.assertEqual(graph.children(self.subject_ids[0], linkage="collected_during"), [])
+        self.assertEqual(graph.children("unknown"), [])
+
+        samples = dict((subject_id, len(graph.descendants(subject_id, "sample")))
+                       for subject_id in graph.nodes("subject"))
+        self.assertEqual(samples, {self.subject_ids[0]: 3, self.subject_ids[1]: 1})
+        self.assertEqual(len(graph.descendants("project1")), 1 + 2 + 3 + 4)
+
+        self.assertEqual(graph.parents(self.visit_ids[0], linkage="by"),
+                         [self.subject_ids[0]])
+        self.assertEqual(graph.parents(self.visit_ids[0], linkage="part_of"), [])
+        self.assertEqual(graph.children(self.subject_ids[0], linkage="unknown"), [])
+
+        # The edge lists are not kept once the adjacency arrays are built.
+        self.assertEqual(graph._edges, None)
+
+        with self.assertRaises(ValueError):
+            graph.add({"id": "new", "node_type": "visit", "linkage": {}})
+
+    def testNodeTypes(self):
+        """ Test retrieving only some node types. """
+        queries = self.server.requests.get('oql_query', 0)
+        graph = NodeGraph.load("hmbr", node_types=["visit"], session=self.session)
+
+        self.assertEqual(self.server.requests.get('oql_query', 0) - queries, 1)
+        self.assertEqual(sorted(graph.nodes("visit")), sorted(self.visit_ids))
+        self.assertEqual(graph.node_type(self.subject_ids[0]), None)
+        self.assertEqual(graph.descendants(self.subject_ids[1]), [self.visit_ids[2]])
+
+if __name__ == '__main__':
+    unittest.main()
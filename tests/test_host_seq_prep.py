@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+
+""" A unittest script for the HostSeqPrep module. """
+
+import unittest
+
+from cutlass import HostSeqPrep
+
+from CutlassTestConfig import CutlassTestConfig
+from CutlassTestUtil import CutlassTestUtil
+
+# pylint: disable=W0703, C1801
+
+class HostSeqPrepTest(unittest.TestCase):
+    """ A unit test class for the HostSeqPrep class. """
+
+    session = None
+    util = None
+
+    @classmethod
+    def setUpClass(cls):
+        """ Setup for the unittest. """
+        # Establish the session for each test method
+        cls.session = CutlassTestConfig.get_session()
+        cls.util = CutlassTestUtil()
+
+    def testImport(self):
+        """ Test the importation of the HostSeqPrep module. """
+        success = False
+        try:
+            from cutlass import HostSeqPrep
+            success = True
+        except Exception:
+            pass
+
+        self.failUnless(success)
+        self.failIf(HostSeqPrep is None)
+
+    def testSessionCreate(self):
+        """ Test the creation of a HostSeqPrep via the session. """
+        success = False
+        prep = None
+
+        try:
+            prep = self.session.create_object("host_seq_prep")
+
+            success = True
+        except Exception:
+            pass
+
+        self.failUnless(success)
+        self.failIf(prep is None)
+
+    def testAdapters(self):
+        """ Test the adapters property. """
+        prep = self.session.create_object("host_seq_prep")
+
+        self.util.stringTypeTest(self, prep, "adapters")
+
+        self.util.stringPropertyTest(self, prep, "adapters")
+
+    def testAdaptersNotComment(self):
+        """ Test that the adapters and the comment are kept apart. """
+        prep = self.session.create_object("host_seq_prep")
+
+        prep.comment = "comment"
+        prep.adapters = "ACGT"
+
+        self.assertEqual(prep.adapters, "ACGT")
+        self.assertEqual(prep.comment, "comment")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+
+""" A unittest script for the identity module. """
+
+import unittest
+
+from cutlass import iHMPSession, Study, Subject
+from cutlass.identity import IdentityMap
+
+# pylint: disable=W0703, C1801
+
+def _subject_doc(study_id, num):
+    return {
+        "ns": "hmbr",
+        "node_type": "subject",
+        "acl": {"read": ["all"], "write": ["hmbr"]},
+        "linkage": {"participates_in": [study_id]},
+        "meta": {"gender": "male", "rand_subject_id": "r%s" % num, "tags": []}
+    }
+
+class _Node(object):
+    """ A minimal stand-in for a node object. """
+
+    def __init__(self, node_id, version=1):
+        self.id = node_id
+        self.version = version
+
+class IdentityMapTest(unittest.TestCase):
+    """ A unit test class for the identity module. """
+
+    def setUp(self):
+        """ Start a local server with a study and a few subjects. """
+        self.session = iHMPSession.local(page_size=2)
+        self.server = self.session.get_local_server()
+
+        study = {
+            "ns": "hmbr",
+            "node_type": "study",
+            "acl": {"read": ["all"], "write": ["hmbr"]},
+            "linkage": {},
+            "meta": {"name": "s", "description": "d", "center": "Broad Institute",
+                     "contact": "Someone", "subtype": "ibd", "tags": []}
+        }
+
+        self.study_id = self.server.load([study])[0]
+        self.subject_ids = self.server.load([_subject_doc(self.study_id, num)
+                                             for num in range(3)])
+
+    def tearDown(self):
+        """ Stop the local server. """
+        self.session.close()
+        self.server.stop()
+
+    def testLRU(self):
+        """ Test the least recently used eviction. """
+        identity_map = IdentityMap(size=2)
+
+        for node_id in ("a", "b"):
+            identity_map.put(_Node(node_id))
+
+        self.failIf(identity_map.get("a", 1) is None)
+
+        identity_map.put(_Node("c"))
+
+        self.assertEqual(len(identity_map), 2)
+        self.failUnless(identity_map.get("b", 1) is None, "b was evicted.")
+        self.failIf(identity_map.get("a", 1) is None)
+        self.failUnless(identity_map.get("a", 2) is None, "Version mismatch.")
+
+        # The stale version was dropped.
+        self.assertEqual(identity_map.stats(),
+                         {"hits": 2, "misses": 2, "size": 1})
+
+        with self.assertRaises(ValueError):
+            IdentityMap(size=-1)
+
+    def testLoad(self):
+        """ Test that loading a node twice returns the same object. """
+        with self.session:
+            first = Subject.load(self.subject_ids[0])
+            second = Subject.load(self.subject_ids[0])
+
+            self.failUnless(first is second)
+
+            study = Study.load(self.study_id)
+            subjects = list(study.subjects())
+
+            self.failUnless(first in subjects)
+            self.failUnless(any([subject is first for subject in subjects]))
+
+            searched = list(Subject.search_iter(session=self.session))
+            self.failUnless(any([subject is first for subject in searched]))
+
+        stats = self.session.get_identity_map().stats()
+        self.assertEqual(stats['size'], 4)
+        self.failUnless(stats['hits'] >= 3)
+
+    def testInvalidation(self):
+        """ Test that saving and deleting drop nodes from the map. """
+        with self.session:
+            subject = Subject.load(self.subject_ids[1])
+            subject.race = "asian"
+
+            self.failUnless(subject.save())
+
+            reloaded = Subject.load(self.subject_ids[1])
+            self.failIf(reloaded is subject)
+            self.assertEqual(reloaded.race, "asian")
+
+            self.failUnless(reloaded.delete())
+            self.assertEqual(self.session.get_identity_map().stats()['size'], 0)
+
+    def testDisabled(self):
+        """ Test that a cache size of 0 disables the map. """
+        session = self.server.session(cache_size=0)
+
+        with session:
+            first = Subject.load(self.subject_ids[2])
+            second = Subject.load(self.subject_ids[2])
+
+        self.failIf(first is second)
+        self.assertEqual(len(session.get_identity_map()), 0)
+
+    def testExplicitSession(self):
+        """ Test that an explicit session's identity map is used. """
+        other = self.server.session(lazy=True)
+
+        with self.session:
+            node = Subject.load(self.subject_ids[0], session=other)
+            self.failIf(node.loaded, "The explicit session is lazy.")
+            self.assertEqual(len(self.session.get_identity_map()), 0)
+
+            searched = Subject.search(session=other)
+            self.assertEqual(len(searched), 2)
+            self.failUnless(all([not subject.loaded for subject in searched]))
+
+            subject = node.load()
+            self.failUnless(Subject.load(self.subject_ids[0],
+                                         session=other) is subject)
+
+            (nodes, _missing) = Subject.load_many(self.subject_ids,
+                                                  session=other)
+            self.failUnless(nodes[0] is subject)
+
+        self.assertEqual(len(self.session.get_identity_map()), 0)
+        self.assertEqual(len(other.get_identity_map()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -324,5 +324,91 @@ class IHMPSessionTest(unittest.TestCase):
             instance = session.create_object(node_type)
             self.failIf(instance is None)
 
+    def testContextSession(self):
+        """ Test that a session used in a 'with' block becomes current. """
+        default = iHMPSession(IHMPSessionTest.username, IHMPSessionTest.password)
+        current = iHMPSession.get_session()
+
+        staging = iHMPSession(IHMPSessionTest.username,
+                              IHMPSessionTest.password, server="staging")
+        other = iHMPSession(IHMPSessionTest.username,
+                            IHMPSessionTest.password, server="other")
+
+        self.failIf(default is None)
+
+        with staging:
+            self.failUnless(iHMPSession.get_session() is staging)
+
+            with other:
+                self.failUnless(iHMPSession.get_session() is other)
+
+            self.failUnless(iHMPSession.get_session() is staging)
+
+        self.failUnless(iHMPSession.get_session() is current)
+
+    def testContextSessionIsPerThread(self):
+        """ Test that a session entered in one thread is not seen in another. """
+        import threading
+
+        staging = iHMPSession(IHMPSessionTest.username,
+                              IHMPSessionTest.password, server="staging")
+        seen = []
+
+        def worker():
+            seen.append(iHMPSession.get_session())
+
+        with staging:
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+
+        self.failIf(seen[0] is staging)
+
+    def testUnknownAttribute(self):
+        """ Test that unknown attributes raise an AttributeError. """
+        session = iHMPSession(IHMPSessionTest.username, IHMPSessionTest.password)
+
+        self.failIf(hasattr(session, "no_such_attribute"))
+
+        with self.assertRaises(AttributeError):
+            session.create_no_such_node()
+
+    def testLoadMany(self):
+        """ Test loading many nodes of different types at once. """
+        session = iHMPSession(IHMPSessionTest.username, IHMPSessionTest.password)
+
+        docs = {
+            "subject1": {
+                "id": "subject1", "ver": 1, "node_type": "subject",
+                "linkage": {"participates_in": ["study1"]},
+                "meta": {"gender": "male", "rand_subject_id": "r1", "tags": []}
+            },
+            "subject2": {
+                "id": "subject2", "ver": 3, "node_type": "subject",
+                "linkage": {"participates_in": ["study1"]},
+                "meta": {"gender": "female", "rand_subject_id": "r2", "tags": []}
+            }
+        }
+
+        def get_node(node_id):
+            if node_id not in docs:
+                raise Exception("Unable to retrieve node document.")
+            return docs[node_id]
+
+        session.get_osdf().get_node = get_node
+
+        (nodes, missing) = session.load_many(["subject2", "nope", "subject1"])
+
+        self.assertEqual([node.id for node in nodes], ["subject2", "subject1"])
+        self.assertEqual(missing, ["nope"])
+
+        from cutlass import Subject
+        (subjects, missing) = Subject.load_many(["subject1", "subject2"],
+                                                session=session)
+
+        self.failUnless(all([isinstance(subj, Subject) for subj in subjects]))
+        self.assertEqual([subj.version for subj in subjects], [1, 3])
+        self.assertEqual(missing, [])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+""" A unittest script for the lazy module. """
+
+import unittest
+
+from cutlass import iHMPSession, Study, Subject
+from cutlass.lazy import LazyNode
+
+# pylint: disable=W0703, C1801
+
+def _doc(node_type, linkage, **meta):
+    meta.setdefault("tags", [])
+
+    return {
+        "ns": "hmbr",
+        "node_type": node_type,
+        "acl": {"read": ["all"], "write": ["hmbr"]},
+        "linkage": linkage,
+        "meta": meta
+    }
+
+class LazyTest(unittest.TestCase):
+    """ A unit test class for the lazy module. """
+
+    def setUp(self):
+        """ Start a local server holding a study with a few subjects. """
+        self.session = iHMPSession.local(lazy=True)
+        self.server = self.session.get_local_server()
+
+        self.study_id = self.server.load([
+            _doc("study", {"part_of": ["project1"]}, name="s",
+                 description="d", center="Broad Institute",
+                 contact="Someone", subtype="ibd")])[0]
+        self.subject_ids = self.server.load([
+            _doc("subject", {"participates_in": [self.study_id]},
+                 gender="male", rand_subject_id="r%s" % num)
+            for num in range(3)])
+
+    def tearDown(self):
+        """ Stop the local server. """
+        self.session.close()
+        self.server.stop()
+
+    def testSearch(self):
+        """ Test that searches return stand-ins until a property is used. """
+        with self.session:
+            subjects = list(Subject.search_iter())
+
+            self.assertEqual(len(subjects), 3)
+            self.failUnless(all(type(subject) is LazyNode for subject in subjects))
+            self.failUnless(all(isinstance(subject, Subject) for subject in subjects))
+
+            subject = subjects[0]
+            self.assertEqual(subject.node_type, "subject")
+            self.assertEqual(subject.version, 1)
+            self.assertEqual(subject.links, {"participates_in": [self.study_id]})
+            self.assertEqual(subject.namespace, "hmbr")
+            self.failIf(subject.loaded)
+
+            self.assertEqual(subject.gender, "male")
+            self.failUnless(subject.loaded)
+
+            # Changes go to the full object, which later loads hand back.
+            subject.race = "asian"
+            self.assertEqual(subject.load().race, "asian")
+            self.failUnless(Subject.load(subject.id) is subject.load())
+
+    def testAccessors(self):
+        """ Test stand-ins returned by linkage accessors and children(). """
+        with self.session:
+            study = Study.load(self.study_id)
+            subjects = list(study.subjects())
+
+            self.failUnless(all(type(subject) is LazyNode for subject in subjects))
+            self.assertEqual(sorted(subject.id for subject in subjects),
+                             sorted(self.subject_ids))
+            self.failIf(any(subject.loaded for subject in subjects))
+
+            children = list(study.children(flatten=True))
+            self.assertEqual(sorted(child.id for child in children),
+                             sorted(self.subject_ids))
+            self.failIf(any(child.loaded for child in children))
+
+            self.session.lazy = False
+            self.failIf(type(list(study.subjects())[0]) is LazyNode)
+
+    def testIdentity(self):
+        """ Test that stand-ins hash and compare like the full objects. """
+        with self.session:
+            subjects = list(Subject.search_iter())
+            subject = subjects[0]
+            loaded = Subject.load_subject(dict(subject.doc))
+
+            self.assertEqual(hash(subject), hash(loaded))
+            self.failUnless(subject == loaded)
+            self.failUnless(loaded == subject)
+            self.failIf(subject == subjects[1])
+            self.failIf(subject.loaded)
+
+            self.failIf(loaded is subject.load())
+            self.assertEqual(len(set(subjects + [loaded])), 3)
+            self.assertEqual(len(set([subject.load(), subject])), 1)
+            self.failUnless(loaded in dict.fromkeys(subjects))
+
+if __name__ == '__main__':
+    unittest.main()
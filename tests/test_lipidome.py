@@ -109,6 +109,24 @@ class LipidomeTest(unittest.TestCase):
 
         self.util.boolPropertyTest(self, lip, "private_files")
 
+    def testSubtype(self):
+        """ Test the subtype property. """
+        lip = self.session.create_lipidome()
+
+        self.util.stringTypeTest(self, lip, "subtype")
+
+        self.util.stringPropertyTest(self, lip, "subtype")
+
+    def testSubtypeNotStudy(self):
+        """ Test that the subtype and the study are kept apart. """
+        lip = self.session.create_lipidome()
+
+        lip.study = "prediabetes"
+        lip.subtype = "host"
+
+        self.assertEqual(lip.subtype, "host")
+        self.assertEqual(lip.study, "prediabetes")
+
     def testToJson(self):
         """ Test the generation of JSON from a Lipidome instance. """
         lip = self.session.create_lipidome()
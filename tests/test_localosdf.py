@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+
+""" A unittest script for the localosdf module. """
+
+import time
+import unittest
+
+from cutlass import iHMPSession, Subject
+from cutlass.localosdf import LocalOSDF, OQLError, compile_oql
+
+# pylint: disable=W0703, C1801
+
+def _doc(node_type, linkage=None, **meta):
+    return {
+        "ns": "hmbr",
+        "node_type": node_type,
+        "acl": {"read": ["all"], "write": ["hmbr"]},
+        "linkage": linkage or {},
+        "meta": meta
+    }
+
+class LocalOSDFTest(unittest.TestCase):
+    """ A unit test class for the localosdf module. """
+
+    def setUp(self):
+        """ Start a fresh local server for every test. """
+        self.session = iHMPSession.local(page_size=3, seed=7, backoff=0)
+        self.server = self.session.get_local_server()
+        self.osdf = self.session.get_osdf()
+
+    def tearDown(self):
+        """ Stop the local server. """
+        self.session.close()
+        self.server.stop()
+
+    def testOQL(self):
+        """ Test the OQL parser. """
+        doc = _doc("subject", {"participates_in": ["study1", "study2"]},
+                   gender="male", visit_number=3)
+
+        matching = [
+            '"subject"[node_type]',
+            '"study2"[linkage.participates_in]',
+            '"male"[gender] && "male"[meta.gender]',
+            '"female"[gender] or "subject"[node_type]',
+            '!"female"[gender]',
+            'not ("female"[gender] || "visit"[node_type])',
+            '[visit_number] >= 3 and [visit_number] < 4',
+            '"subject"[node_type] AND ("x"[gender] OR [meta.visit_number] == 3)'
+        ]
+
+        for query in matching:
+            self.failUnless(compile_oql(query)(doc), query)
+
+        self.failIf(compile_oql('"study3"[linkage.participates_in]')(doc))
+        self.failIf(compile_oql('"male"[missing]')(doc))
+
+        for query in ('"subject"', '("a"[b]', '"a"[b] xor "c"[d]', '[a] ~ 1'):
+            with self.assertRaises(OQLError):
+                compile_oql(query)
+
+    def testNodeLifecycle(self):
+        """ Test inserting, editing, retrieving and deleting nodes. """
+        node_id = self.osdf.insert_node(_doc("subject", gender="male"))
+
+        node = self.osdf.get_node(node_id)
+        self.assertEqual(node['ver'], 1)
+        self.assertEqual(node['meta']['gender'], "male")
+
+        node['meta']['gender'] = "female"
+        self.osdf.edit_node(node)
+
+        self.assertEqual(self.osdf.get_node(node_id)['ver'], 2)
+        self.assertEqual(self.osdf.get_node_by_version(node_id, 1)['meta']['gender'],
+                         "male")
+
+        # Edits of stale versions are refused.
+        with self.assertRaises(Exception):
+            self.osdf.edit_node(node)
+
+        self.assertEqual(self.osdf.validate_node(_doc("subject")), (True, None))
+
+        (valid, error) = self.osdf.validate_node({"node_type": "subject"})
+        self.failIf(valid)
+        self.failUnless("ns" in error)
+
+        self.osdf.delete_node(node_id)
+
+        with self.assertRaises(Exception):
+            self.osdf.get_node(node_id)
+
+    def testPaging(self):
+        """ Test the paging of OQL results. """
+        self.server.load([_doc("subject", gender="male", tags=[],
+                               rand_subject_id="r%s" % num)
+                          for num in range(7)])
+
+        first = self.osdf.oql_query("hmbr", '"subject"[node_type]', page=1)
+        last = self.osdf.oql_query("hmbr", '"subject"[node_type]', page=3)
+        past = self.osdf.oql_query("hmbr", '"subject"[node_type]', page=4)
+
+        self.assertEqual((first['result_count'], len(first['results'])), (7, 3))
+        self.assertEqual((last['result_count'], len(last['results'])), (7, 1))
+        self.assertEqual((past['result_count'], len(past['results'])), (0, 0))
+
+        other = self.osdf.oql_query("ihmp", '"subject"[node_type]')
+        self.assertEqual(other['results'], [])
+
+        subjects = list(Subject.search_iter(session=self.session))
+        self.assertEqual(len(subjects), 7)
+
+    def testModels(self):
+        """ Test saving, loading and walking model objects. """
+        with self.session:
+            study = _doc("study", name="s", description="A study.",
+                         center="Broad Institute", contact="Someone",
+                         subtype="ibd", tags=[])
+            study_id = self.server.load([study])[0]
+
+            for num in range(5):
+                subject = Subject()
+                subject.gender = "female"
+                subject.race = "caucasian"
+                subject.rand_subject_id = "r%s" % num
+                subject.links = {"participates_in": [study_id]}
+
+                self.failUnless(subject.save())
+
+            subject.race = "asian"
+            self.failUnless(subject.save())
+            self.assertEqual(Subject.load(subject.id).race, "asian")
+
+            from cutlass import Study
+            study = Study.load(study_id)
+            self.assertEqual(len(list(study.subjects())), 5)
+
+    def testInjectedErrors(self):
+        """ Test that injected errors are retried and counted. """
+        node_id = self.server.load([_doc("subject")])[0]
+
+        self.session.get_retry_policy().retries = 20
+        self.session.get_circuit_breaker().failure_threshold = 20
+        self.server.error_rate = 0.5
+
+        for _attempt in range(10):
+            self.osdf.get_node(node_id)
+
+        self.failUnless(self.session.get_retry_stats()['retries']['read'] > 0)
+
+        self.session.get_retry_policy().retries = 2
+        self.server.error_rate = 1
+
+        with self.assertRaises(Exception):
+            self.osdf.get_node(node_id)
+
+    def testLatency(self):
+        """ Test the injected latency. """
+        node_id = self.server.load([_doc("subject")])[0]
+        self.server.latency = 0.05
+        self.server.jitter = 0.01
+
+        start = time.time()
+        self.osdf.get_node(node_id)
+
+        self.failUnless(time.time() - start >= 0.04)
+
+    def testInvalidSettings(self):
+        """ Test that invalid server settings are rejected. """
+        with self.assertRaises(ValueError):
+            LocalOSDF(page_size=0)
+
+        with self.assertRaises(ValueError):
+            LocalOSDF(error_rate=2)
+
+if __name__ == '__main__':
+    unittest.main()
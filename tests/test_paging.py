@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+
+""" A unittest script for the paging module. """
+
+import threading
+import time
+import unittest
+
+from cutlass import iHMPSession, Sample, Study, Subject
+from cutlass.paging import oql_docs, oql_pages
+
+# pylint: disable=W0703, C1801
+
+def _subject_doc(num):
+    return {
+        "id": "subject%s" % num,
+        "ver": 1,
+        "node_type": "subject",
+        "linkage": {"participates_in": ["study1"]},
+        "meta": {"gender": "male", "rand_subject_id": "r%s" % num, "tags": []}
+    }
+
+class _PagedQuery(object):
+    """ Stands in for OSDF.oql_query(), serving documents in pages. """
+
+    def __init__(self, docs, page_size, delay=0):
+        self.docs = docs
+        self.page_size = page_size
+        self.delay = delay
+        self.pages = []
+        self.queries = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, namespace, query, page=1, cache=True):
+        with self.lock:
+            self.pages.append(page)
+            self.queries.append(query)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        # Later pages answer faster, to shake out any ordering problems.
+        time.sleep(self.delay / page)
+
+        with self.lock:
+            self.in_flight -= 1
+
+        start = (page - 1) * self.page_size
+        results = self.docs[start:start + self.page_size]
+
+        return {"result_count": len(self.docs), "page": page,
+                "results": results}
+
+class PagingTest(unittest.TestCase):
+    """ A unit test class for the paging module. """
+
+    def _session(self, docs, page_size, delay=0):
+        session = iHMPSession("test", "test", server="staging")
+        session.get_osdf().oql_query = _PagedQuery(docs, page_size, delay)
+
+        return session
+
+    def testAllPages(self):
+        """ Test that every page of results is retrieved, in order. """
+        docs = [_subject_doc(num) for num in range(25)]
+        session = self._session(docs, 10)
+
+        pages = list(oql_pages("hmbr", "q", session=session))
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(sorted(session.get_osdf().oql_query.pages), [1, 2, 3])
+
+        ids = [doc['id'] for doc in oql_docs("hmbr", "q", session=session,
+                                             prefetch=False)]
+        self.assertEqual(ids, [doc['id'] for doc in docs])
+
+    def testNoResults(self):
+        """ Test a query without any results. """
+        session = self._session([], 10)
+
+        self.assertEqual(list(oql_docs("hmbr", "q", session=session)), [])
+        self.assertEqual(session.get_osdf().oql_query.pages, [1])
+
+    def testLazy(self):
+        """ Test that pages are only requested as the results are consumed. """
+        docs = [_subject_doc(num) for num in range(50)]
+        session = self._session(docs, 10)
+
+        gen = oql_docs("hmbr", "q", session=session, prefetch=False)
+        next(gen)
+
+        self.assertEqual(session.get_osdf().oql_query.pages, [1])
+
+        gen.close()
+
+    def testFanOut(self):
+        """ Test that pages are fetched concurrently but yielded in order. """
+        docs = [_subject_doc(num) for num in range(100)]
+        session = self._session(docs, 10, delay=0.05)
+
+        ids = [doc['id'] for doc in oql_docs("hmbr", "q", session=session,
+                                             fan_out=3)]
+
+        self.assertEqual(ids, [doc['id'] for doc in docs])
+
+        oql_query = session.get_osdf().oql_query
+        self.assertEqual(sorted(oql_query.pages), range(1, 11))
+        self.failUnless(1 < oql_query.max_in_flight <= 3)
+
+        with self.assertRaises(ValueError):
+            list(oql_docs("hmbr", "q", session=session, fan_out=0))
+
+    def testShortPages(self):
+        """ Test that pages smaller than the first one are followed up. """
+        docs = [_subject_doc(num) for num in range(12)]
+        session = self._session(docs, 10)
+
+        oql_query = session.get_osdf().oql_query
+
+        def short_pages(namespace, query, page=1, cache=True):
+            res = oql_query(namespace, query, page=page, cache=cache)
+
+            if page > 1:
+                start = 8 + page
+                res['results'] = docs[start:start + 1]
+
+            return res
+
+        session.get_osdf().oql_query = short_pages
+
+        ids = [doc['id'] for doc in oql_docs("hmbr", "q", session=session)]
+
+        self.assertEqual(ids, [doc['id'] for doc in docs])
+
+    def testLinkageAccessor(self):
+        """ Test that linkage accessors walk every page of results. """
+        docs = [_subject_doc(num) for num in range(23)]
+        session = self._session(docs, 5)
+
+        study = Study()
+        study._set_id("study1")
+
+        with session:
+            subjects = list(study.subjects())
+
+        self.assertEqual([subj.id for subj in subjects],
+                         [doc['id'] for doc in docs])
+
+        query = session.get_osdf().oql_query.queries[0]
+        self.assertEqual(query, '"study1"[linkage.participates_in]')
+
+    def testLinkageFanOut(self):
+        """ Test that linkage accessors pass fan_out on to the paging. """
+        docs = [_subject_doc(num) for num in range(50)]
+
+        study = Study()
+        study._set_id("study1")
+
+        session = self._session(docs, 10, delay=0.05)
+
+        with session:
+            subjects = list(study.subjects(fan_out=1))
+
+        self.assertEqual(len(subjects), 50)
+        self.assertEqual(session.get_osdf().oql_query.max_in_flight, 1)
+
+        session = self._session(docs, 10, delay=0.05)
+
+        with session:
+            refs = list(study.subjects(ids_only=True, fan_out=3))
+
+        self.assertEqual(len(refs), 50)
+        self.failUnless(1 < session.get_osdf().oql_query.max_in_flight <= 3)
+
+        sample = Sample()
+        sample._set_id("sample1")
+
+        session = self._session(docs, 10, delay=0.05)
+
+        with session:
+            refs = list(sample.sixteenSDnaPreps(ids_only=True, fan_out=1))
+
+            with self.assertRaises(ValueError):
+                list(sample.preps(fan_out=0))
+
+        self.assertEqual(len(refs), 50)
+        self.assertEqual(session.get_osdf().oql_query.max_in_flight, 1)
+
+    def testSearchIter(self):
+        """ Test the search_iter() class method. """
+        docs = [_subject_doc(num) for num in range(12)]
+        session = self._session(docs, 5)
+
+        subjects = list(Subject.search_iter('"male"[gender]', session=session))
+
+        self.assertEqual(len(subjects), 12)
+        self.failUnless(all([isinstance(subj, Subject) for subj in subjects]))
+        self.assertEqual(subjects[-1].id, "subject11")
+
+        query = session.get_osdf().oql_query.queries[0]
+        self.assertEqual(query, '("male"[gender]) && "subject"[node_type]')
+
+        list(Subject.search_iter(session=session))
+
+        query = session.get_osdf().oql_query.queries[-1]
+        self.assertEqual(query, '"subject"[node_type]')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+
+""" A unittest script for the querycache module. """
+
+import time
+import unittest
+
+from cutlass import HostAssayPrep, iHMPSession, Study, Subject, Visit
+from cutlass.paging import oql_docs
+from cutlass.querycache import QueryCache
+
+# pylint: disable=W0703, C1801
+
+def _subject_doc(study_id, num):
+    return {
+        "ns": "hmbr",
+        "node_type": "subject",
+        "acl": {"read": ["all"], "write": ["hmbr"]},
+        "linkage": {"participates_in": [study_id]},
+        "meta": {"gender": "male", "rand_subject_id": "r%s" % num, "tags": []}
+    }
+
+class QueryCacheTest(unittest.TestCase):
+    """ A unit test class for the querycache module. """
+
+    def setUp(self):
+        """ Start a local server with a study and a few subjects. """
+        self.session = iHMPSession.local(page_size=2)
+        self.server = self.session.get_local_server()
+
+        study = {
+            "ns": "hmbr",
+            "node_type": "study",
+            "acl": {"read": ["all"], "write": ["hmbr"]},
+            "linkage": {"part_of": ["project1"]},
+            "meta": {"name": "s", "description": "d", "center": "Broad Institute",
+                     "contact": "Someone", "subtype": "ibd", "tags": []}
+        }
+
+        self.study_id = self.server.load([study])[0]
+        self.subject_ids = self.server.load([_subject_doc(self.study_id, num)
+                                             for num in range(3)])
+
+    def tearDown(self):
+        """ Stop the local server. """
+        self.session.close()
+        self.server.stop()
+
+    def _queries(self):
+        return self.server.requests.get('oql_query', 0)
+
+    def testRepeatedQueries(self):
+        """ Test that repeated queries are answered from the cache. """
+        first = Subject.search(session=self.session)
+        queries = self._queries()
+
+        second = Subject.search(session=self.session)
+
+        self.assertEqual(self._queries(), queries)
+        self.assertEqual([subject.id for subject in first],
+                         [subject.id for subject in second])
+        self.assertEqual(self.session.get_query_cache().stats()['hits'], 1)
+
+    def testStreamedPages(self):
+        """ Test that searches through every page are not cached. """
+        cache = self.session.get_query_cache()
+
+        self.assertEqual(len(list(Subject.search_iter(session=self.session,
+                                                      ids_only=True))), 3)
+        self.assertEqual(len(cache), 0)
+
+        docs = list(oql_docs("hmbr", '"subject"[node_type]',
+                             session=self.session, cache=False))
+        self.assertEqual(len(docs), 3)
+        self.assertEqual(len(cache), 0)
+
+        # Other paged queries are cached by default.
+        docs = list(oql_docs("hmbr", '"subject"[node_type]',
+                             session=self.session))
+        self.assertEqual(len(docs), 3)
+        self.assertEqual(len(cache), 2)
+
+    def testLocalWrites(self):
+        """ Test that the session's own writes are visible to its queries. """
+        with self.session:
+            study = Study.load(self.study_id)
+
+            def _count():
+                return len(list(study.subjects()))
+
+            self.assertEqual(_count(), 3)
+
+            subject = Subject()
+            subject.gender = "female"
+            subject.rand_subject_id = "new"
+            subject.links = {"participates_in": [self.study_id]}
+            self.failUnless(subject.save())
+
+            self.assertEqual(_count(), 4)
+
+            self.failUnless(subject.delete())
+            self.assertEqual(_count(), 3)
+
+            # Repeating the lookup is answered from the cache.
+            queries = self._queries()
+            self.assertEqual(_count(), 3)
+            self.assertEqual(self._queries(), queries)
+
+            # Any write in the namespace drops the cached pages.
+            other = Study()
+            other.name = "other"
+            other.description = "Another study."
+            other.center = "Broad Institute"
+            other.contact = "Someone"
+            other.subtype = "ibd"
+            other.links = {"part_of": ["project1"]}
+            self.failUnless(other.save())
+            self.assertEqual(_count(), 3)
+            self.failUnless(self._queries() > queries)
+
+    def testMixedTypes(self):
+        """ Test that a write to a node of another type drops the pages. """
+        osdf = self.session.get_osdf()
+        query = '"t3"[tags]'
+
+        doc = _subject_doc(self.study_id, 3)
+        doc['meta']['tags'] = ["t3"]
+        self.server.load([doc])
+
+        self.assertEqual(osdf.oql_query("hmbr", query)['result_count'], 1)
+
+        with self.session:
+            visit = Visit()
+            visit.visit_id = "v1"
+            visit.visit_number = 1
+            visit.interval = 1
+            visit.date = "2000-01-01"
+            visit.tags = ["t3"]
+            visit.links = {"by": [self.subject_ids[0]]}
+            self.failUnless(visit.save())
+
+        self.assertEqual(osdf.oql_query("hmbr", query)['result_count'], 2)
+
+    def testSharedDerivations(self):
+        """ Test that accessors share the documents of a linkage. """
+        def _derived(node_type, prep_id):
+            return {"ns": "hmbr", "node_type": node_type,
+                    "acl": {"read": ["all"], "write": ["hmbr"]},
+                    "linkage": {"derived_from": [prep_id]},
+                    "meta": {"checksums": {"md5": "abc"}, "study": "ibd",
+                             "subtype": "host", "tags": [], "urls": ["u"]}}
+
+        prep = HostAssayPrep()
+        prep._set_id("prep1")
+        self.server.load([_derived("cytokine", "prep1"),
+                          _derived("lipidome", "prep1"),
+                          _derived("cytokine", "prep2")])
+
+        with self.session:
+            # A single node type is filtered by the query itself.
+            queries = self._queries()
+            self.assertEqual(len(list(prep.cytokines())), 1)
+            self.assertEqual(len(list(prep.lipidomes())), 1)
+            self.assertEqual(self._queries() - queries, 2)
+
+            queries = self._queries()
+            derived = [node.__class__.__name__ for node in prep.derivations()]
+            self.assertEqual(sorted(derived), ["Cytokine", "Lipidome"])
+
+            # The other accessors reuse the documents just retrieved.
+            self.assertEqual(len(list(prep.metabolomes())), 0)
+            self.assertEqual(len(list(prep.cytokines())), 1)
+            self.assertEqual(self._queries() - queries, 1)
+
+            # Until the session's cached results are dropped.
+            self.server.load([_derived("lipidome", "prep1")])
+            self.session.get_query_cache().clear()
+            self.assertEqual(len(list(prep.lipidomes())), 2)
+
+    def testInvalidation(self):
+        """ Test that a write drops every page of its namespace. """
+        cache = QueryCache()
+        subject = {"id": "a", "node_type": "subject"}
+
+        cache.put("ns", '"subject"[node_type]', 1, {"results": [subject]})
+        cache.put("ns", '"subject"[node_type]', 2,
+                  {"results": [{"id": "b", "node_type": "subject"}]})
+        cache.put("ns", '"test"[tags]', 1, {"results": []})
+        cache.put("other", '"test"[tags]', 1, {"results": []})
+
+        self.assertEqual(cache.invalidate("ns"), 3)
+        self.failUnless(cache.get("ns", '"test"[tags]', 1) is None)
+        self.failIf(cache.get("other", '"test"[tags]', 1) is None)
+
+        cache.put("ns", '"sample"[node_type]', 1, {"results": []})
+
+        # A write whose namespace is not known drops every page.
+        self.assertEqual(cache.invalidate(), 2)
+        self.assertEqual(len(cache), 0)
+
+    def testExpiry(self):
+        """ Test that pages expire and that the cache can be disabled. """
+        cache = QueryCache(ttl=0.05, size=1)
+        cache.put("ns", "q1", 1, {"results": []})
+
+        self.failIf(cache.get("ns", "q1", 1) is None)
+
+        cache.put("ns", "q2", 1, {"results": []})
+        self.failUnless(cache.get("ns", "q1", 1) is None, "q1 was evicted.")
+
+        time.sleep(0.06)
+        self.failUnless(cache.get("ns", "q2", 1) is None, "q2 expired.")
+
+        session = self.server.session(query_cache_ttl=0)
+        Subject.search(session=session)
+        Subject.search(session=session)
+
+        self.assertEqual(len(session.get_query_cache()), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+
+""" A unittest script for the retry module. """
+
+import json
+import socket
+import threading
+import time
+import unittest
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+
+from cutlass import iHMPSession
+from cutlass.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+from cutlass.retry import READ, INSERT, EDIT, DELETE, classify
+
+# pylint: disable=W0703, C1801
+
+class _Handler(BaseHTTPRequestHandler):
+    """ Fails requests with the planned status codes, then succeeds. """
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self, code, body="", headers=None):
+        self.send_response(code)
+        for (name, value) in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _planned(self):
+        server = self.server
+
+        with server.lock:
+            server.requests.append((self.command, self.path))
+
+            if server.plan:
+                return server.plan.pop(0)
+
+        return None
+
+    def do_GET(self):
+        """ Handle a GET request. """
+        code = self._planned()
+
+        if code is not None:
+            self._respond(code)
+        else:
+            body = json.dumps({"id": self.path.split("/")[-1], "ver": 1})
+            self._respond(200, body)
+
+    def do_POST(self):
+        """ Handle a POST request. """
+        self.rfile.read(int(self.headers.getheader("Content-Length", 0)))
+        code = self._planned()
+
+        if code is not None:
+            self._respond(code)
+        else:
+            self._respond(201, headers={"Location": "/nodes/new1"})
+
+    def log_message(self, *args):
+        """ Keep the test output quiet. """
+        pass
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+class RetryTest(unittest.TestCase):
+    """ A unit test class for the retry module. """
+
+    server = None
+
+    @classmethod
+    def setUpClass(cls):
+        """ Start a local HTTP server. """
+        cls.server = _Server(("127.0.0.1", 0), _Handler)
+        cls.server.lock = threading.Lock()
+
+        thread = threading.Thread(target=cls.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        cls.port = cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        """ Stop the local HTTP server. """
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """ Reset the planned failures. """
+        self.server.plan = []
+        self.server.requests = []
+
+    def _session(self, port=None, **kwargs):
+        return iHMPSession("test", "test", server="127.0.0.1",
+                           port=port or self.port, ssl=False, backoff=0,
+                           **kwargs)
+
+    def testClassify(self):
+        """ Test the classification of OSDF requests. """
+        self.assertEqual(classify("GET", "/nodes/abc"), READ)
+        self.assertEqual(classify("POST", "/nodes/oql/ihmp/page/1"), READ)
+        self.assertEqual(classify("POST", "/nodes/query/ihmp/page/1"), READ)
+        self.assertEqual(classify("POST", "/nodes/validate"), READ)
+        self.assertEqual(classify("POST", "/nodes"), INSERT)
+        self.assertEqual(classify("PUT", "/nodes/abc"), EDIT)
+        self.assertEqual(classify("DELETE", "/nodes/abc"), DELETE)
+
+    def testReadRetried(self):
+        """ Test that reads are retried after transient failures. """
+        session = self._session()
+        self.server.plan = [502, 503]
+
+        node = session.get_osdf().get_node("abc")
+
+        self.assertEqual(node['id'], "abc")
+        self.assertEqual(len(self.server.requests), 3)
+
+        stats = session.get_retry_stats()
+        self.assertEqual(stats['retries'][READ], 2)
+        self.assertEqual(stats['exhausted'], 0)
+        self.assertEqual(stats['breaker_state'], CircuitBreaker.CLOSED)
+
+    def testRetriesExhausted(self):
+        """ Test that reads give up after the configured retries. """
+        session = self._session(retries=2)
+        self.server.plan = [500, 500, 500, 500]
+
+        with self.assertRaises(Exception):
+            session.get_osdf().get_node("abc")
+
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(session.get_retry_stats()['exhausted'], 1)
+
+    def testInsertNotRetried(self):
+        """ Test that inserts that may have been applied are not retried. """
+        session = self._session()
+        self.server.plan = [502]
+
+        with self.assertRaises(Exception):
+            session.get_osdf().insert_node({"node_type": "subject"})
+
+        self.assertEqual(len(self.server.requests), 1)
+
+        # A 503 means the server did not process the request at all.
+        self.server.plan = [503]
+
+        node_id = session.get_osdf().insert_node({"node_type": "subject"})
+
+        self.assertEqual(node_id, "new1")
+        self.assertEqual(session.get_retry_stats()['retries'][INSERT], 1)
+
+    def testInsertGuard(self):
+        """ Test that the insert guard allows inserts to be retried. """
+        session = self._session()
+        seen = []
+
+        def guard(doc):
+            seen.append(doc)
+            return "existing1" if len(seen) > 1 else None
+
+        session.get_retry_policy().insert_guard = guard
+        self.server.plan = [502, 504]
+
+        node_id = session.get_osdf().insert_node({"node_type": "subject"})
+
+        self.assertEqual(node_id, "existing1")
+        self.assertEqual(seen, [{"node_type": "subject"}] * 2)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def testCircuitBreaker(self):
+        """ Test that requests fail fast while the server is down. """
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+
+        session = self._session(port=port, retries=1, failure_threshold=3,
+                                reset_timeout=0.2)
+
+        with self.assertRaises(socket.error):
+            session.get_osdf().get_node("abc")
+
+        # The breaker opens on the third failure, cutting the retries short.
+        with self.assertRaises(CircuitOpenError):
+            session.get_osdf().get_node("abc")
+
+        with self.assertRaises(CircuitOpenError):
+            session.get_osdf().get_node("abc")
+
+        stats = session.get_retry_stats()
+        self.assertEqual(stats['breaker_state'], CircuitBreaker.OPEN)
+        self.assertEqual(stats['breaker_opened'], 1)
+        self.assertEqual(stats['breaker_rejected'], 2)
+
+        # Once the reset timeout has passed, a trial request is let through.
+        time.sleep(0.25)
+        session.port = self.port
+
+        self.assertEqual(session.get_osdf().get_node("abc")['id'], "abc")
+        self.assertEqual(session.get_circuit_breaker().state,
+                         CircuitBreaker.CLOSED)
+
+    def testHalfOpen(self):
+        """ Test that a failed trial request opens the breaker again. """
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        breaker.before_call()
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(breaker.opened, 2)
+
+    def testLocalErrors(self):
+        """ Test that errors raised locally do not open the breaker. """
+        session = self._session(failure_threshold=2, reset_timeout=0)
+        request = session.get_osdf()._request
+
+        def _send(method, resource, data=None):
+            raise ValueError("Not a server failure.")
+
+        request._send = _send
+
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                request.get("/nodes/abc")
+
+        breaker = session.get_circuit_breaker()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.opened, 0)
+
+        # A trial request that fails locally lets the next one through.
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        with self.assertRaises(ValueError):
+            request.get("/nodes/abc")
+
+        del request._send
+        self.assertEqual(session.get_osdf().get_node("abc")['id'], "abc")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def testBackoff(self):
+        """ Test the bounds of the jittered exponential backoff. """
+        policy = RetryPolicy(backoff=1, max_backoff=5)
+
+        for attempt in range(6):
+            delay = policy.delay(attempt)
+            self.failUnless(0 <= delay <= min(5, 2 ** attempt))
+
+        with self.assertRaises(ValueError):
+            RetryPolicy(retries=-1)
+
+        with self.assertRaises(ValueError):
+            CircuitBreaker(failure_threshold=0)
+
+if __name__ == '__main__':
+    unittest.main()
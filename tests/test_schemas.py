@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+
+""" A unittest script for the schemas module. """
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from cutlass import iHMPSession, Subject
+from cutlass.schemas import SchemaCache, SchemaError, compile_schema
+
+# pylint: disable=W0703, C1801
+
+_SUBJECT_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "title": "subject",
+    "type": "object",
+    "properties": {
+        "rand_subject_id": {"type": "string", "minLength": 1},
+        "gender": {"enum": ["male", "female", "unknown"]},
+        "race": {"$ref": "#/definitions/race"},
+        "subtype": {"type": "string"},
+        "tags": {"$ref": "tags"}
+    },
+    "definitions": {
+        "race": {"type": "string", "pattern": "^[a-z_]+$"}
+    },
+    "required": ["rand_subject_id", "gender", "tags"],
+    "additionalProperties": False
+}
+
+_AUX_SCHEMAS = {
+    "tags": {"type": "array", "items": {"type": "string"}, "uniqueItems": True}
+}
+
+def _subject(**meta):
+    subject = Subject()
+    subject.gender = meta.get("gender", "male")
+    subject.rand_subject_id = meta.get("rand_subject_id", "r1")
+    subject.links = {"participates_in": ["study1"]}
+
+    return subject
+
+class SchemasTest(unittest.TestCase):
+    """ A unit test class for the schemas module. """
+
+    def setUp(self):
+        """ Start a local server serving the subject schema. """
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "schemas.json")
+
+        self.session = iHMPSession.local(schema_cache=self.path,
+                                         local_validation=True)
+        self.server = self.session.get_local_server()
+        self.server.schemas["hmbr"] = {"subject": _SUBJECT_SCHEMA}
+        self.server.aux_schemas["hmbr"] = _AUX_SCHEMAS
+
+    def tearDown(self):
+        """ Stop the local server and remove the schema file. """
+        self.session.close()
+        self.server.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def _requests(self, name):
+        return self.server.requests.get(name, 0)
+
+    def testCompile(self):
+        """ Test the validators compiled from schemas. """
+        validate = compile_schema(_SUBJECT_SCHEMA, _AUX_SCHEMAS)
+
+        self.assertEqual(validate({"rand_subject_id": "r1", "gender": "male",
+                                   "race": "asian", "tags": ["a"]}), [])
+
+        problems = validate({"rand_subject_id": "", "gender": "other",
+                             "race": "Asian", "tags": ["a", "a", 1],
+                             "extra": True})
+        self.assertEqual(len(problems), 6, problems)
+
+        problems = validate({"gender": "male"})
+        self.assertEqual(sorted(problems), ["meta.rand_subject_id is required.",
+                                            "meta.tags is required."])
+
+        numbers = compile_schema({"type": "integer", "minimum": 0,
+                                  "exclusiveMinimum": True, "maximum": 10})
+        self.assertEqual(numbers(5), [])
+        self.assertEqual(len(numbers(0)), 1)
+        self.assertEqual(len(numbers(True)), 1)
+        self.assertEqual(len(numbers(2.5)), 1)
+
+        either = compile_schema({"anyOf": [{"type": "string"},
+                                           {"type": "null"}]})
+        self.assertEqual(either(None), [])
+        self.assertEqual(len(either(1)), 1)
+
+        for schema in ({"type": "object", "dependencies": {}},
+                       {"$ref": "unknown_aux_schema"}):
+            with self.assertRaises(SchemaError):
+                compile_schema(schema)
+
+    def testLocalValidation(self):
+        """ Test that validation does not ask OSDF. """
+        subject = _subject()
+
+        self.assertEqual(subject.validate(session=self.session), [])
+        self.failUnless(subject.is_valid(session=self.session))
+
+        subject.rand_subject_id = ""
+        self.failIf(subject.is_valid(session=self.session))
+        self.failUnless("rand_subject_id" in
+                        subject.validate(session=self.session)[0])
+
+        subject.rand_subject_id = "r1"
+        self.failUnless(subject.save(session=self.session))
+
+        self.assertEqual(self._requests('validate_node'), 0)
+        self.assertEqual(self._requests('get_schemas'), 1)
+        self.assertEqual(self._requests('insert_node'), 1)
+
+        # Node types without a schema are left to OSDF.
+        (valid, _error) = self.session.get_osdf().validate_node(
+            {"ns": "hmbr", "node_type": "visit", "acl": {"read": [], "write": []},
+             "linkage": {}, "meta": {}})
+        self.failUnless(valid)
+        self.assertEqual(self._requests('validate_node'), 1)
+
+    def testPersistence(self):
+        """ Test that the schemas are kept on disk between sessions. """
+        self.failUnless(_subject().is_valid(session=self.session))
+
+        session = self.server.session(schema_cache=self.path,
+                                      local_validation=True)
+        self.failUnless(_subject().is_valid(session=session))
+
+        self.assertEqual(self._requests('get_schemas'), 1)
+
+        # Sessions leave validation to OSDF unless asked otherwise.
+        session = self.server.session()
+        self.failUnless(session.get_schema_cache() is None)
+        self.failUnless(_subject().is_valid(session=session))
+
+        self.assertEqual(self._requests('validate_node'), 1)
+
+    def testChangedSchema(self):
+        """ Test what happens once a schema changes. """
+        session = self.server.session(schema_fallback=True,
+                                      local_validation=True)
+        subject = _subject(gender="unknown")
+
+        self.failUnless(subject.is_valid(session=self.session))
+        self.failUnless(subject.is_valid(session=session))
+
+        changed = dict(_SUBJECT_SCHEMA,
+                       properties=dict(_SUBJECT_SCHEMA["properties"],
+                                       gender={"enum": ["male", "female"]}))
+        self.server.schemas["hmbr"] = {"subject": changed}
+
+        # The rejected insert makes the sessions retrieve the schemas again.
+        self.failIf(subject.save(session=self.session))
+        self.failIf(subject.save(session=session))
+
+        self.failIf(subject.is_valid(session=self.session))
+        self.assertEqual(self._requests('validate_node'), 0)
+
+        self.failIf(subject.is_valid(session=session))
+        self.assertEqual(self._requests('validate_node'), 1)
+
+    def testFetchOutsideLock(self):
+        """ Test that retrieving schemas does not hold up other threads. """
+        cache = SchemaCache()
+        fetching = threading.Event()
+        release = threading.Event()
+
+        class _SlowOSDF(object):
+            """ Stands in for OSDF, blocking while serving namespace 'slow'. """
+
+            @staticmethod
+            def get_schemas(namespace):
+                if namespace == "slow":
+                    fetching.set()
+                    release.wait(5)
+
+                return {"subject": _SUBJECT_SCHEMA}
+
+            @staticmethod
+            def get_aux_schemas(_namespace):
+                return _AUX_SCHEMAS
+
+        doc = _subject()._get_raw_doc()
+        self.assertEqual(cache.validate(_SlowOSDF, doc), (True, None))
+
+        slow = dict(doc, ns="slow")
+        thread = threading.Thread(target=cache.validate, args=(_SlowOSDF, slow))
+        thread.start()
+
+        try:
+            self.failUnless(fetching.wait(5))
+
+            # The schemas already retrieved can be used meanwhile.
+            start = time.time()
+            self.assertEqual(cache.validate(_SlowOSDF, doc), (True, None))
+            self.failUnless(time.time() - start < 1)
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(cache.hits, 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+""" A unittest script for the throttle module. """
+
+import threading
+import time
+import unittest
+
+from cutlass import iHMPSession
+from cutlass.throttle import Throttle, TokenBucket
+
+# pylint: disable=W0703, C1801
+
+class _Tracker(object):
+    """ Records how many calls run at once, per HTTP method. """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.max_in_flight = {}
+
+    def __call__(self, method, resource, data=None):
+        with self.lock:
+            count = self.in_flight.get(method, 0) + 1
+            self.in_flight[method] = count
+            self.max_in_flight[method] = max(self.max_in_flight.get(method, 0),
+                                             count)
+
+        time.sleep(self.delay)
+
+        with self.lock:
+            self.in_flight[method] -= 1
+
+        if method == "POST":
+            return {"headers": {"location": "/nodes/new1"}, "content": "",
+                    "code": 201}
+
+        return {"headers": {}, "content": '{"id": "a", "ver": 1}', "code": 200}
+
+class ThrottleTest(unittest.TestCase):
+    """ A unit test class for the throttle module. """
+
+    def testTokenBucket(self):
+        """ Test that the token bucket holds requests to its rate. """
+        bucket = TokenBucket(rate=50, burst=5)
+
+        start = time.time()
+
+        for _request in range(15):
+            bucket.acquire()
+
+        elapsed = time.time() - start
+
+        # The first 5 go out at once, the next 10 need 0.2 seconds.
+        self.failUnless(elapsed >= 0.18, "Requests were held back.")
+        self.failUnless(elapsed < 1, "Requests were not held back too long.")
+
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+    def testMaxInFlight(self):
+        """ Test the limit on simultaneous requests. """
+        throttle = Throttle(max_in_flight=2)
+        tracker = _Tracker(0.02)
+
+        def request():
+            with throttle:
+                tracker("GET", "/nodes/a")
+
+        threads = [threading.Thread(target=request) for _num in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(tracker.max_in_flight["GET"], 2)
+        self.assertEqual(throttle.requests, 8)
+        self.failUnless(throttle.waited > 0)
+
+        with self.assertRaises(ValueError):
+            Throttle(max_in_flight=0)
+
+    def testSessionBudgets(self):
+        """ Test that reads and writes have separate budgets. """
+        session = iHMPSession("test", "test", server="staging",
+                              max_reads_in_flight=3, max_writes_in_flight=1)
+
+        tracker = _Tracker(0.02)
+        session.get_osdf()._request._send = tracker
+
+        osdf = session.get_osdf()
+        calls = [lambda: osdf.get_node("a")] * 8 + \
+                [lambda: osdf.insert_node({"node_type": "subject"})] * 4
+
+        futures = [session.get_executor().submit(call) for call in calls]
+
+        for future in futures:
+            future.result()
+
+        self.assertEqual(tracker.max_in_flight["GET"], 3)
+        self.assertEqual(tracker.max_in_flight["POST"], 1)
+        self.assertEqual(session.get_read_throttle().requests, 8)
+        self.assertEqual(session.get_write_throttle().requests, 4)
+
+if __name__ == '__main__':
+    unittest.main()
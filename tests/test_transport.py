@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+
+""" A unittest script for the transport module. """
+
+import json
+import threading
+import time
+import unittest
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+
+from cutlass import iHMPSession
+from cutlass.transport import ConnectionPool, SessionOSDF
+
+# pylint: disable=W0703, C1801
+
+class _Handler(BaseHTTPRequestHandler):
+    """ Answers every request with a tiny JSON node document. """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        """ Handle a GET request. """
+        server = self.server
+
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+        time.sleep(server.delay)
+
+        with server.lock:
+            server.in_flight -= 1
+
+        body = json.dumps({"id": self.path.split("/")[-1], "ver": 1})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """ Keep the test output quiet. """
+        pass
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+class TransportTest(unittest.TestCase):
+    """ A unit test class for the transport module. """
+
+    server = None
+
+    @classmethod
+    def setUpClass(cls):
+        """ Start a local keep-alive HTTP server. """
+        cls.server = _Server(("127.0.0.1", 0), _Handler)
+        cls.server.lock = threading.Lock()
+        cls.server.in_flight = 0
+        cls.server.max_in_flight = 0
+        cls.server.delay = 0
+
+        thread = threading.Thread(target=cls.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        cls.port = cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        """ Stop the local HTTP server. """
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def _client(self, pool):
+        return SessionOSDF("127.0.0.1", "test", "test", port=self.port,
+                           ssl=False, pool=pool)
+
+    def testConnectionReuse(self):
+        """ Test that sequential requests share a single connection. """
+        pool = ConnectionPool()
+        osdf = self._client(pool)
+
+        for node_id in range(20):
+            node = osdf.get_node("node%s" % node_id)
+            self.assertEqual(node['id'], "node%s" % node_id)
+
+        self.assertEqual(pool.created, 1, "Only one connection was opened.")
+        self.assertEqual(pool.reused, 19, "The connection was reused.")
+        self.assertEqual(pool.idle_count(), 1)
+
+        pool.close()
+        self.assertEqual(pool.idle_count(), 0)
+
+    def testMaxIdle(self):
+        """ Test that expired idle connections are not reused. """
+        pool = ConnectionPool(max_idle=-1)
+        osdf = self._client(pool)
+
+        osdf.get_node("first")
+        osdf.get_node("second")
+
+        self.assertEqual(pool.created, 2)
+        self.assertEqual(pool.reused, 0)
+
+    def testPoolSize(self):
+        """ Test that a pool size of zero disables keep-alive. """
+        pool = ConnectionPool(pool_size=0)
+        osdf = self._client(pool)
+
+        osdf.get_node("first")
+        osdf.get_node("second")
+
+        self.assertEqual(pool.created, 2)
+        self.assertEqual(pool.idle_count(), 0)
+
+    def testPerHostLimit(self):
+        """ Test that concurrent threads respect the per host limit. """
+        pool = ConnectionPool(per_host_limit=2)
+        osdf = self._client(pool)
+
+        self.server.max_in_flight = 0
+        self.server.delay = 0.05
+        errors = []
+
+        def fetch(node_id):
+            try:
+                osdf.get_node(node_id)
+            except Exception as fetch_exception:
+                errors.append(fetch_exception)
+
+        threads = [threading.Thread(target=fetch, args=("n%s" % num,))
+                   for num in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.server.delay = 0
+
+        self.assertEqual(errors, [])
+        self.assertTrue(self.server.max_in_flight <= 2)
+        self.assertEqual(pool.created, 2)
+
+    def testInvalidSettings(self):
+        """ Test that invalid pool settings are rejected. """
+        with self.assertRaises(ValueError):
+            ConnectionPool(pool_size=-1)
+
+        with self.assertRaises(ValueError):
+            ConnectionPool(per_host_limit=0)
+
+    def testSessionSharesPool(self):
+        """ Test that the session's OSDF client uses the session's pool. """
+        session = iHMPSession("test", "test", server="127.0.0.1",
+                              port=self.port, ssl=False)
+
+        osdf = session.get_osdf()
+        self.assertTrue(osdf.pool is session.get_pool())
+
+        osdf.get_node("a")
+        session.port = self.port
+        osdf.get_node("b")
+
+        self.assertEqual(session.get_pool().created, 1)
+
+        session.close()
+
+if __name__ == '__main__':
+    unittest.main()
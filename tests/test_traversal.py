@@ -0,0 +1,419 @@
+#!/usr/bin/env python
+
+""" A unittest script for the traversal module. """
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from cutlass import iHMPSession, Sample, Study, Subject
+from cutlass.Base import NodeRef
+from cutlass.dependency import dependency_methods, node_classes
+from cutlass.traversal import Pruner, child_docs, lineage, walk
+
+# pylint: disable=W0703, C1801
+
+def _doc(node_type, linkage, **meta):
+    meta.setdefault("tags", [])
+
+    return {
+        "ns": "hmbr",
+        "node_type": node_type,
+        "acl": {"read": ["all"], "write": ["hmbr"]},
+        "linkage": linkage,
+        "meta": meta
+    }
+
+def _walk(node):
+    """ Walks the tree one node at a time, like children() used to. """
+    method = dependency_methods.get(node.__class__.__name__)
+
+    if method is None:
+        return
+
+    for child in getattr(node, method)():
+        yield child
+
+        for descendant in _walk(child):
+            yield descendant
+
+class TraversalTest(unittest.TestCase):
+    """ A unit test class for the traversal module. """
+
+    def setUp(self):
+        """ Start a local server holding a study with a few subjects. """
+        self.session = iHMPSession.local(page_size=5, query_cache_ttl=0)
+        self.server = self.session.get_local_server()
+
+        self.study_id = self.server.load([
+            _doc("study", {"part_of": ["project1"]}, name="s",
+                 description="d", center="Broad Institute",
+                 contact="Someone", subtype="ibd")])[0]
+
+        self.subject_ids = subject_ids = self.server.load([
+            _doc("subject", {"participates_in": [self.study_id]},
+                 gender="male", rand_subject_id="r%s" % num)
+            for num in range(12)])
+
+        docs = []
+
+        for subject_id in subject_ids:
+            docs.append(_doc("subject_attr", {"associated_with": [subject_id]},
+                             study="ibd"))
+
+            for num in range(2):
+                docs.append(_doc("visit", {"by": [subject_id]},
+                                 visit_id="v%s" % num, visit_number=num + 1,
+                                 interval=num))
+
+        self.server.load(docs)
+
+        # A node of a type that is not a child of a subject.
+        self.stray_id = self.server.load([
+            _doc("visit_attr", {"associated_with": [subject_ids[0]]},
+                 study="ibd")])[0]
+
+    def tearDown(self):
+        """ Stop the local server. """
+        self.session.close()
+        self.server.stop()
+
+    def _queries(self):
+        return self.server.requests.get('oql_query', 0)
+
+    def testChildren(self):
+        """ Test that the tree is the same as when walked node by node. """
+        with self.session:
+            study = Study.load(self.study_id)
+
+            # Subject.attributes() takes anything associated with a subject.
+            expected = [node.id for node in _walk(study)
+                        if node.id != self.stray_id]
+            queries = self._queries()
+
+            found = [node.id for node in study.children(flatten=True)]
+
+        self.assertEqual(found, expected)
+        self.assertEqual(len(found), 12 * 4)
+
+        # One query per level, linkage and page of results: 3 pages of
+        # subjects, 5 of visits, 3 of attributes and an empty one of samples.
+        self.assertEqual(self._queries() - queries, 3 + 5 + 3 + 1)
+
+    def testStreaming(self):
+        """ Test that flattened children are yielded as they are found. """
+        with self.session:
+            study = Study.load(self.study_id)
+
+            queries = self._queries()
+            nodes = study.children(flatten=True)
+
+            self.assertEqual(next(nodes).id, self.subject_ids[0])
+
+            # Only the subjects were retrieved so far.
+            self.assertEqual(self._queries() - queries, 3)
+
+            self.assertEqual(len(list(nodes)), 12 * 4 - 1)
+            self.assertEqual(self._queries() - queries, 3 + 5 + 3 + 1)
+
+            # A small chunk size retrieves the tree a few nodes at a time.
+            found = [node.id for node in
+                     walk(study, session=self.session, chunk_size=2)]
+            self.assertEqual(found, [node.id for node in
+                                     study.children(flatten=True)])
+
+    def testNested(self):
+        """ Test the generators returned without flattening. """
+        with self.session:
+            study = Study.load(self.study_id)
+            subtrees = list(study.children())
+
+        self.assertEqual(len(subtrees), 12)
+
+        for subtree in subtrees:
+            subject = next(subtree)
+            self.assertEqual(subject.links["participates_in"], [self.study_id])
+
+            children = [next(child) for child in subtree]
+            self.assertEqual([child.__class__.__name__ for child in children],
+                             ["Visit", "Visit", "SubjectAttribute"])
+
+    def testWorkers(self):
+        """ Test exploring the tree on several threads. """
+        with self.session:
+            study = Study.load(self.study_id)
+            expected = [node.id for node in study.children(flatten=True)]
+
+            found = [node.id for node in
+                     study.children(flatten=True, workers=4)]
+            self.assertEqual(found, expected)
+
+            # Exploring ahead of the caller is limited, but still finishes.
+            found = [node.id for node in
+                     study.children(flatten=True, workers=4, max_frontier=1)]
+            self.assertEqual(found, expected)
+
+            unordered = [node.id for node in
+                         study.children(flatten=True, workers=4, ordered=False)]
+            self.assertEqual(sorted(unordered), sorted(expected))
+
+            subtrees = list(study.children(workers=4))
+            self.assertEqual(len(subtrees), 12)
+            self.assertEqual(next(subtrees[0]).id, expected[0])
+
+            # Stopping early leaves nothing behind.
+            first = study.children(flatten=True, workers=4)
+            self.assertEqual(next(first).id, expected[0])
+            first.close()
+
+        for kwargs in ({"workers": 0}, {"ordered": False},
+                       {"workers": 2, "ordered": False, "flatten": False},
+                       {"workers": 2, "max_frontier": 0, "flatten": True}):
+            with self.assertRaises(ValueError):
+                list(study.children(session=self.session, **kwargs))
+
+    def testSharedChildren(self):
+        """ Test limited walks through nodes with several parents. """
+        subject_ids = self.subject_ids[:6]
+        docs = []
+
+        for num in range(6):
+            parents = [subject_ids[num], subject_ids[(num + 1) % 6]]
+            docs.append(_doc("visit", {"by": parents}, visit_id="shared%s" % num,
+                             visit_number=num + 1, interval=num))
+
+        visit_ids = self.server.load(docs)
+
+        mixs = dict((key, key) for key in
+                    ("biome", "body_product", "env_package", "feature",
+                     "geo_loc_name", "lat_lon", "material", "project_name",
+                     "rel_to_oxygen", "samp_collect_device",
+                     "samp_mat_process", "samp_size"))
+        mixs.update(collection_date="2000-01-01", source_mat_id=["a"])
+
+        self.server.load([_doc("sample", {"collected_during": [visit_id]},
+                               fma_body_site="site", mixs=mixs)
+                          for visit_id in visit_ids])
+
+        with self.session:
+            study = Study.load(self.study_id)
+            expected = sorted(node.id for node in
+                              study.children(flatten=True, workers=4,
+                                             ordered=False))
+
+            self.failUnless(set(visit_ids) < set(expected))
+
+            for max_frontier in (1, 3):
+                found = [node.id for node in
+                         study.children(flatten=True, workers=4, ordered=False,
+                                        max_frontier=max_frontier)]
+                self.assertEqual(sorted(found), expected)
+
+            found = set(node.id for node in
+                        study.children(flatten=True, workers=4, max_frontier=1))
+            self.assertEqual(sorted(found), expected)
+
+            # Shared subtrees are yielded under each of their parents.
+            found = [node.id for node in study.children(flatten=True)]
+            self.assertEqual(found, [node.id for node in _walk(study)
+                                     if node.id != self.stray_id])
+
+    def testPruning(self):
+        """ Test that subtrees without wanted node types are skipped. """
+        def _walk(**kwargs):
+            queries = self._queries()
+            found = [node.__class__.__name__ for node in
+                     study.children(flatten=True, **kwargs)]
+
+            return (found, self._queries() - queries)
+
+        with self.session:
+            study = Study.load(self.study_id)
+
+            # Visits can not lead to attributes, so they are not expanded.
+            self.assertEqual(_walk(types=["subject_attr"]),
+                             (["SubjectAttribute"] * 12, 3 + 3))
+
+            # Nor samples to visits.
+            self.assertEqual(_walk(types=["visit"]), (["Visit"] * 24, 3 + 5))
+            # The subjects are split across the workers, 3 to a query.
+            self.assertEqual(_walk(types=["visit"], workers=4, ordered=False),
+                             (["Visit"] * 24, 3 + 4 * 2))
+
+            # Subject attributes can not lead to samples.
+            self.assertEqual(_walk(types=["sample"]), ([], 3 + 5 + 1))
+
+            self.assertEqual(_walk(max_depth=1), (["Subject"] * 12, 3))
+            self.assertEqual(_walk(max_depth=0), ([], 0))
+
+            # Without flattening, the nodes leading to the wanted ones stay.
+            subtree = next(study.children(types=["visit"]))
+            self.assertEqual(next(subtree).__class__.__name__, "Subject")
+            self.assertEqual([next(child).__class__.__name__ for child in subtree],
+                             ["Visit", "Visit"])
+
+        # Linkages are narrowed down to the node types leading somewhere.
+        sample = Sample()
+        self.assertEqual(Pruner(types=["wgs_raw_seq_set"]).linkages(sample),
+                         [("prepared_from", ("wgs_dna_prep",))])
+        self.assertEqual(Pruner(types=["16s_dna_prep"], max_depth=1).linkages(sample),
+                         [("prepared_from", ("16s_dna_prep",))])
+        self.assertEqual(Pruner(types=["wgs_raw_seq_set"], max_depth=1).linkages(sample),
+                         [])
+
+        for kwargs in ({"types": ["unknown"]}, {"max_depth": -1}):
+            with self.assertRaises(ValueError):
+                Pruner(**kwargs)
+
+    def testExport(self):
+        """ Test streaming the documents below a node to NDJSON. """
+        tmpdir = tempfile.mkdtemp()
+        counts = []
+
+        try:
+            with self.session:
+                study = Study.load(self.study_id)
+                expected = sorted(node.id for node in study.children(flatten=True))
+
+                path = os.path.join(tmpdir, "study.ndjson.gz")
+                queries = self._queries()
+                written = study.export_subtree(path, progress=counts.append)
+                all_queries = self._queries() - queries
+
+                with gzip.open(path) as export:
+                    docs = [json.loads(line) for line in export]
+
+                out = StringIO()
+                queries = self._queries()
+                visits = study.export_subtree(out, types=["visit"])
+                visit_queries = self._queries() - queries
+
+                queries = self._queries()
+                list(study.children(flatten=True, workers=4, ordered=False,
+                                    types=["visit"]))
+                pruned_queries = self._queries() - queries
+        finally:
+            shutil.rmtree(tmpdir)
+
+        self.assertEqual(written, len(expected))
+        self.assertEqual(counts, [written])
+        self.assertEqual(sorted(doc["id"] for doc in docs), expected)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(visits, 24)
+        self.assertEqual(len(lines), 24)
+        self.failUnless(all(json.loads(line)["node_type"] == "visit"
+                            for line in lines))
+
+        # Visits are not expanded when only visits are exported.
+        self.assertEqual(visit_queries, pruned_queries)
+        self.failUnless(visit_queries < all_queries)
+
+        with self.assertRaises(ValueError):
+            study.export_subtree(StringIO(), types=["unknown"],
+                                 session=self.session)
+
+    def testChildDocs(self):
+        """ Test the retrieval of the children of many nodes at once. """
+        with self.session:
+            study = Study.load(self.study_id)
+            subjects = [subtree.next() for subtree in study.children()]
+
+            queries = self._queries()
+            docs = child_docs(subjects, chunk_size=5)
+
+        # Three chunks per linkage, and 'by' has a second page for each.
+        self.assertEqual(self._queries() - queries, 3 * 2 + 3)
+        self.assertEqual(sorted(docs.keys()),
+                         sorted([subject.id for subject in subjects]))
+
+        for subject in subjects:
+            self.assertEqual([doc['node_type'] for doc in docs[subject.id]],
+                             ["visit", "visit", "subject_attr"])
+
+        with self.assertRaises(ValueError):
+            child_docs(subjects, session=self.session, chunk_size=0)
+
+    def testIdsOnly(self):
+        """ Test walking, searching and listing by ID only. """
+        with self.session:
+            study = Study.load(self.study_id)
+            expected = [(node.id, node.__class__.__name__)
+                        for node in study.children(flatten=True)]
+
+            for kwargs in ({}, {"workers": 4},
+                           {"workers": 4, "ordered": False}):
+                refs = list(study.children(flatten=True, ids_only=True, **kwargs))
+
+                self.failUnless(all(isinstance(ref, NodeRef) for ref in refs))
+
+                found = [(ref.id, node_classes[ref.node_type].__name__)
+                         for ref in refs]
+
+                if kwargs.get("ordered", True):
+                    self.assertEqual(found, expected)
+                else:
+                    self.assertEqual(sorted(found), sorted(expected))
+
+            refs = list(Subject.search_iter('"r1"[rand_subject_id]', ids_only=True))
+            self.assertEqual([ref.id for ref in refs], [self.subject_ids[1]])
+            self.assertEqual(refs[0].node_type, "subject")
+
+            refs = list(study.subjects(ids_only=True))
+            self.assertEqual(sorted(ref.id for ref in refs),
+                             sorted(self.subject_ids))
+
+            # References can be handed to lineage() in place of objects.
+            self.assertEqual(lineage(refs[:1]),
+                             {refs[0].id: {"study": [self.study_id]}})
+
+    def testLineage(self):
+        """ Test resolving the ancestors of many nodes at once. """
+        server = self.server
+        subject_ids = self.subject_ids
+
+        visit_ids = server.load([_doc("visit", {"by": [subject_id]},
+                                      visit_id="v", visit_number=1, interval=0)
+                                 for subject_id in subject_ids[:4]])
+        sample_ids = server.load([_doc("sample", {"collected_during": [visit_id]},
+                                       fma_body_site="b", body_site="b")
+                                  for visit_id in visit_ids])
+        matrix_id = server.load([_doc("abundance_matrix",
+                                      {"computed_from": sample_ids[:2]},
+                                      matrix_type="x")])[0]
+
+        with self.session:
+            gets = server.requests.get('get_node', 0)
+            ancestry = lineage(sample_ids + [matrix_id, "missing"])
+
+            # One concurrent batch per level: the given nodes, the visits,
+            # the subjects and the study, each retrieved once.
+            self.assertEqual(server.requests.get('get_node', 0) - gets,
+                             6 + 4 + 4 + 1)
+
+            self.assertEqual(ancestry[sample_ids[0]],
+                             {"visit": [visit_ids[0]],
+                              "subject": [subject_ids[0]],
+                              "study": [self.study_id]})
+            self.assertEqual(ancestry[matrix_id],
+                             {"sample": sample_ids[:2],
+                              "visit": visit_ids[:2],
+                              "subject": subject_ids[:2],
+                              "study": [self.study_id]})
+            self.assertEqual(ancestry["missing"], {})
+
+            # Nodes may be given as objects, and climbing may stop early.
+            subjects = [Subject.load(subject_id)
+                        for subject_id in subject_ids[:2]]
+            self.assertEqual(lineage(subjects, up_to="subject"),
+                             dict((subject.id, {}) for subject in subjects))
+
+            with self.assertRaises(ValueError):
+                lineage(subjects, up_to="unknown")
+
+if __name__ == '__main__':
+    unittest.main()
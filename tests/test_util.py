@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+""" A unittest script for the Util module. """
+
+import unittest
+
+from cutlass import Sample, Subject
+from cutlass.Base import Base
+from cutlass.DiseaseMeta import DiseaseMeta
+
+# pylint: disable=W0703, C1801
+
+class ClassLoggerTest(unittest.TestCase):
+    """ A unit test class for the ClassLogger class attribute. """
+
+    def testOncePerClass(self):
+        """ Test that building objects does not add logging handlers. """
+        handlers = len(Sample().logger.handlers)
+
+        for _num in range(1000):
+            sample = Sample()
+
+        self.assertEqual(len(sample.logger.handlers), handlers)
+        self.failIf("logger" in getattr(sample, "__dict__", {}))
+
+        self.failUnless(sample.logger is Sample.logger)
+        self.failIf(Sample.logger is Base.logger)
+        self.failIf(Sample.logger is Subject.logger)
+
+    def testNames(self):
+        """ Test that loggers are named after the module and class. """
+        self.assertEqual(Sample.logger.name, "cutlass.Sample.Sample")
+        self.assertEqual(Subject().logger.name, "cutlass.Subject.Subject")
+        self.assertEqual(DiseaseMeta().logger.name,
+                         DiseaseMeta.__module__ + ".DiseaseMeta")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -68,6 +68,43 @@ class VisitAttributeTest(unittest.TestCase):
         self.assertTrue(success, "Able to use 'to_json'.")
         self.assertTrue(attr_json is not None, "to_json() returned data.")
 
+    def testFieldsBoundOnce(self):
+        """ Test that creating objects leaves the class properties alone. """
+        from cutlass import VisitAttribute
+
+        prop = VisitAttribute.__dict__['age']
+        attr = self.session.create_visit_attr()
+
+        self.failUnless(VisitAttribute.__dict__['age'] is prop)
+        self.failIf("age" in getattr(attr, "__dict__", {}))
+
+    def testLoad(self):
+        """ Test that loading a document fills in the nested fields. """
+        from cutlass import VisitAttribute
+
+        attr = self.session.create_visit_attr()
+
+        attr.comment = "comment"
+        attr.study = "prediabetes"
+        attr.survey_id = "survey"
+        attr.age = 30
+        attr.thirtym_gluc = 90
+        attr.breakfast_food = "eggs"
+        attr.disease_name = "disease"
+
+        doc = attr._get_raw_doc()
+        doc['id'] = "visit_attr_load"
+        doc['ver'] = 1
+
+        loaded = VisitAttribute.load_visit_attr(doc)
+
+        self.assertEqual(loaded.age, 30)
+        self.assertEqual(loaded.thirtym_gluc, 90)
+        self.assertEqual(loaded.breakfast_food, "eggs")
+        self.assertEqual(loaded.disease_name, "disease")
+        self.assertEqual(loaded.disease_description, None)
+        self.assertEqual(loaded.lunch_food, None)
+
     def testComment(self):
         """ Test the comment property. """
         attr = self.session.create_visit_attr()